@@ -1,14 +1,32 @@
 """
-Entry point para rodar o servidor uvicorn
+Entry point do servidor.
+
+    python -m api                 # desenvolvimento: uvicorn com reload
+    python -m api --production    # produção: gunicorn (SERVER_WORKERS, 1 por padrão)
 """
 
+import argparse
+
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "api.infra.web.app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info",
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="gunicorn + uvicorn workers configurados pelas variáveis SERVER_*",
     )
+    args = parser.parse_args()
+
+    if args.production:
+        from api.infra.server import run_production_server
+
+        run_production_server()
+    else:
+        uvicorn.run(
+            "api.infra.web.app:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=True,
+            log_level="info",
+        )
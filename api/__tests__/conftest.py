@@ -0,0 +1,60 @@
+import json
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+from api.infra.services.predict_services.model_registry import (
+    FEATURE_ORDER,
+    SMOKE_BATCH,
+)
+
+
+def build_model_package(seed: int = 0, threshold: float = 0.5) -> dict:
+    """Fits a small LogisticRegression package with the same layout as production"""
+    rng = np.random.default_rng(seed)
+    rows = [dict(SMOKE_BATCH[i % len(SMOKE_BATCH)]) for i in range(60)]
+    df = pd.DataFrame(rows)[FEATURE_ORDER]
+    numeric = [c for c in FEATURE_ORDER if c not in ("education_level", "income_level")]
+    df[numeric] = df[numeric] * rng.uniform(0.8, 1.2, size=(len(df), len(numeric)))
+    df["education_level"] = rng.choice(
+        ["Graduate", "Highschool", "No formal", "Postgraduate"], size=len(df)
+    )
+    df["income_level"] = rng.choice(
+        ["High", "Low", "Lower-Middle", "Middle", "Upper-Middle"], size=len(df)
+    )
+    y = (df["hba1c"] > 6.0).astype(int).values
+
+    label_encoders = {}
+    for col in ("education_level", "income_level"):
+        encoder = LabelEncoder().fit(df[col].astype(str))
+        df[col] = encoder.transform(df[col].astype(str))
+        label_encoders[col] = encoder
+
+    scaler = MinMaxScaler().fit(df)
+    model = LogisticRegression(random_state=seed).fit(scaler.transform(df), y)
+
+    return {
+        "model": model,
+        "threshold": threshold,
+        "preprocessors": {"label_encoders": label_encoders, "scaler": scaler},
+    }
+
+
+@pytest.fixture
+def model_artifact_factory(tmp_path):
+    """Writes versioned model artifacts under tmp_path/models/<version>/"""
+    models_dir = tmp_path / "models"
+
+    def _create(version: str, seed: int = 0, threshold: float = 0.5, **metadata):
+        version_dir = models_dir / version
+        version_dir.mkdir(parents=True, exist_ok=True)
+        artifact = version_dir / "diabetes_model.joblib"
+        joblib.dump(build_model_package(seed=seed, threshold=threshold), artifact)
+        with open(version_dir / "model_metadata.json", "w", encoding="utf-8") as f:
+            json.dump({"model_type": "LogisticRegression", **metadata}, f)
+        return artifact
+
+    _create.models_dir = models_dir
+    return _create
@@ -0,0 +1 @@
+# DTO tests
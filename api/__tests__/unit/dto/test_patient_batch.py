@@ -0,0 +1,215 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from api.application.dto.diabetes_prediction import (
+    PatientBatchValidationError,
+    PatientData,
+    validate_patient_batch,
+)
+from api.application.dto.patient_batch import (
+    BATCH_COLUMNS,
+    PatientBatch,
+    validate_patient_columns,
+    validate_patient_matrix,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    CONFIDENCE_LEVELS,
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import (
+    FEATURE_ORDER,
+    ModelRegistry,
+    SMOKE_BATCH,
+)
+from api.infra.utils.data_formatter import format_patient_data
+
+
+@pytest.fixture
+def service(model_artifact_factory):
+    """Prediction service bound to a test model"""
+    model_artifact_factory("v1", seed=0)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate("v1")
+    return DiabetesPredictionService(registry=registry)
+
+
+class TestPatientBatch:
+    """Test suite for the columnar PatientBatch"""
+
+    def test_columns_follow_model_feature_order(self):
+        """Test that the matrix layout is the one the model scores"""
+        assert list(BATCH_COLUMNS) == FEATURE_ORDER
+
+    def test_dtos_and_records_build_the_same_matrix(self):
+        """Test that both entry points encode categories identically"""
+        from_records = PatientBatch.from_records(SMOKE_BATCH)
+        from_patients = PatientBatch.from_patients(
+            [PatientData(**record) for record in SMOKE_BATCH]
+        )
+
+        assert from_records.values.shape == (len(SMOKE_BATCH), len(FEATURE_ORDER))
+        assert from_records.values.flags.c_contiguous
+        np.testing.assert_array_equal(from_records.values, from_patients.values)
+
+    def test_rows_round_trip_to_records(self):
+        """Test that rows read back as the original JSON records"""
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        assert batch.to_records() == SMOKE_BATCH
+        assert batch[2]["education_level"] == "No formal"
+        assert batch.column("age").tolist() == [45.0, 25.0, 68.0]
+        assert len(batch[1:]) == 2
+
+    def test_values_are_read_only(self):
+        """Test that observers holding the matrix cannot see it change"""
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        with pytest.raises(ValueError):
+            batch.values[0, 0] = 1.0
+
+    def test_unknown_category_is_rejected(self):
+        """Test the error for a category outside the enum"""
+        record = {**SMOKE_BATCH[0], "income_level": "Very high"}
+
+        with pytest.raises(ValueError, match="income_level"):
+            PatientBatch.from_records([record])
+
+    def test_formatter_reads_rows(self):
+        """Test that the prompt formatter accepts a row view"""
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        assert format_patient_data(batch[0]) == format_patient_data(
+            json.loads(json.dumps(batch.to_records()[0]))
+        )
+
+    def test_validate_patient_columns(self):
+        """Test JSON validation straight into a batch"""
+        body = json.dumps(SMOKE_BATCH)
+
+        batch = validate_patient_columns(body)
+
+        assert batch.to_records() == validate_patient_batch(body)
+        with pytest.raises(PatientBatchValidationError):
+            validate_patient_columns(json.dumps([{**SMOKE_BATCH[0], "age": -1}]))
+
+
+class TestValidatePatientMatrix:
+    """Test suite for the vectorized checks of binary batches"""
+
+    def test_valid_matrix_is_not_copied(self):
+        """Test that a valid matrix is wrapped as is"""
+        values = PatientBatch.from_records(SMOKE_BATCH).values.copy()
+
+        batch = validate_patient_matrix(values)
+
+        assert np.shares_memory(batch.values, values)
+        assert batch.to_records() == SMOKE_BATCH
+
+    def test_errors_match_the_json_validation(self):
+        """Test that every bad cell gets the error pydantic would give"""
+        values = PatientBatch.from_records(SMOKE_BATCH).values.copy()
+        values[0, 0] = -1
+        values[1, 1] = 9
+        values[2, 5] = 0.5
+        values[2, 6] = np.nan
+        patients = json.loads(json.dumps(SMOKE_BATCH))
+        patients[0]["age"] = -1
+        patients[1]["education_level"] = "Unknown"
+        patients[2]["family_history_diabetes"] = 0.5
+        del patients[2]["bmi"]
+
+        with pytest.raises(PatientBatchValidationError) as matrix_error:
+            validate_patient_matrix(values)
+        with pytest.raises(PatientBatchValidationError) as json_error:
+            validate_patient_columns(json.dumps(patients))
+
+        assert matrix_error.value.errors == json_error.value.errors
+
+    def test_wrong_shape_is_a_document_error(self):
+        """Test that a matrix without 18 columns has no row index"""
+        with pytest.raises(PatientBatchValidationError) as error:
+            validate_patient_matrix(np.zeros((2, 3)))
+
+        assert list(error.value.errors) == [None]
+
+    def test_rows_with_names_codes_and_nil(self):
+        """Test rows in column order with categories by name or code"""
+        rows = [[record[name] for name in BATCH_COLUMNS] for record in SMOKE_BATCH]
+        rows[0][1] = 0
+        rows[1][0] = None
+        rows[2][2] = "Very high"
+
+        batch = PatientBatch.from_rows(rows)
+
+        assert batch[0]["education_level"] == "Graduate"
+        assert np.isnan(batch.values[1, 0])
+        assert batch.values[2, 2] == -1
+        with pytest.raises(PatientBatchValidationError) as error:
+            validate_patient_matrix(batch.values)
+        assert error.value.errors[2][0]["type"] == "enum"
+
+    def test_rows_of_the_wrong_length(self):
+        """Test the per-row error for short rows"""
+        with pytest.raises(PatientBatchValidationError) as error:
+            PatientBatch.from_rows([[1, 2]])
+
+        assert error.value.errors[0][0]["type"] == "row_length"
+
+
+class TestPatientBatchScoring:
+    """Test suite for scoring a PatientBatch"""
+
+    def test_matches_dataframe_encoding(self, service):
+        """Test parity with the DataFrame path and that no copy is made"""
+        loaded = service.active_model
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        X_raw = loaded.encode_batch(batch)
+
+        assert np.shares_memory(X_raw, batch.values)
+        np.testing.assert_array_equal(X_raw, loaded.encode(pd.DataFrame(SMOKE_BATCH)))
+        assert service.predict_batch(batch) == service.predict_batch(SMOKE_BATCH)
+
+    def test_remaps_non_alphabetical_encoders(self, service):
+        """Test models whose label encoders do not use the batch codes"""
+        loaded = service.active_model
+        encoder = loaded.preprocessors["label_encoders"]["income_level"]
+        encoder.classes_ = encoder.classes_[::-1]
+        loaded._category_remap = loaded._batch_category_remap()
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        X_raw = loaded.encode_batch(batch)
+
+        assert not np.shares_memory(X_raw, batch.values)
+        np.testing.assert_array_equal(X_raw, loaded.encode(pd.DataFrame(SMOKE_BATCH)))
+        loaded._category_unmap = loaded._model_category_unmap()
+        np.testing.assert_array_equal(loaded.decode_codes(X_raw), batch.values)
+
+    def test_category_missing_from_model(self, service):
+        """Test that a category the model never saw is an error"""
+        loaded = service.active_model
+        encoder = loaded.preprocessors["label_encoders"]["education_level"]
+        encoder.classes_ = encoder.classes_[:-1]
+        loaded._category_remap = loaded._batch_category_remap()
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        with pytest.raises(ValueError, match="education_level"):
+            loaded.encode_batch(batch)
+
+    def test_columnar_results_match_the_records(self, service):
+        """Test that predict_batch_columns() holds the same results as dicts"""
+        batch = PatientBatch.from_records(SMOKE_BATCH)
+
+        columns = service.predict_batch_columns(batch)
+        records = service.predict_batch(batch)
+
+        assert columns["model_version"] == "v1"
+        assert columns["probability"].tolist() == [r["probability"] for r in records]
+        assert columns["has_diabetes"].tolist() == [r["has_diabetes"] for r in records]
+        assert [CONFIDENCE_LEVELS[c] for c in columns["confidence"]] == [
+            r["confidence"] for r in records
+        ]
+        assert [
+            [FEATURE_ORDER[i] for i in row] for row in columns["top_factor_index"]
+        ] == [[f["feature"] for f in r["top_factors"]] for r in records]
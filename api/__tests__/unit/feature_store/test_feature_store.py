@@ -0,0 +1,124 @@
+import json
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+from api.infra.feature_store import FeatureStore, import_joblib_package
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+
+
+@pytest.fixture
+def splits():
+    """Small preprocessed splits, X_train as a DataFrame like the notebook's"""
+    rng = np.random.default_rng(0)
+    return {
+        "X_train": pd.DataFrame(rng.random((50, 18)), columns=FEATURE_ORDER),
+        "X_test": rng.random((10, 18)),
+        "y_train": pd.Series(rng.integers(0, 2, 50)),
+        "y_test": rng.integers(0, 2, 10),
+    }
+
+
+class TestFeatureStore:
+    """Test suite for the memory-mapped feature store"""
+
+    def test_round_trip_is_read_only_memmap(self, tmp_path, splits):
+        """Test that splits come back equal, mapped and not writable"""
+        FeatureStore(tmp_path).write(splits)
+
+        features = FeatureStore(tmp_path).open()
+
+        assert isinstance(features["X_train"], np.memmap)
+        assert not features["X_train"].flags.writeable
+        np.testing.assert_array_equal(features["X_train"], splits["X_train"])
+        np.testing.assert_array_equal(features["y_test"], splits["y_test"])
+        assert features.feature_names == FEATURE_ORDER
+        assert set(features) == set(splits)
+
+    def test_manifest_schema_and_scaler(self, tmp_path, splits):
+        """Test that the manifest records shapes, hashes and scaler params"""
+        scaler = MinMaxScaler().fit(splits["X_test"])
+
+        features = FeatureStore(tmp_path).write(splits, scaler=scaler)
+
+        manifest = json.loads((features.path / "manifest.json").read_text())
+        assert manifest["splits"]["X_train"]["shape"] == [50, 18]
+        assert len(manifest["splits"]["y_train"]["sha256"]) == 64
+        assert manifest["scaler"]["type"] == "MinMaxScaler"
+        assert manifest["scaler"]["scale_"] == scaler.scale_.tolist()
+        assert manifest["version"] == manifest["content_hash"][:12]
+
+    def test_versions_and_latest(self, tmp_path, splits):
+        """Test that each content gets a version and LATEST the newest"""
+        store = FeatureStore(tmp_path)
+        first = store.write(splits)
+        second = store.write({**splits, "y_test": splits["y_test"] ^ 1})
+
+        assert store.versions() == sorted([first.version, second.version])
+        assert store.latest == second.version
+        assert store.open(first.version).version == first.version
+        assert store.write(splits).version == first.version
+
+    def test_same_content_keeps_the_version_in_place(self, tmp_path, splits):
+        """Test that rewriting identical content does not replace open files"""
+        store = FeatureStore(tmp_path)
+        first = store.write(splits, version="v1")
+        inode = (first.path / "X_test.npy").stat().st_ino
+
+        again = store.write(splits, version="v1")
+
+        assert (again.path / "X_test.npy").stat().st_ino == inode
+        assert again.manifest["created_at"] == first.manifest["created_at"]
+        assert not list(tmp_path.glob(".staging-*"))
+
+    def test_rewrite_with_new_content(self, tmp_path, splits):
+        """Test that an explicit version is replaced by different content"""
+        store = FeatureStore(tmp_path)
+        store.write(splits, version="v1")
+
+        store.write({**splits, "y_test": splits["y_test"] ^ 1}, version="v1")
+
+        features = store.open("v1", verify=True)
+        np.testing.assert_array_equal(features["y_test"], splits["y_test"] ^ 1)
+        assert store.versions() == ["v1"]
+        assert not list(tmp_path.glob(".staging-*"))
+
+    def test_vectors_only_with_feature_names(self, tmp_path):
+        """Test feature names without a 2-D split to take the dtype from"""
+        features = FeatureStore(tmp_path).write(
+            {"y_train": np.arange(5)}, feature_names=["a", "b"]
+        )
+
+        assert features.manifest["features"] == [
+            {"name": "a", "dtype": None},
+            {"name": "b", "dtype": None},
+        ]
+
+    def test_verify_detects_changed_files(self, tmp_path, splits):
+        """Test that verify=True rejects a file edited after writing"""
+        features = FeatureStore(tmp_path).write(splits, version="v1")
+        data = (features.path / "y_test.npy").read_bytes()
+        (features.path / "y_test.npy").write_bytes(data[:-1] + bytes([data[-1] ^ 1]))
+
+        with pytest.raises(ValueError, match="y_test"):
+            FeatureStore(tmp_path).open("v1", verify=True)
+
+    def test_missing_version(self, tmp_path):
+        """Test the error for an empty store or unknown version"""
+        with pytest.raises(FileNotFoundError):
+            FeatureStore(tmp_path).open()
+        with pytest.raises(FileNotFoundError):
+            FeatureStore(tmp_path).open("nope")
+
+    def test_import_joblib_package(self, tmp_path, splits):
+        """Test the conversion of a preprocessed_data.joblib"""
+        joblib.dump(splits, tmp_path / "preprocessed_data.joblib")
+
+        features = import_joblib_package(
+            FeatureStore(tmp_path / "store"), tmp_path / "preprocessed_data.joblib"
+        )
+
+        assert features.feature_names == FEATURE_ORDER
+        np.testing.assert_array_equal(features["X_test"], splits["X_test"])
+        assert not list((tmp_path / "store").glob(".staging-*"))
@@ -0,0 +1,166 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from api.infra.monitoring.drift_monitor import (
+    DriftBins,
+    DriftMonitor,
+    psi,
+    write_reference_stats,
+)
+from api.infra.services.predict_services.model_registry import (
+    FEATURE_ORDER,
+    ModelRegistry,
+)
+
+
+@pytest.fixture
+def registry(model_artifact_factory):
+    """Registry with a test model active"""
+    model_artifact_factory("v1", seed=0)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate("v1")
+    return registry
+
+
+@pytest.fixture
+def training_features(registry):
+    """Encoded features sampled inside the scaler ranges of the test model"""
+    rng = np.random.default_rng(1)
+    scaler = registry.active.preprocessors["scaler"]
+    X = rng.uniform(scaler.data_min_, scaler.data_max_, size=(4000, len(FEATURE_ORDER)))
+    for name in ("education_level", "income_level"):
+        i = FEATURE_ORDER.index(name)
+        X[:, i] = np.round(X[:, i])
+    return X
+
+
+def decode(registry, X):
+    """Turns an encoded matrix back into patient records"""
+    df = pd.DataFrame(X, columns=FEATURE_ORDER)
+    for name, encoder in registry.active.preprocessors["label_encoders"].items():
+        df[name] = encoder.inverse_transform(df[name].astype(int))
+    return df
+
+
+class TestDriftBins:
+    """Test suite for DriftBins"""
+
+    def test_underflow_and_overflow(self, registry):
+        """Test that values outside the training range go to the edge bins"""
+        bins = DriftBins(registry.active, n_bins=4)
+        X = np.vstack(
+            [bins.data_min - 1, bins.data_min, bins.data_max, bins.data_max + 1]
+        )
+
+        assigned = bins.assign(X)
+
+        assert (assigned[0] == 0).all()
+        assert (assigned[1] == 1).all()
+        assert (assigned[2] == 4).all()
+        assert (assigned[3] == 5).all()
+        assert bins.histogram(X).sum(axis=1).tolist() == [4] * len(FEATURE_ORDER)
+
+
+class TestDriftMonitor:
+    """Test suite for DriftMonitor"""
+
+    def test_moments_match_numpy_across_threads(self, registry, training_features):
+        """Test that merged per-thread Welford moments equal the batch statistics"""
+        monitor = DriftMonitor(registry)
+        chunks = np.array_split(training_features, 8)
+
+        def feed(chunk):
+            for row in chunk:
+                monitor.observe(row.reshape(1, -1), np.zeros(1), 0.5, "v1")
+
+        threads = [threading.Thread(target=feed, args=(c,)) for c in chunks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = monitor.report()
+        i = FEATURE_ORDER.index("hba1c")
+        assert report["samples"] == len(training_features)
+        assert report["features"]["hba1c"]["mean"] == pytest.approx(
+            training_features[:, i].mean()
+        )
+        assert report["features"]["hba1c"]["std"] == pytest.approx(
+            training_features[:, i].std()
+        )
+
+    def test_without_reference_psi_is_none(self, registry, training_features):
+        """Test that PSI is not reported without reference stats"""
+        monitor = DriftMonitor(registry)
+
+        monitor.observe(training_features[:10], np.zeros(10), 0.5, "v1")
+        report = monitor.report()
+
+        assert report["reference_available"] is False
+        assert report["max_psi"] is None
+        assert report["features"]["age"]["histogram"]
+
+    def test_check_reference_warns_when_missing(
+        self, registry, training_features, caplog
+    ):
+        """Test the startup check for reference_stats.json"""
+        assert DriftMonitor(registry).check_reference() is False
+        assert "drift PSI is disabled" in caplog.text
+
+        write_reference_stats(registry.active, decode(registry, training_features))
+        assert DriftMonitor(registry).check_reference() is True
+
+    def test_reference_with_other_bins_disables_histogram_psi(
+        self, registry, training_features, caplog
+    ):
+        """Test that a reference built with other bins yields null PSI, not a 500"""
+        write_reference_stats(
+            registry.active, decode(registry, training_features), n_bins=5
+        )
+        monitor = DriftMonitor(registry, n_bins=10)
+
+        assert monitor.check_reference() is False
+        assert "does not match the drift bins" in caplog.text
+
+        monitor.observe(training_features[:100], np.zeros(100), 0.5, "v1")
+        report = monitor.report()
+
+        assert report["reference_mismatch"] == (
+            "reference built with 5 bins, monitor uses 10"
+        )
+        assert report["features"]["hba1c"]["psi"] is None
+        assert report["features"]["education_level"]["psi"] is not None
+
+    def test_psi_against_reference(self, registry, training_features):
+        """Test stable PSI for the same distribution and drift for a shifted one"""
+        write_reference_stats(registry.active, decode(registry, training_features))
+        monitor = DriftMonitor(registry)
+
+        monitor.observe(training_features[:2000], np.zeros(2000), 0.5, "v1")
+        stable = monitor.report()
+
+        shifted = training_features[:2000].copy()
+        i = FEATURE_ORDER.index("glucose_fasting")
+        shifted[:, i] = shifted[:, i] * 1.5
+        monitor.reset()
+        monitor.observe(shifted, np.zeros(2000), 0.5, "v1")
+        drifted = monitor.report()
+
+        assert stable["reference_available"] is True
+        assert stable["status"] == "stable"
+        assert drifted["features"]["glucose_fasting"]["status"] == "significant"
+        assert drifted["drifted_features"] == ["glucose_fasting"]
+        assert "frequencies" in drifted["features"]["income_level"]
+
+    def test_ignores_inactive_version(self, registry, training_features):
+        """Test that predictions from a version no longer active are skipped"""
+        monitor = DriftMonitor(registry)
+
+        monitor.observe(training_features[:5], np.zeros(5), 0.5, "old")
+
+        assert monitor.report()["samples"] == 0
+
+    def test_psi_identical_is_zero(self):
+        """Test PSI of identical distributions"""
+        assert psi([10, 20, 30], [1, 2, 3]) == pytest.approx(0.0)
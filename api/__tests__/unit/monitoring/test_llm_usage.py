@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import Mock
+
+from api.infra.monitoring.llm_usage import (
+    LLMUsageStats,
+    TokenEstimator,
+    collect_usage,
+    llm_endpoint,
+    parse_prices,
+)
+
+
+@pytest.fixture
+def stats():
+    """Usage stats with the chars/4 estimator (no tokenizer download)"""
+    return LLMUsageStats(prices=parse_prices(None), estimator=TokenEstimator(None))
+
+
+class TestLLMUsageStats:
+    """Test suite for the per provider/model/endpoint usage accounting"""
+
+    def test_aggregates_per_provider_model_and_endpoint(self, stats):
+        """Test calls are grouped by (provider, model, endpoint)"""
+        stats.record("ollama", "llama3.2:1b", 100, 50, 2.0, ttft=0.5, stream=True)
+        stats.record("ollama", "llama3.2:1b", 100, 70, 3.0, ttft=0.5, stream=True)
+        stats.record("ollama", "llama3.2:1b", 90, 40, 1.0, endpoint="jobs")
+
+        report = stats.report()
+        rows = {row["endpoint"]: row for row in report["usage"]}
+
+        assert set(rows) == {"internal", "jobs"}
+        assert rows["internal"]["calls"] == 2
+        assert rows["internal"]["streams"] == 2
+        assert rows["internal"]["prompt_tokens"] == 200
+        assert rows["internal"]["completion_tokens"] == 120
+        # 120 tokens em 1.5s + 2.5s de decode
+        assert rows["internal"]["tokens_per_s"] == 30.0
+        assert rows["internal"]["time_to_first_token"]["p50_ms"] == 500.0
+        assert report["totals"]["calls"] == 3
+
+    def test_endpoint_comes_from_context(self, stats):
+        """Test the endpoint label set by the middleware is used"""
+        token = llm_endpoint.set("/diagnostic/stream")
+        try:
+            stats.record("stub", "stub", 10, 10, 0.1)
+        finally:
+            llm_endpoint.reset(token)
+
+        assert stats.report()["usage"][0]["endpoint"] == "/diagnostic/stream"
+
+    def test_cost_uses_price_table(self, stats):
+        """Test cost per 1M tokens, free local models and unpriced models"""
+        stats.record("openai", "gpt-4o-mini", 1_000_000, 1_000_000, 1.0)
+        stats.record("ollama", "llama3.2:1b", 1_000_000, 1_000_000, 1.0)
+
+        rows = {row["model"]: row for row in stats.report()["usage"]}
+        assert rows["gpt-4o-mini"]["cost_usd"] == pytest.approx(0.75)
+        assert rows["llama3.2:1b"]["cost_usd"] == 0.0
+
+        stats.record("openai", "unknown-model", 10, 10, 1.0)
+        report = stats.report()
+        assert report["totals"]["cost_usd"] is None
+
+    def test_prices_override(self):
+        """Test LLM_PRICES adds and replaces model prices"""
+        prices = parse_prices('{"gpt-4o-mini": [1, 2], "my-model": [0.5, 0.5]}')
+
+        assert prices["gpt-4o-mini"] == (1.0, 2.0)
+        assert prices["my-model"] == (0.5, 0.5)
+        assert prices["gpt-4o"] == (2.5, 10.0)
+
+
+class TestTokenEstimator:
+    """Test suite for the local token estimate"""
+
+    def test_chars_fallback(self):
+        """Test ~4 characters per token without an encoding"""
+        estimator = TokenEstimator(None)
+
+        assert estimator.method == "chars/4"
+        assert estimator.count("") == 0
+        assert estimator.count("a" * 400) == 100
+        # Overhead de 4 tokens por mensagem
+        assert estimator.count_prompt("a" * 40, "b" * 40) == 28
+
+    def test_unavailable_encoding_falls_back(self):
+        """Test an encoding that cannot be loaded falls back to chars/4"""
+        estimator = TokenEstimator("no-such-encoding")
+
+        assert estimator.count("a" * 40) == 10
+        assert estimator.method == "chars/4"
+
+
+class TestCollectUsage:
+    """Test suite for reading LangChain usage_metadata"""
+
+    def test_sums_usage_metadata(self):
+        """Test usage of several chunks is summed and missing metadata skipped"""
+        usage = {}
+        collect_usage(usage, Mock(usage_metadata=None))
+        collect_usage(
+            usage, Mock(usage_metadata={"input_tokens": 7, "output_tokens": 3})
+        )
+        collect_usage(
+            usage, Mock(usage_metadata={"input_tokens": 0, "output_tokens": 2})
+        )
+
+        assert usage == {"prompt_tokens": 7, "completion_tokens": 5}
+
+    def test_no_sink(self):
+        """Test nothing happens when the caller did not ask for usage"""
+        collect_usage(None, Mock(usage_metadata={"input_tokens": 7}))
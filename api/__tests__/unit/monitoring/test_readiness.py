@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from api.application.services.llm_service import LLMService
+from api.infra.monitoring.readiness import LLMProbe, Readiness
+
+
+@pytest.fixture
+def llm_service():
+    """LLM service whose model listing succeeds"""
+    service = Mock(spec=LLMService)
+    service.get_available_models = AsyncMock(return_value=["llama3.2"])
+    return service
+
+
+@pytest.fixture
+def admission():
+    """Admission counters of an idle provider with 4 slots"""
+    return SimpleNamespace(
+        in_use=0, queue_depth=0, max_concurrency=4, max_queue_size=10
+    )
+
+
+@pytest.fixture
+def registry():
+    """Registry with an active model"""
+    return SimpleNamespace(active=SimpleNamespace(version="v1"))
+
+
+class TestLLMProbe:
+    """Test suite for the background LLM reachability probe"""
+
+    @pytest.mark.asyncio
+    async def test_probe_caches_result(self, llm_service):
+        """Test that failures and timeouts mark the LLM unreachable"""
+        probe = LLMProbe(llm_service, timeout=0.05)
+        assert not probe.healthy
+
+        assert await probe.probe()
+        assert probe.healthy
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        llm_service.get_available_models = hang
+        assert not await probe.probe()
+        assert probe.status()["consecutive_failures"] == 1
+        assert "TimeoutError" in probe.last_error
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_not_healthy(self, llm_service):
+        """Test that a probe that stopped running stops vouching for the LLM"""
+        probe = LLMProbe(llm_service, interval=0.01, stale_after=1)
+        await probe.probe()
+        await asyncio.sleep(0.03)
+
+        assert probe.reachable and probe.stale
+        assert not probe.healthy
+
+    @pytest.mark.asyncio
+    async def test_background_loop(self, llm_service):
+        """Test that start probes in the background until stop"""
+        probe = LLMProbe(llm_service, interval=0.01)
+        probe.start()
+        await asyncio.sleep(0.05)
+        await probe.stop()
+
+        assert probe.healthy
+        assert llm_service.get_available_models.await_count >= 2
+
+
+class TestReadiness:
+    """Test suite for the readiness check"""
+
+    @pytest.mark.asyncio
+    async def test_ready_with_load_score(self, registry, admission, llm_service):
+        """Test a ready worker and its load score"""
+        probe = LLMProbe(llm_service)
+        await probe.probe()
+        admission.in_use, admission.queue_depth = 4, 2
+
+        result = Readiness(registry, admission, probe).check()
+
+        assert result["ready"] and result["reasons"] == []
+        assert result["load_score"] == 1.5
+        assert result["model"] == {"loaded": True, "version": "v1"}
+        assert result["llm"]["in_use"] == 4
+        assert result["llm"]["queue_depth"] == 2
+
+    def test_not_ready_reasons(self, admission, llm_service):
+        """Test missing model, unprobed LLM and full queue"""
+        admission.queue_depth = 10
+        readiness = Readiness(
+            SimpleNamespace(active=None), admission, LLMProbe(llm_service)
+        )
+
+        result = readiness.check()
+
+        assert not result["ready"]
+        assert result["reasons"] == [
+            "model not loaded",
+            "LLM not probed yet",
+            "LLM queue full",
+        ]
+        llm_service.get_available_models.assert_not_called()
+
+    def test_llm_not_required(self, registry, admission, llm_service):
+        """Test that the LLM can be left out of readiness"""
+        readiness = Readiness(
+            registry, admission, LLMProbe(llm_service), require_llm=False
+        )
+
+        assert readiness.check()["ready"]
+        assert Readiness(registry, admission, None).check()["ready"]
+
+    def test_job_backlog_in_load_score(self, registry, admission):
+        """Test that report jobs waiting in the queue count as load"""
+        admission.in_use = 2
+        job_service = SimpleNamespace(job_counts={"queued": 6, "running": 1})
+
+        result = Readiness(registry, admission, None, job_service=job_service).check()
+
+        assert result["load_score"] == 2.0
+        assert result["jobs"] == {"queued": 6, "running": 1}
+
+    def test_audit_backlog_is_not_ready(self, registry, admission):
+        """Test that a backlogged audit log takes the worker out of rotation"""
+        audit_sink = SimpleNamespace(backlogged=True)
+
+        result = Readiness(registry, admission, None, audit_sink=audit_sink).check()
+
+        assert not result["ready"]
+        assert result["reasons"] == ["audit log backlogged"]
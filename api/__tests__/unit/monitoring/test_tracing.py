@@ -0,0 +1,168 @@
+import asyncio
+import pytest
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.trace_exporters import (
+    InMemorySpanExporter,
+    JsonLinesSpanExporter,
+)
+from api.infra.monitoring.tracing import SlowTraceSampler, Tracer, tracer
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.llm_services.admission_control import (
+    AdmissionControlledLLMService,
+    AdmissionController,
+)
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def exporter():
+    """Global tracer exporting every trace to memory"""
+    exporter = InMemorySpanExporter()
+    tracer.configure(SlowTraceSampler(exporter, sample_rate=1.0))
+    yield exporter
+    tracer.configure(None)
+
+
+def by_name(spans):
+    """Indexes spans of a single trace by name"""
+    return {span["name"]: span for span in spans}
+
+
+class TestTracer:
+    """Test suite for Tracer"""
+
+    def test_spans_are_noop_outside_a_trace(self, exporter):
+        """Test that spans without an active trace are not recorded"""
+        with tracer.span("orphan") as span:
+            assert span is None
+
+        assert exporter.spans == []
+
+    def test_disabled_tracer_does_not_start_traces(self):
+        """Test that an unconfigured tracer is a no-op"""
+        local = Tracer()
+
+        with local.trace("request") as root:
+            assert root is None
+
+    def test_nested_spans_and_error(self, exporter):
+        """Test parent links, export order and error capture"""
+        with pytest.raises(ValueError):
+            with tracer.trace("request"):
+                with tracer.span("child", rows=3):
+                    pass
+                with tracer.span("failing"):
+                    raise ValueError("boom")
+
+        spans = by_name(exporter.spans)
+        assert exporter.spans[-1]["name"] == "request"
+        assert spans["child"]["parent_id"] == spans["request"]["span_id"]
+        assert spans["child"]["attributes"] == {"rows": 3}
+        assert spans["failing"]["error"] == "ValueError: boom"
+        assert spans["request"]["error"] == "ValueError: boom"
+        assert len({span["trace_id"] for span in exporter.spans}) == 1
+
+    @pytest.mark.asyncio
+    async def test_context_follows_async_generator_across_tasks(self, exporter):
+        """Test that spans opened inside a generator keep their parents"""
+
+        async def generator():
+            with tracer.span("outer"):
+                yield 1
+                with tracer.span("inner"):
+                    yield 2
+
+        root = tracer.start_trace("stream")
+        stream = tracer.stream(generator(), root)
+        first = await stream.__anext__()
+
+        async def consume():
+            # Segunda parte consumida por outra task, como no StreamingResponse
+            assert tracer.current_span() is None
+            return [item async for item in stream]
+
+        rest = await asyncio.create_task(consume())
+        tracer.end(root)
+
+        spans = by_name(exporter.spans)
+        assert [first, *rest] == [1, 2]
+        assert spans["outer"]["parent_id"] == spans["stream"]["span_id"]
+        assert spans["inner"]["parent_id"] == spans["outer"]["span_id"]
+
+
+class TestSlowTraceSampler:
+    """Test suite for SlowTraceSampler"""
+
+    def test_keeps_slowest_per_window(self):
+        """Test that only the N slowest traces of the window are exported"""
+        exporter = InMemorySpanExporter()
+        local = Tracer(SlowTraceSampler(exporter, slowest_per_minute=2))
+
+        for duration in (0.001, 0.02, 0.005, 0.03):
+            root = local.start_trace("request", duration=duration)
+            root._start -= duration
+            local.end(root)
+        local.sampler.flush()
+
+        kept = [span["attributes"]["duration"] for span in exporter.spans]
+        slowest = [t["duration_ms"] for t in local.sampler.slowest()]
+        assert sorted(kept) == [0.02, 0.03]
+        assert slowest[0] >= slowest[1] >= 20
+
+    def test_jsonl_exporter(self, tmp_path):
+        """Test that spans are written one per line"""
+        exporter = JsonLinesSpanExporter(tmp_path / "traces.jsonl")
+        local = Tracer(SlowTraceSampler(exporter, sample_rate=1.0))
+
+        with local.trace("request"):
+            with local.span("child"):
+                pass
+        exporter.shutdown()
+
+        lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+
+
+class TestDiagnosticTracing:
+    """End-to-end spans of a streamed diagnostic report"""
+
+    @pytest.mark.asyncio
+    async def test_stream_spans(self, exporter, model_artifact_factory):
+        """Test prediction, prompt and LLM spans under the route span"""
+        model_artifact_factory("v1", seed=0)
+        registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+        registry.activate("v1")
+        llm = AdmissionControlledLLMService(
+            StubLLMService(ConfigEnvs(), ttft=0.01, token_delay=0.001, tokens=5),
+            AdmissionController("stub", 2, 2, 1.0),
+        )
+        service = DiabetesDiagnosticService(
+            DiabetesPredictionService(registry=registry), llm
+        )
+
+        root = tracer.start_trace("stream_diagnostic")
+        stream = tracer.stream(
+            service.generate_diagnostic_report_stream(registry.smoke_batch[0]), root
+        )
+        chunks = [chunk async for chunk in stream]
+        tracer.end(root)
+
+        spans = by_name(exporter.spans)
+        root_id = spans["stream_diagnostic"]["span_id"]
+        generate = spans["llm.generate"]
+        assert len(chunks) == 6
+        assert spans["prediction.preprocess"]["parent_id"] == root_id
+        assert spans["prediction.predict_proba"]["parent_id"] == root_id
+        assert spans["create_user_prompt"]["parent_id"] == root_id
+        assert generate["parent_id"] == root_id
+        assert spans["llm.connect"]["parent_id"] == generate["span_id"]
+        assert (
+            spans["llm.admission_wait"]["parent_id"] == spans["llm.connect"]["span_id"]
+        )
+        assert spans["llm.stream"]["attributes"]["chunks"] == 5
+        assert [e["name"] for e in generate["events"]] == ["first_token", "last_token"]
+        assert spans["llm.connect"]["duration_ms"] >= 10
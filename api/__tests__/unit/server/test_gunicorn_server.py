@@ -0,0 +1,119 @@
+import pytest
+from api.infra.config.env import ConfigEnvs
+from api.infra.server import (
+    autotune_workers,
+    build_options,
+    per_process_warnings,
+    plan_workers,
+)
+from api.infra.server import gunicorn_server
+from api.infra.server.gunicorn_server import GunicornServer, cpu_limit, memory_limit
+from api.infra.server.uvicorn_worker import ApiUvicornWorker
+
+MiB = 2**20
+
+
+@pytest.fixture
+def envs(monkeypatch):
+    """ConfigEnvs with a fixed machine: 4 CPUs, 2 GiB, 200 MiB per worker"""
+    monkeypatch.setattr(gunicorn_server, "cpu_limit", lambda: 4.0)
+    monkeypatch.setattr(gunicorn_server, "memory_limit", lambda: 2048 * MiB)
+    monkeypatch.setattr(ConfigEnvs, "SERVER_WORKER_MEMORY_MB", 200)
+    monkeypatch.setattr(ConfigEnvs, "SERVER_WORKERS", None)
+    monkeypatch.setattr(ConfigEnvs, "SERVER_MAX_WORKERS", None)
+    return ConfigEnvs()
+
+
+class TestAutotuneWorkers:
+    """Test suite for the worker count heuristic"""
+
+    def test_one_worker_per_cpu(self):
+        """Test that CPUs set the count when memory is plentiful"""
+        plan = autotune_workers(4, 16 * 1024 * MiB, 200 * MiB)
+
+        assert plan.workers == 4
+        assert plan.reason == "4 CPUs"
+
+    def test_fractional_quota_rounds_up(self):
+        """Test a container limited to 1.5 CPUs"""
+        assert autotune_workers(1.5, None, 200 * MiB).workers == 2
+
+    def test_memory_limits_workers(self):
+        """Test that workers never exceed what fits after the reserve"""
+        plan = autotune_workers(8, 1024 * MiB, 300 * MiB, reserve_bytes=256 * MiB)
+
+        assert plan.workers == 2
+        assert plan.reason.startswith("memory")
+
+    def test_always_at_least_one_worker(self):
+        """Test tiny containers"""
+        assert autotune_workers(0.5, 100 * MiB, 300 * MiB).workers == 1
+
+    def test_max_workers_cap(self):
+        """Test SERVER_MAX_WORKERS"""
+        assert autotune_workers(16, None, 200 * MiB, max_workers=3).workers == 3
+
+
+class TestPlanAndOptions:
+    """Test suite for the environment-driven launcher settings"""
+
+    def test_plan_from_environment(self, envs):
+        """Test autotuning with the configured per-worker memory"""
+        plan = plan_workers(envs)
+
+        assert plan.workers == 4
+        assert plan.worker_memory_bytes == 200 * MiB
+
+    def test_explicit_workers_win(self, envs, monkeypatch):
+        """Test that SERVER_WORKERS skips autotuning"""
+        monkeypatch.setattr(ConfigEnvs, "SERVER_WORKERS", 7)
+
+        plan = plan_workers(envs)
+
+        assert plan.workers == 7
+        assert plan.reason == "SERVER_WORKERS"
+
+    def test_per_process_warnings(self, envs, monkeypatch):
+        """Test the warnings for state kept per worker process"""
+        monkeypatch.setattr(ConfigEnvs, "STREAM_RESUME_ENABLED", True)
+
+        single = autotune_workers(1, None, 200 * MiB)
+        warnings = per_process_warnings(envs, plan_workers(envs))
+
+        assert per_process_warnings(envs, single) == []
+        assert len(warnings) == 2
+        assert "4x LLM_MAX_CONCURRENCY" in warnings[0]
+        assert "sticky" in warnings[1]
+
+    def test_gunicorn_settings(self, envs, monkeypatch):
+        """Test that the options are valid gunicorn settings"""
+        monkeypatch.setattr(ConfigEnvs, "SERVER_MAX_REQUESTS", 500)
+        options = build_options(envs, plan_workers(envs))
+
+        cfg = GunicornServer(options).cfg
+
+        assert cfg.workers == 4
+        assert cfg.max_requests == 500
+        assert cfg.preload_app is envs.SERVER_PRELOAD
+        assert cfg.worker_class is ApiUvicornWorker
+
+
+class TestResourceLimits:
+    """Test suite for cgroup-aware CPU and memory detection"""
+
+    def test_cgroup_v2_cpu_quota(self, tmp_path):
+        """Test a 2-CPU quota on a bigger host"""
+        (tmp_path / "cpu.max").write_text("200000 100000\n")
+
+        assert cpu_limit(tmp_path) <= 2.0
+
+    def test_cgroup_v2_memory_limit(self, tmp_path):
+        """Test memory.max and the MemAvailable fallback"""
+        meminfo = tmp_path / "meminfo"
+        meminfo.write_text("MemTotal: 8000000 kB\nMemAvailable: 4000000 kB\n")
+        (tmp_path / "memory.max").write_text("max\n")
+
+        assert memory_limit(tmp_path, meminfo) == 4000000 * 1024
+
+        (tmp_path / "memory.max").write_text(f"{512 * MiB}\n")
+        assert memory_limit(tmp_path, meminfo) == 512 * MiB
@@ -0,0 +1 @@
+# Report jobs tests
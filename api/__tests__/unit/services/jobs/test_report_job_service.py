@@ -0,0 +1,272 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+from api.application.services.diagnostic_service import DiagnosticService
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.services.jobs.report_job_service import ReportJobService
+from api.infra.services.jobs.report_job_store import ReportJobStore
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+
+PATIENT = {"age": 45.0, "hba1c": 5.8}
+PREDICTION = {
+    "has_diabetes": False,
+    "probability": 0.35,
+    "threshold_used": 0.59,
+    "confidence": "high",
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    """ReportJobStore on a temporary database"""
+    store = ReportJobStore(tmp_path / "jobs.sqlite3")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def mock_prediction_service():
+    """Mock DiabetesPredictionService"""
+    service = Mock(spec=DiabetesPredictionService)
+    service.predict = Mock(return_value=PREDICTION)
+    return service
+
+
+@pytest.fixture
+def mock_diagnostic_service():
+    """Mock DiagnosticService with a slow synchronous report"""
+    service = Mock(spec=DiagnosticService)
+
+    def report(patient_data, profile=None, prediction=None):
+        time.sleep(0.01)
+        return "Report text"
+
+    service.generate_diagnostic_report = Mock(side_effect=report)
+    return service
+
+
+@pytest.fixture
+def job_service(store, mock_diagnostic_service, mock_prediction_service):
+    """ReportJobService with fast polling"""
+    return ReportJobService(
+        store=store,
+        diagnostic_service=mock_diagnostic_service,
+        prediction_service=mock_prediction_service,
+        workers=2,
+        poll_interval=0.05,
+    )
+
+
+class TestReportJobStore:
+    """Test suite for ReportJobStore"""
+
+    def test_claim_is_fifo_and_exclusive(self, store):
+        """Test that jobs are claimed oldest first and only once"""
+        first = store.create(PATIENT, PREDICTION)
+        second = store.create(PATIENT, PREDICTION)
+
+        assert store.claim_next()["id"] == first
+        assert store.claim_next()["id"] == second
+        assert store.claim_next() is None
+
+    def test_requeue_expired_after_restart(self, tmp_path):
+        """Test that a job whose owner died goes back to the queue"""
+        db_path = tmp_path / "jobs.sqlite3"
+        store = ReportJobStore(db_path, lease_seconds=0.05)
+        job_id = store.create(PATIENT, PREDICTION)
+        store.claim_next()
+        store.close()
+
+        restarted = ReportJobStore(db_path)
+        assert restarted.requeue_expired() == 0
+        time.sleep(0.1)
+        assert restarted.requeue_expired() == 1
+        job = restarted.claim_next()
+        restarted.close()
+
+        assert job["id"] == job_id
+        assert job["attempts"] == 2
+        assert job["patient_data"] == PATIENT
+
+    def test_live_lease_is_not_requeued(self, tmp_path):
+        """Test that a process starting does not take jobs of a live process"""
+        db_path = tmp_path / "jobs.sqlite3"
+        owner = ReportJobStore(db_path, lease_seconds=0.2)
+        other = ReportJobStore(db_path)
+        job_id = owner.create(PATIENT, PREDICTION)
+        owner.claim_next()
+
+        time.sleep(0.1)
+        assert owner.renew_leases() == 1
+        time.sleep(0.15)
+        assert other.requeue_expired() == 0
+        job = other.get(job_id)
+        owner.close()
+        other.close()
+
+        assert job["status"] == "running"
+        assert job["owner"] == owner.owner
+
+    def test_requeue_without_counting_attempt(self, store):
+        """Test that an uncounted requeue gives the attempt back"""
+        job_id = store.create(PATIENT, PREDICTION)
+        store.claim_next()
+
+        store.requeue(job_id, count_attempt=False)
+
+        assert store.get(job_id)["attempts"] == 0
+        assert store.claim_next()["attempts"] == 1
+
+    def test_client_is_stored_and_old_databases_migrate(self, tmp_path):
+        """Test the client column, added to databases created without it"""
+        db_path = tmp_path / "jobs.sqlite3"
+        store = ReportJobStore(db_path)
+        store._conn.executescript(
+            "DROP TABLE report_jobs; "
+            "CREATE TABLE report_jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "patient_data TEXT NOT NULL, prediction TEXT NOT NULL, report TEXT, "
+            "error TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL);"
+        )
+        store.close()
+
+        migrated = ReportJobStore(db_path)
+        job_id = migrated.create(PATIENT, PREDICTION, client="partner")
+        job = migrated.get(job_id)
+        migrated.close()
+
+        assert job["client"] == "partner"
+
+
+class TestReportJobService:
+    """Test suite for ReportJobService"""
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_prediction_and_completes(
+        self, job_service, mock_prediction_service
+    ):
+        """Test inline prediction and background completion"""
+        job_service.start()
+        submitted = job_service.submit(PATIENT)
+
+        job = await job_service.wait(submitted["job_id"], timeout=2)
+        await job_service.stop()
+
+        assert submitted["status"] == "queued"
+        assert submitted["prediction"] == PREDICTION
+        mock_prediction_service.predict.assert_called_once_with(PATIENT)
+        assert job["status"] == "completed"
+        assert job["report"] == "Report text"
+
+    @pytest.mark.asyncio
+    async def test_worker_reuses_submitted_prediction(
+        self, job_service, mock_diagnostic_service, mock_prediction_service
+    ):
+        """Test that the worker does not score the patient again"""
+        job_service.start()
+        submitted = job_service.submit(PATIENT, profile="summary")
+
+        await job_service.wait(submitted["job_id"], timeout=2)
+        await job_service.stop()
+
+        mock_prediction_service.predict.assert_called_once_with(PATIENT)
+        mock_diagnostic_service.generate_diagnostic_report.assert_called_once_with(
+            PATIENT, "summary", PREDICTION
+        )
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out_while_queued(self, job_service):
+        """Test long-poll timeout without workers"""
+        submitted = job_service.submit(PATIENT)
+
+        job = await job_service.wait(submitted["job_id"], timeout=0.1)
+
+        assert job["status"] == "queued"
+        assert job_service._done_events == {}
+
+    @pytest.mark.asyncio
+    async def test_wait_unknown_job(self, job_service):
+        """Test long-poll on a missing job"""
+        assert await job_service.wait("missing", timeout=0.1) is None
+
+    @pytest.mark.asyncio
+    async def test_queue_survives_restart(
+        self, store, job_service, mock_diagnostic_service, mock_prediction_service
+    ):
+        """Test that jobs queued before a restart are processed afterwards"""
+        job_ids = [job_service.submit(PATIENT)["job_id"] for _ in range(3)]
+
+        restarted = ReportJobService(
+            store=store,
+            diagnostic_service=mock_diagnostic_service,
+            prediction_service=mock_prediction_service,
+            workers=1,
+            poll_interval=0.05,
+        )
+        restarted.start()
+        jobs = [await restarted.wait(job_id, timeout=2) for job_id in job_ids]
+        await restarted.stop()
+
+        assert [job["status"] for job in jobs] == ["completed"] * 3
+
+    @pytest.mark.asyncio
+    async def test_job_counts_are_refreshed(self, job_service):
+        """Test the in-memory job counts read by /ready"""
+        job_service.submit(PATIENT)
+        job_service.submit(PATIENT)
+        assert job_service.job_counts["queued"] == 0
+
+        job_service.start()
+        assert job_service.job_counts["queued"] == 2
+        await asyncio.sleep(0.2)
+        await job_service.stop()
+
+        assert job_service.job_counts["queued"] == 0
+        assert job_service.job_counts["completed"] == 2
+
+    def test_status_reads_cached_counts(self, job_service, monkeypatch):
+        """Test that status() does not query the store"""
+        job_service.job_counts["queued"] = 3
+        monkeypatch.setattr(
+            job_service.store, "counts", Mock(side_effect=AssertionError("query"))
+        )
+
+        assert job_service.status()["jobs"]["queued"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_job_after_max_attempts(
+        self, job_service, mock_diagnostic_service
+    ):
+        """Test that a job fails after exhausting its attempts"""
+        mock_diagnostic_service.generate_diagnostic_report.side_effect = RuntimeError(
+            "boom"
+        )
+        job_service.start()
+        submitted = job_service.submit(PATIENT)
+
+        job = await job_service.wait(submitted["job_id"], timeout=2)
+        await job_service.stop()
+
+        assert job["status"] == "failed"
+        assert job["error"] == "boom"
+        assert job["attempts"] == 3
+
+    @pytest.mark.asyncio
+    async def test_overloaded_llm_requeues(self, job_service, mock_diagnostic_service):
+        """Test that a saturated LLM puts the job back in the queue"""
+        mock_diagnostic_service.generate_diagnostic_report.side_effect = [
+            LLMOverloadedError("saturated", retry_after=0),
+            "Report after retry",
+        ]
+        job_service.start()
+        submitted = job_service.submit(PATIENT)
+
+        job = await job_service.wait(submitted["job_id"], timeout=2)
+        await job_service.stop()
+
+        assert job["status"] == "completed"
+        assert job["report"] == "Report after retry"
+        assert job["attempts"] == 1
@@ -0,0 +1,268 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.config.env import ConfigEnvs
+from api.infra.services.llm_services.admission_control import (
+    AdmissionController,
+    AdmissionControlledLLMService,
+    parse_client_weights,
+    parse_endpoint_priorities,
+)
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+
+
+@pytest.fixture
+def mock_envs():
+    """Mock ConfigEnvs"""
+    return Mock(spec=ConfigEnvs)
+
+
+@pytest.fixture
+def stub_llm(mock_envs):
+    """Fast stub LLM"""
+    return StubLLMService(
+        envs=mock_envs, ttft=0.05, token_delay=0.0, tokens=3, capacity=0
+    )
+
+
+def make_controller(max_concurrency=1, max_queue_size=1, max_queue_time=1.0, **kwargs):
+    return AdmissionController(
+        name="test",
+        max_concurrency=max_concurrency,
+        max_queue_size=max_queue_size,
+        max_queue_time=max_queue_time,
+        **kwargs,
+    )
+
+
+async def admission_order(controller, requests):
+    """Queues (client, priority) requests behind a held slot; returns grant order"""
+    await controller.acquire_async("holder", "standard")
+    order = []
+
+    async def request(client, priority):
+        await controller.acquire_async(client, priority)
+        order.append((client, priority))
+        await asyncio.sleep(0)
+        controller.release(client)
+
+    tasks = []
+    for client, priority in requests:
+        tasks.append(asyncio.create_task(request(client, priority)))
+        await asyncio.sleep(0)
+    controller.release("holder")
+    await asyncio.gather(*tasks)
+    return order
+
+
+class TestAdmissionController:
+    """Test suite for AdmissionController"""
+
+    def test_acquire_and_release(self):
+        """Test slot accounting"""
+        controller = make_controller(max_concurrency=2)
+
+        controller.acquire()
+        controller.acquire()
+        assert controller.in_use == 2
+
+        controller.release()
+        controller.release()
+        assert controller.in_use == 0
+        assert controller.admitted == 2
+
+    def test_sheds_when_queue_is_full(self):
+        """Test fail-fast when the wait queue is full"""
+        controller = make_controller(max_concurrency=1, max_queue_size=0)
+        controller.acquire()
+
+        with pytest.raises(LLMOverloadedError) as exc_info:
+            controller.acquire()
+
+        assert exc_info.value.retry_after >= 1
+        assert controller.shed_queue_full == 1
+
+    def test_sheds_after_max_queue_time(self):
+        """Test that waiting longer than max_queue_time sheds the request"""
+        controller = make_controller(max_queue_time=0.05)
+        controller.acquire()
+
+        with pytest.raises(LLMOverloadedError):
+            controller.acquire()
+
+        assert controller.shed_timeout == 1
+        assert controller.queue_depth == 0
+
+    def test_release_hands_slot_to_waiter(self):
+        """Test direct handoff to a waiting thread"""
+        controller = make_controller(max_queue_time=2.0)
+        controller.acquire()
+        admitted = threading.Event()
+
+        def waiter():
+            controller.acquire()
+            admitted.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        while controller.queue_depth == 0:
+            pass
+        controller.release()
+        thread.join(timeout=2)
+
+        assert admitted.is_set()
+        assert controller.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_async_waiters_are_fifo(self):
+        """Test that async waiters are admitted in arrival order"""
+        controller = make_controller(max_concurrency=1, max_queue_size=5)
+        order = []
+
+        async def request(i):
+            async with controller.slot_async():
+                order.append(i)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request(i) for i in range(4)))
+
+        assert order == [0, 1, 2, 3]
+        assert controller.status()["shed_rate"] == 0.0
+        assert controller.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that a cancelled waiter does not leak a slot"""
+        controller = make_controller(max_concurrency=1, max_queue_size=5)
+        await controller.acquire_async()
+
+        task = asyncio.create_task(controller.acquire_async())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        controller.release()
+
+        assert controller.queue_depth == 0
+        assert controller.in_use == 0
+
+
+class TestFairScheduling:
+    """Test suite for the per-client weighted fair queue with priorities"""
+
+    @pytest.mark.asyncio
+    async def test_interactive_goes_before_queued_batch(self):
+        """Test that a later interactive request is admitted first"""
+        controller = make_controller(max_queue_size=10)
+
+        order = await admission_order(
+            controller,
+            [("partner", "batch"), ("partner", "batch"), ("clinic", "interactive")],
+        )
+
+        assert order[0] == ("clinic", "interactive")
+
+    @pytest.mark.asyncio
+    async def test_burst_does_not_starve_other_clients(self):
+        """Test that clients of one class share slots round-robin"""
+        controller = make_controller(max_queue_size=20)
+        burst = [("partner", "batch")] * 6 + [("other", "batch")] * 2
+
+        order = await admission_order(controller, burst)
+
+        clients = [client for client, _ in order]
+        assert clients[:4] == ["partner", "other", "partner", "other"]
+
+    @pytest.mark.asyncio
+    async def test_weights_set_the_share(self):
+        """Test that a client with weight 2 gets two slots per one of weight 1"""
+        controller = make_controller(max_queue_size=20, client_weights={"clinic": 2.0})
+        requests = [("partner", "batch")] * 6 + [("clinic", "batch")] * 6
+
+        order = await admission_order(controller, requests)
+
+        assert [client for client, _ in order[:6]].count("clinic") == 4
+
+    @pytest.mark.asyncio
+    async def test_reserved_slots_only_for_interactive(self):
+        """Test that batch traffic cannot take the reserved slot"""
+        controller = make_controller(
+            max_concurrency=2, max_queue_size=5, reserved_slots=1
+        )
+        await controller.acquire_async("partner", "batch")
+
+        waiting = asyncio.create_task(controller.acquire_async("partner", "batch"))
+        await asyncio.sleep(0.01)
+        assert controller.queue_depth == 1
+
+        await controller.acquire_async("clinic", "interactive")
+        assert controller.in_use == 2
+        waiting.cancel()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_evicts_lower_priority(self):
+        """Test that an interactive arrival sheds a queued batch request"""
+        controller = make_controller(max_queue_size=1)
+        await controller.acquire_async("holder", "standard")
+        batch = asyncio.create_task(controller.acquire_async("partner", "batch"))
+        await asyncio.sleep(0.01)
+
+        interactive = asyncio.create_task(
+            controller.acquire_async("clinic", "interactive")
+        )
+        with pytest.raises(LLMOverloadedError, match="preempted"):
+            await batch
+        controller.release("holder")
+        await interactive
+
+        status = controller.status()
+        assert status["shed_preempted"] == 1
+        assert status["clients"]["partner"]["shed"] == 1
+        assert status["clients"]["clinic"]["in_use"] == 1
+
+    def test_priority_comes_from_the_endpoint(self):
+        """Test the endpoint to class mapping and its overrides"""
+        controller = make_controller(
+            endpoint_priorities=parse_endpoint_priorities('{"jobs": "standard"}')
+        )
+
+        assert controller.priority_of("/diagnostic/stream") == "interactive"
+        assert controller.priority_of("jobs") == "standard"
+        assert controller.priority_of("/unknown") == "standard"
+
+    def test_invalid_configuration(self):
+        """Test that bad weights and class names are rejected"""
+        with pytest.raises(ValueError):
+            parse_client_weights('{"partner": 0}')
+        with pytest.raises(ValueError):
+            parse_endpoint_priorities('{"jobs": "urgent"}')
+
+
+class TestAdmissionControlledLLMService:
+    """Test suite for AdmissionControlledLLMService"""
+
+    @pytest.mark.asyncio
+    async def test_generate_response_sheds_under_overload(self, stub_llm):
+        """Test that overload surfaces as LLMOverloadedError on the stream"""
+        controller = make_controller(max_concurrency=1, max_queue_size=0)
+        service = AdmissionControlledLLMService(stub_llm, controller)
+
+        async def consume():
+            return [c async for c in service.generate_response("input", "system")]
+
+        results = await asyncio.gather(consume(), consume(), return_exceptions=True)
+
+        assert sum(isinstance(r, LLMOverloadedError) for r in results) == 1
+        assert ["".join(r) for r in results if isinstance(r, list)] == ["Based on the"]
+        assert controller.in_use == 0
+
+    def test_invoke_passes_through(self, stub_llm):
+        """Test sync invoke through the controller"""
+        controller = make_controller()
+        service = AdmissionControlledLLMService(stub_llm, controller)
+
+        assert service.invoke(prompt="input", system_prompt="system") == "Based on the"
+        assert service.model_name == "stub"
+        assert controller.admitted == 1
@@ -0,0 +1,182 @@
+import time
+import pytest
+from unittest.mock import Mock
+from api.application.enum.llm_model import LLMModels
+from api.infra.config.env import ConfigEnvs
+from api.infra.container.dependecies import (
+    _create_llm_cassette,
+    _create_provider_llm_service,
+)
+from api.infra.services.llm_services.cassette_llm_service import (
+    Cassette,
+    CassetteMissError,
+    RecordingLLMService,
+    ReplayLLMService,
+)
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+
+
+@pytest.fixture
+def mock_envs():
+    """Mock ConfigEnvs"""
+    return Mock(spec=ConfigEnvs)
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    """Empty cassette file under tmp_path"""
+    return Cassette(tmp_path / "llm.jsonl")
+
+
+@pytest.fixture
+def recorder(mock_envs, cassette):
+    """Recording wrapper around a stub with a visible TTFT"""
+    stub = StubLLMService(
+        envs=mock_envs, ttft=0.05, token_delay=0.005, tokens=5, capacity=0
+    )
+    return RecordingLLMService(inner=stub, cassette=cassette, provider="stub")
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def replay(mock_envs, cassette, time_scale=1.0, miss_policy="cycle"):
+    return ReplayLLMService(
+        envs=mock_envs,
+        cassette=Cassette(cassette.path),
+        time_scale=time_scale,
+        miss_policy=miss_policy,
+    )
+
+
+class TestRecordingLLMService:
+    """Test suite for RecordingLLMService"""
+
+    @pytest.mark.asyncio
+    async def test_records_chunks_and_timings(self, recorder, cassette):
+        """Test that a full stream is written with per-chunk offsets"""
+        chunks = await collect(
+            recorder.generate_response("patient", "system", temperature=0.7)
+        )
+
+        entry = Cassette(cassette.path).entries[0]
+        assert [text for _, text in entry["chunks"]] == chunks
+        assert entry["kind"] == "stream"
+        assert entry["params"] == {"temperature": 0.7}
+        assert entry["chunks"][0][0] >= 0.05
+        offsets = [offset for offset, _ in entry["chunks"]]
+        assert offsets == sorted(offsets)
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_is_not_recorded(self, recorder, cassette):
+        """Test that only complete generations end up in the cassette"""
+        stream = recorder.generate_response("patient", "system")
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert len(cassette) == 0
+
+    def test_records_invoke(self, recorder, cassette):
+        """Test that sync calls are recorded as a single timed chunk"""
+        response = recorder.invoke(prompt="patient", system_prompt="system")
+
+        entry = cassette.entries[0]
+        assert entry["kind"] == "invoke"
+        assert entry["chunks"][0][1] == response
+
+
+class TestReplayLLMService:
+    """Test suite for ReplayLLMService"""
+
+    @pytest.mark.asyncio
+    async def test_replays_recorded_stream_and_timing(
+        self, mock_envs, recorder, cassette
+    ):
+        """Test that a matched call yields the same chunks at the same pace"""
+        recorded = await collect(recorder.generate_response("patient", "system"))
+        service = replay(mock_envs, cassette)
+
+        start = time.perf_counter()
+        replayed = await collect(service.generate_response("patient", "system"))
+        elapsed = time.perf_counter() - start
+
+        assert replayed == recorded
+        assert elapsed == pytest.approx(cassette.entries[0]["duration"], abs=0.03)
+        assert service.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_time_scale(self, mock_envs, recorder, cassette):
+        """Test that time_scale=0 plays back without waiting"""
+        await collect(recorder.generate_response("patient", "system"))
+        service = replay(mock_envs, cassette, time_scale=0)
+
+        start = time.perf_counter()
+        await collect(service.generate_response("patient", "system"))
+
+        assert time.perf_counter() - start < 0.02
+
+    @pytest.mark.asyncio
+    async def test_miss_policies(self, mock_envs, recorder, cassette):
+        """Test cycling to another recording or failing on unknown prompts"""
+        recorded = await collect(recorder.generate_response("patient", "system"))
+
+        cycling = replay(mock_envs, cassette, time_scale=0)
+        assert await collect(cycling.generate_response("other", "system")) == recorded
+        assert cycling.misses == 1
+
+        strict = replay(mock_envs, cassette, time_scale=0, miss_policy="error")
+        with pytest.raises(CassetteMissError):
+            await collect(strict.generate_response("other", "system"))
+
+    @pytest.mark.asyncio
+    async def test_max_tokens_truncates(self, mock_envs, recorder, cassette):
+        """Test that max_tokens cuts the replayed chunk sequence"""
+        await collect(recorder.generate_response("patient", "system"))
+        service = replay(mock_envs, cassette, time_scale=0)
+
+        chunks = await collect(
+            service.generate_response("patient", "system", max_tokens=2)
+        )
+
+        assert len(chunks) == 2
+
+    def test_empty_cassette_is_rejected(self, mock_envs, cassette):
+        """Test that replay needs at least one recording"""
+        with pytest.raises(ValueError):
+            ReplayLLMService(envs=mock_envs, cassette=cassette)
+
+
+class TestCassetteWiring:
+    """Test suite for the LLM_PROVIDER / LLM_RECORD_CASSETTE wiring"""
+
+    def test_replay_provider(self, mock_envs, recorder, cassette):
+        """Test LLM_PROVIDER=replay with LLM_CASSETTE"""
+        recorder.invoke(prompt="patient", system_prompt="system")
+        mock_envs.LLM_PROVIDER = LLMModels.REPLAY.value
+        mock_envs.LLM_CASSETTE = str(cassette.path)
+        mock_envs.LLM_REPLAY_TIME_SCALE = 0.0
+        mock_envs.LLM_REPLAY_MISS_POLICY = "cycle"
+
+        service = _create_provider_llm_service(
+            mock_envs, _create_llm_cassette(mock_envs)
+        )
+
+        assert isinstance(service, ReplayLLMService)
+        assert service.invoke(prompt="patient", system_prompt="system")
+
+    def test_record_wraps_real_provider(self, mock_envs, tmp_path):
+        """Test that LLM_RECORD_CASSETTE wraps the configured provider"""
+        mock_envs.LLM_PROVIDER = LLMModels.STUB.value
+        mock_envs.LLM_RECORD_CASSETTE = str(tmp_path / "rec.jsonl")
+        mock_envs.STUB_LLM_TTFT = 0.0
+        mock_envs.STUB_LLM_TOKEN_DELAY = 0.0
+        mock_envs.STUB_LLM_TOKENS = 3
+        mock_envs.STUB_LLM_CAPACITY = 0
+
+        service = _create_provider_llm_service(
+            mock_envs, _create_llm_cassette(mock_envs)
+        )
+
+        assert isinstance(service, RecordingLLMService)
+        assert isinstance(service.inner, StubLLMService)
@@ -1,4 +1,5 @@
 import pytest
+import httpx
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from langchain_core.messages import SystemMessage, HumanMessage
 from api.infra.services.llm_services.ollama_llm_service import OllamaLLMService
@@ -131,11 +132,24 @@ class TestOllamaLLMService:
 
     @pytest.mark.asyncio
     async def test_get_available_models(self, ollama_service):
-        """Test get_available_models method"""
-        models = await ollama_service.get_available_models()
+        """Test get_available_models reads the pulled models from /api/tags"""
 
-        assert isinstance(models, list)
-        assert "llama3.2:1b" in models
+        def handler(request):
+            assert request.url.path == "/api/tags"
+            return httpx.Response(
+                200,
+                json={"models": [{"name": "llama3.2:1b"}, {"name": "llama3.1:8b"}]},
+            )
+
+        transport = httpx.MockTransport(handler)
+        real_client = httpx.AsyncClient
+        with patch(
+            "api.infra.services.llm_services.ollama_llm_service.httpx.AsyncClient",
+            lambda **kwargs: real_client(transport=transport, **kwargs),
+        ):
+            models = await ollama_service.get_available_models()
+
+        assert models == ["llama3.2:1b", "llama3.1:8b"]
 
     @patch("api.infra.services.llm_services.ollama_llm_service.ChatOllama")
     def test_invoke(self, mock_chat_ollama, ollama_service):
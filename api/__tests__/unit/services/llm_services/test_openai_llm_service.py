@@ -52,6 +52,9 @@ class TestOpenaiLLMService:
             openai_api_key=openai_service.openai_api_key,
             temperature=0.7,
             top_p=0.8,
+            max_tokens=None,
+            stream_usage=True,
+            stop=None,
         )
         assert result == mock_model
 
@@ -121,14 +124,31 @@ class TestOpenaiLLMService:
             assert chunks == ["Response"]
 
     @pytest.mark.asyncio
-    async def test_get_available_models(self, openai_service):
-        """Test get_available_models method"""
+    @patch("api.infra.services.llm_services.openai_llm_service.AsyncOpenAI")
+    async def test_get_available_models(self, mock_async_openai, openai_service):
+        """Test get_available_models lists the models of the API key"""
+        client = mock_async_openai.return_value
+        client.models.list = AsyncMock(
+            return_value=Mock(data=[Mock(id="gpt-4o-mini"), Mock(id="gpt-4o")])
+        )
+        client.close = AsyncMock()
+
         models = await openai_service.get_available_models()
 
-        assert isinstance(models, list)
-        assert "gpt-4o-mini" in models
-        assert "gpt-4o" in models
-        assert "gpt-3.5-turbo" in models
+        assert models == ["gpt-4o-mini", "gpt-4o"]
+        mock_async_openai.assert_called_once_with(api_key="test-api-key", timeout=5.0)
+        client.close.assert_awaited_once()
+
+    @patch("api.infra.services.llm_services.openai_llm_service.ChatOpenAI")
+    def test_invoke_with_model_and_max_tokens(self, mock_chat_openai, openai_service):
+        """Test invoke forwards the routed model and token budget"""
+        mock_chat_openai.return_value.invoke = Mock(return_value=Mock(content="ok"))
+
+        openai_service.invoke(prompt="Test", model="gpt-4o", max_tokens=300)
+
+        kwargs = mock_chat_openai.call_args.kwargs
+        assert kwargs["model"] == "gpt-4o"
+        assert kwargs["max_tokens"] == 300
 
     @patch("api.infra.services.llm_services.openai_llm_service.ChatOpenAI")
     def test_invoke(self, mock_chat_openai, openai_service):
@@ -174,3 +194,29 @@ class TestOpenaiLLMService:
             chunks.append(chunk)
 
         assert chunks == ["Chunk"]
+
+    @pytest.mark.asyncio
+    @patch("api.infra.services.llm_services.openai_llm_service.ChatOpenAI")
+    async def test_generate_response_collects_usage(
+        self, mock_chat_openai, openai_service
+    ):
+        """Test the usage chunk at the end of the stream fills the usage dict"""
+        text_chunk = Mock(content="Hello", usage_metadata=None)
+        usage_chunk = Mock(
+            content="",
+            usage_metadata={"input_tokens": 120, "output_tokens": 35},
+        )
+
+        async def async_gen(messages):
+            yield text_chunk
+            yield usage_chunk
+
+        mock_chat_openai.return_value = Mock(astream=async_gen)
+
+        usage = {}
+        async for _ in openai_service.generate_response(
+            user_input="Test", system_prompt="", usage=usage
+        ):
+            pass
+
+        assert usage == {"prompt_tokens": 120, "completion_tokens": 35}
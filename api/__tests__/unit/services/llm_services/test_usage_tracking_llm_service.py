@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import Mock
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.llm_usage import LLMUsageStats, TokenEstimator
+from api.infra.services.llm_services.cassette_llm_service import (
+    Cassette,
+    RecordingLLMService,
+)
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.llm_services.usage_tracking_llm_service import (
+    UsageTrackingLLMService,
+)
+
+
+class ReportingStub(StubLLMService):
+    """Stub that reports usage like the Ollama/OpenAI services"""
+
+    REPORTS_USAGE = True
+
+    async def generate_response(self, user_input, system_prompt, usage=None, **kw):
+        async for chunk in super().generate_response(user_input, system_prompt, **kw):
+            yield chunk
+        usage.update(prompt_tokens=321, completion_tokens=5)
+
+    def invoke(self, prompt, system_prompt="", usage=None, **kwargs):
+        usage.update(prompt_tokens=321, completion_tokens=5)
+        return super().invoke(prompt, system_prompt, **kwargs)
+
+
+@pytest.fixture
+def mock_envs():
+    """Mock ConfigEnvs"""
+    return Mock(spec=ConfigEnvs)
+
+
+@pytest.fixture
+def stats():
+    """Usage stats with the chars/4 estimator"""
+    return LLMUsageStats(estimator=TokenEstimator(None))
+
+
+def stub(mock_envs, cls=StubLLMService):
+    return cls(envs=mock_envs, ttft=0.02, token_delay=0.001, tokens=5, capacity=0)
+
+
+class TestUsageTrackingLLMService:
+    """Test suite for UsageTrackingLLMService"""
+
+    @pytest.mark.asyncio
+    async def test_reported_usage_is_recorded(self, mock_envs, stats):
+        """Test the usage filled by the provider wins over the estimate"""
+        llm = UsageTrackingLLMService(
+            inner=stub(mock_envs, ReportingStub), stats=stats, provider="ollama"
+        )
+
+        chunks = [c async for c in llm.generate_response("patient", "system")]
+
+        row = stats.report()["usage"][0]
+        assert len(chunks) == 5
+        assert row["provider"] == "ollama"
+        assert row["model"] == "stub"
+        assert (row["prompt_tokens"], row["completion_tokens"]) == (321, 5)
+        assert row["estimated_calls"] == 0
+        assert row["time_to_first_token"]["p50_ms"] >= 20
+
+    @pytest.mark.asyncio
+    async def test_missing_usage_is_estimated(self, mock_envs, stats):
+        """Test providers without usage are counted with the local estimator"""
+        llm = UsageTrackingLLMService(
+            inner=stub(mock_envs), stats=stats, provider="stub"
+        )
+
+        text = "".join([c async for c in llm.generate_response("a" * 40, "b" * 40)])
+
+        row = stats.report()["usage"][0]
+        assert row["estimated_calls"] == 1
+        assert row["prompt_tokens"] == 28
+        assert row["completion_tokens"] == round(len(text) / 4)
+        assert row["tokens_per_s"] > 0
+
+    def test_invoke(self, mock_envs, stats):
+        """Test invoke records a call without TTFT"""
+        llm = UsageTrackingLLMService(
+            inner=stub(mock_envs, ReportingStub), stats=stats, provider="openai"
+        )
+
+        llm.invoke(prompt="patient", system_prompt="system", temperature=0.7)
+
+        row = stats.report()["usage"][0]
+        assert row["calls"] == 1
+        assert row["streams"] == 0
+        assert row["time_to_first_token"]["count"] == 0
+        assert row["completion_tokens"] == 5
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_early_is_recorded(self, mock_envs, stats):
+        """Test a stream closed by the consumer counts the tokens it produced"""
+        llm = UsageTrackingLLMService(
+            inner=stub(mock_envs), stats=stats, provider="stub"
+        )
+
+        stream = llm.generate_response("patient", "system")
+        await stream.__anext__()
+        await stream.aclose()
+
+        row = stats.report()["usage"][0]
+        assert row["calls"] == 1
+        assert row["errors"] == 0
+        assert row["completion_tokens"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_usage_sink_is_not_recorded_in_cassette(
+        self, mock_envs, stats, tmp_path
+    ):
+        """Test the recorder outside the tracker keeps params free of usage"""
+        cassette = Cassette(tmp_path / "llm.jsonl")
+        tracked = UsageTrackingLLMService(
+            inner=stub(mock_envs, ReportingStub), stats=stats, provider="ollama"
+        )
+        llm = RecordingLLMService(inner=tracked, cassette=cassette, provider="ollama")
+
+        async for _ in llm.generate_response("patient", "system", temperature=0.7):
+            pass
+
+        assert cassette.entries[0]["params"] == {"temperature": 0.7}
+        assert cassette.entries[0]["model"] == "stub"
+        assert stats.report()["usage"][0]["prompt_tokens"] == 321
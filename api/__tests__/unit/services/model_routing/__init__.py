@@ -0,0 +1 @@
+# Model routing tests
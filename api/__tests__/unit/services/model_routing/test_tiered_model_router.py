@@ -0,0 +1,142 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from api.application.services.llm_service import LLMService
+from api.application.services.model_router import ModelRoute
+from api.infra.services.model_routing.model_catalog import ModelCatalog
+from api.infra.services.model_routing.tiered_model_router import (
+    TieredModelRouter,
+    parse_routing_table,
+)
+
+TABLE = [
+    {"name": "fast", "confidence": ["high"], "model": "llama3.2:1b", "max_tokens": 350},
+    {
+        "name": "standard",
+        "confidence": "medium",
+        "model": ["llama3.2:3b", "llama3.2:1b"],
+        "max_tokens": 600,
+    },
+    {"name": "careful", "model": ["llama3.1:8b", "llama3.2:3b"], "max_tokens": 900},
+]
+
+
+def prediction(confidence, probability=0.5):
+    return {"confidence": confidence, "probability": probability}
+
+
+def catalog_with(models):
+    """ModelCatalog over a provider that serves the given models"""
+    llm = Mock(spec=LLMService)
+    llm.get_available_models = AsyncMock(return_value=models)
+    return ModelCatalog(llm_service=llm, ttl=60)
+
+
+class TestParseRoutingTable:
+    """Test suite for the LLM_ROUTING parser"""
+
+    def test_inline_json(self):
+        """Test tiers, single/multiple models and confidence forms"""
+        tiers = parse_routing_table(json.dumps(TABLE))
+
+        assert [t.name for t in tiers] == ["fast", "standard", "careful"]
+        assert tiers[0].models == ("llama3.2:1b",)
+        assert tiers[1].confidence == frozenset({"medium"})
+        assert tiers[2].confidence == frozenset()
+
+    def test_file(self, tmp_path):
+        """Test the table can be read from a JSON file"""
+        path = tmp_path / "routing.json"
+        path.write_text(json.dumps(TABLE))
+
+        assert len(parse_routing_table(str(path))) == 3
+
+    def test_invalid_tables(self):
+        """Test unknown confidence levels and empty tables are rejected"""
+        with pytest.raises(ValueError):
+            parse_routing_table('[{"name": "x", "confidence": ["certain"]}]')
+        with pytest.raises(ValueError):
+            parse_routing_table("[]")
+
+
+class TestTieredModelRouter:
+    """Test suite for TieredModelRouter"""
+
+    def test_routes_by_confidence(self):
+        """Test the first matching tier wins and the last one is the default"""
+        router = TieredModelRouter(parse_routing_table(json.dumps(TABLE)))
+
+        assert router.route(prediction("high")) == ModelRoute(
+            "fast", "llama3.2:1b", 350
+        )
+        assert router.route(prediction("medium")).tier == "standard"
+        assert router.route(prediction("low")).tier == "careful"
+
+    def test_probability_range(self):
+        """Test tiers restricted to a probability band"""
+        router = TieredModelRouter(
+            parse_routing_table(
+                '[{"name": "positive", "min_probability": 0.8, "model": "a"},'
+                ' {"name": "rest", "model": "b"}]'
+            )
+        )
+
+        assert router.route(prediction("high", 0.9)).model == "a"
+        assert router.route(prediction("high", 0.3)).model == "b"
+
+    @pytest.mark.asyncio
+    async def test_uses_first_available_model(self):
+        """Test models missing on the provider are skipped, then the default"""
+        catalog = catalog_with(["llama3.2:3b", "llama3.2:1b"])
+        await catalog.refresh()
+        router = TieredModelRouter(
+            parse_routing_table(json.dumps(TABLE)), catalog=catalog
+        )
+
+        assert router.route(prediction("low")).model == "llama3.2:3b"
+
+        catalog.available = frozenset({"mistral:7b"})
+        route = router.route(prediction("low"))
+        assert route.model is None
+        assert route.max_tokens == 900
+        careful = router.status()["tiers"][2]
+        assert careful["fallbacks"] == 1
+        assert careful["routed_models"] == {"llama3.2:3b": 1, "default": 1}
+
+    def test_latency_per_tier(self):
+        """Test observed latencies are summarized per tier"""
+        router = TieredModelRouter(parse_routing_table(json.dumps(TABLE)))
+        router.observe(ModelRoute("fast"), 1.0, ttft=0.2)
+        router.observe(ModelRoute("fast"), 3.0, ttft=0.4)
+        router.observe(ModelRoute("careful"), 8.0)
+
+        tiers = {t["name"]: t for t in router.status()["tiers"]}
+        assert tiers["fast"]["latency"]["mean_ms"] == 2000.0
+        assert tiers["fast"]["latency"]["p95_ms"] == 3000.0
+        assert tiers["fast"]["time_to_first_token"]["count"] == 2
+        assert tiers["careful"]["time_to_first_token"]["count"] == 0
+        assert tiers["standard"]["latency"]["count"] == 0
+
+
+class TestModelCatalog:
+    """Test suite for the live model discovery"""
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_last_list(self):
+        """Test a discovery error does not drop the known models"""
+        catalog = catalog_with(["llama3.2:latest"])
+        await catalog.refresh()
+        catalog.llm_service.get_available_models.side_effect = OSError("down")
+
+        await catalog.refresh()
+
+        assert catalog.failures == 1
+        assert "down" in catalog.status()["last_error"]
+        # "llama3.2" casa com a tag ":latest" do Ollama
+        assert catalog.resolve(["llama3.1:8b", "llama3.2"]) == "llama3.2"
+
+    def test_unknown_until_first_discovery(self):
+        """Test every model is assumed available before discovery"""
+        catalog = catalog_with([])
+
+        assert catalog.resolve(["anything"]) == "anything"
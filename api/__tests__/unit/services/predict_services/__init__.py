@@ -0,0 +1 @@
+# Prediction services tests
@@ -0,0 +1,203 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from api.infra.services.predict_services.model_registry import (
+    ModelRegistry,
+    ModelVerificationError,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+
+
+@pytest.fixture
+def registry(model_artifact_factory):
+    """Registry with a single active version v1"""
+    artifact = model_artifact_factory("v1", seed=0)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate(artifact)
+    return registry
+
+
+class TestModelRegistry:
+    """Test suite for ModelRegistry"""
+
+    def test_activate_sets_active_version(self, registry):
+        """Test activation of an artifact"""
+        assert registry.active.version == "v1"
+        assert registry.swap_count == 1
+        assert registry.status()["active"]["version"] == "v1"
+
+    def test_activate_by_version_name(self, registry, model_artifact_factory):
+        """Test activation using the version directory name"""
+        model_artifact_factory("v2", seed=1)
+
+        loaded = registry.activate("v2")
+
+        assert loaded.version == "v2"
+        assert registry.active is loaded
+        assert registry.last_parity_delta is not None
+
+    def test_activate_unknown_version(self, registry):
+        """Test activation of a missing version"""
+        with pytest.raises(FileNotFoundError):
+            registry.activate("missing")
+
+    def test_failed_smoke_keeps_active_model(self, registry, model_artifact_factory):
+        """Test that a candidate failing verification is not swapped in"""
+        model_artifact_factory("broken", seed=2)
+        previous = registry.active
+
+        with patch(
+            "api.infra.services.predict_services.model_registry.LoadedModel.predict_proba",
+            return_value=np.full(3, np.nan),
+        ):
+            with pytest.raises(ModelVerificationError):
+                registry.activate("broken")
+
+        assert registry.active is previous
+        assert registry.failed_loads == 1
+
+    def test_parity_tolerance_rejects_divergent_model(self, model_artifact_factory):
+        """Test parity check against the active model"""
+        model_artifact_factory("v1", seed=0)
+        model_artifact_factory("v2", seed=5)
+        registry = ModelRegistry(
+            models_dir=model_artifact_factory.models_dir, parity_tolerance=0.0
+        )
+        registry.activate("v1")
+
+        with pytest.raises(ModelVerificationError):
+            registry.activate("v2")
+
+        assert registry.active.version == "v1"
+
+    def test_poll_activates_new_artifact(self, registry, model_artifact_factory):
+        """Test that poll picks up artifacts added after start"""
+        registry._seen.update(a["fingerprint"] for a in registry.discover())
+        assert registry.poll() is None
+
+        artifact = model_artifact_factory("v2", seed=1)
+        os.utime(artifact, (artifact.stat().st_atime, artifact.stat().st_mtime + 10))
+
+        loaded = registry.poll()
+
+        assert loaded is not None
+        assert registry.active.version == "v2"
+        assert registry.poll() is None
+
+    def test_poll_logs_and_skips_broken_artifact(
+        self, registry, model_artifact_factory, caplog
+    ):
+        """Test that a failed activation is logged and not retried every cycle"""
+        registry._seen.update(a["fingerprint"] for a in registry.discover())
+        artifact = model_artifact_factory("broken", seed=2)
+        os.utime(artifact, (artifact.stat().st_atime, artifact.stat().st_mtime + 10))
+
+        with patch(
+            "api.infra.services.predict_services.model_registry.LoadedModel.predict_proba",
+            return_value=np.full(3, np.nan),
+        ):
+            assert registry.poll() is None
+
+        assert "Failed to activate model artifact" in caplog.text
+        assert registry.active.version == "v1"
+        assert registry.poll() is None
+        assert registry.failed_loads == 1
+
+    @pytest.mark.parametrize(
+        "version", ["", ".", "..", "../v1", "v1/../v1", "..\\v1", "/etc/passwd"]
+    )
+    def test_resolve_rejects_non_version_names(self, registry, version):
+        """Test that only a directory name directly under models_dir resolves"""
+        with pytest.raises(ValueError):
+            registry.resolve(version)
+
+    def test_resolve_rejects_symlink_outside_models_dir(
+        self, registry, model_artifact_factory, tmp_path
+    ):
+        """Test that a version directory linking outside models_dir is refused"""
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "diabetes_model.joblib").write_bytes(b"not a model")
+        (model_artifact_factory.models_dir / "linked").symlink_to(outside)
+
+        with pytest.raises(ValueError):
+            registry.activate("linked")
+
+
+class TestDiabetesPredictionService:
+    """Test suite for DiabetesPredictionService with a registry"""
+
+    def test_predict_reports_model_version(self, registry):
+        """Test that predictions carry the active model version"""
+        service = DiabetesPredictionService(registry=registry)
+
+        result = service.predict(registry.smoke_batch[0])
+
+        assert result["model_version"] == "v1"
+        assert 0.0 <= result["probability"] <= 1.0
+        assert result["confidence"] in ("high", "medium", "low")
+
+    def test_predict_uses_swapped_model(self, registry, model_artifact_factory):
+        """Test that predictions follow an atomic swap"""
+        service = DiabetesPredictionService(registry=registry)
+        model_artifact_factory("v2", seed=1, threshold=0.7)
+
+        registry.activate("v2")
+        result = service.predict(registry.smoke_batch[0])
+
+        assert result["model_version"] == "v2"
+        assert result["threshold_used"] == 0.7
+
+    def test_predict_returns_top_factors(self, registry):
+        """Test that predictions carry the top linear contributors"""
+        service = DiabetesPredictionService(registry=registry, top_k_factors=3)
+
+        result = service.predict(registry.smoke_batch[2])
+
+        factors = result["top_factors"]
+        assert len(factors) == 3
+        magnitudes = [abs(f["contribution"]) for f in factors]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+        assert factors[0]["value"] == registry.smoke_batch[2][factors[0]["feature"]]
+
+    def test_predict_without_top_factors(self, registry):
+        """Test that attribution can be disabled"""
+        service = DiabetesPredictionService(registry=registry, top_k_factors=0)
+
+        result = service.predict(registry.smoke_batch[0])
+
+        assert result["top_factors"] is None
+
+
+class TestLoadedModelAttribution:
+    """Test suite for vectorized linear attribution"""
+
+    def test_contributions_match_coefficients(self, registry):
+        """Test (x - baseline) * coef for a whole batch"""
+        loaded = registry.active
+        X = loaded.preprocess(pd.DataFrame(registry.smoke_batch))
+
+        contributions = loaded.contributions(X)
+
+        expected = (X - loaded.baseline) * loaded.model.coef_[0]
+        np.testing.assert_allclose(contributions, expected)
+        # Soma das contribuições + logit do baseline = logit da predição
+        logits = loaded.model.decision_function(X)
+        baseline_logit = loaded.model.decision_function(loaded.baseline[None, :])
+        np.testing.assert_allclose(contributions.sum(axis=1) + baseline_logit, logits)
+
+    def test_top_contributions_batch(self, registry):
+        """Test top-k selection for a batch"""
+        loaded = registry.active
+        X = loaded.preprocess(pd.DataFrame(registry.smoke_batch))
+
+        indices, values = loaded.top_contributions(X, k=4)
+
+        assert indices.shape == (len(registry.smoke_batch), 4)
+        full = np.abs(loaded.contributions(X))
+        for row, row_indices in enumerate(indices):
+            assert set(row_indices) == set(np.argsort(-full[row])[:4])
@@ -0,0 +1,143 @@
+import threading
+import time
+import numpy as np
+import pytest
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import (
+    FEATURE_ORDER,
+    ModelRegistry,
+)
+from api.infra.services.predict_services.prediction_audit_sink import (
+    PredictionAuditSink,
+    read_audit_file,
+)
+
+
+@pytest.fixture
+def features():
+    """Encoded feature matrix with two rows"""
+    return np.arange(2 * len(FEATURE_ORDER), dtype=float).reshape(2, -1)
+
+
+class TestPredictionAuditSink:
+    """Test suite for PredictionAuditSink"""
+
+    def test_flushes_on_stop(self, tmp_path, features):
+        """Test that buffered records are written when the sink stops"""
+        sink = PredictionAuditSink(tmp_path, flush_interval=60)
+
+        sink.observe(features, np.array([0.2, 0.8]), 0.5, "v1")
+        sink.stop()
+
+        records = read_audit_file(sink.current_file or next(tmp_path.iterdir()))
+        assert sink.status()["written"] == 2
+        assert [r["probability"] for r in records] == [0.2, 0.8]
+        assert records[1]["model_version"] == "v1"
+        assert records[1]["threshold"] == 0.5
+        assert records[1]["age"] == features[1, 0]
+        assert records[1]["diabetes_risk_score"] == features[1, -1]
+
+    def test_rotates_by_row_count(self, tmp_path, features):
+        """Test that a new file is opened once rotate_rows is reached"""
+        sink = PredictionAuditSink(tmp_path, rotate_rows=2)
+        item = (0.0, features, np.array([0.1, 0.9]), 0.5, "v1")
+
+        for _ in range(3):
+            sink._flush([item])
+        sink._close_file()
+
+        files = sorted(tmp_path.glob("predictions-*.sqlite3"))
+        assert len(files) == 3
+        assert sum(len(read_audit_file(f)) for f in files) == 6
+        assert sink.status()["rotations"] == 2
+
+    def test_backlog_keeps_records_without_blocking(self, tmp_path, features):
+        """Test that a slow disk backlogs the sink instead of dropping or blocking"""
+        sink = PredictionAuditSink(tmp_path, max_queue_size=1, flush_rows=1)
+        flushing = threading.Event()
+        release = threading.Event()
+        real_flush = sink._flush
+
+        def slow_flush(buffer):
+            flushing.set()
+            release.wait(5)
+            return real_flush(buffer)
+
+        sink._flush = slow_flush
+
+        sink.observe(features, np.zeros(2), 0.5, "v1")
+        assert flushing.wait(5)
+        # Worker preso no "disco lento": a fila passa do high-water sem descartar
+        start = time.perf_counter()
+        for _ in range(3):
+            sink.observe(features, np.zeros(2), 0.5, "v1")
+        elapsed = time.perf_counter() - start
+        status = sink.status()
+        release.set()
+        sink.stop()
+
+        assert elapsed < 0.05
+        assert status["backlogged"]
+        assert status["overflows"] >= 2
+        assert sink.status()["dropped"] == 0
+        assert sink.status()["written"] == 8
+        assert not sink.backlogged
+
+    def test_observe_after_stop_is_ignored(self, tmp_path, features):
+        """Test that a stopped sink does not restart its writer"""
+        sink = PredictionAuditSink(tmp_path)
+        sink.start()
+        sink.stop()
+
+        sink.observe(features, np.zeros(2), 0.5, "v1")
+
+        assert not sink.status()["running"]
+        assert sink.status()["ignored"] == 2
+        assert sink.status()["enqueued"] == 0
+
+    def test_failed_flush_is_retried(self, tmp_path, features):
+        """Test that a batch whose write failed is kept and written later"""
+        sink = PredictionAuditSink(tmp_path, flush_rows=2, flush_interval=0.01)
+        real_flush = sink._flush
+        attempts = []
+
+        def flaky_flush(buffer):
+            attempts.append(len(buffer))
+            if len(attempts) == 1:
+                return False  # Disco indisponível na primeira tentativa
+            return real_flush(buffer)
+
+        sink._flush = flaky_flush
+
+        sink.observe(features, np.array([0.2, 0.8]), 0.5, "v1")
+        deadline = time.monotonic() + 5
+        while sink.status()["written"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sink.stop()
+
+        assert len(attempts) >= 2
+        assert sink.status()["written"] == 2
+        assert sink.status()["retries"] >= 1
+        assert sink.status()["dropped"] == 0
+
+    def test_prediction_service_writes_audit(self, tmp_path, model_artifact_factory):
+        """Test end to end: every prediction of a batch reaches the audit file"""
+        model_artifact_factory("v1", seed=0)
+        registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+        registry.activate("v1")
+        sink = PredictionAuditSink(tmp_path / "audit")
+        service = DiabetesPredictionService(registry=registry, observers=[sink])
+
+        results = service.predict_batch(registry.smoke_batch)
+        sink.stop()
+
+        records = read_audit_file(
+            sink.current_file or next((tmp_path / "audit").iterdir())
+        )
+        assert len(records) == len(results)
+        assert [r["probability"] for r in records] == pytest.approx(
+            [r["probability"] for r in results]
+        )
+        assert {r["model_version"] for r in records} == {"v1"}
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from api.infra.services.predict_services.model_registry import (
+    LoadedModel,
+    ModelRegistry,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.shadow_scorer import ShadowScorer
+
+
+@pytest.fixture
+def registry(model_artifact_factory):
+    """Registry with v1 active and v2 available as a candidate"""
+    model_artifact_factory("v1", seed=0)
+    model_artifact_factory("v2", seed=3)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate("v1")
+    return registry
+
+
+@pytest.fixture
+def features(registry):
+    """Encoded feature matrix for the smoke batch"""
+    return registry.active.encode(pd.DataFrame(registry.smoke_batch))
+
+
+class TestShadowScorer:
+    """Test suite for ShadowScorer"""
+
+    def test_observe_without_candidates_is_noop(self, features):
+        """Test that observe does nothing when no candidate is configured"""
+        scorer = ShadowScorer()
+
+        scorer.observe(features, np.zeros(len(features)), 0.5, "v1")
+
+        assert scorer.status()["enqueued"] == 0
+        assert scorer.status()["queue_size"] == 0
+
+    def test_identical_candidate_agrees(self, registry, features):
+        """Test agreement and deltas against the same model"""
+        scorer = ShadowScorer(candidates=[registry.active])
+        primary = registry.active.predict_proba(registry.active.scale(features))
+
+        scorer.observe(features, primary, registry.active.threshold, "v1")
+        scored = scorer.drain()
+
+        summary = scorer.status()["candidates"]["v1"]
+        assert scored == len(features)
+        assert summary["scored"] == len(features)
+        assert summary["agreement_rate"] == 1.0
+        assert summary["max_abs_delta"] == pytest.approx(0.0)
+
+    def test_drops_when_queue_is_full(self, registry, features):
+        """Test load shedding when the queue is full"""
+        scorer = ShadowScorer(candidates=[registry.active], max_queue_size=1)
+        probabilities = np.zeros(len(features))
+
+        scorer.observe(features, probabilities, 0.5, "v1")
+        scorer.observe(features, probabilities, 0.5, "v1")
+
+        status = scorer.status()
+        assert status["enqueued"] == len(features)
+        assert status["dropped"] == len(features)
+
+    def test_worker_scores_in_background(self, registry, features):
+        """Test that the worker drains the queue and stop flushes"""
+        candidate = registry.load(registry.resolve("v2"), check_parity=False)
+        scorer = ShadowScorer(candidates=[candidate])
+        scorer.start()
+
+        for _ in range(5):
+            scorer.observe(features, np.full(len(features), 0.4), 0.5, "v1")
+        scorer.stop()
+
+        summary = scorer.status()["candidates"]["v2"]
+        assert summary["scored"] == 5 * len(features)
+        assert scorer.status()["queue_size"] == 0
+
+    def test_candidate_uses_its_own_encoders(self, registry):
+        """Test that a candidate with other label encoders scores correctly"""
+        candidate = registry.load(registry.resolve("v2"), check_parity=False)
+        encoder = candidate.preprocessors["label_encoders"]["income_level"]
+        encoder.classes_ = encoder.classes_[::-1]
+        candidate._category_remap = candidate._batch_category_remap()
+        candidate._category_unmap = candidate._model_category_unmap()
+        scorer = ShadowScorer(candidates=[candidate], registry=registry)
+        service = DiabetesPredictionService(registry=registry, observers=[scorer])
+
+        service.predict_batch(registry.smoke_batch)
+        scorer.drain()
+
+        expected = candidate.score(registry.smoke_batch)
+        primary = registry.active.score(registry.smoke_batch)
+        summary = scorer.status()["candidates"]["v2"]
+        assert summary["scored"] == len(registry.smoke_batch)
+        assert summary["mean_delta"] == pytest.approx(np.mean(expected - primary))
+
+    def test_drops_batches_of_a_swapped_model(self, registry, features):
+        """Test that features of a model no longer active are not scored"""
+        scorer = ShadowScorer(candidates=[registry.active], registry=registry)
+
+        scorer.observe(features, np.zeros(len(features)), 0.5, "v0")
+
+        assert scorer.status()["dropped"] == len(features)
+        assert scorer.status()["queue_size"] == 0
+
+    def test_prediction_service_feeds_shadow(self, registry):
+        """Test that predictions are enqueued for shadow scoring"""
+        scorer = ShadowScorer(candidates=[registry.active])
+        service = DiabetesPredictionService(registry=registry, observers=[scorer])
+
+        service.predict(registry.smoke_batch[0])
+        scorer.drain()
+
+        assert scorer.status()["candidates"]["v1"]["scored"] == 1
@@ -0,0 +1 @@
+# Report cache tests
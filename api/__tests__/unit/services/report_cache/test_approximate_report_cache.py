@@ -0,0 +1,203 @@
+import numpy as np
+import pytest
+
+from api.infra.services.report_cache.approximate_report_cache import (
+    ApproximateReportCache,
+    adapt_report,
+)
+
+
+@pytest.fixture
+def patient_data():
+    """Patient whose values are quoted in the cached report"""
+    return {"age": 45.0, "bmi": 28.5, "hba1c": 5.8, "family_history_diabetes": 1}
+
+
+@pytest.fixture
+def prediction_result():
+    """Positive prediction of the cached report"""
+    return {
+        "has_diabetes": True,
+        "probability": 0.72,
+        "threshold_used": 0.59,
+        "confidence": "medium",
+        "model_version": "v1",
+    }
+
+
+@pytest.fixture
+def features():
+    """Scaled feature vector of the cached patient"""
+    return np.linspace(0.1, 0.9, 18)
+
+
+@pytest.fixture
+def cache(features, patient_data, prediction_result):
+    """Cache holding one report"""
+    cache = ApproximateReportCache(max_distance=0.05, levels=100)
+    cache.store(
+        features,
+        patient_data,
+        prediction_result,
+        "Patient aged 45 with BMI 28.5 and HbA1c 5.8%. Probability 72.00%.",
+    )
+    return cache
+
+
+class TestApproximateReportCache:
+    """Test suite for ApproximateReportCache"""
+
+    def test_exact_hit(self, cache, features, patient_data, prediction_result):
+        """Test that the same quantized vector hits without a neighbor search"""
+        report = cache.lookup(features.copy(), patient_data, prediction_result)
+
+        assert report.startswith("Patient aged 45")
+        assert cache.exact_hits == 1
+        assert cache.hits == 1
+
+    def test_neighbor_hit_adapts_values(
+        self, cache, features, patient_data, prediction_result
+    ):
+        """Test that a close neighbor reuses the report with the new values"""
+        shifted = features.copy()
+        shifted[3] += 0.03
+        neighbor = {**patient_data, "bmi": 29.1, "age": 46.0}
+        neighbor_prediction = {**prediction_result, "probability": 0.74}
+
+        report = cache.lookup(shifted, neighbor, neighbor_prediction)
+
+        assert report == (
+            "Patient aged 46 with BMI 29.1 and HbA1c 5.8%. Probability 74.00%."
+        )
+        assert cache.exact_hits == 0
+        assert cache.hits == 1
+
+    def test_far_neighbor_misses(
+        self, cache, features, patient_data, prediction_result
+    ):
+        """Test that a neighbor beyond max_distance is not reused"""
+        shifted = features.copy()
+        shifted[:4] += 0.04
+
+        assert cache.lookup(shifted, patient_data, prediction_result) is None
+        assert cache.misses == 1
+
+    def test_other_bucket_misses(
+        self, cache, features, patient_data, prediction_result
+    ):
+        """Test that a different class or confidence never reuses the report"""
+        high = {**prediction_result, "confidence": "high"}
+        negative = {**prediction_result, "has_diabetes": False}
+
+        assert cache.lookup(features, patient_data, high) is None
+        assert cache.lookup(features, patient_data, negative) is None
+
+    def test_new_model_version_drops_old_reports(
+        self, cache, features, patient_data, prediction_result
+    ):
+        """Test that storing under a new model version evicts the previous one"""
+        v2 = {**prediction_result, "model_version": "v2"}
+        cache.store(features + 0.2, patient_data, v2, "v2 report")
+
+        assert len(cache) == 1
+        assert cache.lookup(features, patient_data, prediction_result) is None
+        assert cache.lookup(features + 0.2, patient_data, v2) == "v2 report"
+
+    def test_ring_buffer_replaces_oldest(self, patient_data, prediction_result):
+        """Test that a full bucket overwrites its oldest entries"""
+        cache = ApproximateReportCache(max_distance=0.0, levels=100, max_entries=4)
+        vectors = [np.full(18, i / 10) for i in range(6)]
+        for i, vector in enumerate(vectors):
+            cache.store(vector, patient_data, prediction_result, f"report {i}")
+
+        assert len(cache) == 4
+        assert cache.lookup(vectors[0], patient_data, prediction_result) is None
+        assert cache.lookup(vectors[1], patient_data, prediction_result) is None
+        assert cache.lookup(vectors[5], patient_data, prediction_result) == "report 5"
+
+    def test_nearest_matches_brute_force(self, patient_data, prediction_result):
+        """Test the norm-expansion search against a plain distance computation"""
+        rng = np.random.default_rng(0)
+        vectors = rng.random((3000, 18))
+        cache = ApproximateReportCache(max_distance=10.0, levels=100)
+        for i, vector in enumerate(vectors):
+            cache.store(vector, patient_data, prediction_result, str(i))
+
+        quantized = np.stack([cache.quantize(v) for v in vectors]).astype(float)
+        for query in rng.random((20, 18)):
+            expected = np.argmin(
+                ((quantized - cache.quantize(query).astype(float)) ** 2).sum(axis=1)
+            )
+            distances = ((quantized - quantized[expected]) ** 2).sum(axis=1)
+            report = cache.lookup(query, patient_data, prediction_result)
+            assert distances[int(report)] == 0
+
+    def test_status(self, cache, features, patient_data, prediction_result):
+        """Test the metrics exposed in /metrics"""
+        cache.lookup(features, patient_data, prediction_result)
+        cache.lookup(features + 0.5, patient_data, prediction_result)
+
+        status = cache.status()
+
+        assert status["entries"] == 1
+        assert status["buckets"] == {"positive-medium": 1}
+        assert status["hit_rate"] == 0.5
+        assert status["index_bytes"] > 0
+        assert status["lookup_time"]["count"] == 2
+
+
+class TestAdaptReport:
+    """Test suite for adapt_report"""
+
+    def test_ambiguous_changed_values_refuse_the_report(
+        self, patient_data, prediction_result
+    ):
+        """Test that a changed value left in the text refuses the report"""
+        report = "BMI 28.5 (target below 28.5). Family history: 1 relative."
+
+        for changes in ({"bmi": 27.0}, {"family_history_diabetes": 0}):
+            adapted, replaced = adapt_report(
+                report,
+                patient_data,
+                prediction_result,
+                {**patient_data, **changes},
+                prediction_result,
+            )
+
+            assert adapted is None
+            assert replaced == 0
+
+    def test_ambiguous_unchanged_values_are_kept(self, patient_data, prediction_result):
+        """Test that repeated numbers are fine when their value did not change"""
+        report = "BMI 28.5 (target below 28.5). Aged 45."
+
+        adapted, replaced = adapt_report(
+            report,
+            patient_data,
+            prediction_result,
+            {**patient_data, "age": 46.0},
+            prediction_result,
+        )
+
+        assert adapted == "BMI 28.5 (target below 28.5). Aged 46."
+        assert replaced == 1
+
+    def test_refused_report_is_a_miss(
+        self, cache, features, patient_data, prediction_result
+    ):
+        """Test that a neighbor whose text cannot be adapted counts as a miss"""
+        cache.store(
+            features + 0.3,
+            patient_data,
+            prediction_result,
+            "BMI 28.5, well above 25 (target below 28.5).",
+        )
+
+        report = cache.lookup(
+            features + 0.3, {**patient_data, "bmi": 28.6}, prediction_result
+        )
+
+        assert report is None
+        assert cache.misses == 1
+        assert cache.hits == cache.exact_hits == 0
+        assert cache.status()["refused"] == 1
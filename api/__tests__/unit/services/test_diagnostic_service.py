@@ -1,10 +1,23 @@
+import asyncio
+import json
+import time
+import numpy as np
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from api.infra.services.diagnostic_service import DiabetesDiagnosticService
 from api.infra.services.predict_services.diabetes_prediction_service import (
     DiabetesPredictionService,
 )
-from api.application.services.llm_service import LLMService
+from api.application.services.llm_service import LLMOverloadedError, LLMService
+from api.infra.services.report_cache.approximate_report_cache import (
+    ApproximateReportCache,
+)
+from api.infra.services.model_routing.tiered_model_router import (
+    RoutingTier,
+    TieredModelRouter,
+)
+from api.infra.services.report_profiles import ReportProfiles
+from api.infra.utils.prompt_builder import REPORT_END_MARKER, REPORT_SECTIONS
 
 
 @pytest.fixture
@@ -100,7 +113,10 @@ class TestDiabetesDiagnosticService:
         # Verify prompts were created
         mock_create_system_prompt.assert_called_once()
         mock_create_user_prompt.assert_called_once_with(
-            sample_patient_data, mock_prediction_service.predict.return_value
+            sample_patient_data,
+            mock_prediction_service.predict.return_value,
+            top_factors_only=False,
+            profile=None,
         )
 
         # Verify LLM service was called
@@ -113,6 +129,18 @@ class TestDiabetesDiagnosticService:
 
         assert result == "Diagnostic report text"
 
+    def test_precomputed_prediction_is_not_scored_again(
+        self, diagnostic_service, mock_prediction_service, sample_patient_data
+    ):
+        """Test that a prediction passed by the caller skips the model"""
+        prediction = {**mock_prediction_service.predict.return_value}
+
+        diagnostic_service.generate_diagnostic_report(
+            sample_patient_data, prediction=prediction
+        )
+
+        mock_prediction_service.predict.assert_not_called()
+
     @pytest.mark.asyncio
     @patch("api.infra.services.diagnostic_service.create_system_prompt")
     @patch("api.infra.services.diagnostic_service.create_user_prompt")
@@ -149,10 +177,16 @@ class TestDiabetesDiagnosticService:
         # Verify prompts were created
         mock_create_system_prompt.assert_called_once()
         mock_create_user_prompt.assert_called_once_with(
-            sample_patient_data, mock_prediction_service.predict.return_value
+            sample_patient_data,
+            mock_prediction_service.predict.return_value,
+            top_factors_only=False,
+            profile=None,
         )
 
-        assert chunks == ["Chunk 1", "Chunk 2", "Chunk 3"]
+        preamble = json.loads(chunks[0])
+        assert preamble["event"] == "prediction"
+        assert preamble["probability"] == 0.35
+        assert chunks[1:] == ["Chunk 1", "Chunk 2", "Chunk 3"]
 
     def test_generate_diagnostic_report_with_diabetes_positive(
         self, mock_prediction_service, mock_llm_service, sample_patient_data
@@ -215,4 +249,521 @@ class TestDiabetesDiagnosticService:
             ):
                 chunks.append(chunk)
 
-            assert chunks == []
+            # Só o preâmbulo com a predição
+            assert len(chunks) == 1
+            assert json.loads(chunks[0])["event"] == "prediction"
+
+    @pytest.mark.asyncio
+    async def test_stream_preamble_precedes_first_token(
+        self, mock_prediction_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that the preamble is emitted without waiting for the LLM"""
+
+        async def slow_generator(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            await asyncio.sleep(0.3)
+            yield "Token"
+
+        mock_llm_service.generate_response = slow_generator
+        service = DiabetesDiagnosticService(
+            prediction_service=mock_prediction_service, llm_service=mock_llm_service
+        )
+
+        stream = service.generate_diagnostic_report_stream(sample_patient_data)
+        start = time.perf_counter()
+        preamble = await stream.__anext__()
+        preamble_time = time.perf_counter() - start
+        rest = [chunk async for chunk in stream]
+
+        assert json.loads(preamble)["confidence"] == "high"
+        assert preamble_time < 0.1
+        assert rest == ["Token"]
+
+    @pytest.mark.asyncio
+    async def test_stream_queue_full_fails_before_preamble(
+        self, mock_prediction_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that an immediate admission rejection surfaces before any chunk"""
+
+        async def rejected(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            raise LLMOverloadedError("queue full", retry_after=3)
+            yield  # Make it a generator
+
+        mock_llm_service.generate_response = rejected
+        service = DiabetesDiagnosticService(
+            prediction_service=mock_prediction_service, llm_service=mock_llm_service
+        )
+
+        with pytest.raises(LLMOverloadedError):
+            await service.generate_diagnostic_report_stream(
+                sample_patient_data
+            ).__anext__()
+
+
+@pytest.fixture
+def sectioned_service(mock_prediction_service, mock_llm_service):
+    """DiabetesDiagnosticService generating the report section by section"""
+    return DiabetesDiagnosticService(
+        prediction_service=mock_prediction_service,
+        llm_service=mock_llm_service,
+        sectioned=True,
+    )
+
+
+def _section_key(prompt):
+    """Finds which report section a prompt asks for"""
+    return next(s.key for s in REPORT_SECTIONS if f'"{s.title}"' in prompt)
+
+
+class TestSectionedReport:
+    """Test suite for the parallel sectioned report mode"""
+
+    def test_invoke_runs_sections_concurrently(
+        self, sectioned_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that sections are generated in parallel and joined in order"""
+
+        def slow_invoke(prompt, system_prompt, temperature, top_p):
+            time.sleep(0.2)
+            return f"text of {_section_key(prompt)}"
+
+        mock_llm_service.invoke.side_effect = slow_invoke
+
+        start = time.perf_counter()
+        report = sectioned_service.generate_diagnostic_report(sample_patient_data)
+        elapsed = time.perf_counter() - start
+
+        assert mock_llm_service.invoke.call_count == len(REPORT_SECTIONS)
+        assert elapsed < 0.2 * len(REPORT_SECTIONS) * 0.75
+        expected = "\n\n".join(
+            f"## {s.title}\n\ntext of {s.key}" for s in REPORT_SECTIONS
+        )
+        assert report == expected
+
+    @pytest.mark.asyncio
+    async def test_stream_keeps_section_order(
+        self, sectioned_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that sections stream in fixed order even if later ones finish first"""
+        delays = {
+            s.key: 0.05 * (len(REPORT_SECTIONS) - i)
+            for i, s in enumerate(REPORT_SECTIONS)
+        }
+
+        async def generator(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            key = _section_key(user_input)
+            await asyncio.sleep(delays[key])
+            yield f"{key}-1"
+            yield f" {key}-2"
+
+        mock_llm_service.generate_response = generator
+
+        start = time.perf_counter()
+        chunks = [
+            chunk
+            async for chunk in sectioned_service.generate_diagnostic_report_stream(
+                sample_patient_data
+            )
+        ]
+        elapsed = time.perf_counter() - start
+
+        assert json.loads(chunks[0])["event"] == "prediction"
+        expected = []
+        for i, section in enumerate(REPORT_SECTIONS):
+            expected.append(("\n\n" if i else "") + f"## {section.title}\n\n")
+            expected += [f"{section.key}-1", f" {section.key}-2"]
+        assert chunks[1:] == expected
+        # Em paralelo: latência da seção mais lenta, não a soma
+        assert elapsed < sum(delays.values()) * 0.75
+
+    @pytest.mark.asyncio
+    async def test_stream_section_rejected_fails_before_preamble(
+        self, sectioned_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that an immediate rejection of any section surfaces before any chunk"""
+        closed = []
+
+        async def generator(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            key = _section_key(user_input)
+            if key == REPORT_SECTIONS[-1].key:
+                raise LLMOverloadedError("queue full", retry_after=3)
+            try:
+                await asyncio.sleep(10)
+                yield key
+            finally:
+                closed.append(key)
+
+        mock_llm_service.generate_response = generator
+
+        with pytest.raises(LLMOverloadedError):
+            await sectioned_service.generate_diagnostic_report_stream(
+                sample_patient_data
+            ).__anext__()
+
+        # As outras seções são canceladas
+        assert len(closed) == len(REPORT_SECTIONS) - 1
+
+    @pytest.mark.asyncio
+    async def test_stream_section_error_midway(
+        self, sectioned_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a section failing after the preamble stops the stream"""
+
+        async def generator(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            await asyncio.sleep(0.01)
+            if _section_key(user_input) == "recommendations":
+                raise RuntimeError("LLM down")
+            yield "text"
+
+        mock_llm_service.generate_response = generator
+
+        chunks = []
+        with pytest.raises(RuntimeError, match="LLM down"):
+            async for chunk in sectioned_service.generate_diagnostic_report_stream(
+                sample_patient_data
+            ):
+                chunks.append(chunk)
+
+        assert json.loads(chunks[0])["event"] == "prediction"
+        assert not any("Recommendations" in chunk for chunk in chunks)
+
+
+@pytest.fixture
+def cached_service(mock_prediction_service, mock_llm_service):
+    """DiabetesDiagnosticService with an approximate report cache"""
+    mock_prediction_service.predict_with_features = Mock(
+        side_effect=lambda data: (
+            mock_prediction_service.predict.return_value,
+            np.full(18, 0.5),
+        )
+    )
+    return DiabetesDiagnosticService(
+        prediction_service=mock_prediction_service,
+        llm_service=mock_llm_service,
+        report_cache=ApproximateReportCache(),
+    )
+
+
+class TestReportCache:
+    """Test suite for the report cache in DiabetesDiagnosticService"""
+
+    def test_invoke_reuses_cached_report(
+        self, cached_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a second equivalent patient does not call the LLM"""
+        first = cached_service.generate_diagnostic_report(sample_patient_data)
+        second = cached_service.generate_diagnostic_report(sample_patient_data)
+
+        assert first == second == "This is a diagnostic report."
+        mock_llm_service.invoke.assert_called_once()
+
+    def test_precomputed_prediction_only_preprocesses(
+        self,
+        cached_service,
+        mock_prediction_service,
+        mock_llm_service,
+        sample_patient_data,
+    ):
+        """Test that the cache takes features without scoring the patient again"""
+        mock_prediction_service.features = Mock(return_value=np.full(18, 0.5))
+        prediction = {**mock_prediction_service.predict.return_value}
+
+        cached_service.generate_diagnostic_report(
+            sample_patient_data, prediction=prediction
+        )
+        cached_service.generate_diagnostic_report(
+            sample_patient_data, prediction=prediction
+        )
+
+        mock_prediction_service.predict_with_features.assert_not_called()
+        mock_prediction_service.features.assert_called_with(sample_patient_data, None)
+        mock_llm_service.invoke.assert_called_once()
+
+    def test_precomputed_prediction_of_swapped_model_skips_cache(
+        self,
+        cached_service,
+        mock_prediction_service,
+        mock_llm_service,
+        sample_patient_data,
+    ):
+        """Test that features from another model version do not touch the cache"""
+        mock_prediction_service.features = Mock(return_value=None)
+        prediction = {
+            **mock_prediction_service.predict.return_value,
+            "model_version": "v1",
+        }
+
+        cached_service.generate_diagnostic_report(
+            sample_patient_data, prediction=prediction
+        )
+
+        assert len(cached_service.report_cache) == 0
+        mock_llm_service.invoke.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stream_stores_and_reuses_report(
+        self, cached_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a completed stream is cached and replayed after the preamble"""
+        calls = []
+
+        async def generator(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            calls.append(user_input)
+            yield "Cached"
+            yield " report"
+
+        mock_llm_service.generate_response = generator
+
+        first = [
+            c
+            async for c in cached_service.generate_diagnostic_report_stream(
+                sample_patient_data
+            )
+        ]
+        second = [
+            c
+            async for c in cached_service.generate_diagnostic_report_stream(
+                sample_patient_data
+            )
+        ]
+
+        assert len(calls) == 1
+        assert first[1:] == ["Cached", " report"]
+        assert json.loads(second[0])["event"] == "prediction"
+        assert second[1:] == ["Cached report"]
+
+    @pytest.mark.asyncio
+    async def test_interrupted_stream_is_not_cached(
+        self, cached_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a stream closed by the client does not populate the cache"""
+
+        async def generator(user_input, system_prompt, temperature=0.7, top_p=0.9):
+            yield "Partial"
+            yield " report"
+
+        mock_llm_service.generate_response = generator
+
+        stream = cached_service.generate_diagnostic_report_stream(sample_patient_data)
+        await stream.__anext__()
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert len(cached_service.report_cache) == 0
+
+
+@pytest.fixture
+def routed_service(mock_prediction_service, mock_llm_service):
+    """Diagnostic service with a two-tier model router"""
+    router = TieredModelRouter(
+        [
+            RoutingTier("fast", ("small",), 300, frozenset({"high"})),
+            RoutingTier("careful", ("large",), 900),
+        ]
+    )
+    return DiabetesDiagnosticService(
+        prediction_service=mock_prediction_service,
+        llm_service=mock_llm_service,
+        model_router=router,
+    )
+
+
+class TestModelRouting:
+    """Test suite for the risk-tiered model routing in DiabetesDiagnosticService"""
+
+    def test_invoke_uses_tier_model_and_budget(
+        self, routed_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a high-confidence prediction goes to the fast tier"""
+        routed_service.generate_diagnostic_report(sample_patient_data)
+
+        kwargs = mock_llm_service.invoke.call_args.kwargs
+        assert kwargs["model"] == "small"
+        assert kwargs["max_tokens"] == 300
+        assert kwargs["temperature"] == 0.7
+        tiers = {t["name"]: t for t in routed_service.model_router.status()["tiers"]}
+        assert tiers["fast"]["latency"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_records_tier_latency(
+        self,
+        routed_service,
+        mock_prediction_service,
+        mock_llm_service,
+        sample_patient_data,
+    ):
+        """Test that a borderline prediction streams from the careful tier"""
+        mock_prediction_service.predict.return_value = {
+            "has_diabetes": True,
+            "probability": 0.6,
+            "threshold_used": 0.59,
+            "confidence": "low",
+        }
+        params = {}
+
+        async def generator(user_input, system_prompt, **kwargs):
+            params.update(kwargs)
+            yield "Report"
+
+        mock_llm_service.generate_response = generator
+
+        async for _ in routed_service.generate_diagnostic_report_stream(
+            sample_patient_data
+        ):
+            pass
+
+        assert params["model"] == "large"
+        assert params["max_tokens"] == 900
+        tiers = {t["name"]: t for t in routed_service.model_router.status()["tiers"]}
+        assert tiers["careful"]["latency"]["count"] == 1
+        assert tiers["careful"]["time_to_first_token"]["count"] == 1
+
+    def test_sectioned_splits_token_budget(
+        self, mock_prediction_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that each section gets its share of the tier budget"""
+        service = DiabetesDiagnosticService(
+            prediction_service=mock_prediction_service,
+            llm_service=mock_llm_service,
+            sectioned=True,
+            model_router=TieredModelRouter([RoutingTier("all", ("m",), 301)]),
+        )
+
+        service.generate_diagnostic_report(sample_patient_data)
+
+        budgets = {
+            call.kwargs["max_tokens"] for call in mock_llm_service.invoke.call_args_list
+        }
+        assert budgets == {-(-301 // len(REPORT_SECTIONS))}
+
+
+@pytest.fixture
+def profiled_service(mock_prediction_service, mock_llm_service):
+    """Diagnostic service with report profiles (standard by default)"""
+    return DiabetesDiagnosticService(
+        prediction_service=mock_prediction_service,
+        llm_service=mock_llm_service,
+        report_profiles=ReportProfiles(default="standard"),
+    )
+
+
+class TestReportProfiles:
+    """Test suite for the report length profiles in DiabetesDiagnosticService"""
+
+    def test_invoke_uses_profile_budget_and_stop(
+        self, profiled_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that the profile sets max_tokens and stop, and cuts the text"""
+        mock_llm_service.invoke.return_value = (
+            f"## Interpretation\n\nLow risk.\n{REPORT_END_MARKER}\nMore text"
+        )
+
+        report = profiled_service.generate_diagnostic_report(
+            sample_patient_data, profile="summary"
+        )
+
+        kwargs = mock_llm_service.invoke.call_args.kwargs
+        assert kwargs["max_tokens"] == 250
+        assert kwargs["stop"] == [REPORT_END_MARKER, "## Follow-up"]
+        assert "## Recommendations" in kwargs["prompt"]
+        assert report == "## Interpretation\n\nLow risk."
+        status = profiled_service.report_profiles.status()["profiles"]["summary"]
+        assert status == {**status, "reports": 1, "early_stops": 1}
+
+    def test_profile_budget_caps_tier_budget(
+        self, mock_prediction_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that the smaller of tier and profile budgets wins"""
+        service = DiabetesDiagnosticService(
+            prediction_service=mock_prediction_service,
+            llm_service=mock_llm_service,
+            model_router=TieredModelRouter([RoutingTier("all", ("m",), 400)]),
+            report_profiles=ReportProfiles(),
+        )
+
+        service.generate_diagnostic_report(sample_patient_data, profile="summary")
+        assert mock_llm_service.invoke.call_args.kwargs["max_tokens"] == 250
+        service.generate_diagnostic_report(sample_patient_data, profile="full")
+        assert mock_llm_service.invoke.call_args.kwargs["max_tokens"] == 400
+
+    @pytest.mark.asyncio
+    async def test_stream_stops_after_profile_sections(
+        self, profiled_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that the LLM stream is closed once the sections are complete"""
+        pulled = []
+        closed = asyncio.Event()
+
+        async def generator(user_input, system_prompt, **kwargs):
+            try:
+                for chunk in [
+                    "## Interpretation\n\nLow.\n\n",
+                    "## Risk factors\n\nBMI.\n\n",
+                    "## Recommendations\n\nWalk.",
+                    "\n\n## Follow-up",
+                    "\n\nYearly.",
+                ]:
+                    pulled.append(chunk)
+                    yield chunk
+            finally:
+                closed.set()
+
+        mock_llm_service.generate_response = generator
+
+        chunks = [
+            chunk
+            async for chunk in profiled_service.generate_diagnostic_report_stream(
+                sample_patient_data
+            )
+        ]
+
+        report = "".join(chunks[1:])
+        assert report.rstrip().endswith("## Recommendations\n\nWalk.")
+        assert "Follow-up" not in report
+        assert len(pulled) == 4
+        assert closed.is_set()
+        status = profiled_service.report_profiles.status()["profiles"]["standard"]
+        assert status["early_stops"] == 1
+
+    def test_sectioned_generates_only_profile_sections(
+        self, mock_prediction_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a sectioned summary runs one generation per profile section"""
+        service = DiabetesDiagnosticService(
+            prediction_service=mock_prediction_service,
+            llm_service=mock_llm_service,
+            sectioned=True,
+            report_profiles=ReportProfiles(),
+        )
+
+        report = service.generate_diagnostic_report(
+            sample_patient_data, profile="summary"
+        )
+
+        assert mock_llm_service.invoke.call_count == 2
+        assert {
+            call.kwargs["max_tokens"] for call in mock_llm_service.invoke.call_args_list
+        } == {125}
+        assert "## Risk factors" not in report
+
+    def test_profiles_do_not_share_cached_reports(
+        self, mock_prediction_service, mock_llm_service, sample_patient_data
+    ):
+        """Test that a summary is not served to a request for the full report"""
+        mock_prediction_service.predict_with_features = Mock(
+            return_value=(
+                mock_prediction_service.predict.return_value,
+                np.full(18, 0.5),
+            )
+        )
+        service = DiabetesDiagnosticService(
+            prediction_service=mock_prediction_service,
+            llm_service=mock_llm_service,
+            report_cache=ApproximateReportCache(),
+            report_profiles=ReportProfiles(),
+        )
+
+        service.generate_diagnostic_report(sample_patient_data, profile="summary")
+        service.generate_diagnostic_report(sample_patient_data, profile="full")
+        service.generate_diagnostic_report(sample_patient_data, profile="summary")
+
+        assert mock_llm_service.invoke.call_count == 2
@@ -0,0 +1,92 @@
+import pytest
+from api.infra.monitoring.llm_usage import llm_endpoint
+from api.infra.services.report_profiles import (
+    ReportEarlyStop,
+    ReportProfiles,
+    parse_endpoint_profiles,
+    parse_profile_max_tokens,
+)
+from api.infra.utils.prompt_builder import REPORT_END_MARKER, REPORT_PROFILES
+
+SUMMARY_REPORT = (
+    "## Interpretation\n\nLow risk.\n\n"
+    "## Recommendations\n\nKeep active.\n\n"
+    "## Follow-up\n\nYearly check."
+)
+
+
+def feed_in_chunks(guard, text, size):
+    """Feeds `text` to the guard in chunks of `size` characters"""
+    out = "".join(guard.feed(text[i : i + size]) for i in range(0, len(text), size))
+    return out + guard.flush()
+
+
+class TestReportEarlyStop:
+    """Test suite for the early stop of the streamed report"""
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 1000])
+    def test_cuts_at_heading_after_profile_sections(self, size):
+        """Test that an extra section is cut, whatever the chunk boundaries"""
+        guard = ReportEarlyStop(REPORT_PROFILES["summary"])
+
+        out = feed_in_chunks(guard, SUMMARY_REPORT, size)
+
+        assert guard.stopped
+        assert out == SUMMARY_REPORT[: SUMMARY_REPORT.index("\n## Follow-up")]
+
+    @pytest.mark.parametrize("size", [1, 5, 1000])
+    def test_cuts_at_end_marker(self, size):
+        """Test that the end marker and anything after it are dropped"""
+        guard = ReportEarlyStop(REPORT_PROFILES["full"])
+        text = f"## Interpretation\n\nText <b>.\n{REPORT_END_MARKER}\nThanks!"
+
+        out = feed_in_chunks(guard, text, size)
+
+        assert guard.stopped
+        assert out == "## Interpretation\n\nText <b>.\n"
+
+    def test_report_without_cut_is_unchanged(self):
+        """Test that a report ending by itself comes out whole"""
+        guard = ReportEarlyStop(REPORT_PROFILES["standard"])
+        text = "## Interpretation\n\nText ending in <END"
+
+        assert feed_in_chunks(guard, text, 4) == text
+        assert not guard.stopped
+
+
+class TestReportProfiles:
+    """Test suite for the profile selection"""
+
+    def test_resolve_by_request_then_endpoint(self):
+        """Test that the requested profile wins over the endpoint default"""
+        profiles = ReportProfiles(default="standard", max_tokens={"full": 2000})
+
+        token = llm_endpoint.set("jobs")
+        try:
+            assert profiles.resolve().name == "full"
+            assert profiles.resolve().max_tokens == 2000
+            assert profiles.resolve("summary").name == "summary"
+        finally:
+            llm_endpoint.reset(token)
+        assert profiles.resolve().name == "standard"
+        with pytest.raises(ValueError):
+            profiles.resolve("huge")
+
+    def test_observe_counts_early_stops(self):
+        """Test the per-profile counters in status"""
+        profiles = ReportProfiles()
+        profiles.observe(REPORT_PROFILES["summary"], early_stop=True)
+        profiles.observe(REPORT_PROFILES["summary"])
+
+        summary = profiles.status()["profiles"]["summary"]
+        assert summary["reports"] == 2
+        assert summary["early_stops"] == 1
+
+    def test_parse_env_settings(self):
+        """Test the JSON env settings and their validation"""
+        assert parse_endpoint_profiles('{"jobs": "summary"}')["jobs"] == "summary"
+        assert parse_profile_max_tokens('{"summary": 100}') == {"summary": 100}
+        with pytest.raises(ValueError):
+            parse_endpoint_profiles('{"jobs": "huge"}')
+        with pytest.raises(ValueError):
+            parse_profile_max_tokens('{"summary": 0}')
@@ -0,0 +1,168 @@
+import pytest
+from api.infra.utils.prompt_builder import (
+    REPORT_END_MARKER,
+    REPORT_PROFILES,
+    REPORT_SECTIONS,
+    create_section_prompt,
+    create_user_prompt,
+    report_stop_sequences,
+)
+
+
+@pytest.fixture
+def sample_patient_data():
+    """Sample patient data for testing"""
+    return {
+        "age": 45.0,
+        "education_level": "Graduate",
+        "income_level": "Middle",
+        "physical_activity_minutes_per_week": 150.0,
+        "diet_score": 7.5,
+        "family_history_diabetes": 1,
+        "bmi": 28.5,
+        "waist_to_hip_ratio": 0.92,
+        "systolic_bp": 130.0,
+        "cholesterol_total": 220.0,
+        "hdl_cholesterol": 45.0,
+        "ldl_cholesterol": 140.0,
+        "triglycerides": 180.0,
+        "glucose_fasting": 95.0,
+        "glucose_postprandial": 140.0,
+        "insulin_level": 12.0,
+        "hba1c": 5.8,
+        "diabetes_risk_score": 6.5,
+    }
+
+
+@pytest.fixture
+def prediction_result():
+    """Prediction with model attribution"""
+    return {
+        "has_diabetes": True,
+        "probability": 0.72,
+        "threshold_used": 0.59,
+        "confidence": "medium",
+        "top_factors": [
+            {
+                "feature": "hba1c",
+                "value": 5.8,
+                "contribution": 1.4,
+                "direction": "increases",
+            },
+            {
+                "feature": "family_history_diabetes",
+                "value": 1,
+                "contribution": 0.3,
+                "direction": "increases",
+            },
+        ],
+    }
+
+
+class TestCreateUserPrompt:
+    """Test suite for create_user_prompt"""
+
+    def test_includes_patient_data_and_factors(
+        self, sample_patient_data, prediction_result
+    ):
+        """Test default prompt with full data plus key factors"""
+        prompt = create_user_prompt(sample_patient_data, prediction_result)
+
+        assert "PATIENT DATA:" in prompt
+        assert "KEY RISK FACTORS" in prompt
+        assert "- HbA1c: 5.8% (increases risk, +1.40 log-odds)" in prompt
+        assert "- Family history of diabetes: Yes (increases risk" in prompt
+
+    def test_top_factors_only_is_shorter(self, sample_patient_data, prediction_result):
+        """Test that top_factors_only drops the full patient block"""
+        full = create_user_prompt(sample_patient_data, prediction_result)
+        compact = create_user_prompt(
+            sample_patient_data, prediction_result, top_factors_only=True
+        )
+
+        assert "PATIENT DATA:" not in compact
+        assert "KEY RISK FACTORS" in compact
+        assert "ANALYSIS RESULT:" in compact
+        assert len(compact) < len(full)
+
+    def test_without_attribution(self, sample_patient_data, prediction_result):
+        """Test fallback to the full patient block without attribution"""
+        prediction_result.pop("top_factors")
+
+        prompt = create_user_prompt(
+            sample_patient_data, prediction_result, top_factors_only=True
+        )
+
+        assert "PATIENT DATA:" in prompt
+        assert "KEY RISK FACTORS" not in prompt
+
+
+class TestCreateSectionPrompt:
+    """Test suite for create_section_prompt"""
+
+    def test_focused_sections_skip_patient_data(
+        self, sample_patient_data, prediction_result
+    ):
+        """Test that prediction-only sections leave out the 18 features"""
+        interpretation = next(s for s in REPORT_SECTIONS if s.key == "interpretation")
+
+        prompt = create_section_prompt(
+            interpretation, sample_patient_data, prediction_result
+        )
+
+        assert "PATIENT DATA:" not in prompt
+        assert "KEY RISK FACTORS" in prompt
+        assert "ANALYSIS RESULT:" in prompt
+        assert 'Write only the "Interpretation" section' in prompt
+
+    def test_data_sections_include_patient_data(
+        self, sample_patient_data, prediction_result
+    ):
+        """Test that risk factor and recommendation sections get the clinical data"""
+        for key in ("risk_factors", "recommendations"):
+            section = next(s for s in REPORT_SECTIONS if s.key == key)
+
+            prompt = create_section_prompt(
+                section, sample_patient_data, prediction_result
+            )
+
+            assert "PATIENT DATA:" in prompt
+            assert f'"{section.title}"' in prompt
+
+    def test_sections_are_shorter_than_full_prompt(
+        self, sample_patient_data, prediction_result
+    ):
+        """Test that every section prompt is at most the size of the full prompt"""
+        full = create_user_prompt(sample_patient_data, prediction_result)
+
+        for section in REPORT_SECTIONS:
+            prompt = create_section_prompt(
+                section, sample_patient_data, prediction_result
+            )
+            assert len(prompt) <= len(full) + len(section.instruction)
+
+
+class TestReportProfilePrompt:
+    """Test suite for the report profiles in create_user_prompt"""
+
+    def test_profile_asks_only_its_sections(
+        self, sample_patient_data, prediction_result
+    ):
+        """Test that the summary prompt lists its sections and the end marker"""
+        prompt = create_user_prompt(
+            sample_patient_data, prediction_result, profile=REPORT_PROFILES["summary"]
+        )
+
+        assert "## Interpretation" in prompt
+        assert "## Recommendations" in prompt
+        assert "## Risk factors" not in prompt
+        assert "## Follow-up" not in prompt
+        assert prompt.endswith(f"write {REPORT_END_MARKER} and stop.")
+
+    def test_stop_sequences(self):
+        """Test that only the sections after the last requested one stop it"""
+        assert report_stop_sequences(REPORT_PROFILES["summary"]) == [
+            REPORT_END_MARKER,
+            "## Follow-up",
+        ]
+        assert report_stop_sequences(REPORT_PROFILES["full"]) == [REPORT_END_MARKER]
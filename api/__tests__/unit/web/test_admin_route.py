@@ -0,0 +1,75 @@
+import pytest
+from types import SimpleNamespace
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from api.infra.container.dependecies import container
+from api.infra.services.predict_services.model_registry import ModelRegistry
+from api.infra.web.app import app
+
+
+@pytest.fixture
+def registry(model_artifact_factory):
+    """Registry over a temporary models_dir with v1 active"""
+    model_artifact_factory("v1", seed=0)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate("v1")
+    return registry
+
+
+def client_for(registry, admin_token):
+    """TestClient with the given registry and ADMIN_TOKEN"""
+    container.envs.override(providers.Object(SimpleNamespace(ADMIN_TOKEN=admin_token)))
+    container.model_registry.override(providers.Object(registry))
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def reset_override():
+    """Removes the container overrides after each test"""
+    yield
+    container.envs.reset_override()
+    container.model_registry.reset_override()
+
+
+class TestAdminRoute:
+    """Test suite for the /admin authentication and version lookup"""
+
+    def test_disabled_without_admin_token(self, registry):
+        """Test that admin routes answer 403 when ADMIN_TOKEN is not set"""
+        client = client_for(registry, None)
+
+        response = client.get("/admin/models", headers={"X-Admin-Token": ""})
+
+        assert response.status_code == 403
+
+    def test_rejects_wrong_token(self, registry):
+        """Test the 401 answer for a missing or wrong token"""
+        client = client_for(registry, "secret")
+
+        assert client.get("/admin/models").status_code == 401
+        response = client.get("/admin/models", headers={"X-Admin-Token": "nope"})
+        assert response.status_code == 401
+
+    def test_lists_models_with_token(self, registry):
+        """Test the authenticated listing"""
+        client = client_for(registry, "secret")
+
+        response = client.get("/admin/models", headers={"X-Admin-Token": "secret"})
+
+        assert response.status_code == 200
+        assert response.json()["active"]["version"] == "v1"
+
+    def test_reload_rejects_path_traversal(self, registry, tmp_path):
+        """Test that reload only accepts a version name under models_dir"""
+        client = client_for(registry, "secret")
+        outside = tmp_path / "outside.joblib"
+        outside.write_bytes(b"not a model")
+
+        response = client.post(
+            "/admin/models/reload",
+            params={"version": str(outside)},
+            headers={"X-Admin-Token": "secret"},
+        )
+
+        assert response.status_code == 400
+        assert registry.active.version == "v1"
@@ -0,0 +1,213 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from api.application.dto.diabetes_prediction import PatientBatchValidationError
+from api.application.dto.patient_batch import BATCH_COLUMNS, PatientBatch
+from api.infra.services.predict_services.model_registry import (
+    ModelRegistry,
+    SMOKE_BATCH,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.web.app import app
+from api.infra.web.batch_formats import arrow_format, msgpack_format
+from api.infra.web.routes.prediction_route import get_prediction_service
+
+
+@pytest.fixture
+def client(model_artifact_factory):
+    """TestClient with the prediction service bound to a test model"""
+    model_artifact_factory("v1", seed=0)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate("v1")
+    service = DiabetesPredictionService(registry=registry)
+
+    app.dependency_overrides[get_prediction_service] = lambda: service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def pa():
+    """pyarrow, skipping the test when it is not installed"""
+    return pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def msgpack():
+    """msgpack, skipping the test when it is not installed"""
+    return pytest.importorskip("msgpack")
+
+
+def arrow_stream(pa, table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def features_table(pa, values: np.ndarray):
+    return pa.table(
+        {
+            "features": pa.FixedSizeListArray.from_arrays(
+                pa.array(values.ravel()), len(BATCH_COLUMNS)
+            )
+        }
+    )
+
+
+class TestArrowFormat:
+    """Test suite for reading and writing Arrow IPC batches"""
+
+    def test_features_column_is_a_view_of_the_body(self, pa):
+        """Test that the fixed_size_list layout is scored without a copy"""
+        values = PatientBatch.from_records(SMOKE_BATCH).values
+        body = arrow_stream(pa, features_table(pa, values))
+
+        batch = arrow_format.read_patient_batch(body)
+
+        assert np.shares_memory(batch.values, np.frombuffer(body, dtype=np.uint8))
+        np.testing.assert_array_equal(batch.values, values)
+
+    def test_named_columns_with_strings_and_dictionaries(self, pa):
+        """Test one column per feature, categories as text or dictionary"""
+        table = pa.Table.from_pylist(SMOKE_BATCH)
+        index = table.column_names.index("income_level")
+        table = table.set_column(
+            index, "income_level", table.column("income_level").dictionary_encode()
+        )
+
+        batch = arrow_format.read_patient_batch(arrow_stream(pa, table))
+
+        assert batch.to_records() == SMOKE_BATCH
+
+    def test_nulls_and_unknown_categories(self, pa):
+        """Test that nulls are missing fields and unknown categories enum errors"""
+        patients = [dict(record) for record in SMOKE_BATCH]
+        patients[1]["education_level"] = "Unknown"
+        patients[2]["age"] = None
+        body = arrow_stream(pa, pa.Table.from_pylist(patients))
+
+        with pytest.raises(PatientBatchValidationError) as error:
+            arrow_format.read_patient_batch(body)
+
+        assert error.value.errors[1][0]["type"] == "enum"
+        assert error.value.errors[2][0] == {
+            "field": "age",
+            "message": "Field required",
+            "type": "missing",
+        }
+
+    def test_missing_column_and_bad_stream(self, pa):
+        """Test document-level errors"""
+        table = pa.Table.from_pylist(SMOKE_BATCH).drop_columns(["bmi"])
+
+        with pytest.raises(PatientBatchValidationError) as error:
+            arrow_format.read_patient_batch(arrow_stream(pa, table))
+        assert error.value.errors[None][0]["field"] == "bmi"
+
+        with pytest.raises(PatientBatchValidationError) as error:
+            arrow_format.read_patient_batch(b"not arrow")
+        assert error.value.errors[None][0]["type"] == "arrow_invalid"
+
+
+class TestMsgpackFormat:
+    """Test suite for reading MessagePack batches"""
+
+    def test_rows_in_column_order(self, msgpack):
+        """Test the array-of-rows layout"""
+        rows = [[record[name] for name in BATCH_COLUMNS] for record in SMOKE_BATCH]
+
+        batch = msgpack_format.read_patient_batch(msgpack.packb(rows))
+
+        assert batch.to_records() == SMOKE_BATCH
+
+    def test_binary_matrix_in_any_column_order(self, msgpack):
+        """Test the {columns, data} layout, reordered to the model order"""
+        values = PatientBatch.from_records(SMOKE_BATCH).values
+        columns = list(reversed(BATCH_COLUMNS))
+        body = msgpack.packb({"columns": columns, "data": values[:, ::-1].tobytes()})
+
+        batch = msgpack_format.read_patient_batch(body)
+
+        np.testing.assert_array_equal(batch.values, values)
+
+    def test_invalid_documents(self, msgpack):
+        """Test that malformed documents have no row index"""
+        for body in (b"\xc1", msgpack.packb({"data": b"1234"}), msgpack.packb(3)):
+            with pytest.raises(PatientBatchValidationError) as error:
+                msgpack_format.read_patient_batch(body)
+            assert list(error.value.errors) == [None]
+
+
+class TestBinaryBatchRoutes:
+    """Test suite for POST /prediction/batch/arrow and /prediction/batch/msgpack"""
+
+    def test_arrow_round_trip(self, client, pa):
+        """Test that Arrow in gets Arrow out with the JSON route's results"""
+        expected = client.post("/prediction/batch", json=SMOKE_BATCH).json()
+        body = arrow_stream(pa, pa.Table.from_pylist(SMOKE_BATCH))
+
+        response = client.post(
+            "/prediction/batch/arrow",
+            content=body,
+            headers={"content-type": arrow_format.ARROW_MEDIA_TYPE},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == arrow_format.ARROW_MEDIA_TYPE
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.metadata[b"model_version"] == b"v1"
+        rows = table.to_pylist()
+        for row, prediction in zip(rows, expected["predictions"]):
+            assert row["probability"] == prediction["probability"]
+            assert row["confidence"] == prediction["confidence"]
+            assert row["top_factor_features"] == [
+                factor["feature"] for factor in prediction["top_factors"]
+            ]
+
+    def test_msgpack_round_trip(self, client, msgpack):
+        """Test that MessagePack gets the JSON route's document back"""
+        expected = client.post("/prediction/batch", json=SMOKE_BATCH).json()
+        rows = [[record[name] for name in BATCH_COLUMNS] for record in SMOKE_BATCH]
+
+        response = client.post(
+            "/prediction/batch/msgpack",
+            content=msgpack.packb(rows),
+            headers={"content-type": msgpack_format.MSGPACK_MEDIA_TYPE},
+        )
+
+        assert response.status_code == 200
+        assert msgpack.unpackb(response.content) == expected
+
+    def test_bad_rows_get_the_json_error_shape(self, client, pa):
+        """Test per-index 422 errors for binary bodies"""
+        patients = [dict(record) for record in SMOKE_BATCH]
+        patients[1]["age"] = -5
+        body = arrow_stream(pa, pa.Table.from_pylist(patients))
+
+        response = client.post("/prediction/batch/arrow", content=body)
+
+        assert response.status_code == 422
+        assert response.json()["errors"][0]["index"] == 1
+        assert response.json()["errors"][0]["errors"][0]["field"] == "age"
+
+    def test_batch_size_limit(self, client, msgpack, monkeypatch):
+        """Test the 413 for batches over PREDICTION_MAX_BATCH_SIZE"""
+        from api.infra.container.dependecies import container
+
+        monkeypatch.setattr(container.envs(), "PREDICTION_MAX_BATCH_SIZE", 2)
+        rows = [[record[name] for name in BATCH_COLUMNS] for record in SMOKE_BATCH]
+
+        response = client.post("/prediction/batch/msgpack", content=msgpack.packb(rows))
+
+        assert response.status_code == 413
+
+    def test_missing_dependency(self, client, monkeypatch):
+        """Test the 415 when the optional package is not installed"""
+        monkeypatch.setattr(arrow_format, "ARROW_AVAILABLE", False)
+
+        response = client.post("/prediction/batch/arrow", content=b"")
+
+        assert response.status_code == 415
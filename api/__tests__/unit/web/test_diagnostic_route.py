@@ -0,0 +1,145 @@
+import json
+import pytest
+from unittest.mock import Mock
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from api.application.services.diagnostic_service import DiagnosticService
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.config.env import ConfigEnvs
+from api.infra.container.dependecies import container
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.web.app import app
+from api.infra.web.routes.diagnostic_route import get_diagnostic_service
+
+
+@pytest.fixture
+def prediction_service():
+    """Mock prediction service bound into the container"""
+    service = Mock()
+    service.predict = Mock(
+        return_value={
+            "has_diabetes": False,
+            "probability": 0.35,
+            "threshold_used": 0.59,
+            "confidence": "high",
+        }
+    )
+    with container.prediction_service.override(providers.Object(service)):
+        yield service
+
+
+@pytest.fixture
+def overloaded_service():
+    """Diagnostic service whose LLM stage is saturated"""
+    service = Mock(spec=DiagnosticService)
+    service.generate_diagnostic_report = Mock(
+        side_effect=LLMOverloadedError("saturated", retry_after=7)
+    )
+
+    async def stream(patient_data, profile=None, prediction=None):
+        raise LLMOverloadedError("saturated", retry_after=7)
+        yield  # Make it a generator
+
+    service.generate_diagnostic_report_stream = stream
+    return service
+
+
+@pytest.fixture
+def client(overloaded_service, prediction_service):
+    """TestClient with the overloaded diagnostic service"""
+    app.dependency_overrides[get_diagnostic_service] = lambda: overloaded_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestDiagnosticRouteOverload:
+    """Test suite for admission control on /diagnostic routes"""
+
+    def test_invoke_returns_503_with_retry_after(self, client):
+        """Test fail-fast on /diagnostic/invoke"""
+        response = client.post("/diagnostic/invoke", json=SMOKE_BATCH[0])
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+
+    def test_stream_returns_503_with_retry_after(self, client):
+        """Test fail-fast on /diagnostic/stream before streaming starts"""
+        response = client.post("/diagnostic/stream", json=SMOKE_BATCH[0])
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+
+    def test_invoke_degrades_to_prediction_only(self, client, monkeypatch):
+        """Test degrade policy on /diagnostic/invoke"""
+        monkeypatch.setattr(ConfigEnvs, "LLM_OVERLOAD_POLICY", "degrade")
+
+        response = client.post("/diagnostic/invoke", json=SMOKE_BATCH[0])
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["degraded"] is True
+        assert body["diagnostic_report"] == ""
+        assert body["prediction"]["probability"] == 0.35
+
+    def test_invoke_scores_the_patient_once(
+        self, client, overloaded_service, prediction_service, monkeypatch
+    ):
+        """Test that the report reuses the route's prediction"""
+        monkeypatch.setattr(ConfigEnvs, "LLM_OVERLOAD_POLICY", "degrade")
+
+        client.post("/diagnostic/invoke", json=SMOKE_BATCH[0])
+
+        prediction_service.predict.assert_called_once()
+        kwargs = overloaded_service.generate_diagnostic_report.call_args.kwargs
+        assert kwargs["prediction"] is prediction_service.predict.return_value
+
+    def test_stream_degrades_to_prediction_only(
+        self, client, prediction_service, monkeypatch
+    ):
+        """Test degrade policy on /diagnostic/stream"""
+        monkeypatch.setattr(ConfigEnvs, "LLM_OVERLOAD_POLICY", "degrade")
+
+        response = client.post("/diagnostic/stream", json=SMOKE_BATCH[0])
+
+        assert response.status_code == 200
+        assert response.headers["X-Degraded"] == "true"
+        preamble = json.loads(response.text)
+        assert preamble["event"] == "prediction"
+        assert preamble["probability"] == 0.35
+        prediction_service.predict.assert_called_once()
+
+
+class TestDiagnosticStreamPreamble:
+    """Test suite for the prediction preamble on /diagnostic/stream"""
+
+    @pytest.fixture
+    def stream_client(self, prediction_service):
+        """TestClient whose LLM saturates right after the preamble"""
+        service = Mock(spec=DiagnosticService)
+
+        async def stream(patient_data, profile=None, prediction=None):
+            yield json.dumps({"event": "prediction", "probability": 0.35}) + "\n"
+            raise LLMOverloadedError("saturated", retry_after=4)
+
+        service.generate_diagnostic_report_stream = stream
+        app.dependency_overrides[get_diagnostic_service] = lambda: service
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+
+    def test_overload_after_preamble_is_reported_in_stream(self, stream_client):
+        """Test that the prediction is delivered and the overload is an event"""
+        timings = container.stream_timings()
+        before = timings.ttfb.count
+
+        response = stream_client.post("/diagnostic/stream", json=SMOKE_BATCH[0])
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.status_code == 200
+        assert lines[0]["event"] == "prediction"
+        assert lines[1] == {
+            "event": "error",
+            "status": 503,
+            "detail": "saturated",
+            "retry_after": 4,
+        }
+        assert timings.ttfb.count == before + 1
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.multiplex_stats import MultiplexStats
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.web.app import app
+from api.infra.web.multiplex import ReportMultiplexer
+from api.infra.web.routes.diagnostic_route import get_diagnostic_service
+
+
+class FakeDiagnosticService:
+    """Streams a preamble plus a few chunks and tracks concurrent reports"""
+
+    def __init__(self, chunks=3, delay=0.01):
+        self.chunks = chunks
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.pulled = 0
+        self.profiles = []
+
+    async def generate_diagnostic_report_stream(self, patient_data, profile=None):
+        self.profiles.append(profile)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            yield json.dumps({"event": "prediction", "age": patient_data["age"]})
+            for i in range(self.chunks):
+                await asyncio.sleep(self.delay)
+                self.pulled += 1
+                yield f"part {i}"
+        finally:
+            self.active -= 1
+
+
+def submit(report_id, patient=None):
+    """Submit message for the multiplexed endpoint"""
+    return {"type": "submit", "id": report_id, "patient": patient or SMOKE_BATCH[0]}
+
+
+def receive_until_done(ws, ids):
+    """Collects messages until every id finished (done or error)"""
+    messages, pending = [], set(ids)
+    while pending:
+        message = ws.receive_json()
+        messages.append(message)
+        if message["event"] in ("done", "error"):
+            pending.discard(message["id"])
+    return messages
+
+
+@pytest.fixture
+def fake_service():
+    """Fake diagnostic service bound to the route"""
+    service = FakeDiagnosticService()
+    app.dependency_overrides[get_diagnostic_service] = lambda: service
+    yield service
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(fake_service):
+    """TestClient for the WebSocket endpoint"""
+    return TestClient(app)
+
+
+class TestDiagnosticWebSocket:
+    """Test suite for /diagnostic/ws"""
+
+    def test_reports_are_interleaved_and_tagged(self, client):
+        """Test that several reports stream over one connection, each in order"""
+        with client.websocket_connect("/diagnostic/ws") as ws:
+            for report_id in ("a", "b", "c"):
+                ws.send_json(submit(report_id))
+            messages = receive_until_done(ws, ["a", "b", "c"])
+
+        for report_id in ("a", "b", "c"):
+            own = [m for m in messages if m["id"] == report_id]
+            assert [m["event"] for m in own] == [
+                "prediction",
+                "chunk",
+                "chunk",
+                "chunk",
+                "done",
+            ]
+            assert [m["text"] for m in own[1:4]] == ["part 0", "part 1", "part 2"]
+        # Intercalados: o primeiro relatório não termina antes dos outros começarem
+        first_done = next(i for i, m in enumerate(messages) if m["event"] == "done")
+        assert {m["id"] for m in messages[:first_done]} == {"a", "b", "c"}
+
+    def test_concurrency_cap_per_connection(self, client, fake_service, monkeypatch):
+        """Test that no more than WS_MAX_CONCURRENT_REPORTS run at once"""
+        monkeypatch.setattr(ConfigEnvs, "WS_MAX_CONCURRENT_REPORTS", 2)
+        ids = [f"p{i}" for i in range(6)]
+
+        with client.websocket_connect("/diagnostic/ws") as ws:
+            for report_id in ids:
+                ws.send_json(submit(report_id))
+            messages = receive_until_done(ws, ids)
+
+        assert fake_service.max_active == 2
+        assert sum(m["event"] == "done" for m in messages) == len(ids)
+
+    def test_invalid_messages_get_errors(self, client):
+        """Test validation, duplicate id and unknown type errors"""
+        invalid = {**SMOKE_BATCH[0], "age": "old"}
+
+        with client.websocket_connect("/diagnostic/ws") as ws:
+            ws.send_json(submit("bad", invalid))
+            assert ws.receive_json()["status"] == 422
+
+            ws.send_json({"type": "ping", "id": "x"})
+            assert ws.receive_json()["status"] == 400
+
+            for bad_id in (["a"], {"a": 1}, 1.5, True):
+                ws.send_json(submit(bad_id))
+                assert ws.receive_json() == {
+                    "id": None,
+                    "event": "error",
+                    "status": 400,
+                    "detail": "Field 'id' must be a string or an integer",
+                }
+            ws.send_json({"type": "cancel", "id": ["a"]})
+            assert ws.receive_json()["status"] == 400
+
+            ws.send_json(submit("dup"))
+            ws.send_json(submit("dup"))
+            messages = receive_until_done(ws, ["dup"])
+
+        assert any(m["event"] == "error" and m["status"] == 409 for m in messages)
+
+    def test_report_profile(self, client, fake_service):
+        """Test that the submit profile reaches the service and is validated"""
+        with client.websocket_connect("/diagnostic/ws") as ws:
+            ws.send_json({**submit("bad"), "profile": "huge"})
+            assert ws.receive_json()["status"] == 422
+
+            ws.send_json({**submit("a"), "profile": "summary"})
+            ws.send_json(submit("b"))
+            receive_until_done(ws, ["a", "b"])
+
+        assert sorted(fake_service.profiles, key=str) == [None, "summary"]
+
+    def test_overload_is_an_error_event(self, client, fake_service):
+        """Test that a saturated LLM is reported per report with retry_after"""
+
+        async def overloaded(patient_data, profile=None):
+            raise LLMOverloadedError("saturated", retry_after=5)
+            yield  # Make it a generator
+
+        fake_service.generate_diagnostic_report_stream = overloaded
+
+        with client.websocket_connect("/diagnostic/ws") as ws:
+            ws.send_json(submit("a"))
+            message = ws.receive_json()
+
+        assert message == {
+            "id": "a",
+            "event": "error",
+            "status": 503,
+            "detail": "saturated",
+            "retry_after": 5,
+        }
+
+
+class SlowClientWebSocket:
+    """WebSocket double whose client never reads until released"""
+
+    def __init__(self, messages):
+        self.incoming = asyncio.Queue()
+        for message in messages:
+            self.incoming.put_nowait(message)
+        self.read = asyncio.Event()
+        self.sent = []
+
+    async def receive_json(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return message
+
+    async def send_text(self, text):
+        await self.read.wait()
+        self.sent.append(json.loads(text))
+
+
+class TestReportMultiplexerFlowControl:
+    """Test suite for backpressure on the send queue"""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_pauses_reports(self):
+        """Test that a client that does not read bounds the buffered output"""
+        service = FakeDiagnosticService(chunks=200, delay=0)
+        websocket = SlowClientWebSocket([submit("a")])
+        stats = MultiplexStats()
+        multiplexer = ReportMultiplexer(
+            websocket, service, stats=stats, send_queue_size=8
+        )
+
+        run = asyncio.create_task(multiplexer.run())
+        await asyncio.sleep(0.1)
+
+        # Fila cheia: o relatório parou de consumir a LLM
+        assert multiplexer._outbox.qsize() == 8
+        assert service.pulled <= 8 + 2
+        assert stats.send_blocked >= 1
+
+        websocket.read.set()
+        while not any(m["event"] == "done" for m in websocket.sent):
+            await asyncio.sleep(0.01)
+        websocket.incoming.put_nowait(None)
+        await run
+
+        assert service.pulled == 200
+        assert stats.completed == 1
+        assert stats.open_connections == 0
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_reports(self):
+        """Test that reports still running are cancelled when the client leaves"""
+        service = FakeDiagnosticService(chunks=1000, delay=0.01)
+        websocket = SlowClientWebSocket([submit("a"), submit("b")])
+        websocket.read.set()
+        multiplexer = ReportMultiplexer(websocket, service, stats=MultiplexStats())
+
+        run = asyncio.create_task(multiplexer.run())
+        await asyncio.sleep(0.05)
+        websocket.incoming.put_nowait(None)
+        await asyncio.wait_for(run, timeout=1)
+
+        assert service.active == 0
+        assert service.pulled < 1000
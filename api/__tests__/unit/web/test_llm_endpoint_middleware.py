@@ -0,0 +1,27 @@
+from api.infra.web.middlewares.llm_endpoint_middleware import client_id
+
+
+def scope(*headers):
+    return {"type": "http", "headers": [(k, v) for k, v in headers]}
+
+
+class TestClientId:
+    """Test suite for identifying the API client of a request"""
+
+    def test_client_header_wins(self):
+        """Test that the configured header names the client"""
+        request = scope((b"x-api-key", b"secret"), (b"x-client-id", b"clinic"))
+
+        assert client_id(request, b"x-client-id") == "clinic"
+
+    def test_api_key_is_hashed(self):
+        """Test that the API key never appears in the label"""
+        label = client_id(scope((b"x-api-key", b"secret")), b"x-client-id")
+
+        assert label.startswith("key-")
+        assert "secret" not in label
+        assert label == client_id(scope((b"x-api-key", b"secret")), b"x-client-id")
+
+    def test_anonymous(self):
+        """Test requests without identification"""
+        assert client_id(scope(), b"x-client-id") == "anonymous"
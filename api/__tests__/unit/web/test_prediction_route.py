@@ -0,0 +1,81 @@
+import copy
+import pytest
+from types import SimpleNamespace
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from api.infra.container.dependecies import container
+from api.infra.services.predict_services.model_registry import (
+    ModelRegistry,
+    SMOKE_BATCH,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.web.app import app
+from api.infra.web.routes.prediction_route import get_prediction_service
+
+
+@pytest.fixture
+def client(model_artifact_factory):
+    """TestClient with the prediction service bound to a test model"""
+    model_artifact_factory("v1", seed=0)
+    registry = ModelRegistry(models_dir=model_artifact_factory.models_dir)
+    registry.activate("v1")
+    service = DiabetesPredictionService(registry=registry)
+
+    app.dependency_overrides[get_prediction_service] = lambda: service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestPredictionBatchRoute:
+    """Test suite for POST /prediction/batch"""
+
+    def test_scores_whole_batch(self, client):
+        """Test that every row is scored in request order"""
+        response = client.post("/prediction/batch", json=SMOKE_BATCH)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == len(SMOKE_BATCH)
+        assert body["model_version"] == "v1"
+        assert all(0 <= p["probability"] <= 1 for p in body["predictions"])
+
+    def test_rejects_bad_rows_with_index(self, client):
+        """Test per-index validation errors"""
+        patients = copy.deepcopy(SMOKE_BATCH)
+        patients[1]["age"] = -5
+        del patients[2]["bmi"]
+
+        response = client.post("/prediction/batch", json=patients)
+
+        assert response.status_code == 422
+        errors = {row["index"]: row["errors"] for row in response.json()["errors"]}
+        assert set(errors) == {1, 2}
+        assert errors[1][0]["field"] == "age"
+        assert errors[2][0]["type"] == "missing"
+
+    def test_rejects_invalid_document(self, client):
+        """Test errors that do not belong to a row"""
+        response = client.post("/prediction/batch", content=b'{"not": "a list"}')
+
+        assert response.status_code == 422
+        assert response.json()["errors"][0]["index"] is None
+
+    def test_empty_batch(self, client):
+        """Test that an empty batch is accepted"""
+        response = client.post("/prediction/batch", json=[])
+
+        assert response.status_code == 200
+        assert response.json() == {"model_version": None, "count": 0, "predictions": []}
+
+    def test_sheds_while_audit_is_backlogged(self, client):
+        """Test that scoring is refused with 503 while the audit log is behind"""
+        audit_sink = SimpleNamespace(backlogged=True, flush_interval=1.0, shed=0)
+
+        with container.audit_sink.override(providers.Object(audit_sink)):
+            response = client.post("/prediction/batch", json=SMOKE_BATCH)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert audit_sink.shed == 1
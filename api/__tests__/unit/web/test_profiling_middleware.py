@@ -0,0 +1,107 @@
+import time
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api.infra.monitoring.sampling_profiler import ProfileStore
+from api.infra.web.middlewares.profiling_middleware import (
+    ProfilingMiddleware,
+    sign_profile_token,
+    verify_profile_token,
+)
+
+SECRET = "test-secret"
+
+
+def busy_numpy(seconds: float) -> None:
+    """Burns CPU inside numpy for the given time"""
+    deadline = time.perf_counter() + seconds
+    rng = np.random.default_rng(0)
+    while time.perf_counter() < deadline:
+        np.linalg.svd(rng.random((80, 80)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    """ProfileStore on a temporary directory"""
+    return ProfileStore(tmp_path / "profiles")
+
+
+def make_client(store: ProfileStore, sample_rate: float = 0.0) -> TestClient:
+    """Small app with a sync route (threadpool) behind the middleware"""
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        busy_numpy(0.2)
+        return {"ok": True}
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=store,
+        secret=SECRET,
+        sample_rate=sample_rate,
+        interval=0.002,
+    )
+    return TestClient(app)
+
+
+class TestProfileToken:
+    """Test suite for signed profiling tokens"""
+
+    def test_valid_token(self):
+        """Test that a freshly signed token is accepted"""
+        assert verify_profile_token(SECRET, sign_profile_token(SECRET, ttl=60))
+
+    def test_rejects_wrong_secret_and_expired(self):
+        """Test rejection of tokens signed elsewhere or already expired"""
+        assert not verify_profile_token(SECRET, sign_profile_token("other", ttl=60))
+        assert not verify_profile_token(SECRET, sign_profile_token(SECRET, ttl=-1))
+        assert not verify_profile_token(None, sign_profile_token(SECRET, ttl=60))
+        assert not verify_profile_token(SECRET, "garbage")
+
+
+class TestProfilingMiddleware:
+    """Test suite for ProfilingMiddleware"""
+
+    def test_not_profiled_without_header(self, store):
+        """Test that requests pass through untouched by default"""
+        response = make_client(store).get("/work")
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert store.list() == []
+
+    def test_invalid_token_is_ignored(self, store):
+        """Test that a bad signature does not trigger profiling"""
+        response = make_client(store).get(
+            "/work", headers={"X-Profile-Token": sign_profile_token("other")}
+        )
+
+        assert "x-profile-id" not in response.headers
+
+    def test_signed_header_profiles_request(self, store):
+        """Test profile capture, category attribution and folded output"""
+        response = make_client(store).get(
+            "/work", headers={"X-Profile-Token": sign_profile_token(SECRET)}
+        )
+
+        profile_id = response.headers["x-profile-id"]
+        summary = store.get(profile_id)
+        folded = store.folded_path(profile_id).read_text()
+        assert summary["path"] == "/work"
+        assert summary["status"] == 200
+        assert summary["samples"] > 0
+        assert "numpy" in summary["categories"]
+        assert "busy_numpy" in folded
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
+
+    def test_sample_rate(self, store):
+        """Test that sample_rate=1 profiles every request"""
+        response = make_client(store, sample_rate=1.0).get("/work")
+
+        assert response.headers["x-profile-id"] in [p["id"] for p in store.list()]
+
+    def test_rejects_path_traversal(self, store):
+        """Test that profile ids cannot escape the profiles directory"""
+        assert store.get("../secrets") is None
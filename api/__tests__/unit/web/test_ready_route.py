@@ -0,0 +1,52 @@
+import pytest
+from types import SimpleNamespace
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from api.infra.container.dependecies import container
+from api.infra.monitoring.readiness import Readiness
+from api.infra.web.app import app
+
+
+@pytest.fixture
+def admission():
+    """Admission counters with 2 of 4 LLM slots in use"""
+    return SimpleNamespace(in_use=2, queue_depth=0, max_concurrency=4, max_queue_size=8)
+
+
+def client_for(registry, admission):
+    """TestClient whose readiness reads the given registry and admission"""
+    readiness = Readiness(registry, admission, llm_probe=None)
+    container.readiness.override(providers.Object(readiness))
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def reset_override():
+    """Removes the readiness override after each test"""
+    yield
+    container.readiness.reset_override()
+
+
+class TestReadyRoute:
+    """Test suite for GET /ready"""
+
+    def test_ready(self, admission):
+        """Test the 200 answer with the load score header"""
+        client = client_for(
+            SimpleNamespace(active=SimpleNamespace(version="v1")), admission
+        )
+
+        response = client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert response.headers["X-Load-Score"] == "0.5"
+
+    def test_not_ready(self, admission):
+        """Test the 503 answer while the model is not loaded"""
+        client = client_for(SimpleNamespace(active=None), admission)
+
+        response = client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["model not loaded"]
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from api.application.services.diagnostic_service import DiagnosticService
+from api.infra.container.dependecies import container
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.web.app import app
+from api.infra.web.resumable import ResumableStreams, StreamGoneError
+from api.infra.web.routes.diagnostic_route import get_diagnostic_service
+
+
+async def report_chunks(tokens=5, delay=0.0):
+    """Preamble plus one chunk per token, like the diagnostic stream"""
+    yield json.dumps({"event": "prediction"}) + "\n"
+    for i in range(tokens):
+        await asyncio.sleep(delay)
+        yield f"token{i} "
+
+
+async def read_all(buffer, offset=0) -> bytes:
+    return b"".join([chunk async for chunk in buffer.read(offset)])
+
+
+class TestResumableStreams:
+    """Test suite for the stream buffers behind /diagnostic/stream"""
+
+    @pytest.mark.asyncio
+    async def test_generation_survives_the_reader(self):
+        """Test that a dropped reader does not stop the generation"""
+        streams = ResumableStreams()
+        buffer = streams.start(report_chunks(tokens=5, delay=0.01))
+
+        reader = buffer.read()
+        received = b""
+        while b"token1 " not in received:
+            received += await reader.__anext__()
+        await reader.aclose()  # Conexão caiu
+        await asyncio.sleep(0.1)
+
+        assert buffer.done and buffer.chunks == 6
+        resumed = streams.resume(buffer.id, len(received))
+        rest = await read_all(resumed, len(received))
+        assert received + rest == await read_all(buffer)
+        # Só os tokens que o cliente já tinha seriam gerados de novo
+        assert streams.status()["tokens_avoided"] == 2
+        assert streams.status()["bytes_replayed"] == len(rest)
+
+    @pytest.mark.asyncio
+    async def test_resume_while_generating(self):
+        """Test that a reconnect follows the generation still running"""
+        streams = ResumableStreams()
+        buffer = streams.start(report_chunks(tokens=3, delay=0.01))
+        await asyncio.sleep(0)
+
+        first, second = await asyncio.gather(read_all(buffer), read_all(buffer, 0))
+
+        assert first == second
+        assert first.endswith(b"token2 ")
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_offset_errors(self):
+        """Test expiry, unknown ids and offsets outside the buffer"""
+        streams = ResumableStreams(ttl=0, max_bytes=20)
+        buffer = streams.start(report_chunks(tokens=5))
+        await asyncio.sleep(0.01)
+
+        assert buffer.done and buffer.base > 0
+        assert len(await read_all(buffer, buffer.base)) == 20
+        with pytest.raises(StreamGoneError):
+            await read_all(buffer, 0)
+        with pytest.raises(StreamGoneError):
+            await read_all(buffer, buffer.size + 1)
+
+        await asyncio.sleep(0.01)
+        with pytest.raises(KeyError):
+            streams.resume(buffer.id, 0)
+        assert streams.status()["resume_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_finished_streams_are_evicted_first(self):
+        """Test the max_streams bound"""
+        streams = ResumableStreams(max_streams=2)
+        finished = streams.start(report_chunks(tokens=1))
+        await read_all(finished)
+        running = streams.start(report_chunks(tokens=3, delay=0.05))
+
+        newest = streams.start(report_chunks(tokens=1))
+
+        assert streams.get(finished.id) is None
+        assert streams.get(running.id) is running
+        assert streams.get(newest.id) is newest
+        await streams.stop()
+
+
+@pytest.fixture
+def streams():
+    """Fresh resumable stream registry in the container (disabled by default)"""
+    streams = ResumableStreams()
+    container.resumable_streams.override(providers.Object(streams))
+    yield streams
+    container.resumable_streams.reset_override()
+
+
+@pytest.fixture
+def client(streams):
+    """TestClient whose diagnostic service streams a short report"""
+    service = Mock(spec=DiagnosticService)
+    service.generate_diagnostic_report_stream = (
+        lambda patient, profile=None, prediction=None: (report_chunks())
+    )
+    app.dependency_overrides[get_diagnostic_service] = lambda: service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+class TestResumeRoute:
+    """Test suite for GET /diagnostic/stream/{stream_id}"""
+
+    def test_resume_from_offset(self, client, streams):
+        """Test that a reconnect gets the rest of the report, not a new one"""
+        response = client.post("/diagnostic/stream", json=SMOKE_BATCH[0])
+        stream_id = response.headers["X-Stream-Id"]
+        body = response.content
+
+        resumed = client.get(f"/diagnostic/stream/{stream_id}", params={"offset": 10})
+        by_header = client.get(
+            f"/diagnostic/stream/{stream_id}", headers={"Last-Event-ID": "45"}
+        )
+
+        assert resumed.status_code == 200
+        assert resumed.content == body[10:]
+        assert resumed.headers["X-Stream-Offset"] == "10"
+        assert by_header.content == body[45:]
+        assert streams.status()["resumed"] == 2
+        # Preâmbulo (24 bytes) + 3 tokens de 7 bytes recebidos antes do offset 45
+        assert streams.status()["tokens_avoided"] == 3
+
+    def test_unknown_stream_and_bad_offset(self, client):
+        """Test the 404 and 416 answers"""
+        response = client.post("/diagnostic/stream", json=SMOKE_BATCH[0])
+        stream_id = response.headers["X-Stream-Id"]
+
+        assert client.get("/diagnostic/stream/nope").status_code == 404
+        past_end = client.get(
+            f"/diagnostic/stream/{stream_id}",
+            params={"offset": len(response.content) + 1},
+        )
+        assert past_end.status_code == 416
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Literal
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Any, Dict, List, Literal, Optional, Union
 from api.application.enum.education_level import EducationLevel
 from api.application.enum.income_level import IncomeLevel
 
@@ -27,6 +27,17 @@ class PatientData(BaseModel):
     diabetes_risk_score: float = Field(..., ge=0, le=10)
 
 
+class RiskFactor(BaseModel):
+    """Contribuição de uma feature para o risco (atribuição linear em log-odds)"""
+
+    feature: str
+    value: Union[float, int, str, None] = None
+    contribution: float = Field(
+        ..., description="Contribuição em log-odds relativa ao baseline do modelo"
+    )
+    direction: Literal["increases", "decreases"]
+
+
 class PredictionResponse(BaseModel):
     """Resposta da predição"""
 
@@ -34,6 +45,12 @@ class PredictionResponse(BaseModel):
     probability: float = Field(..., ge=0, le=1)
     threshold_used: float
     confidence: Literal["high", "medium", "low"]
+    model_version: Optional[str] = Field(
+        None, description="Versão do modelo que gerou a predição"
+    )
+    top_factors: Optional[List[RiskFactor]] = Field(
+        None, description="Principais fatores de risco, do maior para o menor"
+    )
 
 
 class DiagnosticReportResponse(BaseModel):
@@ -43,3 +60,60 @@ class DiagnosticReportResponse(BaseModel):
     diagnostic_report: str = Field(
         ..., description="Relatório médico explicativo gerado pela LLM"
     )
+    degraded: bool = Field(
+        False,
+        description="True quando a LLM estava saturada e só a predição foi retornada",
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Resposta da predição em lote (mesma ordem da requisição)"""
+
+    model_version: Optional[str] = None
+    count: int
+    predictions: List[PredictionResponse]
+
+
+class PatientBatchValidationError(Exception):
+    """Linhas inválidas em um lote de pacientes, agrupadas pelo índice"""
+
+    def __init__(self, errors: Dict[Optional[int], List[Dict[str, Any]]]):
+        super().__init__(f"{len(errors)} invalid patient rows")
+        self.errors = errors
+
+
+PATIENT_LIST_ADAPTER = TypeAdapter(List[PatientData])
+
+
+def validate_patients(raw_json: Union[str, bytes]) -> List[PatientData]:
+    """
+    Valida uma lista JSON de pacientes em uma única chamada (pydantic-core).
+
+    Raises:
+        PatientBatchValidationError: com os erros agrupados pelo índice da linha
+            (índice None para erros no documento como um todo)
+    """
+    try:
+        patients = PATIENT_LIST_ADAPTER.validate_json(raw_json)
+    except ValidationError as e:
+        errors: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for error in e.errors(include_url=False, include_input=False):
+            loc = error["loc"]
+            index = loc[0] if loc and isinstance(loc[0], int) else None
+            field = (
+                ".".join(str(part) for part in loc[1:]) if index is not None else None
+            )
+            errors.setdefault(index, []).append(
+                {"field": field, "message": error["msg"], "type": error["type"]}
+            )
+        raise PatientBatchValidationError(errors)
+
+    return patients
+
+
+def validate_patient_batch(raw_json: Union[str, bytes]) -> List[Dict[str, Any]]:
+    """
+    Como validate_patients(), mas devolve os registros já serializados em modo
+    JSON, prontos para o modelo.
+    """
+    return PATIENT_LIST_ADAPTER.dump_python(validate_patients(raw_json), mode="json")
@@ -0,0 +1,304 @@
+from collections.abc import Hashable, Mapping
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from api.application.dto.diabetes_prediction import (
+    PatientBatchValidationError,
+    PatientData,
+    validate_patients,
+)
+from api.application.enum.education_level import EducationLevel
+from api.application.enum.income_level import IncomeLevel
+
+# Mesma ordem das features do modelo (a ordem dos campos de PatientData)
+BATCH_COLUMNS = tuple(PatientData.model_fields)
+COLUMN_INDEX = {name: index for index, name in enumerate(BATCH_COLUMNS)}
+
+_ENUMS = {"education_level": EducationLevel, "income_level": IncomeLevel}
+
+# Categorias em ordem alfabética, o mesmo código que o LabelEncoder do treino
+CATEGORIES: Dict[str, List[str]] = {
+    name: sorted(member.value for member in enum) for name, enum in _ENUMS.items()
+}
+INTEGER_COLUMNS = ("family_history_diabetes",)
+
+_CODES = {
+    name: {category: code for code, category in enumerate(categories)}
+    for name, categories in CATEGORIES.items()
+}
+# Aceita tanto o membro do enum (DTO) quanto o valor em texto (JSON)
+_ENUM_CODES = {
+    COLUMN_INDEX[name]: {
+        **_CODES[name],
+        **{member: _CODES[name][member.value] for member in _ENUMS[name]},
+    }
+    for name in _ENUMS
+}
+# Linhas binárias (MessagePack) também podem trazer o código da categoria
+_ROW_CODES = {
+    COLUMN_INDEX[name]: {
+        **_CODES[name],
+        **{code: code for code in range(len(CATEGORIES[name]))},
+    }
+    for name in _ENUMS
+}
+_INTEGER_SLOTS = {COLUMN_INDEX[name] for name in INTEGER_COLUMNS}
+_CATEGORY_SLOTS = {COLUMN_INDEX[name]: name for name in CATEGORIES}
+
+
+def _column_bounds() -> np.ndarray:
+    # Limites ge/le de PatientData por coluna; categorias pelo número de códigos
+    bounds = np.array([[-np.inf, np.inf]] * len(BATCH_COLUMNS))
+    for index, name in enumerate(BATCH_COLUMNS):
+        for constraint in PatientData.model_fields[name].metadata:
+            if getattr(constraint, "ge", None) is not None:
+                bounds[index, 0] = constraint.ge
+            if getattr(constraint, "le", None) is not None:
+                bounds[index, 1] = constraint.le
+    for index, name in _CATEGORY_SLOTS.items():
+        bounds[index] = (0, len(CATEGORIES[name]) - 1)
+    return bounds
+
+
+_LOWER, _UPPER = _column_bounds().T
+_WHOLE_MASK = np.zeros(len(BATCH_COLUMNS), dtype=bool)
+_WHOLE_MASK[list(_INTEGER_SLOTS | set(_CATEGORY_SLOTS))] = True
+_get_fields = attrgetter(*BATCH_COLUMNS)
+_get_items = itemgetter(*BATCH_COLUMNS)
+
+
+def _encode_row(row: Sequence[Any]) -> List[Any]:
+    row = list(row)
+    for index, codes in _ENUM_CODES.items():
+        try:
+            row[index] = codes[row[index]]
+        except KeyError:
+            name = BATCH_COLUMNS[index]
+            raise ValueError(f"Unknown {name}: {row[index]!r}") from None
+    return row
+
+
+def decode_value(index: int, value: float) -> Any:
+    """Column value as the JSON record has it (category name, int or float)"""
+    name = BATCH_COLUMNS[index]
+    if name in CATEGORIES:
+        return CATEGORIES[name][int(value)]
+    if index in _INTEGER_SLOTS:
+        return int(value)
+    return float(value)
+
+
+class PatientRow(Mapping):
+    """Read-only dict-like view of one patient of a PatientBatch"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: np.ndarray):
+        self._values = values
+
+    def __getitem__(self, name: str) -> Any:
+        index = COLUMN_INDEX[name]
+        return decode_value(index, self._values[index])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(BATCH_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(BATCH_COLUMNS)
+
+
+class PatientBatch(Sequence):
+    """
+    Columnar batch of patients: one contiguous float64 matrix (n, 18) in the
+    model feature order, with the enums stored as category codes.
+
+    It is the raw feature matrix the model scores, so the prediction service
+    uses it without copying; rows are exposed as PatientRow views for the
+    prompt formatter and anything else that reads patients as mappings.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: np.ndarray):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(BATCH_COLUMNS):
+            raise ValueError(
+                f"Expected a (n, {len(BATCH_COLUMNS)}) matrix, got {values.shape}"
+            )
+        # Imutável: observadores guardam referências ao array
+        values.flags.writeable = False
+        self.values = values
+
+    @classmethod
+    def from_patients(cls, patients: Sequence[PatientData]) -> "PatientBatch":
+        """Builds the batch straight from validated DTOs (no model_dump)"""
+        rows = [_encode_row(_get_fields(patient)) for patient in patients]
+        return cls._from_rows(rows)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "PatientBatch":
+        """
+        Builds the batch from plain dicts (JSON mode, enums as strings).
+
+        Raises:
+            ValueError: unknown category
+            KeyError: missing feature
+        """
+        rows = [_encode_row(_get_items(record)) for record in records]
+        return cls._from_rows(rows)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]]) -> "PatientBatch":
+        """
+        Builds the batch from rows of values in BATCH_COLUMNS order, with the
+        categories as names or codes and None for a missing value. Values are
+        not range-checked (see validate_patient_matrix()); unknown categories
+        become code -1 so the check reports them.
+
+        Raises:
+            PatientBatchValidationError: rows of the wrong length or non-numeric values
+        """
+        encoded: List[List[Any]] = []
+        errors: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for index, row in enumerate(rows):
+            if not isinstance(row, (list, tuple)) or len(row) != len(BATCH_COLUMNS):
+                size = (
+                    len(row) if isinstance(row, (list, tuple)) else type(row).__name__
+                )
+                errors[index] = [
+                    {
+                        "field": None,
+                        "message": f"Expected {len(BATCH_COLUMNS)} values, got {size}",
+                        "type": "row_length",
+                    }
+                ]
+                continue
+            row = list(row)
+            for slot, codes in _ROW_CODES.items():
+                value = row[slot]
+                if value is not None:
+                    row[slot] = (
+                        codes.get(value, -1) if isinstance(value, Hashable) else -1
+                    )
+            encoded.append(row)
+        if errors:
+            raise PatientBatchValidationError(errors)
+
+        try:
+            return cls._from_rows(encoded)
+        except (TypeError, ValueError) as e:
+            raise PatientBatchValidationError(
+                {None: [{"field": None, "message": str(e), "type": "float_parsing"}]}
+            ) from None
+
+    @classmethod
+    def _from_rows(cls, rows: List[List[Any]]) -> "PatientBatch":
+        values = np.array(rows, dtype=np.float64)
+        return cls(values.reshape(len(rows), len(BATCH_COLUMNS)))
+
+    def column(self, name: str) -> np.ndarray:
+        """Column view (no copy)"""
+        return self.values[:, COLUMN_INDEX[name]]
+
+    def row(self, index: int) -> PatientRow:
+        return PatientRow(self.values[index])
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [dict(self.row(i)) for i in range(len(self))]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PatientBatch(self.values[index])
+        return self.row(index)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+
+def validate_patient_columns(raw_json: Union[str, bytes]) -> PatientBatch:
+    """
+    Validates a JSON list of patients and returns it as a PatientBatch, skipping
+    the per-row dict serialization of validate_patient_batch().
+
+    Raises:
+        PatientBatchValidationError: same errors as validate_patient_batch()
+    """
+    return PatientBatch.from_patients(validate_patients(raw_json))
+
+
+def _matrix_error(index: int, value: float) -> Dict[str, str]:
+    # Mesmos tipos e mensagens do pydantic para o cliente tratar igual ao JSON
+    name = BATCH_COLUMNS[index]
+    if np.isnan(value):
+        return {"field": name, "message": "Field required", "type": "missing"}
+    if index in _CATEGORY_SLOTS:
+        names = [repr(category) for category in CATEGORIES[name]]
+        return {
+            "field": name,
+            "message": f"Input should be {', '.join(names[:-1])} or {names[-1]}",
+            "type": "enum",
+        }
+    if np.isinf(value):
+        return {
+            "field": name,
+            "message": "Input should be a finite number",
+            "type": "finite_number",
+        }
+    if value < _LOWER[index]:
+        return {
+            "field": name,
+            "message": f"Input should be greater than or equal to {_LOWER[index]:g}",
+            "type": "greater_than_equal",
+        }
+    if value > _UPPER[index]:
+        return {
+            "field": name,
+            "message": f"Input should be less than or equal to {_UPPER[index]:g}",
+            "type": "less_than_equal",
+        }
+    return {
+        "field": name,
+        "message": "Input should be a valid integer, got a number with a fractional part",
+        "type": "int_from_float",
+    }
+
+
+def validate_patient_matrix(values: np.ndarray) -> PatientBatch:
+    """
+    Applies the PatientData constraints to a (n, 18) float64 matrix already
+    in the batch layout (categories as codes, missing values as NaN), in one
+    vectorized pass, and wraps it in a PatientBatch without copying.
+
+    Raises:
+        PatientBatchValidationError: same error shape as validate_patient_columns()
+    """
+    try:
+        batch = PatientBatch(values)
+    except ValueError as e:
+        raise PatientBatchValidationError(
+            {None: [{"field": None, "message": str(e), "type": "shape"}]}
+        ) from None
+
+    matrix = batch.values
+    with np.errstate(invalid="ignore"):
+        invalid = (
+            ~np.isfinite(matrix)
+            | (matrix < _LOWER)
+            | (matrix > _UPPER)
+            | (_WHOLE_MASK & (matrix != np.floor(matrix)))
+        )
+    if invalid.any():
+        rows, columns = np.nonzero(invalid)
+        errors: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for row, column in zip(rows.tolist(), columns.tolist()):
+            errors.setdefault(row, []).append(
+                _matrix_error(column, matrix[row, column])
+            )
+        raise PatientBatchValidationError(errors)
+    return batch
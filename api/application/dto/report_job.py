@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from api.application.dto.diabetes_prediction import PredictionResponse
+
+
+class ReportJobResponse(BaseModel):
+    """Estado de um job assíncrono de geração de relatório"""
+
+    job_id: str
+    status: Literal["queued", "running", "completed", "failed"]
+    prediction: PredictionResponse
+    diagnostic_report: Optional[str] = Field(
+        None, description="Relatório gerado pela LLM (quando status=completed)"
+    )
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: Optional[float] = None
+    finished_at: Optional[float] = None
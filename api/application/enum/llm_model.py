@@ -6,3 +6,5 @@ class LLMModels(Enum):
 
     OLLAMA = "ollama"
     OPENAI = "openai"
+    STUB = "stub"
+    REPLAY = "replay"
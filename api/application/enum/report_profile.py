@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class ReportProfileName(Enum):
+    """Report length profile value object"""
+
+    SUMMARY = "summary"
+    STANDARD = "standard"
+    FULL = "full"
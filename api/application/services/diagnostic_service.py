@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
 class DiagnosticService(ABC):
@@ -9,13 +9,19 @@ class DiagnosticService(ABC):
     def generate_diagnostic_report(
         self,
         patient_data: Dict[str, Any],
+        profile: Optional[str] = None,
+        prediction: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         Gera um relatório diagnóstico explicativo baseado nos dados do paciente.
-        Faz a predição internamente e gera o relatório com explicação.
+        Faz a predição internamente (ou usa a informada) e gera o relatório com
+        explicação.
 
         Args:
             patient_data: Dados do paciente (18 features)
+            profile: Perfil de tamanho do relatório (summary, standard, full);
+                None usa o padrão do endpoint
+            prediction: Predição já calculada para o paciente; None prediz aqui
 
         Returns:
             Relatório diagnóstico em texto explicativo
@@ -26,15 +32,23 @@ class DiagnosticService(ABC):
     async def generate_diagnostic_report_stream(
         self,
         patient_data: Dict[str, Any],
+        profile: Optional[str] = None,
+        prediction: Optional[Dict[str, Any]] = None,
     ):
         """
         Gera um relatório diagnóstico explicativo de forma assíncrona (streaming).
-        Faz a predição internamente e gera o relatório com explicação.
+        Faz a predição internamente (ou usa a informada) e gera o relatório com
+        explicação.
 
         Args:
             patient_data: Dados do paciente (18 features)
+            profile: Perfil de tamanho do relatório (summary, standard, full);
+                None usa o padrão do endpoint
+            prediction: Predição já calculada para o paciente; None prediz aqui
 
         Yields:
-            Chunks do relatório diagnóstico
+            Primeiro um preâmbulo em uma linha JSON com a predição
+            ({"event": "prediction", ...}), emitido antes do primeiro token
+            da LLM; depois os chunks do relatório diagnóstico
         """
         pass
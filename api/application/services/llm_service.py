@@ -1,10 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Optional
 
 from langchain_core.language_models import BaseChatModel
 from api.infra.config.env import ConfigEnvs
 
 
+class LLMOverloadedError(Exception):
+    """Raised when an LLM request is shed by admission control"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class LLMService(ABC):
     """Interface for Large Language Model services"""
 
@@ -21,9 +29,11 @@ class LLMService(ABC):
         self,
         user_input: str,
         system_prompt: str,
-        model: str = "default",
+        model: Optional[str] = None,
         temperature: float = 0.5,
         top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
     ) -> AsyncGenerator[str, None]:
         """Generate streaming response from LLM"""
         pass
@@ -35,6 +45,9 @@ class LLMService(ABC):
         system_prompt: str = "",
         temperature: float = 0.5,
         top_p: float = 0.9,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
     ) -> str:
         """Invoke LLM and get complete response"""
         pass
@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class ModelRoute(NamedTuple):
+    """Modelo e orçamento de tokens escolhidos para um relatório"""
+
+    tier: str
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+
+    def llm_params(self) -> Dict[str, Any]:
+        """Parâmetros extras da chamada à LLM (só os definidos)"""
+        params: Dict[str, Any] = {}
+        if self.model:
+            params["model"] = self.model
+        if self.max_tokens:
+            params["max_tokens"] = self.max_tokens
+        return params
+
+
+class ModelRouter(ABC):
+    """Interface para escolher o modelo da LLM de cada relatório pela predição"""
+
+    @abstractmethod
+    def route(self, prediction_result: Dict[str, Any]) -> ModelRoute:
+        """
+        Escolhe o tier do relatório.
+
+        Args:
+            prediction_result: Predição do paciente (probability, confidence, ...)
+
+        Returns:
+            Tier, modelo e limite de tokens da geração
+        """
+        pass
+
+    @abstractmethod
+    def observe(
+        self, route: ModelRoute, duration: float, ttft: Optional[float] = None
+    ) -> None:
+        """Registra a latência de um relatório gerado pelo tier"""
+        pass
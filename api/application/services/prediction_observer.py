@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class PredictionObserver(ABC):
+    """Interface para consumidores de predições fora do caminho da requisição"""
+
+    @abstractmethod
+    def observe(
+        self,
+        features: np.ndarray,
+        probabilities: np.ndarray,
+        threshold: float,
+        model_version: str,
+    ) -> None:
+        """
+        Recebe um lote de predições já calculadas. Deve retornar imediatamente,
+        sem I/O nem trabalho pesado, pois roda dentro da requisição.
+
+        Args:
+            features: Matriz (n, 18) codificada e não escalada, na ordem do modelo
+            probabilities: Probabilidade da classe positiva para cada linha
+            threshold: Threshold usado na decisão
+            model_version: Versão do modelo que gerou as probabilidades
+        """
+        pass
@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class ReportCache(ABC):
+    """Interface para cache de relatórios diagnósticos já gerados pela LLM"""
+
+    @abstractmethod
+    def lookup(
+        self,
+        features: np.ndarray,
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+    ) -> Optional[str]:
+        """
+        Procura um relatório gerado para um paciente equivalente.
+
+        Args:
+            features: Vetor (18,) já escalado, na ordem do modelo
+            patient_data: Dados do paciente (18 features)
+            prediction_result: Predição do paciente
+
+        Returns:
+            Relatório pronto para este paciente, ou None se não houver
+        """
+        pass
+
+    @abstractmethod
+    def store(
+        self,
+        features: np.ndarray,
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+        report: str,
+    ) -> None:
+        """Guarda o relatório gerado para o paciente"""
+        pass
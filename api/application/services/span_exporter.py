@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class SpanExporter(ABC):
+    """Interface para destinos dos spans de tracing"""
+
+    @abstractmethod
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        """
+        Recebe os spans de um trace finalizado.
+
+        Args:
+            spans: Spans serializados (dict) do mesmo trace, o root por último
+        """
+        pass
+
+    def shutdown(self) -> None:
+        """Libera recursos (arquivos, conexões) no encerramento da aplicação"""
+        pass
@@ -5,9 +5,199 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _optional_int(name: str):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+
+def _optional_float(name: str):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else None
+
+
 class ConfigEnvs:
     OLLAMA_HOST = os.getenv("OLLAMA_HOST")
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL")
     LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")
+
+    # Model registry / hot-reload
+    MODELS_DIR = os.getenv("MODELS_DIR")
+    MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+    MODEL_PARITY_TOLERANCE = _optional_float("MODEL_PARITY_TOLERANCE")
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # Atribuição de fatores de risco
+    TOP_K_FACTORS = int(os.getenv("TOP_K_FACTORS", "5"))
+    PROMPT_TOP_FACTORS_ONLY = os.getenv("PROMPT_TOP_FACTORS_ONLY", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+    # Relatório seccionado: uma geração por seção, em paralelo
+    REPORT_SECTIONED = os.getenv("REPORT_SECTIONED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+    # Cache aproximado de relatórios (vizinho mais próximo nas features escaladas)
+    REPORT_CACHE_ENABLED = os.getenv("REPORT_CACHE_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    REPORT_CACHE_MAX_DISTANCE = float(os.getenv("REPORT_CACHE_MAX_DISTANCE", "0.05"))
+    REPORT_CACHE_LEVELS = int(os.getenv("REPORT_CACHE_LEVELS", "100"))
+    REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "100000"))
+
+    # Perfis de tamanho do relatório (summary, standard, full): orçamento de
+    # tokens, seções pedidas e parada antecipada; "none" desliga (sem limite)
+    REPORT_PROFILE_DEFAULT = os.getenv("REPORT_PROFILE_DEFAULT", "standard")
+    # JSON {"endpoint": "perfil"}, sobre o padrão (jobs: full, demais: standard)
+    REPORT_ENDPOINT_PROFILES = os.getenv("REPORT_ENDPOINT_PROFILES", "")
+    # JSON {"perfil": max_tokens}, sobre os orçamentos padrão (250/600/1200)
+    REPORT_PROFILE_MAX_TOKENS = os.getenv("REPORT_PROFILE_MAX_TOKENS", "")
+
+    # Servidor de produção (python -m api --production): gunicorn + uvicorn
+    SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    # Um worker por padrão: admissão da LLM, retomada de streams e caches são
+    # por processo. "auto" calcula o número pelos CPUs e memória
+    SERVER_WORKERS = (
+        None
+        if os.getenv("SERVER_WORKERS", "1").lower() == "auto"
+        else _optional_int("SERVER_WORKERS") or 1
+    )
+    SERVER_MAX_WORKERS = _optional_int("SERVER_MAX_WORKERS")
+    SERVER_WORKER_MEMORY_MB = _optional_int("SERVER_WORKER_MEMORY_MB")
+    SERVER_MEMORY_RESERVE_MB = int(os.getenv("SERVER_MEMORY_RESERVE_MB", "256"))
+    SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "10000"))
+    SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "1000"))
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "60"))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+
+    # WebSocket multiplexado (/diagnostic/ws), limites por conexão
+    WS_MAX_CONCURRENT_REPORTS = int(os.getenv("WS_MAX_CONCURRENT_REPORTS", "4"))
+    WS_MAX_PENDING_REPORTS = int(os.getenv("WS_MAX_PENDING_REPORTS", "64"))
+    WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+
+    # Streams retomáveis do /diagnostic/stream (buffer em memória por worker)
+    # Buffers ficam na memória do processo: só ligar com um único worker ou
+    # com roteamento sticky até o mesmo worker
+    STREAM_RESUME_ENABLED = os.getenv("STREAM_RESUME_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    STREAM_RESUME_TTL = float(os.getenv("STREAM_RESUME_TTL", "60"))
+    STREAM_RESUME_MAX_STREAMS = int(os.getenv("STREAM_RESUME_MAX_STREAMS", "1000"))
+    STREAM_RESUME_MAX_BYTES = int(os.getenv("STREAM_RESUME_MAX_BYTES", "262144"))
+
+    # Shadow scoring de modelos candidatos
+    SHADOW_MODELS = os.getenv("SHADOW_MODELS", "")
+    SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1024"))
+    SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "256"))
+
+    # Predição em lote
+    PREDICTION_MAX_BATCH_SIZE = int(os.getenv("PREDICTION_MAX_BATCH_SIZE", "10000"))
+
+    # Admission control na frente da LLM (por provider)
+    LLM_MAX_CONCURRENCY = _optional_int("LLM_MAX_CONCURRENCY")
+    LLM_MAX_QUEUE_SIZE = _optional_int("LLM_MAX_QUEUE_SIZE")
+    LLM_MAX_QUEUE_TIME = float(os.getenv("LLM_MAX_QUEUE_TIME", "10"))
+    LLM_OVERLOAD_POLICY = os.getenv("LLM_OVERLOAD_POLICY", "reject").lower()
+    # Fila justa por cliente da API, com prioridade por endpoint
+    LLM_CLIENT_HEADER = os.getenv("LLM_CLIENT_HEADER", "x-client-id")
+    LLM_CLIENT_WEIGHTS = os.getenv("LLM_CLIENT_WEIGHTS")
+    LLM_ENDPOINT_PRIORITIES = os.getenv("LLM_ENDPOINT_PRIORITIES")
+    LLM_RESERVED_INTERACTIVE_SLOTS = int(
+        os.getenv("LLM_RESERVED_INTERACTIVE_SLOTS", "0")
+    )
+
+    # LLM stub (testes de carga e benchmarks)
+    STUB_LLM_TTFT = float(os.getenv("STUB_LLM_TTFT", "0.2"))
+    STUB_LLM_TOKEN_DELAY = float(os.getenv("STUB_LLM_TOKEN_DELAY", "0.01"))
+    STUB_LLM_TOKENS = int(os.getenv("STUB_LLM_TOKENS", "60"))
+    STUB_LLM_CAPACITY = int(os.getenv("STUB_LLM_CAPACITY", "0"))
+
+    # Cassetes de LLM: grava chamadas reais / reproduz com o mesmo timing
+    LLM_RECORD_CASSETTE = os.getenv("LLM_RECORD_CASSETTE")
+    LLM_CASSETTE = os.getenv("LLM_CASSETTE")
+    LLM_REPLAY_TIME_SCALE = float(os.getenv("LLM_REPLAY_TIME_SCALE", "1.0"))
+    LLM_REPLAY_MISS_POLICY = os.getenv("LLM_REPLAY_MISS_POLICY", "cycle").lower()
+
+    # Contabilidade de tokens/custo da LLM (preços em USD por 1M de tokens)
+    LLM_PRICES = os.getenv("LLM_PRICES")
+    LLM_USAGE_ENCODING = os.getenv("LLM_USAGE_ENCODING", "o200k_base")
+
+    # Roteamento de modelo por tier de risco (JSON ou caminho de arquivo JSON)
+    LLM_ROUTING = os.getenv("LLM_ROUTING")
+    LLM_MODEL_DISCOVERY_TTL = float(os.getenv("LLM_MODEL_DISCOVERY_TTL", "300"))
+
+    # Readiness (/ready): sonda da LLM em background; intervalo 0 desliga a sonda
+    READY_LLM_PROBE_INTERVAL = float(os.getenv("READY_LLM_PROBE_INTERVAL", "15"))
+    READY_LLM_PROBE_TIMEOUT = float(os.getenv("READY_LLM_PROBE_TIMEOUT", "5"))
+    READY_REQUIRE_LLM = os.getenv("READY_REQUIRE_LLM", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+    # Jobs assíncronos de relatório
+    REPORT_JOBS_DB = os.getenv("REPORT_JOBS_DB", "data/report_jobs.sqlite3")
+    REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "2"))
+    REPORT_JOB_LEASE_SECONDS = float(os.getenv("REPORT_JOB_LEASE_SECONDS", "30"))
+
+    # Auditoria de predições (write-behind em arquivos SQLite)
+    AUDIT_LOG_ENABLED = os.getenv("AUDIT_LOG_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    AUDIT_LOG_DIR = os.getenv("AUDIT_LOG_DIR", "data/audit")
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "4096"))
+    AUDIT_FLUSH_ROWS = int(os.getenv("AUDIT_FLUSH_ROWS", "2048"))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+    AUDIT_ROTATE_ROWS = int(os.getenv("AUDIT_ROTATE_ROWS", "1000000"))
+    AUDIT_ROTATE_INTERVAL = float(os.getenv("AUDIT_ROTATE_INTERVAL", "3600"))
+
+    # Monitor de drift das features (PSI contra reference_stats.json)
+    DRIFT_MONITOR_ENABLED = os.getenv("DRIFT_MONITOR_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    DRIFT_BINS = int(os.getenv("DRIFT_BINS", "10"))
+
+    # Profiling sob demanda (middleware só é instalado com PROFILING_ENABLED)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    PROFILING_SECRET = os.getenv("PROFILING_SECRET")
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+    PROFILING_DIR = os.getenv("PROFILING_DIR", "data/profiles")
+    PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", "200"))
+    PROFILING_MAX_CONCURRENT = int(os.getenv("PROFILING_MAX_CONCURRENT", "1"))
+
+    # Tracing por requisição (spans da rota até o último token)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "jsonl").lower()
+    TRACE_FILE = os.getenv("TRACE_FILE", "data/traces.jsonl")
+    TRACE_SLOWEST_PER_MINUTE = int(os.getenv("TRACE_SLOWEST_PER_MINUTE", "10"))
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
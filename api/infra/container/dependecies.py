@@ -2,44 +2,400 @@ from pathlib import Path
 from dependency_injector import containers, providers
 from api.infra.services.llm_services.ollama_llm_service import OllamaLLMService
 from api.infra.services.llm_services.openai_llm_service import OpenaiLLMService
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.llm_services.cassette_llm_service import (
+    Cassette,
+    RecordingLLMService,
+    ReplayLLMService,
+)
+from api.infra.services.llm_services.usage_tracking_llm_service import (
+    UsageTrackingLLMService,
+)
+from api.infra.services.llm_services.admission_control import (
+    AdmissionControlledLLMService,
+    AdmissionController,
+    parse_client_weights,
+    parse_endpoint_priorities,
+)
 from api.infra.services.predict_services.diabetes_prediction_service import (
     DiabetesPredictionService,
 )
+from api.infra.services.predict_services.model_registry import (
+    DEFAULT_MODELS_DIR,
+    ModelRegistry,
+)
+from api.infra.services.predict_services.shadow_scorer import ShadowScorer
+from api.infra.services.predict_services.prediction_audit_sink import (
+    PredictionAuditSink,
+)
 from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.model_routing.model_catalog import ModelCatalog
+from api.infra.services.model_routing.tiered_model_router import (
+    TieredModelRouter,
+    parse_routing_table,
+)
+from api.infra.services.report_cache.approximate_report_cache import (
+    ApproximateReportCache,
+)
+from api.infra.services.report_profiles import (
+    ReportProfiles,
+    parse_endpoint_profiles,
+    parse_profile_max_tokens,
+)
+from api.infra.services.jobs.report_job_store import ReportJobStore
+from api.infra.services.jobs.report_job_service import ReportJobService
+from api.infra.monitoring.drift_monitor import DriftMonitor
+from api.infra.monitoring.sampling_profiler import ProfileStore
+from api.infra.monitoring.stream_timings import StreamTimings
+from api.infra.monitoring.multiplex_stats import MultiplexStats
+from api.infra.monitoring.readiness import LLMProbe, Readiness
+from api.infra.monitoring.llm_usage import (
+    LLMUsageStats,
+    TokenEstimator,
+    parse_prices,
+)
+from api.infra.monitoring.trace_exporters import (
+    InMemorySpanExporter,
+    JsonLinesSpanExporter,
+)
+from api.infra.monitoring.tracing import SlowTraceSampler
+from api.infra.web.resumable.resumable_streams import ResumableStreams
 from api.infra.config.env import ConfigEnvs
 from api.application.enum.llm_model import LLMModels
 
 
-def _create_llm_service(envs: ConfigEnvs):
-    provider = envs.LLM_PROVIDER or "ollama"
+# Limites padrão por provider: Ollama local satura com poucas gerações simultâneas
+DEFAULT_LLM_CONCURRENCY = {
+    LLMModels.OLLAMA: 2,
+    LLMModels.OPENAI: 16,
+    LLMModels.STUB: 8,
+    LLMModels.REPLAY: 8,
+}
+
 
+def _llm_provider(envs: ConfigEnvs) -> LLMModels:
+    provider = envs.LLM_PROVIDER or "ollama"
     try:
-        llm_model = LLMModels(provider.lower())
-        if llm_model == LLMModels.OLLAMA:
-            return OllamaLLMService(envs=envs)
-        elif llm_model == LLMModels.OPENAI:
-            return OpenaiLLMService(envs=envs)
+        return LLMModels(provider.lower())
     except ValueError:
         # If invalid value, default to Ollama
-        return OllamaLLMService(envs=envs)
+        return LLMModels.OLLAMA
+
+
+def _create_llm_cassette(envs: ConfigEnvs):
+    if _llm_provider(envs) == LLMModels.REPLAY:
+        if not envs.LLM_CASSETTE:
+            raise ValueError("LLM_PROVIDER=replay requires LLM_CASSETTE")
+        return Cassette(Path(envs.LLM_CASSETTE))
+    if envs.LLM_RECORD_CASSETTE:
+        return Cassette(Path(envs.LLM_RECORD_CASSETTE))
+    return None
+
+
+def _create_llm_usage(envs: ConfigEnvs) -> LLMUsageStats:
+    return LLMUsageStats(
+        prices=parse_prices(envs.LLM_PRICES),
+        estimator=TokenEstimator(envs.LLM_USAGE_ENCODING),
+    )
+
+
+def _create_provider_llm_service(envs: ConfigEnvs, cassette=None, usage=None):
+    llm_model = _llm_provider(envs)
+    if llm_model == LLMModels.REPLAY:
+        service = ReplayLLMService(envs=envs, cassette=cassette)
+    elif llm_model == LLMModels.OPENAI:
+        service = OpenaiLLMService(envs=envs)
+    elif llm_model == LLMModels.STUB:
+        service = StubLLMService(envs=envs)
+    else:
+        service = OllamaLLMService(envs=envs)
+
+    if usage is not None:
+        # Por dentro da gravação: o dict de usage não entra nos params do cassete
+        service = UsageTrackingLLMService(
+            inner=service, stats=usage, provider=llm_model.value
+        )
+    if cassette is not None and llm_model != LLMModels.REPLAY:
+        # Grava prompts, chunks e tempos das chamadas reais para replay
+        return RecordingLLMService(
+            inner=service, cassette=cassette, provider=llm_model.value
+        )
+    return service
+
+
+def _create_admission_controller(envs: ConfigEnvs) -> AdmissionController:
+    llm_model = _llm_provider(envs)
+    max_concurrency = envs.LLM_MAX_CONCURRENCY or DEFAULT_LLM_CONCURRENCY[llm_model]
+    max_queue_size = (
+        envs.LLM_MAX_QUEUE_SIZE
+        if envs.LLM_MAX_QUEUE_SIZE is not None
+        else 4 * max_concurrency
+    )
+    return AdmissionController(
+        name=llm_model.value,
+        max_concurrency=max_concurrency,
+        max_queue_size=max_queue_size,
+        max_queue_time=envs.LLM_MAX_QUEUE_TIME,
+        client_weights=parse_client_weights(envs.LLM_CLIENT_WEIGHTS),
+        endpoint_priorities=parse_endpoint_priorities(envs.LLM_ENDPOINT_PRIORITIES),
+        reserved_slots=envs.LLM_RESERVED_INTERACTIVE_SLOTS,
+    )
+
+
+def _create_llm_service(
+    envs: ConfigEnvs, admission: AdmissionController, cassette=None, usage=None
+):
+    return AdmissionControlledLLMService(
+        inner=_create_provider_llm_service(envs, cassette, usage),
+        controller=admission,
+    )
+
+
+def _create_model_catalog(envs: ConfigEnvs, llm_service):
+    if not envs.LLM_ROUTING:
+        return None
+    return ModelCatalog(llm_service=llm_service, ttl=envs.LLM_MODEL_DISCOVERY_TTL)
+
+
+def _create_llm_probe(envs: ConfigEnvs, llm_service):
+    if envs.READY_LLM_PROBE_INTERVAL <= 0:
+        return None
+    return LLMProbe(
+        llm_service=llm_service,
+        interval=envs.READY_LLM_PROBE_INTERVAL,
+        timeout=envs.READY_LLM_PROBE_TIMEOUT,
+    )
+
+
+def _create_model_router(envs: ConfigEnvs, catalog):
+    if not envs.LLM_ROUTING:
+        return None
+    return TieredModelRouter(parse_routing_table(envs.LLM_ROUTING), catalog=catalog)
+
+
+def _create_shadow_scorer(envs: ConfigEnvs, registry: ModelRegistry):
+    versions = [v.strip() for v in (envs.SHADOW_MODELS or "").split(",") if v.strip()]
+    candidates = [
+        registry.load(registry.resolve(version), check_parity=False)
+        for version in versions
+    ]
+    return ShadowScorer(
+        candidates=candidates,
+        max_queue_size=envs.SHADOW_QUEUE_SIZE,
+        max_batch_size=envs.SHADOW_BATCH_SIZE,
+        registry=registry,
+    )
+
+
+def _create_trace_exporter(envs: ConfigEnvs):
+    if envs.TRACE_EXPORTER == "memory":
+        return InMemorySpanExporter()
+    if envs.TRACE_EXPORTER == "jsonl":
+        return JsonLinesSpanExporter(Path(envs.TRACE_FILE))
+    # "none": só os traces lentos em memória (/monitoring/traces)
+    return None
+
+
+def _create_report_cache(envs: ConfigEnvs):
+    if not envs.REPORT_CACHE_ENABLED:
+        return None
+    return ApproximateReportCache(
+        max_distance=envs.REPORT_CACHE_MAX_DISTANCE,
+        levels=envs.REPORT_CACHE_LEVELS,
+        max_entries=envs.REPORT_CACHE_MAX_ENTRIES,
+    )
+
+
+def _create_report_profiles(envs: ConfigEnvs):
+    if envs.REPORT_PROFILE_DEFAULT.lower() == "none":
+        return None
+    return ReportProfiles(
+        default=envs.REPORT_PROFILE_DEFAULT,
+        endpoint_profiles=parse_endpoint_profiles(envs.REPORT_ENDPOINT_PROFILES),
+        max_tokens=parse_profile_max_tokens(envs.REPORT_PROFILE_MAX_TOKENS),
+    )
+
+
+def _create_resumable_streams(envs: ConfigEnvs):
+    if not envs.STREAM_RESUME_ENABLED:
+        return None
+    return ResumableStreams(
+        ttl=envs.STREAM_RESUME_TTL,
+        max_streams=envs.STREAM_RESUME_MAX_STREAMS,
+        max_bytes=envs.STREAM_RESUME_MAX_BYTES,
+    )
+
+
+def _prediction_observers(
+    envs: ConfigEnvs,
+    shadow_scorer: ShadowScorer,
+    audit_sink: PredictionAuditSink,
+    drift_monitor: DriftMonitor,
+):
+    observers = [shadow_scorer]
+    if envs.AUDIT_LOG_ENABLED:
+        observers.append(audit_sink)
+    if envs.DRIFT_MONITOR_ENABLED:
+        observers.append(drift_monitor)
+    return observers
 
 
 class Container(containers.DeclarativeContainer):
     config = providers.Configuration()
     envs = providers.Singleton(ConfigEnvs)
 
+    # Admission control compartilhado por todas as chamadas ao provider
+    llm_admission = providers.Singleton(_create_admission_controller, envs=envs)
+
+    # Cassete de gravação/replay da LLM (None sem LLM_RECORD_CASSETTE/replay)
+    llm_cassette = providers.Singleton(_create_llm_cassette, envs=envs)
+
+    # Tokens, TTFT, tokens/s e custo por provider, modelo e endpoint
+    llm_usage = providers.Singleton(_create_llm_usage, envs=envs)
+
     llm_service = providers.Factory(
         _create_llm_service,
         envs=envs,
+        admission=llm_admission,
+        cassette=llm_cassette,
+        usage=llm_usage,
     )
 
-    # Serviço de predição de diabetes (Singleton - carrega modelo uma vez)
-    # O model_path é calculado internamente pelo serviço
-    prediction_service = providers.Singleton(DiabetesPredictionService)
+    # Modelos servidos pelo provider (descoberta ao vivo) e roteamento por tier
+    model_catalog = providers.Singleton(
+        _create_model_catalog, envs=envs, llm_service=llm_service
+    )
+
+    model_router = providers.Singleton(
+        _create_model_router, envs=envs, catalog=model_catalog
+    )
+
+    # Sonda de alcance da LLM (None com READY_LLM_PROBE_INTERVAL=0)
+    llm_probe = providers.Singleton(
+        _create_llm_probe, envs=envs, llm_service=llm_service
+    )
+
+    # Registry de versões do modelo (hot-reload com troca atômica)
+    model_registry = providers.Singleton(
+        ModelRegistry,
+        models_dir=providers.Callable(
+            lambda models_dir: Path(models_dir) if models_dir else DEFAULT_MODELS_DIR,
+            envs.provided.MODELS_DIR,
+        ),
+        watch_interval=envs.provided.MODEL_WATCH_INTERVAL,
+        parity_tolerance=envs.provided.MODEL_PARITY_TOLERANCE,
+    )
+
+    # Shadow scoring de modelos candidatos (fila limitada + worker em background)
+    shadow_scorer = providers.Singleton(
+        _create_shadow_scorer,
+        envs=envs,
+        registry=model_registry,
+    )
+
+    # Auditoria write-behind de todas as predições
+    audit_sink = providers.Singleton(
+        PredictionAuditSink,
+        directory=envs.provided.AUDIT_LOG_DIR,
+        max_queue_size=envs.provided.AUDIT_QUEUE_SIZE,
+        flush_rows=envs.provided.AUDIT_FLUSH_ROWS,
+        flush_interval=envs.provided.AUDIT_FLUSH_INTERVAL,
+        rotate_rows=envs.provided.AUDIT_ROTATE_ROWS,
+        rotate_interval=envs.provided.AUDIT_ROTATE_INTERVAL,
+    )
+
+    # Estatísticas online das features para detecção de drift
+    drift_monitor = providers.Singleton(
+        DriftMonitor,
+        registry=model_registry,
+        n_bins=envs.provided.DRIFT_BINS,
+    )
+
+    # Serviço de predição de diabetes (Singleton - lê o modelo ativo do registry)
+    # O model_path padrão é calculado internamente pelo serviço
+    prediction_service = providers.Singleton(
+        DiabetesPredictionService,
+        registry=model_registry,
+        observers=providers.Callable(
+            _prediction_observers,
+            envs=envs,
+            shadow_scorer=shadow_scorer,
+            audit_sink=audit_sink,
+            drift_monitor=drift_monitor,
+        ),
+        top_k_factors=envs.provided.TOP_K_FACTORS,
+    )
+
+    # Cache aproximado de relatórios (None quando desligado)
+    report_cache = providers.Singleton(_create_report_cache, envs=envs)
+
+    # Perfis de tamanho do relatório (None quando desligados)
+    report_profiles = providers.Singleton(_create_report_profiles, envs=envs)
 
     # Serviço de diagnóstico (Singleton - combina predição + LLM para relatórios)
     diagnostic_service = providers.Singleton(
         DiabetesDiagnosticService,
         prediction_service=prediction_service,
         llm_service=llm_service,
+        top_factors_only=envs.provided.PROMPT_TOP_FACTORS_ONLY,
+        sectioned=envs.provided.REPORT_SECTIONED,
+        report_cache=report_cache,
+        model_router=model_router,
+        report_profiles=report_profiles,
+    )
+
+    # Jobs assíncronos de relatório (fila persistida em SQLite)
+    report_job_store = providers.Singleton(
+        ReportJobStore,
+        db_path=envs.provided.REPORT_JOBS_DB,
+        lease_seconds=envs.provided.REPORT_JOB_LEASE_SECONDS,
+    )
+
+    report_job_service = providers.Singleton(
+        ReportJobService,
+        store=report_job_store,
+        diagnostic_service=diagnostic_service,
+        prediction_service=prediction_service,
+        workers=envs.provided.REPORT_JOB_WORKERS,
+    )
+
+    # Readiness do worker para o balanceador (só estado em memória)
+    readiness = providers.Singleton(
+        Readiness,
+        registry=model_registry,
+        admission=llm_admission,
+        llm_probe=llm_probe,
+        require_llm=envs.provided.READY_REQUIRE_LLM,
+        job_service=report_job_service,
+        audit_sink=audit_sink,
+    )
+
+    # Perfis de requisições gravados pelo ProfilingMiddleware
+    profile_store = providers.Singleton(
+        ProfileStore,
+        directory=envs.provided.PROFILING_DIR,
+        max_files=envs.provided.PROFILING_MAX_FILES,
+    )
+
+    # Tracing: exporter plugável e sampler que sempre guarda os traces mais lentos
+    trace_exporter = providers.Singleton(_create_trace_exporter, envs=envs)
+
+    trace_sampler = providers.Singleton(
+        SlowTraceSampler,
+        exporter=trace_exporter,
+        slowest_per_minute=envs.provided.TRACE_SLOWEST_PER_MINUTE,
+        sample_rate=envs.provided.TRACE_SAMPLE_RATE,
     )
+
+    # TTFB (preâmbulo) x TTFT (primeiro token da LLM) do /diagnostic/stream
+    stream_timings = providers.Singleton(StreamTimings)
+
+    # Contadores do WebSocket multiplexado (/diagnostic/ws)
+    multiplex_stats = providers.Singleton(MultiplexStats)
+
+    # Buffers do /diagnostic/stream para o cliente retomar após reconexão
+    resumable_streams = providers.Singleton(_create_resumable_streams, envs=envs)
+
+
+# Instância compartilhada por todas as rotas (mesmos singletons)
+container = Container()
@@ -0,0 +1,11 @@
+"""
+Feature store module - Splits de treino e teste versionados, mapeados em memória
+"""
+
+from api.infra.feature_store.feature_store import (
+    FeatureSet,
+    FeatureStore,
+    import_joblib_package,
+)
+
+__all__ = ["FeatureSet", "FeatureStore", "import_joblib_package"]
@@ -0,0 +1,319 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import joblib
+import numpy as np
+
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+
+MANIFEST_FILE = "manifest.json"
+# Versões novas apontam para cá depois de escritas por completo
+LATEST_FILE = "LATEST"
+_HASH_BLOCK = 16 * 1024 * 1024
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _as_array(value: Any) -> np.ndarray:
+    # DataFrame/Series do pandas viram o array contíguo que vai para o disco
+    values = value.to_numpy() if hasattr(value, "to_numpy") else np.asarray(value)
+    return np.ascontiguousarray(values)
+
+
+def scaler_params(scaler: Any) -> Optional[Dict[str, Any]]:
+    """Class and fitted arrays (attributes ending in '_') of a sklearn scaler"""
+    if scaler is None:
+        return None
+    params: Dict[str, Any] = {"type": type(scaler).__name__}
+    for name, value in vars(scaler).items():
+        if name.endswith("_") and not name.startswith("_"):
+            if isinstance(value, (np.ndarray, np.generic)):
+                value = value.tolist()
+            params[name] = value
+    if hasattr(scaler, "feature_range"):
+        params["feature_range"] = list(scaler.feature_range)
+    return params
+
+
+class FeatureSet(Mapping):
+    """
+    One version of the feature store, opened read-only: a mapping of split
+    name (X_train, y_train, ...) to a NumPy array memory-mapped from disk.
+
+    Arrays are mapped lazily on first access and never copied: every
+    process that opens the same version shares the pages of the OS cache.
+    """
+
+    def __init__(self, path: Path, manifest: Dict[str, Any]):
+        self.path = Path(path)
+        self.manifest = manifest
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def feature_names(self) -> List[str]:
+        return [feature["name"] for feature in self.manifest["features"]]
+
+    @property
+    def scaler(self) -> Optional[Dict[str, Any]]:
+        return self.manifest.get("scaler")
+
+    def __getitem__(self, split: str) -> np.ndarray:
+        array = self._arrays.get(split)
+        if array is None:
+            entry = self.manifest["splits"][split]
+            array = np.load(self.path / entry["file"], mmap_mode="r")
+            if (
+                list(array.shape) != entry["shape"]
+                or str(array.dtype) != entry["dtype"]
+            ):
+                raise ValueError(
+                    f"{split} is {array.dtype}{array.shape}, manifest says "
+                    f"{entry['dtype']}{tuple(entry['shape'])}"
+                )
+            self._arrays[split] = array
+        return array
+
+    def __iter__(self):
+        return iter(self.manifest["splits"])
+
+    def __len__(self) -> int:
+        return len(self.manifest["splits"])
+
+    def verify(self) -> None:
+        """
+        Recomputes the file hashes against the manifest.
+
+        Raises:
+            ValueError: a split file changed since it was written
+        """
+        for split, entry in self.manifest["splits"].items():
+            if _file_sha256(self.path / entry["file"]) != entry["sha256"]:
+                raise ValueError(f"{split} does not match its manifest hash")
+
+
+class FeatureStore:
+    """
+    Versioned on-disk store of preprocessed train/test splits.
+
+    Each version is a directory with one .npy file per split and a
+    manifest.json with the schema (feature names and dtypes), the scaler
+    parameters, the shape, dtype and SHA-256 of every file, and a content
+    hash over all of them, which is also the default version name. Versions
+    are written to a temporary directory and renamed into place, so readers
+    never see a partial one; writing a version again with the same content
+    keeps the directory already in place.
+
+        store = FeatureStore("data/feature_store")
+        features = store.open()          # versão em LATEST
+        X_train = features["X_train"]    # np.memmap somente leitura
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        # Diretórios ocultos são escritas em andamento ou versões aposentadas
+        return sorted(
+            path.name
+            for path in self.root.iterdir()
+            if not path.name.startswith(".") and (path / MANIFEST_FILE).exists()
+        )
+
+    @property
+    def latest(self) -> Optional[str]:
+        path = self.root / LATEST_FILE
+        if not path.exists():
+            return None
+        return path.read_text(encoding="utf-8").strip() or None
+
+    def open(self, version: Optional[str] = None, verify: bool = False) -> FeatureSet:
+        """
+        Opens a version (LATEST by default) read-only.
+
+        Raises:
+            FileNotFoundError: no such version
+            ValueError: verify=True and a file does not match the manifest
+        """
+        version = version or self.latest
+        path = self.root / version if version else None
+        if path is None or not (path / MANIFEST_FILE).exists():
+            raise FileNotFoundError(
+                f"No feature store version {version!r} in {self.root}"
+            )
+        with open(path / MANIFEST_FILE, encoding="utf-8") as f:
+            features = FeatureSet(path, json.load(f))
+        if verify:
+            features.verify()
+        return features
+
+    def write(
+        self,
+        splits: Mapping[str, Any],
+        feature_names: Optional[Sequence[str]] = None,
+        scaler: Any = None,
+        version: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> FeatureSet:
+        """
+        Writes a new version and points LATEST to it.
+
+        `splits` maps names to arrays (or DataFrames/Series); feature names
+        default to the columns of the first DataFrame. `scaler` is the fitted
+        sklearn scaler the features went through, saved as parameters.
+        """
+        arrays = {name: _as_array(value) for name, value in splits.items()}
+        if feature_names is None:
+            columns = next(
+                (v.columns for v in splits.values() if hasattr(v, "columns")), None
+            )
+            feature_names = list(columns) if columns is not None else None
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".staging-{os.getpid()}-{datetime.now():%H%M%S%f}"
+        staging.mkdir()
+        try:
+            entries = {}
+            for name, array in arrays.items():
+                np.save(staging / f"{name}.npy", array, allow_pickle=False)
+                entries[name] = {
+                    "file": f"{name}.npy",
+                    "shape": list(array.shape),
+                    "dtype": str(array.dtype),
+                    "sha256": _file_sha256(staging / f"{name}.npy"),
+                }
+
+            matrix = next((a for a in arrays.values() if a.ndim == 2), None)
+            width = matrix.shape[1] if matrix is not None else 0
+            names = list(feature_names or (f"f{i}" for i in range(width)))
+            # Sem split 2-D (só vetores) o dtype das features não é conhecido
+            dtype = str(matrix.dtype) if matrix is not None else None
+            features = [{"name": name, "dtype": dtype} for name in names]
+            scaler_entry = scaler_params(scaler)
+            # Hash dos dados, do schema e do scaler: mesma versão, mesmo conteúdo
+            content_hash = hashlib.sha256(
+                json.dumps(
+                    {
+                        "splits": {name: e["sha256"] for name, e in entries.items()},
+                        "features": features,
+                        "scaler": scaler_entry,
+                    },
+                    sort_keys=True,
+                ).encode()
+            ).hexdigest()
+
+            manifest = {
+                "version": version or content_hash[:12],
+                "created_at": datetime.now().isoformat(),
+                "content_hash": content_hash,
+                "features": features,
+                "scaler": scaler_entry,
+                "splits": entries,
+                "metadata": metadata or {},
+            }
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+            target = self.root / manifest["version"]
+            existing = self._read_manifest(target)
+            if existing is not None and existing["content_hash"] == content_hash:
+                # Mesmo conteúdo: leitores continuam com o diretório atual
+                shutil.rmtree(staging)
+                manifest = existing
+            elif target.exists():
+                # Reescrita explícita: o antigo sai do caminho com um rename
+                # (sem apagar arquivos sob leitores) e só então é removido
+                retired = staging.with_suffix(".retired")
+                target.rename(retired)
+                staging.rename(target)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                staging.rename(target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        latest = staging.with_suffix(".latest")
+        latest.write_text(manifest["version"], encoding="utf-8")
+        os.replace(latest, self.root / LATEST_FILE)
+        return FeatureSet(target, manifest)
+
+    @staticmethod
+    def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path / MANIFEST_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+def import_joblib_package(
+    store: FeatureStore,
+    data_path: Path,
+    model_path: Optional[Path] = None,
+    version: Optional[str] = None,
+) -> FeatureSet:
+    """
+    Converts a preprocessed_data.joblib package (X_train, X_test, y_train,
+    y_test) into a feature store version. The scaler and feature order come
+    from the model package when given.
+    """
+    package = joblib.load(data_path)
+    splits = {
+        name: package[name]
+        for name in ("X_train", "X_test", "y_train", "y_test")
+        if name in package
+    }
+    feature_names, scaler = None, None
+    if model_path is not None:
+        preprocessors = joblib.load(model_path).get("preprocessors", {})
+        scaler = preprocessors.get("scaler")
+        feature_names = preprocessors.get("feature_names")
+    if feature_names is None and np.shape(splits.get("X_train"))[1:] == (
+        len(FEATURE_ORDER),
+    ):
+        feature_names = FEATURE_ORDER
+    return store.write(
+        splits,
+        feature_names=feature_names,
+        scaler=scaler,
+        version=version,
+        metadata={"source": str(data_path)},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Writes a feature store version from a preprocessed_data.joblib"
+    )
+    parser.add_argument("data", type=Path, help="Path to preprocessed_data.joblib")
+    parser.add_argument("store", type=Path, help="Feature store root directory")
+    parser.add_argument("--model", type=Path, help="Model .joblib with the scaler")
+    parser.add_argument("--version", help="Version name (default: content hash)")
+    args = parser.parse_args()
+
+    features = import_joblib_package(
+        FeatureStore(args.store), args.data, args.model, args.version
+    )
+    print(f"Feature store version {features.version} written to {features.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+import argparse
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.application.services.prediction_observer import PredictionObserver
+from api.infra.services.predict_services.model_registry import (
+    FEATURE_ORDER,
+    LoadedModel,
+    ModelRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_STATS_FILE = "reference_stats.json"
+CATEGORICAL_FEATURES = ("education_level", "income_level")
+
+# Faixas usuais de PSI: < 0.1 estável, 0.1-0.25 moderado, > 0.25 drift
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+PSI_EPSILON = 1e-4
+
+
+def _merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Chan et al. merge of two (count, mean, M2) summaries"""
+    total = count_a + count_b
+    if total == 0:
+        return 0, mean_a, m2_a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (count_b / total)
+    m2 = m2_a + m2_b + delta**2 * (count_a * count_b / total)
+    return total, mean, m2
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population Stability Index between two distributions of the same bins"""
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    expected = np.clip(expected / max(expected.sum(), 1e-12), PSI_EPSILON, None)
+    actual = np.clip(actual / max(actual.sum(), 1e-12), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def psi_status(value: Optional[float]) -> Optional[str]:
+    if value is None:
+        return None
+    if value >= PSI_SIGNIFICANT:
+        return "significant"
+    if value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+class DriftBins:
+    """
+    Fixed equal-width bins per feature over the MinMaxScaler training range,
+    plus one underflow and one overflow bin. Categorical features are also
+    counted per class of their label encoder.
+    """
+
+    def __init__(self, loaded: LoadedModel, n_bins: int = 10):
+        self.n_bins = n_bins
+        scaler = loaded.preprocessors.get("scaler")
+        if scaler is None or not hasattr(scaler, "data_min_"):
+            raise ValueError(
+                f"Model {loaded.version} has no MinMaxScaler ranges for drift bins"
+            )
+
+        self.data_min = np.asarray(scaler.data_min_, dtype=float)
+        self.data_max = np.asarray(scaler.data_max_, dtype=float)
+        self.width = np.where(
+            self.data_max > self.data_min,
+            (self.data_max - self.data_min) / n_bins,
+            1.0,
+        )
+
+        encoders = loaded.preprocessors.get("label_encoders", {})
+        self.categories: Dict[str, List[str]] = {
+            name: [str(c) for c in encoders[name].classes_]
+            for name in CATEGORICAL_FEATURES
+            if name in encoders
+        }
+        self.category_index = {
+            name: FEATURE_ORDER.index(name) for name in self.categories
+        }
+
+    @property
+    def total_bins(self) -> int:
+        return self.n_bins + 2
+
+    def edges(self) -> List[List[float]]:
+        return [
+            np.linspace(low, high, self.n_bins + 1).round(6).tolist()
+            for low, high in zip(self.data_min, self.data_max)
+        ]
+
+    def assign(self, X_raw: np.ndarray) -> np.ndarray:
+        """Bin index (n, 18): 0 underflow, 1..n_bins inside range, n_bins+1 overflow"""
+        # floor < 0 vira -1 (underflow); x == data_max fica no último bin interno
+        index = np.floor((X_raw - self.data_min) / self.width)
+        index = np.clip(index, -1, self.n_bins - 1).astype(np.int64) + 1
+        return np.where(X_raw > self.data_max, self.n_bins + 1, index)
+
+    def histogram(self, X_raw: np.ndarray) -> np.ndarray:
+        """Counts per (feature, bin) for a batch, in one bincount"""
+        bins = self.assign(X_raw)
+        flat = bins + np.arange(bins.shape[1]) * self.total_bins
+        counts = np.bincount(flat.ravel(), minlength=bins.shape[1] * self.total_bins)
+        return counts.reshape(bins.shape[1], self.total_bins)
+
+    def category_counts(self, X_raw: np.ndarray) -> Dict[str, np.ndarray]:
+        counts = {}
+        for name, classes in self.categories.items():
+            codes = X_raw[:, self.category_index[name]].astype(np.int64)
+            codes = codes[(codes >= 0) & (codes < len(classes))]
+            counts[name] = np.bincount(codes, minlength=len(classes))
+        return counts
+
+
+class _Shard:
+    """Per-thread accumulator; its lock is only contended by snapshot()"""
+
+    def __init__(self, bins: DriftBins):
+        n_features = len(FEATURE_ORDER)
+        self.lock = threading.Lock()
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.histogram = np.zeros((n_features, bins.total_bins), dtype=np.int64)
+        self._feature_rows = np.arange(n_features)
+        self.categories = {
+            name: np.zeros(len(classes), dtype=np.int64)
+            for name, classes in bins.categories.items()
+        }
+
+    def update(self, X_raw: np.ndarray, bins: DriftBins) -> None:
+        if X_raw.shape[0] == 1:
+            self._update_one(X_raw[0], bins)
+            return
+
+        n = X_raw.shape[0]
+        batch_mean = X_raw.mean(axis=0)
+        batch_m2 = ((X_raw - batch_mean) ** 2).sum(axis=0)
+        histogram = bins.histogram(X_raw)
+        categories = bins.category_counts(X_raw)
+
+        with self.lock:
+            self.count, self.mean, self.m2 = _merge_moments(
+                self.count, self.mean, self.m2, n, batch_mean, batch_m2
+            )
+            self.histogram += histogram
+            for name, counts in categories.items():
+                self.categories[name] += counts
+
+    def _update_one(self, x: np.ndarray, bins: DriftBins) -> None:
+        # Caminho de uma requisição: Welford clássico e incrementos diretos
+        bin_index = bins.assign(x)
+        with self.lock:
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (x - self.mean)
+            self.histogram[self._feature_rows, bin_index] += 1
+            for name, i in bins.category_index.items():
+                code = int(x[i])
+                if 0 <= code < len(self.categories[name]):
+                    self.categories[name][code] += 1
+
+
+class _VersionStats:
+    """Accumulated live statistics for one model version"""
+
+    def __init__(self, loaded: LoadedModel, n_bins: int):
+        self.version = loaded.version
+        self.bins = DriftBins(loaded, n_bins)
+        self.reference = load_reference_stats(loaded)
+        if self.reference is None:
+            logger.warning(
+                "No %s for model %s in %s: drift PSI is disabled. Generate it "
+                "from the training split with "
+                "`python -m api.infra.monitoring.drift_monitor %s <train.csv>`",
+                REFERENCE_STATS_FILE,
+                loaded.version,
+                loaded.path.parent,
+                loaded.path,
+            )
+        self.reference_mismatch = reference_mismatch(self.reference, self.bins)
+        if self.reference_mismatch is not None:
+            logger.warning(
+                "%s for model %s does not match the drift bins (%s): histogram "
+                "PSI is disabled. Regenerate it with "
+                "`python -m api.infra.monitoring.drift_monitor %s <train.csv>`",
+                REFERENCE_STATS_FILE,
+                loaded.version,
+                self.reference_mismatch,
+                loaded.path,
+            )
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(self.bins)
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def snapshot(self) -> _Shard:
+        merged = _Shard(self.bins)
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            with shard.lock:
+                merged.count, merged.mean, merged.m2 = _merge_moments(
+                    merged.count,
+                    merged.mean,
+                    merged.m2,
+                    shard.count,
+                    shard.mean.copy(),
+                    shard.m2.copy(),
+                )
+                merged.histogram += shard.histogram
+                for name, counts in shard.categories.items():
+                    merged.categories[name] += counts
+        return merged
+
+
+class DriftMonitor(PredictionObserver):
+    """
+    Online feature-drift monitor fed from the prediction path.
+
+    Keeps, per feature, running moments (Welford), a fixed-bin histogram over
+    the MinMaxScaler training range and, for categorical features, class
+    frequencies. No raw request is stored. Each thread updates its own shard,
+    so observe() is O(features) and never waits on other request threads;
+    shards are merged only when the report is built. PSI is computed against
+    reference_stats.json stored next to model_metadata.json.
+    """
+
+    def __init__(self, registry: ModelRegistry, n_bins: int = 10):
+        self.registry = registry
+        self.n_bins = n_bins
+        self._stats: Optional[_VersionStats] = None
+        self._stats_lock = threading.Lock()
+
+    def observe(
+        self,
+        features: np.ndarray,
+        probabilities: np.ndarray,
+        threshold: float,
+        model_version: str,
+    ) -> None:
+        stats = self._stats_for(model_version)
+        if stats is not None:
+            stats.shard().update(features, stats.bins)
+
+    def check_reference(self) -> bool:
+        """
+        Builds the statistics of the active model now, so a missing
+        reference_stats.json is reported at startup rather than on the first
+        prediction, as is one built with other bins. Returns whether PSI can
+        be computed.
+        """
+        active = self.registry.active
+        if active is None:
+            return False
+        stats = self._stats_for(active.version)
+        return (
+            stats is not None
+            and stats.reference is not None
+            and stats.reference_mismatch is None
+        )
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            self._stats = None
+
+    def report(self) -> Dict[str, Any]:
+        stats = self._stats
+        if stats is None:
+            return {"model_version": None, "samples": 0, "features": {}}
+
+        live = stats.snapshot()
+        reference = stats.reference
+        ref_features = (reference or {}).get("features", {})
+        std = np.sqrt(live.m2 / live.count) if live.count > 1 else None
+
+        features = {}
+        for i, name in enumerate(FEATURE_ORDER):
+            ref = ref_features.get(name)
+            if name in live.categories:
+                counts = live.categories[name]
+                labels = stats.bins.categories[name]
+                entry = {
+                    "frequencies": (
+                        dict(zip(labels, (counts / live.count).round(4).tolist()))
+                        if live.count
+                        else {}
+                    )
+                }
+                ref_counts = (
+                    [ref["frequencies"].get(label, 0.0) for label in labels]
+                    if ref and "frequencies" in ref
+                    else None
+                )
+            else:
+                entry = {
+                    "mean": float(live.mean[i]) if live.count else None,
+                    "std": float(std[i]) if std is not None else None,
+                    "histogram": live.histogram[i].tolist(),
+                }
+                counts = live.histogram[i]
+                # Referência com outros bins: PSI fica null em vez de comparar
+                # histogramas de tamanhos diferentes
+                ref_counts = (
+                    ref.get("histogram")
+                    if ref and stats.reference_mismatch is None
+                    else None
+                )
+
+            value = (
+                round(psi(ref_counts, counts), 6)
+                if live.count and ref_counts is not None
+                else None
+            )
+            entry["psi"] = value
+            entry["status"] = psi_status(value)
+            if ref and "mean" in ref:
+                entry["reference_mean"] = ref["mean"]
+            features[name] = entry
+
+        psi_values = [f["psi"] for f in features.values() if f["psi"] is not None]
+        max_psi = max(psi_values) if psi_values else None
+        return {
+            "model_version": stats.version,
+            "samples": live.count,
+            "reference_available": reference is not None,
+            "reference_samples": (reference or {}).get("samples"),
+            "reference_mismatch": stats.reference_mismatch,
+            "bins": self.n_bins,
+            "max_psi": max_psi,
+            "status": psi_status(max_psi),
+            "drifted_features": sorted(
+                name
+                for name, entry in features.items()
+                if entry["status"] == "significant"
+            ),
+            "features": features,
+        }
+
+    def _stats_for(self, model_version: str) -> Optional[_VersionStats]:
+        stats = self._stats
+        if stats is not None and stats.version == model_version:
+            return stats
+
+        with self._stats_lock:
+            stats = self._stats
+            if stats is not None and stats.version == model_version:
+                return stats
+            active = self.registry.active
+            if active is None or active.version != model_version:
+                # Predição de uma versão que já saiu (troca em andamento)
+                return None
+            try:
+                self._stats = _VersionStats(active, self.n_bins)
+            except ValueError:
+                return None
+            return self._stats
+
+
+def load_reference_stats(loaded: LoadedModel) -> Optional[Dict[str, Any]]:
+    path = loaded.path.parent / REFERENCE_STATS_FILE
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def reference_mismatch(
+    reference: Optional[Dict[str, Any]], bins: DriftBins
+) -> Optional[str]:
+    """Why the reference histograms cannot be compared to `bins`, or None"""
+    if reference is None:
+        return None
+    ref_bins = reference.get("bins")
+    if ref_bins is not None and ref_bins != bins.n_bins:
+        return f"reference built with {ref_bins} bins, monitor uses {bins.n_bins}"
+    for name, entry in reference.get("features", {}).items():
+        histogram = entry.get("histogram")
+        if histogram is not None and len(histogram) != bins.total_bins:
+            return (
+                f"reference histogram of {name} has {len(histogram)} bins, "
+                f"expected {bins.total_bins}"
+            )
+    return None
+
+
+def build_reference_stats(
+    loaded: LoadedModel, X_raw: np.ndarray, n_bins: int = 10
+) -> Dict[str, Any]:
+    """Reference statistics of the training features (encoded, not scaled)"""
+    bins = DriftBins(loaded, n_bins)
+    histogram = bins.histogram(X_raw)
+    categories = bins.category_counts(X_raw)
+    samples = int(X_raw.shape[0])
+
+    features = {}
+    for i, name in enumerate(FEATURE_ORDER):
+        entry = {
+            "mean": float(X_raw[:, i].mean()),
+            "std": float(X_raw[:, i].std()),
+            "histogram": histogram[i].tolist(),
+        }
+        if name in categories:
+            entry["frequencies"] = dict(
+                zip(
+                    bins.categories[name],
+                    (categories[name] / samples).round(6).tolist(),
+                )
+            )
+        features[name] = entry
+
+    return {
+        "model_version": loaded.version,
+        "samples": samples,
+        "bins": n_bins,
+        "edges": dict(zip(FEATURE_ORDER, bins.edges())),
+        "features": features,
+    }
+
+
+def write_reference_stats(
+    loaded: LoadedModel, records: pd.DataFrame, n_bins: int = 10
+) -> Path:
+    """Builds reference stats from training records and saves them next to the model"""
+    stats = build_reference_stats(loaded, loaded.encode(records), n_bins)
+    path = loaded.path.parent / REFERENCE_STATS_FILE
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Writes reference_stats.json for a model from its training data"
+    )
+    parser.add_argument("model", type=Path, help="Path to the model .joblib")
+    parser.add_argument("data", type=Path, help="CSV with the training features")
+    parser.add_argument("--bins", type=int, default=10)
+    args = parser.parse_args()
+
+    loaded = LoadedModel.from_path(args.model)
+    path = write_reference_stats(loaded, pd.read_csv(args.data), args.bins)
+    print(f"Reference stats written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, List
+
+
+def _pick(sorted_samples: List[float], q: float) -> float:
+    index = math.ceil(q / 100 * len(sorted_samples)) - 1
+    return sorted_samples[min(len(sorted_samples) - 1, max(0, index))]
+
+
+class LatencyStats:
+    """Thread-safe rolling window of durations (seconds) with percentiles"""
+
+    def __init__(self, window: int = 2048):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        return _pick(samples, q) if samples else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {
+                "count": self.count,
+                "mean_ms": None,
+                "p50_ms": None,
+                "p95_ms": None,
+            }
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean * 1000, 3),
+            "p50_ms": round(_pick(samples, 50) * 1000, 3),
+            "p95_ms": round(_pick(samples, 95) * 1000, 3),
+            "p99_ms": round(_pick(samples, 99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
@@ -0,0 +1,248 @@
+import contextvars
+import json
+import statistics
+import threading
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from api.infra.monitoring.latency_stats import LatencyStats
+
+# Rota (ou origem, ex. "jobs") que disparou a chamada à LLM
+llm_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_endpoint", default="internal"
+)
+# Cliente da API (header de identificação ou chave) que disparou a chamada
+ANONYMOUS_CLIENT = "anonymous"
+llm_client: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_client", default=ANONYMOUS_CLIENT
+)
+
+# USD por 1M de tokens (entrada, saída); sobrescrito/estendido por LLM_PRICES
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+# Providers que rodam localmente: custo por token zero
+LOCAL_PROVIDERS = {"ollama", "stub"}
+
+# Tokens extras por mensagem do chat (papel e delimitadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def parse_prices(raw: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """DEFAULT_PRICES updated with LLM_PRICES ('{"model": [input, output]}')"""
+    prices = dict(DEFAULT_PRICES)
+    if raw:
+        for model, (input_price, output_price) in json.loads(raw).items():
+            prices[model] = (float(input_price), float(output_price))
+    return prices
+
+
+class TokenEstimator:
+    """
+    Local token count for calls whose provider reports no usage.
+
+    Uses the tiktoken encoding when it can be loaded (it is downloaded on
+    first use, so it may be missing offline) and ~4 characters per token
+    otherwise. The encoding is loaded once, on the first estimate.
+    """
+
+    def __init__(self, encoding: Optional[str] = "o200k_base"):
+        self.encoding_name = encoding if encoding and encoding != "none" else None
+        self._encoding = None
+        self._loaded = self.encoding_name is None
+        self._lock = threading.Lock()
+
+    @property
+    def method(self) -> str:
+        if self._encoding is not None or not self._loaded:
+            return self.encoding_name
+        return "chars/4"
+
+    def load(self) -> None:
+        """Loads the encoding now (the app does it at startup, off the loop)"""
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                import tiktoken
+
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception:
+                self._encoding = None
+            self._loaded = True
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if not self._loaded:
+            self.load()
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, round(len(text) / 4))
+
+    def count_prompt(self, system_prompt: str, prompt: str) -> int:
+        messages = [m for m in (system_prompt, prompt) if m]
+        return sum(self.count(m) for m in messages) + (
+            MESSAGE_OVERHEAD_TOKENS * len(messages)
+        )
+
+
+def collect_usage(sink: Optional[Dict[str, int]], message: Any) -> None:
+    """Adds the usage_metadata of a LangChain message or chunk to the sink"""
+    metadata = getattr(message, "usage_metadata", None)
+    if sink is None or not metadata:
+        return
+    sink["prompt_tokens"] = sink.get("prompt_tokens", 0) + metadata.get(
+        "input_tokens", 0
+    )
+    sink["completion_tokens"] = sink.get("completion_tokens", 0) + metadata.get(
+        "output_tokens", 0
+    )
+
+
+class _UsageRow:
+    """Totals of one (provider, model, endpoint)"""
+
+    def __init__(self, window: int):
+        self.calls = 0
+        self.streams = 0
+        self.errors = 0
+        self.estimated = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.generation_seconds = 0.0
+        self.cost_usd: Optional[float] = 0.0
+        self.ttft = LatencyStats(window)
+        self.duration = LatencyStats(window)
+        self.tokens_per_s: deque = deque(maxlen=window)
+
+
+class LLMUsageStats:
+    """
+    In-memory token, latency and cost accounting of LLM calls, aggregated per
+    provider, model and endpoint.
+
+    Tokens/s is the decode rate: completion tokens over the time after the
+    first token (whole call for invoke). Cost uses the per-model price table
+    (USD per 1M tokens); local providers cost nothing and models without a
+    price report cost null.
+    """
+
+    def __init__(
+        self,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        estimator: Optional[TokenEstimator] = None,
+        window: int = 2048,
+    ):
+        self.prices = DEFAULT_PRICES if prices is None else prices
+        self.estimator = estimator or TokenEstimator()
+        self.window = window
+        self._lock = threading.Lock()
+        self._rows: Dict[Tuple[str, str, str], _UsageRow] = {}
+
+    def price(self, provider: str, model: str) -> Optional[Tuple[float, float]]:
+        if model in self.prices:
+            return self.prices[model]
+        if provider in LOCAL_PROVIDERS:
+            return (0.0, 0.0)
+        return None
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        duration: float,
+        ttft: Optional[float] = None,
+        stream: bool = False,
+        estimated: bool = False,
+        error: bool = False,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        endpoint = endpoint or llm_endpoint.get()
+        # Decode: tempo depois do primeiro token (stream) ou a chamada inteira
+        generation = duration - ttft if ttft is not None else duration
+        price = self.price(provider, model)
+
+        with self._lock:
+            row = self._rows.get((provider, model, endpoint))
+            if row is None:
+                row = self._rows[(provider, model, endpoint)] = _UsageRow(self.window)
+            row.calls += 1
+            row.errors += error
+            row.estimated += estimated
+            row.prompt_tokens += prompt_tokens
+            row.completion_tokens += completion_tokens
+            if price is None:
+                row.cost_usd = None
+            elif row.cost_usd is not None:
+                row.cost_usd += (
+                    prompt_tokens * price[0] + completion_tokens * price[1]
+                ) / 1e6
+            row.streams += stream
+            if ttft is not None:
+                row.ttft.record(ttft)
+            row.duration.record(duration)
+            if completion_tokens and generation > 0:
+                row.generation_seconds += generation
+                row.tokens_per_s.append(completion_tokens / generation)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            items = sorted(self._rows.items())
+            rows = [(key, row, sorted(row.tokens_per_s)) for key, row in items]
+
+        usage = []
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        cost: Optional[float] = 0.0
+        for (provider, model, endpoint), row, rates in rows:
+            usage.append(
+                {
+                    "provider": provider,
+                    "model": model,
+                    "endpoint": endpoint,
+                    "calls": row.calls,
+                    "streams": row.streams,
+                    "errors": row.errors,
+                    "estimated_calls": row.estimated,
+                    "prompt_tokens": row.prompt_tokens,
+                    "completion_tokens": row.completion_tokens,
+                    "prompt_tokens_per_call": round(row.prompt_tokens / row.calls, 1),
+                    "completion_tokens_per_call": round(
+                        row.completion_tokens / row.calls, 1
+                    ),
+                    "tokens_per_s": (
+                        round(row.completion_tokens / row.generation_seconds, 1)
+                        if row.generation_seconds
+                        else None
+                    ),
+                    "tokens_per_s_p50": (
+                        round(statistics.median(rates), 1) if rates else None
+                    ),
+                    "time_to_first_token": row.ttft.summary(),
+                    "duration": row.duration.summary(),
+                    "cost_usd": (
+                        round(row.cost_usd, 6) if row.cost_usd is not None else None
+                    ),
+                }
+            )
+            totals["calls"] += row.calls
+            totals["prompt_tokens"] += row.prompt_tokens
+            totals["completion_tokens"] += row.completion_tokens
+            if cost is not None:
+                cost = cost + row.cost_usd if row.cost_usd is not None else None
+
+        totals["cost_usd"] = round(cost, 6) if cost is not None else None
+        return {
+            "estimator": self.estimator.method,
+            "totals": totals,
+            "usage": usage,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rows.clear()
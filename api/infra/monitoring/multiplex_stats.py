@@ -0,0 +1,39 @@
+from typing import Any, Dict
+
+from api.infra.monitoring.latency_stats import LatencyStats
+
+
+class MultiplexStats:
+    """
+    Counters of the multiplexed WebSocket endpoint: connections, reports per
+    state and how often a slow client made the report tasks wait on the
+    bounded send queue.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.connections = 0
+        self.open_connections = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.running = 0
+        self.waiting = 0
+        self.send_blocked = 0
+        self.send_wait = LatencyStats(window)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "open_connections": self.open_connections,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "running": self.running,
+            "waiting": self.waiting,
+            "send_blocked": self.send_blocked,
+            "send_wait": self.send_wait.summary(),
+        }
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from api.application.services.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProbe:
+    """
+    LLM reachability, checked by a background task every `interval` seconds
+    (get_available_models: Ollama /api/tags, OpenAI /v1/models) and cached,
+    so readiness checks never wait on the provider.
+
+    A result older than `stale_after` intervals counts as unreachable: the
+    probe itself stopped running.
+    """
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        interval: float = 15.0,
+        timeout: float = 5.0,
+        stale_after: int = 3,
+    ):
+        self.llm_service = llm_service
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.reachable: Optional[bool] = None
+        self.checked_at: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self) -> bool:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                self.llm_service.get_available_models(), timeout=self.timeout
+            )
+        except Exception as e:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            if self.reachable is not False:
+                logger.warning("LLM probe failed: %s", self.last_error)
+            self.reachable = False
+        else:
+            self.consecutive_failures = 0
+            self.reachable = True
+        self.latency_ms = (time.perf_counter() - start) * 1000
+        self.checked_at = time.monotonic()
+        return self.reachable
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.checked_at is None
+            or time.monotonic() - self.checked_at > self.interval * self.stale_after
+        )
+
+    @property
+    def healthy(self) -> bool:
+        return bool(self.reachable) and not self.stale
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._probe_loop(), name="llm-probe")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "reachable": self.reachable,
+            "stale": self.stale,
+            "checked_s_ago": (
+                round(time.monotonic() - self.checked_at, 1)
+                if self.checked_at is not None
+                else None
+            ),
+            "latency_ms": (
+                round(self.latency_ms, 1) if self.latency_ms is not None else None
+            ),
+            "interval_s": self.interval,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+class Readiness:
+    """
+    Whether this worker should receive traffic, from state that is already
+    in memory: the active model (loaded and warmed by the smoke batch before
+    activation), the cached LLM probe, the LLM admission counters and the
+    job counts refreshed by the report job service and the audit queue
+    depth. No check does I/O, so
+    /ready costs nothing to the requests being served.
+
+    `load_score` is (LLM generations in use + queued + report jobs waiting
+    in the job queue) / max concurrency: 0 is idle, 1 is every slot busy,
+    above 1 work is waiting. A load balancer routing to the lowest score
+    spreads the LLM work.
+    """
+
+    def __init__(
+        self,
+        registry,
+        admission,
+        llm_probe: Optional[LLMProbe] = None,
+        require_llm: bool = True,
+        job_service=None,
+        audit_sink=None,
+    ):
+        self.registry = registry
+        self.admission = admission
+        self.llm_probe = llm_probe
+        self.require_llm = require_llm and llm_probe is not None
+        self.job_service = job_service
+        self.audit_sink = audit_sink
+
+    def check(self) -> Dict[str, Any]:
+        active = self.registry.active
+        admission = self.admission
+        in_use = admission.in_use
+        queue_depth = admission.queue_depth
+        job_counts = self.job_service.job_counts if self.job_service is not None else {}
+        # A fila de jobs é compartilhada pelos workers; os jobs que esperam
+        # ainda vão disputar as vagas da LLM
+        queued_jobs = job_counts.get("queued", 0)
+        load_score = (in_use + queue_depth + queued_jobs) / max(
+            admission.max_concurrency, 1
+        )
+
+        reasons: List[str] = []
+        if active is None:
+            reasons.append("model not loaded")
+        if self.require_llm and not self.llm_probe.healthy:
+            reasons.append(
+                "LLM not probed yet"
+                if self.llm_probe.reachable is None
+                else "LLM unreachable"
+            )
+        if queue_depth >= admission.max_queue_size:
+            # Novas requisições seriam descartadas com 503 na admissão
+            reasons.append("LLM queue full")
+        if self.audit_sink is not None and self.audit_sink.backlogged:
+            # Predições novas seriam recusadas até a auditoria alcançar
+            reasons.append("audit log backlogged")
+
+        return {
+            "ready": not reasons,
+            "reasons": reasons,
+            "load_score": round(load_score, 3),
+            "model": {
+                "loaded": active is not None,
+                "version": active.version if active is not None else None,
+            },
+            "llm": {
+                "required": self.require_llm,
+                **(self.llm_probe.status() if self.llm_probe is not None else {}),
+                "in_use": in_use,
+                "max_concurrency": admission.max_concurrency,
+                "queue_depth": queue_depth,
+                "max_queue_size": admission.max_queue_size,
+            },
+            "jobs": {
+                "queued": queued_jobs,
+                "running": job_counts.get("running", 0),
+            },
+        }
@@ -0,0 +1,218 @@
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Categoria pelo caminho do arquivo; a primeira que casar, da folha para a raiz
+CATEGORY_MARKERS = [
+    ("pandas", ("/pandas/",)),
+    ("sklearn", ("/sklearn/", "/joblib/")),
+    ("numpy", ("/numpy/", "/scipy/")),
+    ("langchain", ("/langchain", "/openai/", "/ollama/", "/tiktoken/")),
+    ("web", ("/fastapi/", "/starlette/", "/uvicorn/", "/httpx/", "/httpcore/")),
+]
+
+# Folhas que indicam thread esperando (I/O, fila, lock), não CPU
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+WORKER_THREAD_PREFIXES = ("AnyIO worker thread", "asyncio_", "report-section")
+
+APP_ROOT = str(Path(__file__).resolve().parents[2])
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(APP_ROOT):
+        return "api" + filename[len(APP_ROOT) :]
+    for marker in ("site-packages/", "dist-packages/"):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return Path(filename).name
+
+
+def frame_category(filename: str) -> Optional[str]:
+    if filename.startswith(APP_ROOT):
+        return "app"
+    for category, markers in CATEGORY_MARKERS:
+        if any(marker in filename for marker in markers):
+            return category
+    return None
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a daemon thread snapshots the stacks of the request
+    threads (the event loop thread plus threadpool workers that are not idle)
+    every `interval` seconds via sys._current_frames().
+
+    Samples are aggregated as folded stacks (flamegraph.pl / speedscope input)
+    and as time per category (our code vs pandas, sklearn, numpy, langchain).
+    Threadpool workers are shared, so concurrent requests can show up in the
+    same profile.
+    """
+
+    def __init__(self, loop_thread_id: int, interval: float = 0.005):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.leaves: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _target_threads(self) -> set:
+        targets = {self.loop_thread_id}
+        for thread in threading.enumerate():
+            if thread.name.startswith(WORKER_THREAD_PREFIXES):
+                targets.add(thread.ident)
+        return targets
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            targets = self._target_threads()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or thread_id not in targets:
+                    continue
+                self._sample(frame, is_loop=thread_id == self.loop_thread_id)
+
+    def _sample(self, frame, is_loop: bool) -> None:
+        leaf = frame.f_code
+        idle = (Path(leaf.co_filename).name, leaf.co_name) in IDLE_LEAVES
+        if idle and not is_loop:
+            # Worker ocioso no pool: não pertence a nenhuma requisição
+            return
+
+        names: List[str] = []
+        category = None
+        while frame is not None:
+            code = frame.f_code
+            names.append(
+                f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            )
+            if category is None:
+                category = frame_category(code.co_filename)
+            frame = frame.f_back
+
+        root = "event-loop" if is_loop else "worker"
+        self.stacks[";".join([root, *reversed(names)])] += 1
+        self.categories["io_wait" if idle else category or "other"] += 1
+        self.leaves[names[0]] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.samples or 1
+        return {
+            "duration_ms": round(self.duration * 1000, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "categories": {
+                name: {
+                    "samples": count,
+                    "ms": round(count * self.interval * 1000, 3),
+                    "share": round(count / total, 4),
+                }
+                for name, count in self.categories.most_common()
+            },
+            "top_leaves": [
+                {"frame": frame, "samples": count}
+                for frame, count in self.leaves.most_common(15)
+            ],
+        }
+
+
+class ProfileStore:
+    """Profiles on disk: <id>.folded (flamegraph input) and <id>.json (summary)"""
+
+    def __init__(self, directory: Path, max_files: int = 200):
+        self.directory = Path(directory)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def save(
+        self,
+        profile_id: str,
+        profiler: SamplingProfiler,
+        request_info: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        summary = {"id": profile_id, **request_info, **profiler.summary()}
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / f"{profile_id}.folded").write_text(
+                profiler.folded(), encoding="utf-8"
+            )
+            with open(
+                self.directory / f"{profile_id}.json", "w", encoding="utf-8"
+            ) as f:
+                json.dump(summary, f, indent=2)
+            self._evict()
+        return summary
+
+    def list(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            with open(path, encoding="utf-8") as f:
+                summary = json.load(f)
+            profiles.append(
+                {
+                    key: summary.get(key)
+                    for key in ("id", "method", "path", "status", "duration_ms")
+                }
+            )
+        return profiles
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(profile_id, ".json")
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def folded_path(self, profile_id: str) -> Optional[Path]:
+        return self._path(profile_id, ".folded")
+
+    def _path(self, profile_id: str, suffix: str) -> Optional[Path]:
+        # ids são gerados aqui; qualquer outra coisa (ex.: "../") é rejeitada
+        if not profile_id.replace("-", "").isalnum():
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.exists() else None
+
+    def _evict(self) -> None:
+        summaries = sorted(self.directory.glob("*.json"))
+        for path in summaries[: max(len(summaries) - self.max_files, 0)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".folded").unlink(missing_ok=True)
@@ -0,0 +1,25 @@
+from typing import Any, Dict
+
+from api.infra.monitoring.latency_stats import LatencyStats
+
+
+class StreamTimings:
+    """
+    Latency milestones of streamed responses, measured from the start of the
+    handler: first byte (the prediction preamble), first LLM token and end of
+    the stream.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.ttfb = LatencyStats(window)
+        self.ttft = LatencyStats(window)
+        self.total = LatencyStats(window)
+        self.overloaded_after_preamble = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "time_to_first_byte": self.ttfb.summary(),
+            "time_to_first_token": self.ttft.summary(),
+            "total": self.total.summary(),
+            "overloaded_after_preamble": self.overloaded_after_preamble,
+        }
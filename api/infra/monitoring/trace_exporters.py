@@ -0,0 +1,56 @@
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+from api.application.services.span_exporter import SpanExporter
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps exported spans in a list (tests and local inspection)"""
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def traces(self) -> Dict[str, List[Dict[str, Any]]]:
+        grouped = defaultdict(list)
+        with self._lock:
+            for span in self.spans:
+                grouped[span["trace_id"]].append(span)
+        return dict(grouped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends one JSON object per span to a file. Writes go through the file
+    buffer (no fsync per trace); the file is flushed and closed on shutdown.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(lines)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
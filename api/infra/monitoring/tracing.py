@@ -0,0 +1,317 @@
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from api.application.services.span_exporter import SpanExporter
+
+
+class Trace:
+    """Spans of one request; finished when its root span ends"""
+
+    __slots__ = ("trace_id", "root", "spans")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.root: Optional["Span"] = None
+        self.spans: List["Span"] = []
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration if self.root and self.root.duration else 0.0
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [span.to_dict() for span in self.spans]
+
+
+class Span:
+    """A timed operation inside a trace"""
+
+    __slots__ = (
+        "name",
+        "trace",
+        "span_id",
+        "parent_id",
+        "start_time",
+        "_start",
+        "duration",
+        "attributes",
+        "events",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: Trace,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.attributes = attributes or {}
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+    @property
+    def ended(self) -> bool:
+        return self.duration is not None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the span started (monotonic clock)"""
+        return time.perf_counter() - self._start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes) -> None:
+        offset = self.elapsed * 1000
+        self.events.append({"name": name, "offset_ms": round(offset, 3), **attributes})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": (
+                round(self.duration * 1000, 3) if self.duration is not None else None
+            ),
+            "attributes": self.attributes,
+            "events": self.events,
+            "error": self.error,
+        }
+
+
+class SlowTraceSampler:
+    """
+    Decides which finished traces reach the exporter.
+
+    A fraction (sample_rate) is exported right away; on top of that, the
+    slowest N traces of every wall-clock minute are always kept and exported
+    when the minute closes. The last minutes stay in memory for inspection.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        slowest_per_minute: int = 10,
+        sample_rate: float = 0.0,
+        history_minutes: int = 5,
+    ):
+        self.exporter = exporter
+        self.slowest_per_minute = slowest_per_minute
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._window: Optional[int] = None
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._history: deque = deque(maxlen=history_minutes)
+
+        self.finished = 0
+        self.exported = 0
+
+    def on_trace_end(self, trace: Trace) -> None:
+        exported = False
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self._export(trace)
+            exported = True
+
+        closed = None
+        with self._lock:
+            self.finished += 1
+            window = int(time.time() // 60)
+            if window != self._window:
+                closed = self._close_window_locked(window)
+
+            item = (trace.duration, next(self._seq), trace, exported)
+            if len(self._heap) < self.slowest_per_minute:
+                heapq.heappush(self._heap, item)
+            elif self._heap and item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+        if closed:
+            self._export_kept(closed)
+
+    def flush(self) -> None:
+        with self._lock:
+            closed = self._close_window_locked(None)
+        self._export_kept(closed)
+
+    def slowest(self) -> List[Dict[str, Any]]:
+        """Kept traces of the current and last minutes, slowest first"""
+        with self._lock:
+            items = list(self._heap) + [
+                item for window in self._history for item in window
+            ]
+        items.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {
+                "trace_id": trace.trace_id,
+                "name": trace.root.name,
+                "duration_ms": round(duration * 1000, 3),
+                "start_time": trace.root.start_time,
+                "spans": trace.to_dicts(),
+            }
+            for duration, _, trace, _ in items
+        ]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "finished": self.finished,
+            "exported": self.exported,
+            "slowest_per_minute": self.slowest_per_minute,
+            "sample_rate": self.sample_rate,
+        }
+
+    def _close_window_locked(self, window: Optional[int]) -> List[tuple]:
+        closed = sorted(self._heap, reverse=True)
+        if closed:
+            self._history.append(closed)
+        self._heap = []
+        self._window = window
+        return closed
+
+    def _export_kept(self, items: List[tuple]) -> None:
+        for _, _, trace, exported in items:
+            if not exported:
+                self._export(trace)
+
+    def _export(self, trace: Trace) -> None:
+        if self.exporter is None:
+            return
+        self.exporter.export(trace.to_dicts())
+        self.exported += 1
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Tracer:
+    """
+    Minimal contextvars-based tracer.
+
+    Spans are only recorded inside a trace started by start_trace()/trace();
+    everywhere else span() is a no-op, so instrumented code costs almost
+    nothing when tracing is off or the request is not traced.
+    """
+
+    def __init__(self, sampler: Optional[SlowTraceSampler] = None):
+        self.sampler = sampler
+
+    @property
+    def enabled(self) -> bool:
+        return self.sampler is not None
+
+    def configure(self, sampler: Optional[SlowTraceSampler]) -> None:
+        self.sampler = sampler
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_trace(self, name: str, **attributes) -> Optional[Span]:
+        if self.sampler is None:
+            return None
+        trace = Trace()
+        trace.root = Span(name, trace, attributes=attributes)
+        return trace.root
+
+    def start_span(
+        self, name: str, parent: Optional[Span] = None, **attributes
+    ) -> Optional[Span]:
+        parent = parent or _current_span.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace, parent=parent, attributes=attributes)
+
+    def end(self, span: Optional[Span], error: Optional[BaseException] = None) -> None:
+        if span is None or span.ended:
+            return
+        span.duration = span.elapsed
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        trace = span.trace
+        trace.spans.append(span)
+        if span is trace.root and self.sampler is not None:
+            self.sampler.on_trace_end(trace)
+
+    @contextmanager
+    def activate(self, span: Optional[Span]):
+        previous = _current_span.get()
+        _current_span.set(span)
+        try:
+            yield span
+        finally:
+            # set em vez de reset: o bloco pode terminar em outro contexto
+            # (ex.: gerador assíncrono consumido por outra task)
+            _current_span.set(previous)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+        with self.activate(span):
+            try:
+                yield span
+            except BaseException as e:
+                self.end(span, error=e)
+                raise
+        self.end(span)
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        root = self.start_trace(name, **attributes)
+        if root is None:
+            yield None
+            return
+        with self.activate(root):
+            try:
+                yield root
+            except BaseException as e:
+                self.end(root, error=e)
+                raise
+        self.end(root)
+
+    async def stream(
+        self, agen: AsyncIterator, span: Optional[Span] = None
+    ) -> AsyncIterator:
+        """
+        Iterates an async generator keeping its own trace context across steps,
+        even when the steps are driven by different tasks (route handler
+        first, StreamingResponse afterwards).
+        """
+        current = span or _current_span.get()
+        try:
+            while True:
+                token = _current_span.set(current)
+                try:
+                    item = await anext(agen)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    current = _current_span.get()
+                    _current_span.reset(token)
+                yield item
+        finally:
+            await agen.aclose()
+
+
+# Tracer global, configurado pela aplicação no startup (desligado por padrão)
+tracer = Tracer()
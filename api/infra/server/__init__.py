@@ -0,0 +1,23 @@
+"""
+Server module - Launcher de produção (gunicorn + workers uvicorn autoajustados)
+"""
+
+from api.infra.server.gunicorn_server import (
+    GunicornServer,
+    WorkerPlan,
+    autotune_workers,
+    build_options,
+    per_process_warnings,
+    plan_workers,
+    run_production_server,
+)
+
+__all__ = [
+    "GunicornServer",
+    "WorkerPlan",
+    "autotune_workers",
+    "build_options",
+    "per_process_warnings",
+    "plan_workers",
+    "run_production_server",
+]
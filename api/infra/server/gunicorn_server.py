@@ -0,0 +1,247 @@
+import math
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.util import import_app
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.server.uvicorn_worker import detect_event_loop, detect_http_parser
+
+APP_URI = "api.infra.web.app:app"
+WORKER_CLASS = "api.infra.server.uvicorn_worker.ApiUvicornWorker"
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+MEMINFO = Path("/proc/meminfo")
+
+# Estimativa quando o app não é pré-carregado no master para medir
+DEFAULT_WORKER_MEMORY = 300 * 2**20
+
+
+class WorkerPlan(NamedTuple):
+    """Worker count chosen by the launcher and the limits behind it"""
+
+    workers: int
+    cpus: float
+    memory_bytes: Optional[int]
+    worker_memory_bytes: int
+    reason: str
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit(cgroup_root: Path = CGROUP_ROOT) -> float:
+    """
+    CPUs this process may use: the affinity mask capped by the cgroup quota
+    (cgroup v2 cpu.max or v1 cfs_quota_us), as containers usually see the
+    host's core count in os.cpu_count().
+    """
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+
+    quota = period = None
+    cpu_max = _read(cgroup_root / "cpu.max")
+    if cpu_max:
+        value, _, value_period = cpu_max.partition(" ")
+        if value != "max":
+            quota, period = int(value), int(value_period or 100_000)
+    else:
+        value = _read(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+        value_period = _read(cgroup_root / "cpu" / "cpu.cfs_period_us")
+        if value and value_period and int(value) > 0:
+            quota, period = int(value), int(value_period)
+
+    if quota and period:
+        cpus = min(cpus, quota / period)
+    return cpus
+
+
+def memory_limit(
+    cgroup_root: Path = CGROUP_ROOT, meminfo: Path = MEMINFO
+) -> Optional[int]:
+    """Bytes available to the server: cgroup limit, else MemAvailable"""
+    limit = _read(cgroup_root / "memory.max")
+    if limit is None:
+        limit = _read(cgroup_root / "memory" / "memory.limit_in_bytes")
+    # v1 sem limite reporta um número enorme (página máxima alinhada)
+    if limit and limit != "max" and int(limit) < 2**60:
+        return int(limit)
+
+    for line in (_read(meminfo) or "").splitlines():
+        if line.startswith("MemAvailable:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+def current_rss() -> int:
+    """Resident memory of this process in bytes"""
+    statm = _read(Path("/proc/self/statm"))
+    if statm:
+        return int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_worker_memory() -> int:
+    """
+    RSS after importing the app and loading the model in this process, i.e.
+    what one worker costs. Used as the per-worker estimate when preloading,
+    where the import happens in the master anyway.
+    """
+    from api.infra.container.dependecies import container
+
+    import_app(APP_URI)
+    container.prediction_service()
+    return current_rss()
+
+
+def autotune_workers(
+    cpus: float,
+    memory_bytes: Optional[int],
+    worker_memory_bytes: int,
+    reserve_bytes: int = 0,
+    max_workers: Optional[int] = None,
+) -> WorkerPlan:
+    """
+    One async worker per CPU (the LLM wait is I/O, a worker only burns CPU on
+    validation, scoring and serialization), lowered to what fits in memory
+    after `reserve_bytes` and capped by `max_workers`.
+    """
+    workers = max(1, math.ceil(cpus))
+    reason = f"{cpus:g} CPUs"
+
+    if memory_bytes is not None:
+        fits = max(1, (memory_bytes - reserve_bytes) // worker_memory_bytes)
+        if fits < workers:
+            workers = fits
+            reason = (
+                f"memory: {memory_bytes / 2**20:.0f} MiB for "
+                f"{worker_memory_bytes / 2**20:.0f} MiB per worker"
+            )
+
+    if max_workers is not None and max_workers < workers:
+        workers = max(1, max_workers)
+        reason = "SERVER_MAX_WORKERS"
+
+    return WorkerPlan(workers, cpus, memory_bytes, worker_memory_bytes, reason)
+
+
+def plan_workers(envs: ConfigEnvs) -> WorkerPlan:
+    """Worker plan from the environment (SERVER_WORKERS wins over autotuning)"""
+    cpus = cpu_limit()
+    memory_bytes = memory_limit()
+
+    if envs.SERVER_WORKER_MEMORY_MB is not None:
+        worker_memory = envs.SERVER_WORKER_MEMORY_MB * 2**20
+    elif envs.SERVER_PRELOAD:
+        worker_memory = measure_worker_memory()
+    else:
+        worker_memory = DEFAULT_WORKER_MEMORY
+
+    if envs.SERVER_WORKERS is not None:
+        return WorkerPlan(
+            envs.SERVER_WORKERS, cpus, memory_bytes, worker_memory, "SERVER_WORKERS"
+        )
+    return autotune_workers(
+        cpus,
+        memory_bytes,
+        worker_memory,
+        reserve_bytes=envs.SERVER_MEMORY_RESERVE_MB * 2**20,
+        max_workers=envs.SERVER_MAX_WORKERS,
+    )
+
+
+def describe_plan(plan: WorkerPlan) -> str:
+    memory = f"{plan.memory_bytes / 2**20:.0f} MiB" if plan.memory_bytes else "unknown"
+    return (
+        f"{plan.workers} workers ({plan.reason}); cpus={plan.cpus:g} "
+        f"memory={memory} per_worker={plan.worker_memory_bytes / 2**20:.0f} MiB "
+        f"loop={detect_event_loop()} http={detect_http_parser()}"
+    )
+
+
+def per_process_warnings(envs: ConfigEnvs, plan: WorkerPlan) -> List[str]:
+    """State kept per worker process that multiplies or breaks with N workers"""
+    if plan.workers <= 1:
+        return []
+    warnings = [
+        f"LLM admission is per worker: the LLM receives up to {plan.workers}x "
+        f"LLM_MAX_CONCURRENCY generations and {plan.workers}x LLM_MAX_QUEUE_SIZE "
+        f"queued requests"
+    ]
+    if envs.STREAM_RESUME_ENABLED:
+        warnings.append(
+            "STREAM_RESUME_ENABLED keeps buffers per worker: reconnects need "
+            "sticky routing to the same worker"
+        )
+    return warnings
+
+
+def build_options(envs: ConfigEnvs, plan: WorkerPlan) -> Dict[str, Any]:
+    """Gunicorn settings for the production server"""
+    return {
+        "bind": f"{envs.SERVER_HOST}:{envs.SERVER_PORT}",
+        "workers": plan.workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": envs.SERVER_PRELOAD,
+        # Reciclagem: o worker termina as requisições em andamento e é trocado
+        "max_requests": envs.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": envs.SERVER_MAX_REQUESTS_JITTER,
+        "keepalive": envs.SERVER_KEEPALIVE,
+        "timeout": envs.SERVER_TIMEOUT,
+        "graceful_timeout": envs.SERVER_GRACEFUL_TIMEOUT,
+        # Heartbeat dos workers em memória, não no disco do container
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+    }
+
+
+class GunicornServer(BaseApplication):
+    """Embedded gunicorn application serving the FastAPI app"""
+
+    def __init__(
+        self,
+        options: Dict[str, Any],
+        app_uri: str = APP_URI,
+        on_starting: Optional[Callable] = None,
+    ):
+        self.options = options
+        self.app_uri = app_uri
+        self.on_starting = on_starting
+        super().__init__()
+
+    def init(self, parser, opts, args):
+        # Configuração vem de options (load_config), não da linha de comando
+        return None
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+        if self.on_starting is not None:
+            self.cfg.set("on_starting", self.on_starting)
+
+    def load(self):
+        return import_app(self.app_uri)
+
+
+def run_production_server(envs: Optional[ConfigEnvs] = None) -> None:
+    """Starts gunicorn with the autotuned worker plan (blocks until shutdown)"""
+    envs = envs or ConfigEnvs()
+    plan = plan_workers(envs)
+    summary = describe_plan(plan)
+    warnings = per_process_warnings(envs, plan)
+
+    def on_starting(arbiter):
+        arbiter.log.info("Production server: %s", summary)
+        for warning in warnings:
+            arbiter.log.warning("Production server: %s", warning)
+
+    GunicornServer(build_options(envs, plan), on_starting=on_starting).run()
@@ -0,0 +1,34 @@
+import importlib.util
+import warnings
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    # uvicorn.workers ainda funciona, só avisa que foi movido para outro pacote
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        from uvicorn.workers import UvicornWorker
+
+
+def detect_event_loop() -> str:
+    """uvloop when installed, otherwise the stdlib asyncio loop"""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def detect_http_parser() -> str:
+    """httptools when installed, otherwise the pure-Python h11"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class ApiUvicornWorker(UvicornWorker):
+    """
+    Gunicorn worker running the ASGI app on uvicorn, with the event loop and
+    HTTP parser picked explicitly (instead of uvicorn's silent "auto") so the
+    launcher can log what each worker actually uses.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": detect_event_loop(),
+        "http": detect_http_parser(),
+        "lifespan": "on",
+    }
@@ -1,10 +1,119 @@
-from typing import Dict, Any
+import asyncio
+import contextlib
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from api.application.services.diagnostic_service import DiagnosticService
 from api.application.services.llm_service import LLMService
+from api.application.services.model_router import ModelRoute, ModelRouter
+from api.application.services.report_cache import ReportCache
 from api.infra.services.predict_services.diabetes_prediction_service import (
     DiabetesPredictionService,
 )
-from api.infra.utils.prompt_builder import create_system_prompt, create_user_prompt
+from api.infra.monitoring.tracing import tracer
+from api.infra.services.report_profiles import ReportEarlyStop, ReportProfiles
+from api.infra.utils.data_formatter import format_stream_preamble
+from api.infra.utils.prompt_builder import (
+    REPORT_PROFILES,
+    REPORT_SECTIONS,
+    ReportProfile,
+    ReportSection,
+    create_section_prompt,
+    create_system_prompt,
+    create_user_prompt,
+    profile_sections,
+    report_stop_sequences,
+)
+
+LLM_PARAMS = {"temperature": 0.7, "top_p": 0.9}
+
+_SECTION_END = object()
+
+
+def format_section(section: ReportSection, text: str) -> str:
+    return f"## {section.title}\n\n{text.strip()}"
+
+
+class _SectionedReport:
+    """
+    Async iterator over a report generated section by section.
+
+    Every section gets its own LLM generation, all started at once; chunks
+    come out in the fixed section order, the current section streaming live
+    while the following ones buffer in memory until their turn.
+    """
+
+    def __init__(
+        self,
+        llm_service: LLMService,
+        section_prompts: List[Tuple[ReportSection, str]],
+        system_prompt: str,
+        llm_params: Optional[Dict[str, Any]] = None,
+    ):
+        self._llm_service = llm_service
+        self._system_prompt = system_prompt
+        self._llm_params = llm_params or LLM_PARAMS
+        self._sections = [section for section, _ in section_prompts]
+        self._queues = [asyncio.Queue() for _ in section_prompts]
+        self._errors: List[Optional[Exception]] = [None] * len(section_prompts)
+        self._tasks = [
+            asyncio.create_task(self._generate(index, section, prompt))
+            for index, (section, prompt) in enumerate(section_prompts)
+        ]
+        self._chunks = self._ordered_chunks()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._chunks.aclose()
+
+    async def _generate(self, index: int, section: ReportSection, prompt: str):
+        span = tracer.start_span("report.section", section=section.key)
+        llm_stream = None
+        try:
+            with tracer.activate(span):
+                llm_stream = self._llm_service.generate_response(
+                    user_input=prompt,
+                    system_prompt=self._system_prompt,
+                    **self._llm_params,
+                )
+                async for chunk in llm_stream:
+                    self._queues[index].put_nowait(chunk)
+        except Exception as e:
+            self._errors[index] = e
+            tracer.end(span, error=e)
+        finally:
+            tracer.end(span)
+            if llm_stream is not None:
+                await llm_stream.aclose()
+            self._queues[index].put_nowait(_SECTION_END)
+
+    def _raise_first_error(self) -> None:
+        error = next((e for e in self._errors if e is not None), None)
+        if error is not None:
+            raise error
+
+    async def _ordered_chunks(self):
+        for index, section in enumerate(self._sections):
+            # Falha de qualquer seção (ex.: fila da LLM cheia) interrompe já
+            self._raise_first_error()
+            yield ("\n\n" if index else "") + f"## {section.title}\n\n"
+            while True:
+                chunk = await self._queues[index].get()
+                if chunk is _SECTION_END:
+                    break
+                yield chunk
+        self._raise_first_error()
 
 
 class DiabetesDiagnosticService(DiagnosticService):
@@ -12,39 +121,333 @@ class DiabetesDiagnosticService(DiagnosticService):
         self,
         prediction_service: DiabetesPredictionService,
         llm_service: LLMService,
+        top_factors_only: bool = False,
+        sectioned: bool = False,
+        report_cache: Optional[ReportCache] = None,
+        model_router: Optional[ModelRouter] = None,
+        report_profiles: Optional[ReportProfiles] = None,
     ):
         self.prediction_service = prediction_service
         self.llm_service = llm_service
+        self.top_factors_only = top_factors_only
+        # Modo seccionado: uma geração por seção, em paralelo (menor latência
+        # total, mas cada relatório ocupa len(REPORT_SECTIONS) vagas na LLM)
+        self.sectioned = sectioned
+        self.report_cache = report_cache
+        # Modelo e orçamento de tokens por tier de risco (None: modelo padrão)
+        self.model_router = model_router
+        # Perfil de tamanho por requisição/endpoint (None: relatório sem limite)
+        self.report_profiles = report_profiles
 
     def generate_diagnostic_report(
         self,
         patient_data: Dict[str, Any],
+        profile: Optional[str] = None,
+        prediction: Optional[Dict[str, Any]] = None,
     ) -> str:
-        prediction_result = self.prediction_service.predict(patient_data)
+        report_profile = self._profile(profile)
+        prediction_result, features = self._predict(patient_data, prediction)
+        cache_key = self._cache_key(prediction_result, report_profile)
 
-        system_prompt = create_system_prompt()
-        user_prompt = create_user_prompt(patient_data, prediction_result)
+        cached = self._cached_report(features, patient_data, cache_key)
+        if cached is not None:
+            return cached
 
-        return self.llm_service.invoke(
-            prompt=user_prompt,
-            system_prompt=system_prompt,
-            temperature=0.7,
-            top_p=0.9,
-        )
+        route = self._route(prediction_result)
+        start = time.perf_counter()
+        early_stop = False
+        if self.sectioned:
+            report = self._generate_sectioned_report(
+                patient_data, prediction_result, route, report_profile
+            )
+        else:
+            with tracer.span("create_user_prompt"):
+                system_prompt = create_system_prompt()
+                user_prompt = create_user_prompt(
+                    patient_data,
+                    prediction_result,
+                    top_factors_only=self.top_factors_only,
+                    profile=report_profile,
+                )
+
+            report = self.llm_service.invoke(
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                **self._llm_params(route, profile=report_profile),
+            )
+            if report_profile is not None:
+                # Provider sem stop sequences: corta o texto depois das seções
+                guard = ReportEarlyStop(report_profile)
+                report = (guard.feed(report) + guard.flush()).strip()
+                early_stop = guard.stopped
+        if route is not None:
+            self.model_router.observe(route, time.perf_counter() - start)
+        self._observe_profile(report_profile, early_stop)
+
+        self._store_report(features, patient_data, cache_key, report)
+        return report
 
     async def generate_diagnostic_report_stream(
         self,
         patient_data: Dict[str, Any],
+        profile: Optional[str] = None,
+        prediction: Optional[Dict[str, Any]] = None,
     ):
-        prediction_result = self.prediction_service.predict(patient_data)
+        report_profile = self._profile(profile)
+        prediction_result, features = self._predict(patient_data, prediction)
+        cache_key = self._cache_key(prediction_result, report_profile)
+
+        cached = self._cached_report(features, patient_data, cache_key)
+        if cached is not None:
+            yield format_stream_preamble(prediction_result)
+            yield cached
+            return
+
+        route = self._route(prediction_result)
+        start = time.perf_counter()
+        guard = None
+        if self.sectioned:
+            section_prompts = self._section_prompts(
+                patient_data, prediction_result, report_profile
+            )
+            llm_stream = _SectionedReport(
+                self.llm_service,
+                section_prompts,
+                create_system_prompt(),
+                self._llm_params(
+                    route, sections=len(section_prompts), profile=report_profile
+                ),
+            )
+        else:
+            with tracer.span("create_user_prompt"):
+                system_prompt = create_system_prompt()
+                user_prompt = create_user_prompt(
+                    patient_data,
+                    prediction_result,
+                    top_factors_only=self.top_factors_only,
+                    profile=report_profile,
+                )
+
+            llm_stream = self.llm_service.generate_response(
+                user_input=user_prompt,
+                system_prompt=system_prompt,
+                **self._llm_params(route, profile=report_profile),
+            )
+            if report_profile is not None:
+                # Seções do perfil completas: para a geração sem esperar o fim
+                guard = ReportEarlyStop(report_profile)
+
+        # Pede o primeiro token já: a admissão na LLM começa enquanto o
+        # preâmbulo sai, e uma fila cheia ainda falha antes do primeiro byte
+        first_token = asyncio.ensure_future(anext(llm_stream))
+        try:
+            await asyncio.sleep(0)
+            if first_token.done() and not first_token.cancelled():
+                error = first_token.exception()
+                if error is not None and not isinstance(error, StopAsyncIteration):
+                    raise error
+
+            yield format_stream_preamble(prediction_result)
+
+            chunks = []
+            try:
+                first = await first_token
+                ttft = time.perf_counter() - start
+            except StopAsyncIteration:
+                return
+            chunk = first
+            while True:
+                text = chunk if guard is None else guard.feed(chunk)
+                if text:
+                    chunks.append(text)
+                    yield text
+                if guard is not None and guard.stopped:
+                    # O finally fecha o stream da LLM e libera a vaga já
+                    break
+                try:
+                    chunk = await anext(llm_stream)
+                except StopAsyncIteration:
+                    tail = "" if guard is None else guard.flush()
+                    if tail:
+                        chunks.append(tail)
+                        yield tail
+                    break
 
+            if route is not None:
+                self.model_router.observe(route, time.perf_counter() - start, ttft)
+            self._observe_profile(report_profile, guard is not None and guard.stopped)
+
+            # Só relatórios completos vão para o cache (não os interrompidos)
+            self._store_report(features, patient_data, cache_key, "".join(chunks))
+        finally:
+            if not first_token.done():
+                first_token.cancel()
+                with contextlib.suppress(BaseException):
+                    await first_token
+            await llm_stream.aclose()
+
+    def _route(self, prediction_result: Dict[str, Any]) -> Optional[ModelRoute]:
+        if self.model_router is None:
+            return None
+        with tracer.span("route_model") as span:
+            route = self.model_router.route(prediction_result)
+            if span is not None:
+                span.set_attribute("tier", route.tier)
+                span.set_attribute("model", route.model)
+        return route
+
+    @staticmethod
+    def _llm_params(
+        route: Optional[ModelRoute],
+        sections: int = 1,
+        profile: Optional[ReportProfile] = None,
+    ) -> Dict[str, Any]:
+        if route is None and profile is None:
+            return LLM_PARAMS
+        params = {**LLM_PARAMS, **(route.llm_params() if route else {})}
+        # Orçamento efetivo: o menor entre o do tier e o do perfil
+        budgets = [
+            tokens
+            for tokens in (
+                route.max_tokens if route else None,
+                profile.max_tokens if profile else None,
+            )
+            if tokens
+        ]
+        if budgets:
+            # Dividido entre as seções geradas em paralelo
+            params["max_tokens"] = math.ceil(min(budgets) / sections)
+        if profile is not None and sections == 1:
+            params["stop"] = report_stop_sequences(profile)
+        return params
+
+    def _profile(self, name: Optional[str]) -> Optional[ReportProfile]:
+        """
+        Raises:
+            ValueError: unknown profile name
+        """
+        if self.report_profiles is not None:
+            return self.report_profiles.resolve(name)
+        if name is None:
+            return None
+        if name not in REPORT_PROFILES:
+            raise ValueError(
+                f"Unknown report profile {name!r}; use {list(REPORT_PROFILES)}"
+            )
+        return REPORT_PROFILES[name]
+
+    def _observe_profile(
+        self, profile: Optional[ReportProfile], early_stop: bool
+    ) -> None:
+        if self.report_profiles is not None and profile is not None:
+            self.report_profiles.observe(profile, early_stop)
+
+    @staticmethod
+    def _cache_key(
+        prediction_result: Dict[str, Any], profile: Optional[ReportProfile]
+    ) -> Dict[str, Any]:
+        # Relatórios de perfis diferentes não se substituem no cache
+        if profile is None:
+            return prediction_result
+        return {**prediction_result, "report_profile": profile.name}
+
+    def _predict(
+        self,
+        patient_data: Dict[str, Any],
+        prediction: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], Optional[np.ndarray]]:
+        if prediction is not None:
+            # Predição feita pelo chamador: não pontua de novo (os observadores
+            # veriam o paciente duas vezes); o cache só precisa das features,
+            # e sem a mesma versão do modelo ele fica de fora
+            if self.report_cache is None:
+                return prediction, None
+            return prediction, self.prediction_service.features(
+                patient_data, prediction.get("model_version")
+            )
+        if self.report_cache is None:
+            return self.prediction_service.predict(patient_data), None
+        return self.prediction_service.predict_with_features(patient_data)
+
+    def _cached_report(
+        self,
+        features: Optional[np.ndarray],
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+    ) -> Optional[str]:
+        if self.report_cache is None or features is None:
+            return None
+        with tracer.span("report_cache.lookup") as span:
+            report = self.report_cache.lookup(features, patient_data, prediction_result)
+            if span is not None:
+                span.set_attribute("hit", report is not None)
+        return report
+
+    def _store_report(
+        self,
+        features: Optional[np.ndarray],
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+        report: str,
+    ) -> None:
+        if self.report_cache is not None and features is not None and report.strip():
+            self.report_cache.store(features, patient_data, prediction_result, report)
+
+    def _section_prompts(
+        self,
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+        profile: Optional[ReportProfile] = None,
+    ) -> List[Tuple[ReportSection, str]]:
+        sections = REPORT_SECTIONS if profile is None else profile_sections(profile)
+        with tracer.span("create_section_prompts"):
+            return [
+                (
+                    section,
+                    create_section_prompt(
+                        section,
+                        patient_data,
+                        prediction_result,
+                        top_factors_only=self.top_factors_only,
+                    ),
+                )
+                for section in sections
+            ]
+
+    def _generate_sectioned_report(
+        self,
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+        route: Optional[ModelRoute] = None,
+        profile: Optional[ReportProfile] = None,
+    ) -> str:
         system_prompt = create_system_prompt()
-        user_prompt = create_user_prompt(patient_data, prediction_result)
-
-        async for chunk in self.llm_service.generate_response(
-            user_input=user_prompt,
-            system_prompt=system_prompt,
-            temperature=0.7,
-            top_p=0.9,
-        ):
-            yield chunk
+        section_prompts = self._section_prompts(
+            patient_data, prediction_result, profile
+        )
+        llm_params = self._llm_params(
+            route, sections=len(section_prompts), profile=profile
+        )
+
+        def invoke_section(section: ReportSection, prompt: str) -> str:
+            with tracer.span("report.section", section=section.key):
+                return self.llm_service.invoke(
+                    prompt=prompt, system_prompt=system_prompt, **llm_params
+                )
+
+        # copy_context: cada thread herda o span atual para o trace
+        with ThreadPoolExecutor(
+            max_workers=len(section_prompts), thread_name_prefix="report-section"
+        ) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run, invoke_section, section, prompt
+                )
+                for section, prompt in section_prompts
+            ]
+            texts = [future.result() for future in futures]
+
+        return "\n\n".join(
+            format_section(section, text)
+            for (section, _), text in zip(section_prompts, texts)
+        )
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from api.application.services.diagnostic_service import DiagnosticService
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.monitoring.llm_usage import (
+    ANONYMOUS_CLIENT,
+    llm_client,
+    llm_endpoint,
+)
+from api.infra.services.jobs.report_job_store import ReportJobStore
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReportJobService:
+    """
+    Queues report generation as jobs and runs them on a pool of async workers.
+
+    The prediction is computed inline on submit; only the LLM report is
+    deferred. Workers claim jobs from the SQLite store, so concurrency is
+    bounded by the number of workers and pending jobs survive restarts.
+
+    A heartbeat task renews the leases of the jobs this process is running
+    and requeues jobs whose lease expired, so a job left by a dead process
+    is recovered by any live one without touching jobs of healthy processes.
+    The same task refreshes `job_counts` every poll_interval, so readers
+    such as /ready see the queue backlog without querying SQLite.
+    """
+
+    TERMINAL_STATUSES = (ReportJobStore.COMPLETED, ReportJobStore.FAILED)
+
+    def __init__(
+        self,
+        store: ReportJobStore,
+        diagnostic_service: DiagnosticService,
+        prediction_service: DiabetesPredictionService,
+        workers: int = 2,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+    ):
+        self.store = store
+        self.diagnostic_service = diagnostic_service
+        self.prediction_service = prediction_service
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self._tasks: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.job_counts: Dict[str, int] = {
+            status: 0
+            for status in (
+                ReportJobStore.QUEUED,
+                ReportJobStore.RUNNING,
+                ReportJobStore.COMPLETED,
+                ReportJobStore.FAILED,
+            )
+        }
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(
+        self, patient_data: Dict[str, Any], profile: Optional[str] = None
+    ) -> Dict[str, Any]:
+        prediction = self.prediction_service.predict(patient_data)
+        # O job guarda o cliente: a LLM o atende na fatia desse cliente
+        job_id = self.store.create(
+            patient_data, prediction, client=llm_client.get(), profile=profile
+        )
+        if self._loop is not None:
+            # submit roda no threadpool; acorda os workers no event loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return {
+            "job_id": job_id,
+            "status": ReportJobStore.QUEUED,
+            "prediction": prediction,
+        }
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Long-poll: returns once the job is completed/failed or timeout expires"""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in self.TERMINAL_STATUSES:
+            return job
+
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while job["status"] not in self.TERMINAL_STATUSES:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # Evento cobre jobs deste processo; o poll cobre outros workers
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), timeout=min(remaining, self.poll_interval)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                job = await asyncio.to_thread(self.store.get, job_id)
+        finally:
+            # Último a esperar (por fim do job, timeout ou cancelamento) leva
+            # o evento junto: jobs nunca concluídos não acumulam eventos
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                self._done_events.pop(job_id, None)
+        return job
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._requeue_expired()
+        self.job_counts = self.store.counts()
+
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"report-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._heartbeat_task = asyncio.create_task(
+            self._heartbeat(), name="report-job-heartbeat"
+        )
+
+    async def stop(self) -> None:
+        tasks = self._tasks + [t for t in (self._heartbeat_task,) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+        self._loop = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            # Contagens do heartbeat: /metrics não consulta o SQLite no event loop
+            "jobs": dict(self.job_counts),
+        }
+
+    def _requeue_expired(self) -> int:
+        recovered = self.store.requeue_expired()
+        if recovered:
+            logger.info("Requeued %d report jobs with an expired lease", recovered)
+        return recovered
+
+    async def _heartbeat(self) -> None:
+        # Renova bem antes do fim do lease para tolerar um ciclo atrasado
+        renew_interval = self.store.lease_seconds / 3
+        loop = asyncio.get_running_loop()
+        next_renewal = loop.time() + renew_interval
+        while True:
+            await asyncio.sleep(min(self.poll_interval, renew_interval))
+            try:
+                if loop.time() >= next_renewal:
+                    next_renewal = loop.time() + renew_interval
+                    await asyncio.to_thread(self.store.renew_leases)
+                    if await asyncio.to_thread(self._requeue_expired):
+                        self._wakeup.set()
+                self.job_counts = await asyncio.to_thread(self.store.counts)
+            except Exception:
+                logger.exception("Report job heartbeat failed")
+
+    async def _worker(self) -> None:
+        # Chamadas à LLM dos jobs aparecem como "jobs" no uso por endpoint
+        llm_endpoint.set("jobs")
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                # Worker parado no meio do job: volta para a fila sem gastar
+                # uma tentativa
+                await asyncio.to_thread(self.store.requeue, job["id"], False)
+                raise
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        llm_client.set(job.get("client") or ANONYMOUS_CLIENT)
+        try:
+            report = await asyncio.to_thread(
+                self.diagnostic_service.generate_diagnostic_report,
+                job["patient_data"],
+                job.get("profile"),
+                job["prediction"],
+            )
+        except LLMOverloadedError as e:
+            # LLM saturada: devolve o job para a fila, sem contar a tentativa, e
+            # espera antes de tentar de novo
+            await asyncio.to_thread(self.store.requeue, job["id"], False)
+            await asyncio.sleep(e.retry_after)
+            return
+        except Exception as e:
+            logger.exception("Report job %s failed", job["id"])
+            if job["attempts"] < self.max_attempts:
+                await asyncio.to_thread(self.store.requeue, job["id"])
+                return
+            await asyncio.to_thread(self.store.fail, job["id"], str(e))
+            self._notify(job["id"])
+            return
+
+        await asyncio.to_thread(self.store.complete, job["id"], report)
+        self._notify(job["id"])
+
+    def _notify(self, job_id: str) -> None:
+        event = self._done_events.pop(job_id, None)
+        if event is not None:
+            event.set()
@@ -0,0 +1,219 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    patient_data TEXT NOT NULL,
+    prediction TEXT NOT NULL,
+    client TEXT,
+    profile TEXT,
+    report TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_report_jobs_status_created
+    ON report_jobs (status, created_at);
+"""
+
+
+class ReportJobStore:
+    """
+    SQLite-backed job table. The database is the source of truth, so queued
+    jobs survive a worker or process restart.
+
+    A claimed job records its owner (host, pid and a per-store id) and a lease
+    that the owner renews with renew_leases() while it runs. The database is
+    shared by every worker process, so requeue_expired() only puts back jobs
+    whose lease ran out: their owner died or stopped renewing.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, db_path: Path, lease_seconds: float = 30.0):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        # Bancos criados antes das colunas client (fila justa por cliente),
+        # profile (perfil de tamanho do relatório) e owner/lease_expires_at
+        # (recuperação de jobs de processos mortos)
+        columns = {
+            row["name"] for row in self._conn.execute("PRAGMA table_info(report_jobs)")
+        }
+        for column, column_type in (
+            ("client", "TEXT"),
+            ("profile", "TEXT"),
+            ("owner", "TEXT"),
+            ("lease_expires_at", "REAL"),
+        ):
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE report_jobs ADD COLUMN {column} {column_type}"
+                )
+
+    def create(
+        self,
+        patient_data: Dict[str, Any],
+        prediction: Dict[str, Any],
+        client: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO report_jobs (id, status, patient_data, prediction, "
+                "client, profile, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    self.QUEUED,
+                    json.dumps(patient_data),
+                    json.dumps(prediction),
+                    client,
+                    profile,
+                    time.time(),
+                ),
+            )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically moves the oldest queued job to running and returns it"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM report_jobs WHERE status = ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (self.QUEUED,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE report_jobs SET status = ?, started_at = ?, "
+                    "attempts = attempts + 1, owner = ?, lease_expires_at = ? "
+                    "WHERE id = ?",
+                    (
+                        self.RUNNING,
+                        now,
+                        self.owner,
+                        now + self.lease_seconds,
+                        row["id"],
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = self._to_dict(row)
+        job["status"] = self.RUNNING
+        job["attempts"] += 1
+        job["owner"] = self.owner
+        return job
+
+    def complete(self, job_id: str, report: str) -> None:
+        self._finish(job_id, self.COMPLETED, report=report)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, self.FAILED, error=error)
+
+    def requeue(self, job_id: str, count_attempt: bool = True) -> None:
+        """
+        Puts a claimed job back in the queue. With count_attempt=False the
+        claim is not counted against max attempts (LLM overload, shutdown).
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE report_jobs SET status = ?, started_at = NULL, "
+                "owner = NULL, lease_expires_at = NULL, "
+                "attempts = attempts - ? WHERE id = ?",
+                (self.QUEUED, 0 if count_attempt else 1, job_id),
+            )
+
+    def renew_leases(self) -> int:
+        """Extends the lease of the running jobs claimed by this store"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE report_jobs SET lease_expires_at = ? "
+                "WHERE status = ? AND owner = ?",
+                (time.time() + self.lease_seconds, self.RUNNING, self.owner),
+            )
+        return cursor.rowcount
+
+    def requeue_expired(self) -> int:
+        """Puts running jobs whose owner stopped renewing the lease back in the queue"""
+        with self._lock:
+            # Linhas sem lease vêm de bancos anteriores à coluna
+            cursor = self._conn.execute(
+                "UPDATE report_jobs SET status = ?, started_at = NULL, "
+                "owner = NULL, lease_expires_at = NULL WHERE status = ? "
+                "AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (self.QUEUED, self.RUNNING, time.time()),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM report_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) AS total FROM report_jobs GROUP BY status"
+            ).fetchall()
+        counts = {
+            status: 0
+            for status in (self.QUEUED, self.RUNNING, self.COMPLETED, self.FAILED)
+        }
+        counts.update({row["status"]: row["total"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _finish(self, job_id: str, status: str, report=None, error=None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE report_jobs SET status = ?, report = ?, error = ?, "
+                "finished_at = ?, lease_expires_at = NULL WHERE id = ?",
+                (status, report, error, time.time(), job_id),
+            )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["patient_data"] = json.loads(job["patient_data"])
+        job["prediction"] = json.loads(job["prediction"])
+        return job
@@ -0,0 +1,487 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+from langchain_core.language_models import BaseChatModel
+
+from api.application.services.llm_service import LLMOverloadedError, LLMService
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.monitoring.llm_usage import llm_client, llm_endpoint
+from api.infra.monitoring.tracing import tracer
+
+
+# Classes de prioridade, da mais alta para a mais baixa
+PRIORITY_CLASSES = ("interactive", "standard", "batch")
+DEFAULT_PRIORITY = "standard"
+
+# Prioridade pelo endpoint que disparou a chamada (llm_endpoint)
+DEFAULT_ENDPOINT_PRIORITIES = {
+    "/diagnostic/stream": "interactive",
+    "/diagnostic/ws": "interactive",
+    "/diagnostic/invoke": "standard",
+    "jobs": "batch",
+}
+
+# Clientes além deste limite dividem a mesma fila ("other")
+MAX_TRACKED_CLIENTS = 1000
+OTHER_CLIENT = "other"
+
+
+def parse_client_weights(raw: Optional[str]) -> Dict[str, float]:
+    """LLM_CLIENT_WEIGHTS ('{"client": weight}'); weights must be positive"""
+    weights = {client: float(w) for client, w in json.loads(raw or "{}").items()}
+    invalid = [client for client, weight in weights.items() if weight <= 0]
+    if invalid:
+        raise ValueError(f"Client weights must be positive: {invalid}")
+    return weights
+
+
+def parse_endpoint_priorities(raw: Optional[str]) -> Dict[str, str]:
+    """DEFAULT_ENDPOINT_PRIORITIES updated with LLM_ENDPOINT_PRIORITIES"""
+    priorities = {**DEFAULT_ENDPOINT_PRIORITIES, **json.loads(raw or "{}")}
+    unknown = set(priorities.values()) - set(PRIORITY_CLASSES)
+    if unknown:
+        raise ValueError(
+            f"Unknown priority classes {sorted(unknown)}; use {PRIORITY_CLASSES}"
+        )
+    return priorities
+
+
+class _Waiter:
+    """A request parked in the admission queue (sync thread or asyncio task)"""
+
+    __slots__ = (
+        "event",
+        "future",
+        "loop",
+        "granted",
+        "shed",
+        "enqueued_at",
+        "client",
+        "priority",
+        "start_tag",
+    )
+
+    def __init__(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop],
+        client: "_ClientQueue",
+        priority: int,
+        start_tag: float,
+    ):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+        self.shed = False
+        self.enqueued_at = time.perf_counter()
+        self.client = client
+        self.priority = priority
+        self.start_tag = start_tag
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class _ClientQueue:
+    """Per-client state of the fair queue: waiters per class, tag and metrics"""
+
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.waiters = [deque() for _ in PRIORITY_CLASSES]
+        # Fim virtual do último pedido enfileirado (start-time fair queueing)
+        self.last_finish = 0.0
+        self.in_use = 0
+        self.admitted = 0
+        self.shed = 0
+        self.wait_time = LatencyStats(window=512)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.waiters)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "in_use": self.in_use,
+            "queued": {
+                name: len(queue)
+                for name, queue in zip(PRIORITY_CLASSES, self.waiters)
+                if queue
+            },
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "wait_time": self.wait_time.summary(),
+        }
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded wait queue and a maximum queue time,
+    scheduled by priority class and, within a class, by weighted fair
+    queueing across API clients.
+
+    Works for both sync callers (invoke, run in the threadpool) and asyncio
+    callers (streaming). A released slot is handed directly to the next
+    waiter, so admitted requests never race new arrivals for it. The next
+    waiter is the one of the highest class (interactive, standard, batch)
+    with the smallest start tag: each client's requests advance its virtual
+    time by 1/weight, so a client with a burst of thousands of requests only
+    gets its weighted share of the slots while others are waiting.
+    `reserved_slots` are only given to the interactive class, and when the
+    queue is full an arrival evicts the newest waiter of a lower class.
+
+    Requests that find the queue full, or that wait longer than
+    max_queue_time, are shed with LLMOverloadedError carrying a Retry-After
+    estimate. Client and class default to the llm_client and llm_endpoint
+    context variables of the request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue_size: int,
+        max_queue_time: float,
+        client_weights: Optional[Dict[str, float]] = None,
+        endpoint_priorities: Optional[Dict[str, str]] = None,
+        reserved_slots: int = 0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.max_queue_time = max_queue_time
+        self.client_weights = dict(client_weights or {})
+        self.endpoint_priorities = (
+            DEFAULT_ENDPOINT_PRIORITIES
+            if endpoint_priorities is None
+            else endpoint_priorities
+        )
+        self.reserved_slots = min(reserved_slots, max(max_concurrency - 1, 0))
+
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._queued = 0
+        self._virtual_time = 0.0
+        self._clients: Dict[str, _ClientQueue] = {}
+
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.shed_preempted = 0
+        self.wait_time = LatencyStats()
+        self.service_time = LatencyStats()
+        self.class_wait_time = [LatencyStats() for _ in PRIORITY_CLASSES]
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def priority_of(self, endpoint: Optional[str] = None) -> str:
+        """Priority class of an endpoint (the current request's by default)"""
+        endpoint = endpoint or llm_endpoint.get()
+        return self.endpoint_priorities.get(endpoint, DEFAULT_PRIORITY)
+
+    def acquire(
+        self, client: Optional[str] = None, priority: Optional[str] = None
+    ) -> None:
+        """Blocks the calling thread until a slot is granted or the request is shed"""
+        waiter = self._try_acquire_or_enqueue(None, client, priority)
+        if waiter is None:
+            return
+
+        waiter.event.wait(self.max_queue_time)
+        self._finish_wait(waiter)
+
+    async def acquire_async(
+        self, client: Optional[str] = None, priority: Optional[str] = None
+    ) -> None:
+        """Awaits a slot without blocking the event loop"""
+        waiter = self._try_acquire_or_enqueue(
+            asyncio.get_running_loop(), client, priority
+        )
+        if waiter is None:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter.future), timeout=self.max_queue_time
+            )
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # Cliente desconectou enquanto esperava: devolve o slot se já recebeu
+            with self._lock:
+                if waiter.granted:
+                    self._release_locked(waiter.client)
+                else:
+                    self._remove_waiter(waiter)
+            raise
+        self._finish_wait(waiter)
+
+    def release(self, client: Optional[str] = None) -> None:
+        with self._lock:
+            self._release_locked(self._client(client))
+
+    @contextmanager
+    def slot(self, client: Optional[str] = None, priority: Optional[str] = None):
+        client = client or llm_client.get()
+        with tracer.span("llm.admission_wait", provider=self.name, client=client):
+            self.acquire(client, priority)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.service_time.record(time.perf_counter() - start)
+            self.release(client)
+
+    @asynccontextmanager
+    async def slot_async(
+        self, client: Optional[str] = None, priority: Optional[str] = None
+    ):
+        client = client or llm_client.get()
+        with tracer.span("llm.admission_wait", provider=self.name, client=client):
+            await self.acquire_async(client, priority)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.service_time.record(time.perf_counter() - start)
+            self.release(client)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new request"""
+        mean_service = self.service_time.mean or 1.0
+        backlog = (self.queue_depth + 1) / max(self.max_concurrency, 1)
+        return int(min(60, max(1, math.ceil(mean_service * backlog))))
+
+    def status(self) -> Dict[str, Any]:
+        shed = self.shed_queue_full + self.shed_timeout + self.shed_preempted
+        total = self.admitted + shed
+        with self._lock:
+            clients = {
+                name: client.status() for name, client in sorted(self._clients.items())
+            }
+        return {
+            "provider": self.name,
+            "max_concurrency": self.max_concurrency,
+            "reserved_interactive_slots": self.reserved_slots,
+            "max_queue_size": self.max_queue_size,
+            "max_queue_time_s": self.max_queue_time,
+            "in_use": self.in_use,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "shed_preempted": self.shed_preempted,
+            "shed_rate": shed / total if total else 0.0,
+            "wait_time": self.wait_time.summary(),
+            "wait_time_by_priority": {
+                name: stats.summary()
+                for name, stats in zip(PRIORITY_CLASSES, self.class_wait_time)
+            },
+            "service_time": self.service_time.summary(),
+            "clients": clients,
+        }
+
+    def _client(self, name: Optional[str]) -> _ClientQueue:
+        name = name or llm_client.get()
+        client = self._clients.get(name)
+        if client is None:
+            if len(self._clients) >= MAX_TRACKED_CLIENTS and name != OTHER_CLIENT:
+                return self._client(OTHER_CLIENT)
+            client = self._clients[name] = _ClientQueue(
+                name, self.client_weights.get(name, 1.0)
+            )
+        return client
+
+    def _limit(self, priority: int) -> int:
+        # Slots reservados ficam só para a classe interativa
+        return self.max_concurrency - (self.reserved_slots if priority else 0)
+
+    def _has_waiters(self, up_to_priority: int) -> bool:
+        return any(
+            client.waiters[p]
+            for client in self._clients.values()
+            for p in range(up_to_priority + 1)
+        )
+
+    def _admit_locked(self, client: _ClientQueue, priority: int, wait: float) -> None:
+        self._in_use += 1
+        client.in_use += 1
+        client.admitted += 1
+        self.admitted += 1
+        self.wait_time.record(wait)
+        self.class_wait_time[priority].record(wait)
+        client.wait_time.record(wait)
+
+    def _try_acquire_or_enqueue(
+        self, loop, client_name: Optional[str], priority_name: Optional[str]
+    ) -> Optional[_Waiter]:
+        priority = PRIORITY_CLASSES.index(priority_name or self.priority_of())
+        with self._lock:
+            client = self._client(client_name)
+            if self._in_use < self._limit(priority) and not self._has_waiters(priority):
+                self._admit_locked(client, priority, 0.0)
+                return None
+
+            if self._queued >= self.max_queue_size and not self._evict_lower(priority):
+                self.shed_queue_full += 1
+                client.shed += 1
+                raise LLMOverloadedError(
+                    f"LLM provider '{self.name}' is saturated (queue full)",
+                    retry_after=self.retry_after(),
+                )
+
+            start_tag = max(self._virtual_time, client.last_finish)
+            client.last_finish = start_tag + 1.0 / client.weight
+            waiter = _Waiter(loop, client, priority, start_tag)
+            client.waiters[priority].append(waiter)
+            self._queued += 1
+            return waiter
+
+    def _evict_lower(self, priority: int) -> bool:
+        # Fila cheia: o pedido mais novo de uma classe inferior cede o lugar
+        for lower in range(len(PRIORITY_CLASSES) - 1, priority, -1):
+            queues = [c.waiters[lower] for c in self._clients.values()]
+            queues = [queue for queue in queues if queue]
+            if queues:
+                victim = max(queues, key=lambda queue: queue[-1].start_tag).pop()
+                self._queued -= 1
+                victim.shed = True
+                victim.wake()
+                return True
+        return False
+
+    def _finish_wait(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if not waiter.granted:
+                self._remove_waiter(waiter)
+                waiter.client.shed += 1
+                if waiter.shed:
+                    self.shed_preempted += 1
+                    reason = "preempted by higher-priority requests"
+                else:
+                    self.shed_timeout += 1
+                    reason = f"waited more than {self.max_queue_time}s"
+                raise LLMOverloadedError(
+                    f"LLM provider '{self.name}' is saturated ({reason})",
+                    retry_after=self.retry_after(),
+                )
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in range(len(PRIORITY_CLASSES)):
+            if self._in_use >= self._limit(priority):
+                continue
+            heads = [
+                client.waiters[priority]
+                for client in self._clients.values()
+                if client.waiters[priority]
+            ]
+            if heads:
+                # Menor start tag: o cliente que menos usou sua fatia
+                return min(heads, key=lambda queue: queue[0].start_tag).popleft()
+        return None
+
+    def _release_locked(self, client: _ClientQueue) -> None:
+        self._in_use -= 1
+        client.in_use -= 1
+        # Slot passa direto para o próximo da fila
+        waiter = self._next_waiter()
+        if waiter is not None:
+            self._queued -= 1
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            waiter.granted = True
+            self._admit_locked(
+                waiter.client,
+                waiter.priority,
+                time.perf_counter() - waiter.enqueued_at,
+            )
+            waiter.wake()
+
+    def _remove_waiter(self, waiter: _Waiter) -> None:
+        try:
+            waiter.client.waiters[waiter.priority].remove(waiter)
+            self._queued -= 1
+        except ValueError:
+            pass
+
+
+class AdmissionControlledLLMService(LLMService):
+    """Wraps a provider so every call goes through its AdmissionController"""
+
+    def __init__(self, inner: LLMService, controller: AdmissionController):
+        super().__init__(inner.envs)
+        self.inner = inner
+        self.controller = controller
+
+    def __getattr__(self, name: str):
+        # Atributos específicos do provider (model_name, ollama_host, ...)
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    @property
+    def model(self) -> BaseChatModel:
+        return self.inner.model
+
+    async def generate_response(self, user_input: str, system_prompt: str, **kwargs):
+        # Spans com pai explícito: os passos do gerador podem rodar em tasks diferentes
+        generate = tracer.start_span("llm.generate", provider=self.controller.name)
+        connect = tracer.start_span("llm.connect", parent=generate)
+        streaming = None
+        chunks = 0
+        error = None
+        try:
+            with tracer.activate(connect):
+                async with self.controller.slot_async():
+                    async for chunk in self.inner.generate_response(
+                        user_input=user_input, system_prompt=system_prompt, **kwargs
+                    ):
+                        if chunks == 0 and generate is not None:
+                            tracer.end(connect)
+                            generate.add_event("first_token")
+                            streaming = tracer.start_span("llm.stream", parent=generate)
+                        chunks += 1
+                        yield chunk
+        except GeneratorExit:
+            # Consumidor fechou o stream antes do fim: não é erro da LLM
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if generate is not None:
+                tracer.end(connect, error=error)
+                if streaming is not None:
+                    streaming.set_attribute("chunks", chunks)
+                    tracer.end(streaming, error=error)
+                generate.add_event("last_token", chunks=chunks)
+                tracer.end(generate, error=error)
+
+    def invoke(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        with tracer.span("llm.invoke", provider=self.controller.name):
+            with self.controller.slot():
+                return self.inner.invoke(
+                    prompt=prompt, system_prompt=system_prompt, **kwargs
+                )
+
+    async def get_available_models(self) -> list[str]:
+        return await self.inner.get_available_models()
@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from api.application.services.llm_service import LLMService
+from api.infra.config.env import ConfigEnvs
+
+
+class CassetteMissError(LookupError):
+    """Raised on replay when no recording matches the prompt (miss policy 'error')"""
+
+
+def cassette_key(system_prompt: str, prompt: str, params: Dict[str, Any]) -> str:
+    """Stable key for a call: prompts plus sampling params, not the model name"""
+    payload = json.dumps(
+        [
+            system_prompt,
+            prompt,
+            {k: v for k, v in sorted(params.items()) if k != "model"},
+        ],
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Cassette:
+    """
+    JSON-lines file of recorded LLM calls, one interaction per line:
+
+        {"key", "kind": "stream"|"invoke", "provider", "model", "params",
+         "system_prompt", "prompt", "chunks": [[offset_s, text], ...],
+         "duration", "recorded_at"}
+
+    Chunk offsets are seconds since the call started, so the first one is
+    the time to first token. Lines are appended as calls finish, which keeps
+    a cassette usable if the recording run is interrupted.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        self._key_turns: Dict[str, int] = {}
+        self._turn = 0
+        if self.path.exists():
+            self.load()
+
+    def load(self) -> None:
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        with self._lock:
+            self.entries = []
+            self._by_key = {}
+            self._by_kind = {}
+            for entry in entries:
+                self._index(entry)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._index(entry)
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self._by_key.setdefault(entry["key"], []).append(entry)
+        self._by_kind.setdefault(entry["kind"], []).append(entry)
+
+    def match(self, key: str) -> Optional[Dict[str, Any]]:
+        """Recording of this exact call (rotating when recorded several times)"""
+        with self._lock:
+            recordings = self._by_key.get(key)
+            if not recordings:
+                return None
+            turn = self._key_turns.get(key, 0)
+            self._key_turns[key] = turn + 1
+            return recordings[turn % len(recordings)]
+
+    def next(self, kind: str) -> Optional[Dict[str, Any]]:
+        """Next recording of the given kind, cycling through the cassette"""
+        with self._lock:
+            candidates = self._by_kind.get(kind) or self.entries
+            if not candidates:
+                return None
+            entry = candidates[self._turn % len(candidates)]
+            self._turn += 1
+            return entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class RecordingLLMService(LLMService):
+    """
+    Wraps a real provider and writes every completed call to a cassette:
+    the prompts, the chunk sequence and when each chunk arrived.
+
+    Streams closed before the last chunk are not recorded, so a cassette only
+    holds full generations.
+    """
+
+    def __init__(self, inner: LLMService, cassette: Cassette, provider: str):
+        super().__init__(inner.envs)
+        self.inner = inner
+        self.cassette = cassette
+        self.provider = provider
+
+    def __getattr__(self, name: str):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    @property
+    def model(self) -> BaseChatModel:
+        return self.inner.model
+
+    def _entry(
+        self,
+        kind: str,
+        system_prompt: str,
+        prompt: str,
+        params: Dict[str, Any],
+        chunks: List[List[Any]],
+        duration: float,
+    ) -> Dict[str, Any]:
+        return {
+            "key": cassette_key(system_prompt, prompt, params),
+            "kind": kind,
+            "provider": self.provider,
+            "model": getattr(self.inner, "model_name", None),
+            "params": params,
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            "chunks": chunks,
+            "duration": round(duration, 6),
+            "recorded_at": datetime.now().isoformat(),
+        }
+
+    async def generate_response(self, user_input: str, system_prompt: str, **kwargs):
+        chunks: List[List[Any]] = []
+        start = time.perf_counter()
+        async for chunk in self.inner.generate_response(
+            user_input=user_input, system_prompt=system_prompt, **kwargs
+        ):
+            chunks.append([round(time.perf_counter() - start, 6), chunk])
+            yield chunk
+        self.cassette.append(
+            self._entry(
+                "stream",
+                system_prompt,
+                user_input,
+                kwargs,
+                chunks,
+                time.perf_counter() - start,
+            )
+        )
+
+    def invoke(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        start = time.perf_counter()
+        response = self.inner.invoke(
+            prompt=prompt, system_prompt=system_prompt, **kwargs
+        )
+        duration = time.perf_counter() - start
+        self.cassette.append(
+            self._entry(
+                "invoke",
+                system_prompt,
+                prompt,
+                kwargs,
+                [[round(duration, 6), response]],
+                duration,
+            )
+        )
+        return response
+
+    async def get_available_models(self) -> list[str]:
+        return await self.inner.get_available_models()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": "record",
+            "cassette": str(self.cassette.path),
+            "recordings": len(self.cassette),
+        }
+
+
+class ReplayLLMService(LLMService):
+    """
+    LLM stand-in that plays back a cassette with the recorded timing.
+
+    A call is matched by its prompts and sampling params; with miss policy
+    "cycle" (default) calls that were not recorded get the next recording of
+    the same kind, so load tests with new patients still see the recorded
+    streaming profile. `time_scale` multiplies every recorded delay (0.5 plays
+    twice as fast, 0 as fast as possible).
+    """
+
+    def __init__(
+        self,
+        envs: ConfigEnvs,
+        cassette: Optional[Cassette] = None,
+        time_scale: Optional[float] = None,
+        miss_policy: Optional[str] = None,
+        **kwargs,
+    ):
+        super().__init__(envs)
+        if cassette is None:
+            cassette = Cassette(Path(envs.LLM_CASSETTE))
+        if not len(cassette):
+            raise ValueError(f"Cassette {cassette.path} has no recordings")
+        self.cassette = cassette
+        self.time_scale = (
+            envs.LLM_REPLAY_TIME_SCALE if time_scale is None else time_scale
+        )
+        self.miss_policy = miss_policy or envs.LLM_REPLAY_MISS_POLICY
+        self.model_name = cassette.entries[0].get("model") or "replay"
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self) -> BaseChatModel:
+        return FakeListChatModel(
+            responses=["".join(text for _, text in self.cassette.entries[0]["chunks"])]
+        )
+
+    def _recording(
+        self, kind: str, system_prompt: str, prompt: str, params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        entry = self.cassette.match(cassette_key(system_prompt, prompt, params))
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        if self.miss_policy == "error":
+            raise CassetteMissError("No recording matches this prompt")
+        return self.cassette.next(kind)
+
+    @staticmethod
+    def _chunks(entry: Dict[str, Any], max_tokens: Optional[int]) -> List[List[Any]]:
+        chunks = entry["chunks"]
+        return chunks[:max_tokens] if max_tokens else chunks
+
+    async def generate_response(self, user_input: str, system_prompt: str, **kwargs):
+        entry = self._recording("stream", system_prompt, user_input, kwargs)
+        start = time.perf_counter()
+        for offset, text in self._chunks(entry, kwargs.get("max_tokens")):
+            # Agenda pelo início da chamada: atrasos não se acumulam entre chunks
+            delay = start + offset * self.time_scale - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield text
+
+    def invoke(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        entry = self._recording("invoke", system_prompt, prompt, kwargs)
+        chunks = self._chunks(entry, kwargs.get("max_tokens"))
+        if chunks:
+            time.sleep(chunks[-1][0] * self.time_scale)
+        return "".join(text for _, text in chunks).strip()
+
+    async def get_available_models(self) -> list[str]:
+        return [self.model_name]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": "replay",
+            "cassette": str(self.cassette.path),
+            "recordings": len(self.cassette),
+            "time_scale": self.time_scale,
+            "miss_policy": self.miss_policy,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
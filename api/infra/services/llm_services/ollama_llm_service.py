@@ -1,12 +1,17 @@
-from typing import Optional
+from typing import Dict, List, Optional
+import httpx
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_ollama import ChatOllama
 from api.application.services.llm_service import LLMService
 from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.llm_usage import collect_usage
 
 
 class OllamaLLMService(LLMService):
+    # Preenche o dict `usage` com prompt_eval_count/eval_count do Ollama
+    REPORTS_USAGE = True
+
     def __init__(
         self,
         envs: ConfigEnvs,
@@ -42,6 +47,9 @@ class OllamaLLMService(LLMService):
         model: Optional[str] = None,
         temperature: float = 0.5,
         top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        usage: Optional[Dict[str, int]] = None,
     ):
         messages = []
         if system_prompt:
@@ -58,17 +66,21 @@ class OllamaLLMService(LLMService):
             streaming=self.stream,
             temperature=temperature,
             top_p=top_p,
+            num_predict=max_tokens,
+            stop=stop,
         )
 
         async for chunk in chat_model.astream(messages):
+            # A contagem de tokens vem no último chunk (done=True)
+            collect_usage(usage, chunk)
             yield chunk.content
 
     async def get_available_models(self) -> list[str]:
-        """Get list of available models"""
-        # Common Ollama models
-        return [
-            "llama3.2:1b",
-        ]
+        """Models pulled on the Ollama server (GET /api/tags)"""
+        async with httpx.AsyncClient(base_url=self.ollama_host, timeout=5.0) as client:
+            response = await client.get("/api/tags")
+            response.raise_for_status()
+        return [model["name"] for model in response.json().get("models", [])]
 
     def invoke(
         self,
@@ -77,6 +89,9 @@ class OllamaLLMService(LLMService):
         temperature: float = 0.5,
         top_p: float = 0.9,
         model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        usage: Optional[Dict[str, int]] = None,
     ) -> str:
         """
         Synchronous method to invoke LLM and get complete response.
@@ -87,6 +102,9 @@ class OllamaLLMService(LLMService):
             temperature: Sampling temperature
             top_p: Top-p sampling parameter
             model: Optional model name to override default
+            max_tokens: Optional limit of generated tokens (num_predict)
+            stop: Optional sequences that end the generation
+            usage: Optional dict filled with prompt/completion token counts
 
         Returns:
             Complete response string
@@ -106,8 +124,11 @@ class OllamaLLMService(LLMService):
             streaming=False,
             temperature=temperature,
             top_p=top_p,
+            num_predict=max_tokens,
+            stop=stop,
         )
         response = chat_model.invoke(messages)
+        collect_usage(usage, response)
 
         return response.content.strip()
 
@@ -1,12 +1,17 @@
-from typing import Optional
+from typing import Dict, List, Optional
+from openai import AsyncOpenAI
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 from api.application.services.llm_service import LLMService
 from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.llm_usage import collect_usage
 
 
 class OpenaiLLMService(LLMService):
+    # Preenche o dict `usage` com o usage da API (stream_usage no streaming)
+    REPORTS_USAGE = True
+
     def __init__(
         self,
         envs: ConfigEnvs,
@@ -24,23 +29,35 @@ class OpenaiLLMService(LLMService):
         return self._create_chat_model(temperature=0.5, top_p=0.9)
 
     def _create_chat_model(
-        self, temperature: float = 0.5, top_p: float = 0.9
+        self,
+        temperature: float = 0.5,
+        top_p: float = 0.9,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
     ) -> BaseChatModel:
         return ChatOpenAI(
-            model=self.model_name,
+            model=model or self.model_name,
             streaming=self.stream,
             openai_api_key=self.openai_api_key,
             temperature=temperature,
             top_p=top_p,
+            max_tokens=max_tokens,
+            stop=stop,
+            # Último chunk do stream traz prompt/completion tokens
+            stream_usage=True,
         )
 
     async def generate_response(
         self,
         user_input: str,
         system_prompt: str,
-        model: str = "default",
+        model: Optional[str] = None,
         temperature: float = 0.5,
         top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        usage: Optional[Dict[str, int]] = None,
     ):
         messages = []
         if system_prompt:
@@ -48,14 +65,26 @@ class OpenaiLLMService(LLMService):
         messages.append(HumanMessage(content=user_input))
 
         # Create model with temperature and top_p
-        chat_model = self._create_chat_model(temperature=temperature, top_p=top_p)
+        chat_model = self._create_chat_model(
+            temperature=temperature,
+            top_p=top_p,
+            model=model,
+            max_tokens=max_tokens,
+            stop=stop,
+        )
 
         async for chunk in chat_model.astream(messages):
+            collect_usage(usage, chunk)
             yield chunk.content
 
     async def get_available_models(self) -> list[str]:
-        """Get list of available models"""
-        return ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo"]
+        """Models this API key can use (GET /v1/models)"""
+        client = AsyncOpenAI(api_key=self.openai_api_key, timeout=5.0)
+        try:
+            page = await client.models.list()
+        finally:
+            await client.close()
+        return [model.id for model in page.data]
 
     def invoke(
         self,
@@ -63,6 +92,10 @@ class OpenaiLLMService(LLMService):
         system_prompt: str = "",
         temperature: float = 0.5,
         top_p: float = 0.9,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        usage: Optional[Dict[str, int]] = None,
     ) -> str:
         """
         Synchronous method to invoke LLM and get complete response.
@@ -72,6 +105,10 @@ class OpenaiLLMService(LLMService):
             system_prompt: System prompt (instructions for the LLM)
             temperature: Sampling temperature
             top_p: Top-p sampling parameter
+            model: Optional model name to override default
+            max_tokens: Optional limit of generated tokens
+            stop: Optional sequences that end the generation
+            usage: Optional dict filled with prompt/completion token counts
 
         Returns:
             Complete response string
@@ -82,8 +119,15 @@ class OpenaiLLMService(LLMService):
         messages.append(HumanMessage(content=prompt))
 
         # Create model with temperature and top_p
-        chat_model = self._create_chat_model(temperature=temperature, top_p=top_p)
+        chat_model = self._create_chat_model(
+            temperature=temperature,
+            top_p=top_p,
+            model=model,
+            max_tokens=max_tokens,
+            stop=stop,
+        )
         response = chat_model.invoke(messages)
+        collect_usage(usage, response)
 
         return response.content.strip()
 
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Optional
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from api.application.services.llm_service import LLMService
+from api.infra.config.env import ConfigEnvs
+
+STUB_REPORT = (
+    "Based on the clinical data and the model prediction, the patient's profile "
+    "was reviewed. The main risk factors are glycemic markers, body composition "
+    "and family history. Recommendations: keep a balanced diet, at least 150 "
+    "minutes of physical activity per week, and regular follow-up with HbA1c "
+    "and fasting glucose tests. This report does not replace a medical consultation."
+)
+
+
+class StubLLMService(LLMService):
+    """
+    Deterministic LLM stand-in for load tests and benchmarks.
+
+    Emulates a provider with a time-to-first-token, a per-token delay and a
+    limited number of generations processed at the same time (like a single
+    Ollama instance); extra requests wait inside the "server".
+    """
+
+    def __init__(
+        self,
+        envs: ConfigEnvs,
+        model: Optional[str] = None,
+        ttft: Optional[float] = None,
+        token_delay: Optional[float] = None,
+        tokens: Optional[int] = None,
+        capacity: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(envs)
+        self.model_name = model or "stub"
+        self.ttft = envs.STUB_LLM_TTFT if ttft is None else ttft
+        self.token_delay = (
+            envs.STUB_LLM_TOKEN_DELAY if token_delay is None else token_delay
+        )
+        self.tokens = envs.STUB_LLM_TOKENS if tokens is None else tokens
+        self.capacity = envs.STUB_LLM_CAPACITY if capacity is None else capacity
+        self._words = STUB_REPORT.split(" ")
+        self._server_slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def model(self) -> BaseChatModel:
+        return FakeListChatModel(responses=[STUB_REPORT])
+
+    def _token_stream(self, max_tokens: Optional[int] = None):
+        count = self.tokens if not max_tokens else min(self.tokens, max_tokens)
+        for i in range(count):
+            word = self._words[i % len(self._words)]
+            yield word if i == 0 else " " + word
+
+    async def generate_response(
+        self,
+        user_input: str,
+        system_prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        top_p: float = 0.9,
+        **kwargs,
+    ):
+        if self._server_slots is None and self.capacity > 0:
+            self._server_slots = asyncio.Semaphore(self.capacity)
+
+        if self._server_slots is None:
+            async for chunk in self._generate(kwargs.get("max_tokens")):
+                yield chunk
+            return
+
+        async with self._server_slots:
+            async for chunk in self._generate(kwargs.get("max_tokens")):
+                yield chunk
+
+    async def _generate(self, max_tokens: Optional[int] = None):
+        await asyncio.sleep(self.ttft)
+        for i, chunk in enumerate(self._token_stream(max_tokens)):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield chunk
+
+    async def get_available_models(self) -> list[str]:
+        """Get list of available models"""
+        return [self.model_name]
+
+    def invoke(
+        self,
+        prompt: str,
+        system_prompt: str = "",
+        temperature: float = 0.5,
+        top_p: float = 0.9,
+        **kwargs,
+    ) -> str:
+        chunks = list(self._token_stream(kwargs.get("max_tokens")))
+        time.sleep(self.ttft + self.token_delay * max(len(chunks) - 1, 0))
+        return "".join(chunks).strip()
+
+    async def get_model_response(self, user_input: str, system_prompt: str):
+        async for chunk in self.generate_response(user_input, system_prompt):
+            yield chunk
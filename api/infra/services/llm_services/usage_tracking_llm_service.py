@@ -0,0 +1,132 @@
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+
+from api.application.services.llm_service import LLMService
+from api.infra.monitoring.llm_usage import LLMUsageStats
+
+
+class UsageTrackingLLMService(LLMService):
+    """
+    Wraps a provider and records the tokens, TTFT, decode rate and cost of
+    every call in LLMUsageStats.
+
+    Providers that report usage (REPORTS_USAGE) get a `usage` dict to fill
+    from the LangChain usage_metadata; for the others, or when the provider
+    sent nothing, prompt and completion are counted with the local estimator.
+    Streams closed early are recorded with the tokens generated so far.
+    """
+
+    def __init__(self, inner: LLMService, stats: LLMUsageStats, provider: str):
+        super().__init__(inner.envs)
+        self.inner = inner
+        self.stats = stats
+        self.provider = provider
+        self._reports_usage = getattr(inner, "REPORTS_USAGE", False)
+
+    def __getattr__(self, name: str):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    @property
+    def model(self) -> BaseChatModel:
+        return self.inner.model
+
+    def _usage_sink(self, kwargs: Dict) -> Optional[Dict[str, int]]:
+        if not self._reports_usage:
+            return None
+        usage: Dict[str, int] = {}
+        kwargs["usage"] = usage
+        return usage
+
+    def _record(
+        self,
+        kwargs: Dict,
+        usage: Optional[Dict[str, int]],
+        system_prompt: str,
+        prompt: str,
+        completion: List[str],
+        duration: float,
+        ttft: Optional[float] = None,
+        stream: bool = False,
+        error: bool = False,
+    ) -> None:
+        estimator = self.stats.estimator
+        estimated = not usage
+        if estimated:
+            usage = {
+                "prompt_tokens": estimator.count_prompt(system_prompt, prompt),
+                "completion_tokens": estimator.count("".join(completion)),
+            }
+        self.stats.record(
+            provider=self.provider,
+            model=kwargs.get("model") or getattr(self.inner, "model_name", "unknown"),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            duration=duration,
+            ttft=ttft,
+            stream=stream,
+            estimated=estimated,
+            error=error,
+        )
+
+    async def generate_response(self, user_input: str, system_prompt: str, **kwargs):
+        usage = self._usage_sink(kwargs)
+        completion: List[str] = []
+        ttft = None
+        error = False
+        start = time.perf_counter()
+        try:
+            async for chunk in self.inner.generate_response(
+                user_input=user_input, system_prompt=system_prompt, **kwargs
+            ):
+                if ttft is None and chunk:
+                    ttft = time.perf_counter() - start
+                completion.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            raise
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._record(
+                kwargs,
+                usage,
+                system_prompt,
+                user_input,
+                completion,
+                time.perf_counter() - start,
+                ttft=ttft,
+                stream=True,
+                error=error,
+            )
+
+    def invoke(self, prompt: str, system_prompt: str = "", **kwargs) -> str:
+        usage = self._usage_sink(kwargs)
+        start = time.perf_counter()
+        response = ""
+        error = False
+        try:
+            response = self.inner.invoke(
+                prompt=prompt, system_prompt=system_prompt, **kwargs
+            )
+            return response
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._record(
+                kwargs,
+                usage,
+                system_prompt,
+                prompt,
+                [response],
+                time.perf_counter() - start,
+                error=error,
+            )
+
+    async def get_available_models(self) -> list[str]:
+        return await self.inner.get_available_models()
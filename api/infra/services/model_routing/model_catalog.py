@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from api.application.services.llm_service import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCatalog:
+    """
+    Models the LLM provider can serve right now, discovered live through
+    get_available_models (Ollama /api/tags, OpenAI /v1/models) and refreshed
+    every `ttl` seconds by a background task.
+
+    A failed discovery keeps the last known list, so a provider hiccup does
+    not reroute traffic. Until the first discovery succeeds every configured
+    model is assumed to be available.
+    """
+
+    def __init__(self, llm_service: LLMService, ttl: float = 300.0):
+        self.llm_service = llm_service
+        self.ttl = ttl
+        self.available: Optional[frozenset] = None
+        self.refreshed_at: Optional[float] = None
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> Optional[frozenset]:
+        try:
+            models = await self.llm_service.get_available_models()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("Model discovery failed: %s", self.last_error)
+        else:
+            self.available = frozenset(models)
+            self.refreshed_at = time.time()
+        return self.available
+
+    def is_available(self, model: str) -> bool:
+        if self.available is None:
+            return True
+        # Ollama lista "llama3.2:latest" para quem pediu só "llama3.2"
+        return model in self.available or f"{model}:latest" in self.available
+
+    def resolve(self, candidates: Iterable[str]) -> Optional[str]:
+        """First candidate the provider serves, or None when none of them is"""
+        return next((model for model in candidates if self.is_available(model)), None)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop(), name="model-catalog")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.ttl)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "available": sorted(self.available) if self.available is not None else None,
+            "refreshed_at": self.refreshed_at,
+            "ttl_s": self.ttl,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,171 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from api.application.services.model_router import ModelRoute, ModelRouter
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.model_routing.model_catalog import ModelCatalog
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    CONFIDENCE_LEVELS,
+)
+
+
+class RoutingTier(NamedTuple):
+    """
+    A row of the routing table: the predictions it takes (confidence levels
+    and probability range, both optional) and the models to use, in order of
+    preference, with their token budget.
+    """
+
+    name: str
+    models: Tuple[str, ...] = ()
+    max_tokens: Optional[int] = None
+    confidence: FrozenSet[str] = frozenset()
+    min_probability: float = 0.0
+    max_probability: float = 1.0
+
+    def matches(self, prediction_result: Dict[str, Any]) -> bool:
+        # Conjunto vazio aceita qualquer confiança
+        if (
+            self.confidence
+            and prediction_result.get("confidence") not in self.confidence
+        ):
+            return False
+        probability = prediction_result.get("probability", 0.0)
+        return self.min_probability <= probability <= self.max_probability
+
+
+def _parse_tier(raw: Dict[str, Any]) -> RoutingTier:
+    if not raw.get("name"):
+        raise ValueError(f"Routing tier without a name: {raw}")
+    models = raw.get("model") or raw.get("models") or ()
+    if isinstance(models, str):
+        models = (models,)
+
+    confidence = raw.get("confidence")
+    if isinstance(confidence, str):
+        confidence = [confidence]
+    confidence = frozenset(confidence or ())
+    unknown = confidence - set(CONFIDENCE_LEVELS)
+    if unknown:
+        raise ValueError(f"Unknown confidence in tier {raw['name']}: {unknown}")
+
+    return RoutingTier(
+        name=raw["name"],
+        models=tuple(models),
+        max_tokens=raw.get("max_tokens"),
+        confidence=confidence,
+        min_probability=float(raw.get("min_probability", 0.0)),
+        max_probability=float(raw.get("max_probability", 1.0)),
+    )
+
+
+def parse_routing_table(raw: str) -> List[RoutingTier]:
+    """
+    Tiers from LLM_ROUTING: a JSON list (or the path of a JSON file) like
+
+        [{"name": "fast", "confidence": ["high"], "model": "llama3.2:1b",
+          "max_tokens": 350},
+         {"name": "careful", "model": ["llama3.1:8b", "llama3.2:3b"],
+          "max_tokens": 900}]
+    """
+    text = raw.strip()
+    if not text.startswith("["):
+        text = Path(text).read_text(encoding="utf-8")
+    tiers = [_parse_tier(tier) for tier in json.loads(text)]
+    if not tiers:
+        raise ValueError("LLM_ROUTING has no tiers")
+    return tiers
+
+
+class _TierStats:
+    def __init__(self, window: int):
+        self.routed = 0
+        self.fallbacks = 0
+        self.models: Dict[str, int] = {}
+        self.latency = LatencyStats(window)
+        self.ttft = LatencyStats(window)
+
+
+class TieredModelRouter(ModelRouter):
+    """
+    Picks the model and token budget of a report from the prediction: the
+    first tier whose rules match wins, the last tier takes whatever no tier
+    matched. Within a tier the first model the provider currently serves
+    (ModelCatalog) is used; when none is, the provider's default model runs
+    the report and the tier counts a fallback.
+
+    Keeps report latency (and time to first token for streams) per tier.
+    """
+
+    def __init__(
+        self,
+        tiers: List[RoutingTier],
+        catalog: Optional[ModelCatalog] = None,
+        window: int = 2048,
+    ):
+        self.tiers = tiers
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._stats = {tier.name: _TierStats(window) for tier in tiers}
+
+    def _tier(self, prediction_result: Dict[str, Any]) -> RoutingTier:
+        return next(
+            (tier for tier in self.tiers if tier.matches(prediction_result)),
+            self.tiers[-1],
+        )
+
+    def route(self, prediction_result: Dict[str, Any]) -> ModelRoute:
+        tier = self._tier(prediction_result)
+        if self.catalog is None:
+            model = tier.models[0] if tier.models else None
+        else:
+            model = self.catalog.resolve(tier.models)
+
+        stats = self._stats[tier.name]
+        with self._lock:
+            stats.routed += 1
+            if tier.models and model is None:
+                stats.fallbacks += 1
+            label = model or "default"
+            stats.models[label] = stats.models.get(label, 0) + 1
+        return ModelRoute(tier=tier.name, model=model, max_tokens=tier.max_tokens)
+
+    def observe(
+        self, route: ModelRoute, duration: float, ttft: Optional[float] = None
+    ) -> None:
+        stats = self._stats.get(route.tier)
+        if stats is None:
+            return
+        stats.latency.record(duration)
+        if ttft is not None:
+            stats.ttft.record(ttft)
+
+    def status(self) -> Dict[str, Any]:
+        tiers = []
+        for tier in self.tiers:
+            stats = self._stats[tier.name]
+            with self._lock:
+                models = dict(stats.models)
+            tiers.append(
+                {
+                    "name": tier.name,
+                    "models": list(tier.models),
+                    "max_tokens": tier.max_tokens,
+                    "confidence": (
+                        sorted(tier.confidence) if tier.confidence else None
+                    ),
+                    "probability": [tier.min_probability, tier.max_probability],
+                    "routed": stats.routed,
+                    "fallbacks": stats.fallbacks,
+                    "routed_models": models,
+                    "latency": stats.latency.summary(),
+                    "time_to_first_token": stats.ttft.summary(),
+                }
+            )
+        return {
+            "enabled": True,
+            "tiers": tiers,
+            "catalog": self.catalog.status() if self.catalog is not None else None,
+        }
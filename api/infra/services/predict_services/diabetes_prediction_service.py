@@ -1,103 +1,267 @@
-import joblib
 import pandas as pd
 import numpy as np
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+from api.application.dto.patient_batch import PatientBatch, decode_value
+from api.application.services.prediction_observer import PredictionObserver
+from api.infra.monitoring.tracing import tracer
+from api.infra.services.predict_services.model_registry import (
+    DEFAULT_MODELS_DIR,
+    FEATURE_ORDER,
+    LoadedModel,
+    ModelRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+# Códigos de confiança (índice = código) usados pelos formatos colunares
+CONFIDENCE_LEVELS = ("high", "medium", "low")
+
+
+def confidence_codes(probabilities: np.ndarray, threshold: float) -> np.ndarray:
+    """Confidence level code per row (index into CONFIDENCE_LEVELS)"""
+    distance_from_threshold = np.abs(probabilities - threshold)
+    return np.select(
+        [distance_from_threshold > 0.2, distance_from_threshold > 0.1],
+        [0, 1],
+        default=2,
+    ).astype(np.int8)
 
 
 class DiabetesPredictionService:
 
-    def __init__(self):
-
-        service_dir = Path(__file__).resolve().parent
-        infra_dir = service_dir.parent.parent
-        self.model_path = (
-            infra_dir / "models" / "model_optimized" / "diabetes_model_optimized.joblib"
-        )
-
-        if not self.model_path.exists():
-            raise FileNotFoundError(f"Model file not found: {self.model_path}")
-
-        self.model_package = self._load_model()
-        self.model = self.model_package["model"]
-        self.threshold = self.model_package.get("threshold", 0.5)
-        self.preprocessors = self.model_package.get("preprocessors", {})
-
-    def _load_model(self) -> Dict[str, Any]:
-        return joblib.load(self.model_path)
-
-    def _preprocess(self, patient_data: Dict[str, Any]) -> np.ndarray:
-
-        feature_order = [
-            "age",
-            "education_level",
-            "income_level",
-            "physical_activity_minutes_per_week",
-            "diet_score",
-            "family_history_diabetes",
-            "bmi",
-            "waist_to_hip_ratio",
-            "systolic_bp",
-            "cholesterol_total",
-            "hdl_cholesterol",
-            "ldl_cholesterol",
-            "triglycerides",
-            "glucose_fasting",
-            "glucose_postprandial",
-            "insulin_level",
-            "hba1c",
-            "diabetes_risk_score",
-        ]
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        observers: Optional[List[PredictionObserver]] = None,
+        top_k_factors: int = 5,
+    ):
 
-        df = pd.DataFrame([patient_data])[feature_order]
+        self.registry = registry or ModelRegistry(DEFAULT_MODELS_DIR)
+        self.observers = list(observers or [])
+        self.top_k_factors = top_k_factors
 
-        if "label_encoders" in self.preprocessors:
-            label_encoders = self.preprocessors["label_encoders"]
-            for col, encoder in label_encoders.items():
-                if col in df.columns:
-                    df[col] = encoder.transform(df[col].astype(str))
+        if self.registry.active is None:
+            default_model_path = (
+                DEFAULT_MODELS_DIR
+                / "model_optimized"
+                / "diabetes_model_optimized.joblib"
+            )
 
-        if "scaler" in self.preprocessors:
-            scaler = self.preprocessors["scaler"]
-            scaled = scaler.transform(df)
-        else:
-            scaled = df.values
+            if not default_model_path.exists():
+                raise FileNotFoundError(f"Model file not found: {default_model_path}")
 
-        return scaled
+            self.registry.activate(default_model_path)
 
-    def predict(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
-        X_processed = self._preprocess(patient_data)
+    @property
+    def active_model(self) -> LoadedModel:
+        return self.registry.active
 
-        # Garantir que X_processed está no formato correto (2D array)
-        if X_processed.ndim == 1:
-            X_processed = X_processed.reshape(1, -1)
+    @property
+    def model_path(self) -> Path:
+        return self.active_model.path
 
-        # Obter probabilidades
-        try:
-            probabilities = self.model.predict_proba(X_processed)
-            probability = (
-                probabilities[0, 1]
-                if probabilities.shape[1] > 1
-                else probabilities[0, 0]
-            )
-        except AttributeError as e:
-            # Fallback se predict_proba não estiver disponível
-            prediction = self.model.predict(X_processed)[0]
-            probability = float(prediction)
-
-        has_diabetes = probability >= self.threshold
-
-        distance_from_threshold = abs(probability - self.threshold)
-        if distance_from_threshold > 0.2:
-            confidence = "high"
-        elif distance_from_threshold > 0.1:
-            confidence = "medium"
+    @property
+    def model_version(self) -> str:
+        return self.active_model.version
+
+    @property
+    def model_package(self) -> Dict[str, Any]:
+        return self.active_model.package
+
+    @property
+    def model(self):
+        return self.active_model.model
+
+    @property
+    def threshold(self) -> float:
+        return self.active_model.threshold
+
+    @property
+    def preprocessors(self) -> Dict[str, Any]:
+        return self.active_model.preprocessors
+
+    def add_observer(self, observer: PredictionObserver) -> None:
+        self.observers.append(observer)
+
+    def _preprocess(
+        self, patient_data: Dict[str, Any], loaded: Optional[LoadedModel] = None
+    ) -> np.ndarray:
+        loaded = loaded or self.active_model
+        return loaded.preprocess(pd.DataFrame([patient_data]))
+
+    def _notify_observers(
+        self, features: np.ndarray, probabilities: np.ndarray, loaded: LoadedModel
+    ) -> None:
+        for observer in self.observers:
+            try:
+                observer.observe(
+                    features, probabilities, loaded.threshold, loaded.version
+                )
+            except Exception:
+                # Observadores nunca podem derrubar a predição
+                logger.exception("Prediction observer %r failed", observer)
+
+    def _top_factors(
+        self,
+        records: Sequence[Mapping[str, Any]],
+        X_processed: np.ndarray,
+        loaded: LoadedModel,
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """Top risk contributors for every row, computed in one vectorized pass"""
+        if self.top_k_factors <= 0:
+            return [None] * len(records)
+
+        top = loaded.top_contributions(X_processed, self.top_k_factors)
+        if top is None:
+            return [None] * len(records)
+
+        index_array, value_array = top
+        indices, values = index_array.tolist(), value_array.tolist()
+        if isinstance(records, PatientBatch):
+            # Lê os valores direto da matriz em vez de linha a linha
+            raw = np.take_along_axis(records.values, index_array, axis=1).tolist()
+            feature_values = [
+                [decode_value(index, value) for index, value in zip(row, raw_row)]
+                for row, raw_row in zip(indices, raw)
+            ]
         else:
-            confidence = "low"
+            feature_values = [
+                [record.get(FEATURE_ORDER[index]) for index in row]
+                for record, row in zip(records, indices)
+            ]
 
+        factors = []
+        for row_indices, row_values, row_features in zip(
+            indices, values, feature_values
+        ):
+            factors.append(
+                [
+                    {
+                        "feature": FEATURE_ORDER[index],
+                        "value": feature,
+                        "contribution": value,
+                        "direction": "increases" if value > 0 else "decreases",
+                    }
+                    for index, value, feature in zip(
+                        row_indices, row_values, row_features
+                    )
+                ]
+            )
+        return factors
+
+    def _build_results(
+        self,
+        records: Sequence[Mapping[str, Any]],
+        X_processed: np.ndarray,
+        probabilities: np.ndarray,
+        loaded: LoadedModel,
+    ) -> List[Dict[str, Any]]:
+        threshold = float(loaded.threshold)
+        confidences = [
+            CONFIDENCE_LEVELS[code]
+            for code in confidence_codes(probabilities, threshold).tolist()
+        ]
+        has_diabetes = (probabilities >= threshold).tolist()
+        top_factors = self._top_factors(records, X_processed, loaded)
+
+        return [
+            {
+                "has_diabetes": bool(has_diabetes[i]),
+                "probability": float(probability),
+                "threshold_used": threshold,
+                "confidence": confidences[i],
+                "model_version": loaded.version,
+                "top_factors": top_factors[i],
+            }
+            for i, probability in enumerate(probabilities.tolist())
+        ]
+
+    def predict_batch(
+        self, records: Union[PatientBatch, List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Scores a list of patients with a single vectorized pass through the model"""
+        if not len(records):
+            return []
+        return self._score(records)[0]
+
+    def predict_batch_columns(self, batch: PatientBatch) -> Dict[str, Any]:
+        """
+        Scores a batch and returns the results as arrays, one entry per row,
+        for the columnar response formats (no per-row dicts):
+
+            model_version, threshold_used, has_diabetes (bool), probability,
+            confidence (codes into CONFIDENCE_LEVELS), top_factor_index and
+            top_factor_contribution ((n, k), or None without contributions)
+        """
+        X_processed, probabilities, loaded = self._score_matrix(batch)
+        threshold = float(loaded.threshold)
+        top = None
+        if self.top_k_factors > 0 and len(batch):
+            top = loaded.top_contributions(X_processed, self.top_k_factors)
         return {
-            "has_diabetes": bool(has_diabetes),
-            "probability": float(probability),
-            "threshold_used": float(self.threshold),
-            "confidence": confidence,
+            "model_version": loaded.version,
+            "threshold_used": threshold,
+            "has_diabetes": probabilities >= threshold,
+            "probability": probabilities,
+            "confidence": confidence_codes(probabilities, threshold),
+            "top_factor_index": top[0] if top is not None else None,
+            "top_factor_contribution": top[1] if top is not None else None,
         }
+
+    def _score(
+        self, records: Union[PatientBatch, List[Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        X_processed, probabilities, loaded = self._score_matrix(records)
+        results = self._build_results(records, X_processed, probabilities, loaded)
+        return results, X_processed
+
+    def _score_matrix(
+        self, records: Union[PatientBatch, List[Dict[str, Any]]]
+    ) -> Tuple[np.ndarray, np.ndarray, LoadedModel]:
+        # Fixa a versão ativa para toda a requisição (troca atômica no registry)
+        loaded = self.active_model
+
+        with tracer.span("prediction.preprocess", rows=len(records)):
+            # Dicts viram um PatientBatch; o lote é a própria matriz do modelo
+            batch = (
+                records
+                if isinstance(records, PatientBatch)
+                else PatientBatch.from_records(records)
+            )
+            X_raw = loaded.encode_batch(batch)
+            X_processed = loaded.scale(X_raw)
+
+        # Obter probabilidades
+        with tracer.span("prediction.predict_proba", model_version=loaded.version):
+            probabilities = loaded.predict_proba(X_processed)
+
+        if self.observers:
+            self._notify_observers(X_raw, probabilities, loaded)
+
+        return X_processed, probabilities, loaded
+
+    def predict(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.predict_batch([patient_data])[0]
+
+    def features(
+        self, patient_data: Dict[str, Any], model_version: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Scaled feature vector (18,) as the active model preprocesses it, without
+        scoring nor notifying observers. None when model_version is given and
+        is no longer the active version.
+        """
+        loaded = self.active_model
+        if model_version is not None and loaded.version != model_version:
+            return None
+        return self._preprocess(patient_data, loaded)[0]
+
+    def predict_with_features(
+        self, patient_data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], np.ndarray]:
+        """Prediction plus the scaled feature vector (18,) the model scored"""
+        results, X_processed = self._score([patient_data])
+        return results[0], X_processed[0]
@@ -0,0 +1,511 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from api.application.dto.patient_batch import CATEGORIES, COLUMN_INDEX, PatientBatch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS_DIR = Path(__file__).resolve().parent.parent.parent / "models"
+
+FEATURE_ORDER = [
+    "age",
+    "education_level",
+    "income_level",
+    "physical_activity_minutes_per_week",
+    "diet_score",
+    "family_history_diabetes",
+    "bmi",
+    "waist_to_hip_ratio",
+    "systolic_bp",
+    "cholesterol_total",
+    "hdl_cholesterol",
+    "ldl_cholesterol",
+    "triglycerides",
+    "glucose_fasting",
+    "glucose_postprandial",
+    "insulin_level",
+    "hba1c",
+    "diabetes_risk_score",
+]
+
+# Lote fixo usado para aquecer e validar um modelo antes de ativá-lo
+SMOKE_BATCH: List[Dict[str, Any]] = [
+    {
+        "age": 45.0,
+        "education_level": "Graduate",
+        "income_level": "Middle",
+        "physical_activity_minutes_per_week": 150.0,
+        "diet_score": 7.5,
+        "family_history_diabetes": 1,
+        "bmi": 28.5,
+        "waist_to_hip_ratio": 0.92,
+        "systolic_bp": 130.0,
+        "cholesterol_total": 220.0,
+        "hdl_cholesterol": 45.0,
+        "ldl_cholesterol": 140.0,
+        "triglycerides": 180.0,
+        "glucose_fasting": 95.0,
+        "glucose_postprandial": 140.0,
+        "insulin_level": 12.0,
+        "hba1c": 5.8,
+        "diabetes_risk_score": 6.5,
+    },
+    {
+        "age": 25.0,
+        "education_level": "Postgraduate",
+        "income_level": "High",
+        "physical_activity_minutes_per_week": 300.0,
+        "diet_score": 9.0,
+        "family_history_diabetes": 0,
+        "bmi": 21.0,
+        "waist_to_hip_ratio": 0.8,
+        "systolic_bp": 110.0,
+        "cholesterol_total": 170.0,
+        "hdl_cholesterol": 65.0,
+        "ldl_cholesterol": 90.0,
+        "triglycerides": 90.0,
+        "glucose_fasting": 82.0,
+        "glucose_postprandial": 105.0,
+        "insulin_level": 6.0,
+        "hba1c": 4.9,
+        "diabetes_risk_score": 2.5,
+    },
+    {
+        "age": 68.0,
+        "education_level": "No formal",
+        "income_level": "Low",
+        "physical_activity_minutes_per_week": 20.0,
+        "diet_score": 3.0,
+        "family_history_diabetes": 1,
+        "bmi": 34.0,
+        "waist_to_hip_ratio": 1.01,
+        "systolic_bp": 160.0,
+        "cholesterol_total": 270.0,
+        "hdl_cholesterol": 32.0,
+        "ldl_cholesterol": 190.0,
+        "triglycerides": 290.0,
+        "glucose_fasting": 150.0,
+        "glucose_postprandial": 240.0,
+        "insulin_level": 25.0,
+        "hba1c": 8.2,
+        "diabetes_risk_score": 9.0,
+    },
+]
+
+
+class ModelVerificationError(Exception):
+    """Raised when a candidate model fails the smoke or parity check"""
+
+
+class LoadedModel:
+    """A loaded model package pinned to a version, ready for vectorized scoring"""
+
+    def __init__(
+        self,
+        path: Path,
+        package: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.path = path
+        self.package = package
+        self.metadata = metadata or {}
+        self.model = package["model"]
+        self.threshold = float(package.get("threshold", 0.5))
+        self.preprocessors = package.get("preprocessors", {})
+        self.version = str(self.metadata.get("version") or path.parent.name)
+        self.loaded_at = datetime.now()
+        self.coefficients = self._linear_coefficients()
+        self.baseline = self._attribution_baseline()
+        self._category_remap = self._batch_category_remap()
+        self._category_unmap = self._model_category_unmap()
+
+    @classmethod
+    def from_path(cls, path: Path) -> "LoadedModel":
+        metadata_path = path.parent / "model_metadata.json"
+        metadata = None
+        if metadata_path.exists():
+            with open(metadata_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+        return cls(path=path, package=joblib.load(path), metadata=metadata)
+
+    def encode(self, records: pd.DataFrame) -> np.ndarray:
+        """Label-encodes a DataFrame of patients into the raw feature matrix"""
+        df = records[FEATURE_ORDER].copy()
+
+        if "label_encoders" in self.preprocessors:
+            label_encoders = self.preprocessors["label_encoders"]
+            for col, encoder in label_encoders.items():
+                if col in df.columns:
+                    df[col] = encoder.transform(df[col].astype(str))
+
+        return df.to_numpy(dtype=float)
+
+    def encode_batch(self, batch: PatientBatch) -> np.ndarray:
+        """
+        Raw feature matrix of a PatientBatch. When the package's label
+        encoders use the batch codes (alphabetical classes) this is
+        batch.values itself, with no copy.
+
+        Raises:
+            ValueError: a category the model was not trained on
+        """
+        return self.encode_codes(batch.values)
+
+    def encode_codes(self, values: np.ndarray) -> np.ndarray:
+        """
+        Raw feature matrix of this model from a matrix in PatientBatch codes;
+        values itself when the codes already match.
+
+        Raises:
+            ValueError: a category the model was not trained on
+        """
+        if not self._category_remap:
+            return values
+
+        X_raw = values.copy()
+        for index, lookup in self._category_remap.items():
+            codes = lookup[X_raw[:, index].astype(np.intp)]
+            if np.any(codes < 0):
+                raise ValueError(
+                    f"Unknown category for {FEATURE_ORDER[index]} in this model"
+                )
+            X_raw[:, index] = codes
+        return X_raw
+
+    def decode_codes(self, X_raw: np.ndarray) -> np.ndarray:
+        """
+        Inverse of encode_codes: a raw feature matrix of this model back in
+        PatientBatch codes, so another model can encode it with its own
+        label encoders.
+
+        Raises:
+            ValueError: a category code outside the PatientBatch categories
+        """
+        if not self._category_unmap:
+            return X_raw
+
+        values = X_raw.copy()
+        for index, lookup in self._category_unmap.items():
+            codes = lookup[values[:, index].astype(np.intp)]
+            if np.any(codes < 0):
+                raise ValueError(
+                    f"Category of {FEATURE_ORDER[index]} unknown to PatientBatch"
+                )
+            values[:, index] = codes
+        return values
+
+    def scale(self, X_raw: np.ndarray) -> np.ndarray:
+        """Applies the package scaler to an encoded feature matrix"""
+        if "scaler" not in self.preprocessors:
+            return X_raw
+
+        scaler = self.preprocessors["scaler"]
+        if hasattr(scaler, "scale_") and hasattr(scaler, "min_"):
+            # MinMaxScaler: mesma conta do sklearn, sem passar pelo DataFrame
+            return X_raw * scaler.scale_ + scaler.min_
+        return scaler.transform(pd.DataFrame(X_raw, columns=FEATURE_ORDER))
+
+    def preprocess(self, records: pd.DataFrame) -> np.ndarray:
+        """Encodes and scales a DataFrame of patients (one row per patient)"""
+        return self.scale(self.encode(records))
+
+    def predict_proba(self, X_processed: np.ndarray) -> np.ndarray:
+        """Returns the positive-class probability for every row of X_processed"""
+        if X_processed.ndim == 1:
+            X_processed = X_processed.reshape(1, -1)
+
+        try:
+            probabilities = self.model.predict_proba(X_processed)
+            if probabilities.shape[1] > 1:
+                return probabilities[:, 1]
+            return probabilities[:, 0]
+        except AttributeError:
+            # Fallback se predict_proba não estiver disponível
+            return np.asarray(self.model.predict(X_processed), dtype=float)
+
+    def contributions(self, X_processed: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Linear attribution in log-odds: (x_scaled - baseline) * coef for every
+        row and feature. None when the model is not linear.
+        """
+        if self.coefficients is None:
+            return None
+        if X_processed.ndim == 1:
+            X_processed = X_processed.reshape(1, -1)
+        return (X_processed - self.baseline) * self.coefficients
+
+    def top_contributions(
+        self, X_processed: np.ndarray, k: int = 5
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Returns (indices, values), both (n, k), with the k features of largest
+        absolute contribution per row, ordered from largest to smallest.
+        """
+        contributions = self.contributions(X_processed)
+        if contributions is None:
+            return None
+
+        k = min(k, contributions.shape[1])
+        magnitude = np.abs(contributions)
+        top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1)
+        indices = np.take_along_axis(top, order, axis=1)
+        return indices, np.take_along_axis(contributions, indices, axis=1)
+
+    def score(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        return self.predict_proba(self.preprocess(pd.DataFrame(records)))
+
+    def _linear_coefficients(self) -> Optional[np.ndarray]:
+        coef = getattr(self.model, "coef_", None)
+        if coef is None:
+            return None
+        coef = np.asarray(coef, dtype=float)
+        return coef[0] if coef.ndim == 2 else coef
+
+    def _batch_category_remap(self) -> Dict[int, np.ndarray]:
+        """Batch code -> model code per column, only where the two differ"""
+        remap = {}
+        label_encoders = self.preprocessors.get("label_encoders", {})
+        for col, categories in CATEGORIES.items():
+            encoder = label_encoders.get(col)
+            if encoder is None:
+                continue
+            model_codes = {str(c): code for code, c in enumerate(encoder.classes_)}
+            lookup = np.array([model_codes.get(c, -1) for c in categories])
+            if not np.array_equal(lookup, np.arange(len(categories))):
+                remap[COLUMN_INDEX[col]] = lookup
+        return remap
+
+    def _model_category_unmap(self) -> Dict[int, np.ndarray]:
+        """Model code -> batch code for the columns remapped on encoding"""
+        unmap = {}
+        label_encoders = self.preprocessors.get("label_encoders", {})
+        for index, lookup in self._category_remap.items():
+            encoder = label_encoders[FEATURE_ORDER[index]]
+            inverse = np.full(len(encoder.classes_), -1)
+            known = lookup >= 0
+            inverse[lookup[known]] = np.arange(len(lookup))[known]
+            unmap[index] = inverse
+        return unmap
+
+    def _attribution_baseline(self) -> np.ndarray:
+        if "baseline" in self.package:
+            return np.asarray(self.package["baseline"], dtype=float)
+        if "scaler" in self.preprocessors:
+            # Sem estatísticas de treino: centro do intervalo do MinMaxScaler
+            return np.full(len(FEATURE_ORDER), 0.5)
+        return np.zeros(len(FEATURE_ORDER))
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": str(self.path),
+            "threshold": self.threshold,
+            "model_type": self.metadata.get("model_type"),
+            "export_date": self.metadata.get("export_date"),
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+class ModelRegistry:
+    """
+    Keeps the active model version and swaps it atomically.
+
+    Candidates are loaded, warmed and verified off the request path; the swap
+    itself is a single reference assignment, so in-flight predictions keep the
+    version they started with.
+    """
+
+    ARTIFACT_PATTERN = "*.joblib"
+
+    def __init__(
+        self,
+        models_dir: Path = DEFAULT_MODELS_DIR,
+        watch_interval: float = 0.0,
+        parity_tolerance: Optional[float] = None,
+        smoke_batch: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.models_dir = Path(models_dir)
+        self.watch_interval = watch_interval
+        self.parity_tolerance = parity_tolerance
+        self.smoke_batch = smoke_batch or SMOKE_BATCH
+
+        self._active: Optional[LoadedModel] = None
+        self._swap_lock = threading.Lock()
+        self._seen: set = set()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+        self.swap_count = 0
+        self.failed_loads = 0
+        self.last_error: Optional[str] = None
+        self.last_parity_delta: Optional[float] = None
+
+    @property
+    def active(self) -> Optional[LoadedModel]:
+        return self._active
+
+    def discover(self) -> List[Dict[str, Any]]:
+        """Lists versioned artifacts under models_dir, newest first"""
+        artifacts = []
+        for path in self.models_dir.glob(f"*/{self.ARTIFACT_PATTERN}"):
+            stat = path.stat()
+            artifacts.append(
+                {
+                    "version": path.parent.name,
+                    "path": path,
+                    "fingerprint": (str(path), stat.st_mtime_ns, stat.st_size),
+                    "modified_at": stat.st_mtime,
+                }
+            )
+        return sorted(artifacts, key=lambda a: a["modified_at"], reverse=True)
+
+    def load(self, path: Path, check_parity: bool = True) -> LoadedModel:
+        """Loads, warms and verifies a candidate without activating it"""
+        candidate = LoadedModel.from_path(Path(path))
+
+        # O primeiro lote aquece o modelo e serve de smoke test
+        probabilities = candidate.score(self.smoke_batch)
+        if probabilities.shape != (len(self.smoke_batch),) or not np.all(
+            np.isfinite(probabilities)
+        ):
+            raise ModelVerificationError(
+                f"Smoke batch produced invalid output for {candidate.version}"
+            )
+        if np.any(probabilities < 0) or np.any(probabilities > 1):
+            raise ModelVerificationError(
+                f"Smoke batch probabilities out of [0, 1] for {candidate.version}"
+            )
+
+        current = self._active
+        if check_parity and current is not None:
+            delta = float(
+                np.max(np.abs(probabilities - current.score(self.smoke_batch)))
+            )
+            self.last_parity_delta = delta
+            if self.parity_tolerance is not None and delta > self.parity_tolerance:
+                raise ModelVerificationError(
+                    f"Parity check failed for {candidate.version}: "
+                    f"max delta {delta:.4f} > {self.parity_tolerance:.4f}"
+                )
+
+        return candidate
+
+    def activate(self, target: Union[str, Path]) -> LoadedModel:
+        """
+        Loads a version (directory name under models_dir) or artifact Path and
+        swaps it in. Raises ModelVerificationError if the candidate is rejected.
+        """
+        path = self.resolve(target)
+        with self._swap_lock:
+            try:
+                candidate = self.load(path)
+            except Exception as e:
+                self.failed_loads += 1
+                self.last_error = str(e)
+                raise
+
+            self._active = candidate
+            self.swap_count += 1
+            self.last_error = None
+            stat = path.stat()
+            self._seen.add((str(path), stat.st_mtime_ns, stat.st_size))
+            return candidate
+
+    def poll(self) -> Optional[LoadedModel]:
+        """Activates the newest artifact that appeared since the last poll"""
+        new_artifacts = [
+            a for a in self.discover() if a["fingerprint"] not in self._seen
+        ]
+        if not new_artifacts:
+            return None
+
+        newest = new_artifacts[0]
+        try:
+            return self.activate(newest["path"])
+        except Exception:
+            logger.exception("Failed to activate model artifact %s", newest["path"])
+            return None
+        finally:
+            # Só marca como visto depois da carga ou da falha registrada: um
+            # artefato quebrado não é recarregado a cada ciclo, e os mais
+            # antigos foram superados pelo mais recente
+            for artifact in new_artifacts:
+                self._seen.add(artifact["fingerprint"])
+
+    def start_watching(self) -> None:
+        if self.watch_interval <= 0 or self._watcher is not None:
+            return
+
+        # Artefatos já existentes não disparam troca
+        self._seen.update(a["fingerprint"] for a in self.discover())
+        self._stop_event.clear()
+        self._watcher = threading.Thread(
+            target=self._watch_loop, name="model-registry-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        if self._watcher is None:
+            return
+        self._stop_event.set()
+        self._watcher.join(timeout=self.watch_interval + 1)
+        self._watcher = None
+
+    def status(self) -> Dict[str, Any]:
+        active = self._active
+        return {
+            "active": active.info() if active else None,
+            "swap_count": self.swap_count,
+            "failed_loads": self.failed_loads,
+            "last_error": self.last_error,
+            "last_parity_delta": self.last_parity_delta,
+            "watching": self._watcher is not None,
+        }
+
+    def _watch_loop(self) -> None:
+        while not self._stop_event.wait(self.watch_interval):
+            self.poll()
+
+    def resolve(self, target: Union[str, Path]) -> Path:
+        """
+        Maps a version directory name directly under models_dir to its artifact
+        file. A Path is taken as an artifact chosen by the application itself
+        (discover(), the default model) and is never built from request input.
+        Raises ValueError for names that are not a plain directory name.
+        """
+        if isinstance(target, Path):
+            if not target.is_file():
+                raise FileNotFoundError(f"Model artifact not found: {target}")
+            return target
+
+        name = str(target)
+        if (
+            not name
+            or name in (".", "..")
+            or any(sep in name for sep in ("/", "\\", os.sep, os.altsep) if sep)
+        ):
+            raise ValueError(f"Invalid model version: {name!r}")
+
+        # Links simbólicos não podem apontar para fora do diretório de modelos
+        root = self.models_dir.resolve()
+        version_dir = (self.models_dir / name).resolve()
+        if version_dir.parent != root:
+            raise ValueError(f"Invalid model version: {name!r}")
+        artifacts = [
+            path
+            for path in sorted(version_dir.glob(self.ARTIFACT_PATTERN))
+            if path.resolve().is_relative_to(root)
+        ]
+        if not artifacts:
+            raise FileNotFoundError(f"Model version not found: {name}")
+        return artifacts[0]
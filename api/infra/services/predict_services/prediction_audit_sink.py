@@ -0,0 +1,290 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from api.application.services.prediction_observer import PredictionObserver
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = ["ts", "model_version", "threshold", "probability", *FEATURE_ORDER]
+
+AUDIT_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS predictions ("
+    "ts REAL NOT NULL, model_version TEXT NOT NULL, threshold REAL NOT NULL, "
+    "probability REAL NOT NULL, "
+    + ", ".join(f"{name} REAL" for name in FEATURE_ORDER)
+    + ")"
+)
+
+AUDIT_INSERT = (
+    f"INSERT INTO predictions ({', '.join(AUDIT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in AUDIT_COLUMNS)})"
+)
+
+
+class PredictionAuditSink(PredictionObserver):
+    """
+    Write-behind audit log of every prediction.
+
+    observe() appends the batch to an in-memory queue; a writer thread groups
+    queued batches and flushes them to append-only SQLite files in one
+    transaction, when flush_rows rows are buffered or flush_interval expires.
+    Files rotate by row count and age. observe() never blocks nor drops: it
+    runs inside the scoring path, often on the event loop. Once max_queue_size
+    batches are waiting the sink is `backlogged`; the scoring routes shed new
+    requests and /ready reports not-ready until the writer catches up, so the
+    queue only grows by the requests already admitted. A flush that fails
+    keeps its rows and is retried every flush_interval; while a full batch
+    waits for the retry the writer stops draining the queue. After stop()
+    observe() ignores new batches and counts them.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_queue_size: int = 4096,
+        flush_rows: int = 2048,
+        flush_interval: float = 1.0,
+        rotate_rows: int = 1_000_000,
+        rotate_interval: float = 3600.0,
+    ):
+        self.directory = Path(directory)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rotate_rows = rotate_rows
+        self.rotate_interval = rotate_interval
+
+        # Sem limite na fila: a contenção é feita na admissão (high-water)
+        self.max_queue_size = max_queue_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._stopped = False
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._file: Optional[Path] = None
+        self._file_rows = 0
+        self._file_opened_at = 0.0
+        self._file_seq = 0
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.shed = 0
+        self.ignored = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.errors = 0
+        self.retries = 0
+        self.flush_time = LatencyStats()
+
+    @property
+    def current_file(self) -> Optional[Path]:
+        return self._file
+
+    @property
+    def backlogged(self) -> bool:
+        """True while max_queue_size batches or more wait for the writer"""
+        return self._queue.qsize() >= self.max_queue_size
+
+    def observe(
+        self,
+        features: np.ndarray,
+        probabilities: np.ndarray,
+        threshold: float,
+        model_version: str,
+    ) -> None:
+        if self._stopped:
+            # Sink encerrado: nada mais seria escrito (e não reinicia o writer)
+            self.ignored += len(probabilities)
+            if self.ignored == len(probabilities):
+                logger.warning("Audit sink stopped, ignoring new predictions")
+            return
+        if self._worker is None:
+            self.start()
+
+        if self.backlogged:
+            # Requisições já admitidas: enfileira assim mesmo (esperar aqui
+            # travaria o event loop); as novas são recusadas na admissão
+            self.overflows += 1
+            if self.overflows == 1 or self.overflows % 1000 == 0:
+                logger.warning(
+                    "Audit queue past its high-water mark (%d batches waiting)",
+                    self._queue.qsize(),
+                )
+        self._queue.put_nowait(
+            (time.time(), features, probabilities, threshold, model_version)
+        )
+        self.enqueued += len(probabilities)
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._worker is not None:
+                return
+            self._stopped = False
+            self._stop_event.clear()
+            self._worker = threading.Thread(
+                target=self._run, name="prediction-audit", daemon=True
+            )
+            self._worker.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flushes everything still queued and closes the current file"""
+        with self._start_lock:
+            self._stopped = True
+            worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        self._stop_event.set()
+        worker.join(timeout=timeout)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._worker is not None,
+            "directory": str(self.directory),
+            "current_file": str(self._file) if self._file else None,
+            "queue_size": self._queue.qsize(),
+            "queue_capacity": self.max_queue_size,
+            "backlogged": self.backlogged,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "pending": self.enqueued - self.written,
+            "dropped": self.dropped,
+            "overflows": self.overflows,
+            "shed": self.shed,
+            "ignored": self.ignored,
+            "flushes": self.flushes,
+            "rotations": self.rotations,
+            "errors": self.errors,
+            "retries": self.retries,
+            "flush_time": self.flush_time.summary(),
+        }
+
+    def _run(self) -> None:
+        buffer: List[tuple] = []
+        rows = 0
+        deadline = None
+        while not self._stop_event.is_set():
+            timeout = 0.5 if deadline is None else max(deadline - time.monotonic(), 0)
+            if rows >= self.flush_rows:
+                # Lote cheio esperando nova tentativa: não puxa mais da fila,
+                # que passa do high-water e fecha a admissão
+                self._stop_event.wait(timeout)
+            else:
+                try:
+                    item = self._queue.get(timeout=timeout)
+                    if not buffer:
+                        deadline = time.monotonic() + self.flush_interval
+                    buffer.append(item)
+                    rows += len(item[2])
+                except queue.Empty:
+                    pass
+
+            if buffer and (rows >= self.flush_rows or time.monotonic() >= deadline):
+                if self._flush(buffer):
+                    buffer, rows, deadline = [], 0, None
+                else:
+                    # Mantém o lote e tenta de novo no próximo intervalo
+                    self.retries += 1
+                    deadline = time.monotonic() + self.flush_interval
+
+        # Shutdown: esvazia a fila antes de fechar o arquivo
+        while True:
+            try:
+                buffer.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if buffer and not self._flush(buffer):
+            lost = sum(len(item[2]) for item in buffer)
+            self.dropped += lost
+            logger.error("Audit shutdown: %d predictions could not be written", lost)
+        self._close_file()
+
+    def _flush(self, buffer: List[tuple]) -> bool:
+        """Writes the buffer in one transaction; False (nothing written) on error"""
+        start = time.perf_counter()
+        rows = self._to_rows(buffer)
+        try:
+            if self._should_rotate():
+                self._rotate()
+            with self._conn:
+                self._conn.executemany(AUDIT_INSERT, rows)
+        except Exception:
+            self.errors += 1
+            logger.exception("Failed to write %d audit records", len(rows))
+            self._close_file()
+            return False
+
+        self._file_rows += len(rows)
+        self.written += len(rows)
+        self.flushes += 1
+        self.flush_time.record(time.perf_counter() - start)
+        return True
+
+    @staticmethod
+    def _to_rows(buffer: List[tuple]) -> List[tuple]:
+        rows = []
+        for ts, features, probabilities, threshold, model_version in buffer:
+            threshold = float(threshold)
+            for probability, values in zip(
+                probabilities.tolist(), np.asarray(features, dtype=float).tolist()
+            ):
+                rows.append((ts, model_version, threshold, probability, *values))
+        return rows
+
+    def _should_rotate(self) -> bool:
+        if self._conn is None:
+            return True
+        if self._file_rows >= self.rotate_rows:
+            return True
+        return time.monotonic() - self._file_opened_at >= self.rotate_interval
+
+    def _rotate(self) -> None:
+        if self._conn is not None:
+            self.rotations += 1
+        self._close_file()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # pid no nome: vários workers do servidor escrevem em arquivos separados
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self._file_seq += 1
+        self._file = (
+            self.directory
+            / f"predictions-{stamp}-{os.getpid()}-{self._file_seq:04d}.sqlite3"
+        )
+        self._conn = sqlite3.connect(self._file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(AUDIT_SCHEMA)
+        self._file_rows = 0
+        self._file_opened_at = time.monotonic()
+
+    def _close_file(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+
+def read_audit_file(path: Path) -> List[Dict[str, Any]]:
+    """Loads every record of an audit file (for inspection and tests)"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(f"SELECT {', '.join(AUDIT_COLUMNS)} FROM predictions")
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
@@ -0,0 +1,227 @@
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from api.application.services.prediction_observer import PredictionObserver
+from api.infra.services.predict_services.model_registry import LoadedModel
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowCandidateStats:
+    """Running agreement and probability-delta counters for one candidate"""
+
+    def __init__(self, candidate: LoadedModel):
+        self.candidate = candidate
+        self.scored = 0
+        self.agreements = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+
+    def update(
+        self,
+        primary: np.ndarray,
+        primary_decisions: np.ndarray,
+        shadow: np.ndarray,
+    ) -> None:
+        delta = shadow - primary
+        abs_delta = np.abs(delta)
+        self.scored += len(primary)
+        self.agreements += int(
+            np.count_nonzero((shadow >= self.candidate.threshold) == primary_decisions)
+        )
+        self.delta_sum += float(delta.sum())
+        self.abs_delta_sum += float(abs_delta.sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_delta.max()))
+
+    def summary(self) -> Dict[str, Any]:
+        scored = self.scored or 1
+        return {
+            "path": str(self.candidate.path),
+            "threshold": self.candidate.threshold,
+            "scored": self.scored,
+            "agreement_rate": self.agreements / scored if self.scored else None,
+            "mean_delta": self.delta_sum / scored if self.scored else None,
+            "mean_abs_delta": self.abs_delta_sum / scored if self.scored else None,
+            "max_abs_delta": self.max_abs_delta,
+        }
+
+
+class ShadowScorer(PredictionObserver):
+    """
+    Scores live traffic against candidate models without touching latency.
+
+    observe() only does a non-blocking put on a bounded queue; when the queue
+    is full the batch is dropped and counted. A worker thread drains the queue
+    and scores everything it finds in one vectorized call per candidate.
+
+    Features arrive encoded by the primary model, taken from the registry.
+    The worker maps them back to PatientBatch codes and every candidate
+    encodes them with its own label encoders. Without a registry the
+    features are expected in PatientBatch codes.
+    """
+
+    def __init__(
+        self,
+        candidates: Optional[List[LoadedModel]] = None,
+        max_queue_size: int = 1024,
+        max_batch_size: int = 256,
+        registry=None,
+    ):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._stats: Dict[str, ShadowCandidateStats] = {}
+        self._stats_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+
+        for candidate in candidates or []:
+            self.add_candidate(candidate)
+
+    @property
+    def candidates(self) -> List[LoadedModel]:
+        return [stats.candidate for stats in self._stats.values()]
+
+    def add_candidate(self, candidate: LoadedModel) -> None:
+        with self._stats_lock:
+            self._stats[candidate.version] = ShadowCandidateStats(candidate)
+
+    def remove_candidate(self, version: str) -> None:
+        with self._stats_lock:
+            self._stats.pop(version, None)
+
+    def observe(
+        self,
+        features: np.ndarray,
+        probabilities: np.ndarray,
+        threshold: float,
+        model_version: str,
+    ) -> None:
+        if not self._stats:
+            return
+
+        primary = self.registry.active if self.registry is not None else None
+        if primary is not None and primary.version != model_version:
+            # Modelo trocado entre a predição e o observe: a codificação das
+            # features é desconhecida
+            self.dropped += len(probabilities)
+            return
+
+        try:
+            self._queue.put_nowait((features, probabilities, threshold, primary))
+            self.enqueued += len(probabilities)
+        except queue.Full:
+            # Descarta carga em vez de atrasar a requisição
+            self.dropped += len(probabilities)
+
+    def start(self) -> None:
+        if self._worker is not None:
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(
+            target=self._run, name="shadow-scorer", daemon=True
+        )
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._worker is None:
+            return
+        self._stop_event.set()
+        self._worker.join(timeout=timeout)
+        self._worker = None
+
+    def drain(self) -> int:
+        """Scores everything currently queued; returns the number of rows scored"""
+        scored = 0
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                return scored
+            self._score(batch)
+            scored += sum(len(item[1]) for item in batch)
+
+    def status(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            candidates = {
+                version: stats.summary() for version, stats in self._stats.items()
+            }
+        return {
+            "running": self._worker is not None,
+            "queue_size": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "candidates": candidates,
+        }
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            batch = self._take_batch(block=True)
+            if batch:
+                self._score(batch)
+        self.drain()
+
+    def _take_batch(self, block: bool) -> list:
+        batch = []
+        rows = 0
+        try:
+            item = self._queue.get(timeout=0.5) if block else self._queue.get_nowait()
+        except queue.Empty:
+            return batch
+
+        batch.append(item)
+        rows += len(item[1])
+        while rows < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[1])
+        return batch
+
+    def _score(self, batch: list) -> None:
+        try:
+            # Volta aos códigos do PatientBatch, independentes do modelo
+            codes = np.vstack(
+                [
+                    item[3].decode_codes(item[0]) if item[3] is not None else item[0]
+                    for item in batch
+                ]
+            )
+        except ValueError:
+            self.errors += 1
+            logger.exception("Shadow scoring could not decode the primary features")
+            return
+        primary = np.concatenate([item[1] for item in batch])
+        primary_decisions = np.concatenate([item[1] >= item[2] for item in batch])
+
+        with self._stats_lock:
+            stats = list(self._stats.values())
+
+        for candidate_stats in stats:
+            candidate = candidate_stats.candidate
+            try:
+                shadow = candidate.predict_proba(
+                    candidate.scale(candidate.encode_codes(codes))
+                )
+            except Exception:
+                self.errors += 1
+                logger.exception("Shadow scoring failed for %s", candidate.version)
+                continue
+            with self._stats_lock:
+                candidate_stats.update(primary, primary_decisions, shadow)
+
+        self.batches += 1
@@ -0,0 +1,329 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.application.services.report_cache import ReportCache
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+
+
+def _number_forms(value: float) -> List[str]:
+    """Ways a value from the prompt can show up in the report text"""
+    forms = [str(value)]
+    if float(value).is_integer():
+        forms.append(str(int(value)))
+    return forms
+
+
+# Número isolado no texto (não parte de outro número)
+_NUMBER = re.compile(r"(?<![\d.])\d+(?:\.\d+)?(?!\d|\.\d)")
+
+
+def adapt_report(
+    report: str,
+    source_data: Dict[str, Any],
+    source_prediction: Dict[str, Any],
+    patient_data: Dict[str, Any],
+    prediction_result: Dict[str, Any],
+) -> Tuple[Optional[str], int]:
+    """
+    Rewrites the values quoted in a cached report with the new patient's
+    ones. Only numbers that appear exactly once are replaced. When a changed
+    value still shows up in the text (repeated, single-digit or conflicting)
+    the report would quote the previous patient, so it is refused: returns
+    (None, 0). Otherwise returns the report and the number of replacements.
+    """
+    pairs = []
+    for name in FEATURE_ORDER:
+        old, new = source_data.get(name), patient_data.get(name)
+        if old == new:
+            continue
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+            continue
+        new_forms = _number_forms(new)
+        # "45" vira o novo valor mesmo quando ele não é inteiro ("46.5")
+        pairs.extend(zip(_number_forms(old), new_forms + new_forms[-1:]))
+
+    old_p, new_p = source_prediction["probability"], prediction_result["probability"]
+    if old_p != new_p:
+        for digits in (2, 1):
+            pairs.append((f"{old_p * 100:.{digits}f}", f"{new_p * 100:.{digits}f}"))
+
+    replacements: Dict[str, str] = {}
+    conflicts = set()
+    for old_form, new_form in pairs:
+        if old_form == new_form:
+            continue
+        # Números de um dígito ("1", "7") são ambíguos demais para trocar
+        if len(old_form) < 2 or (
+            replacements.setdefault(old_form, new_form) != new_form
+        ):
+            conflicts.add(old_form)
+    if not replacements and not conflicts:
+        return report, 0
+
+    # Uma passada no texto: só troca números que aparecem uma única vez
+    counts = Counter(_NUMBER.findall(report))
+    targets = {
+        old: new
+        for old, new in replacements.items()
+        if counts[old] == 1 and old not in conflicts
+    }
+    # Valor antigo que ficaria no texto: só é aceitável se também for um
+    # valor do novo paciente
+    current = {new_form for _, new_form in pairs}
+    current.update(
+        form
+        for value in patient_data.values()
+        if isinstance(value, (int, float))
+        for form in _number_forms(value)
+    )
+    if any(
+        counts[old] and old not in targets and old not in current
+        for old in replacements.keys() | conflicts
+    ):
+        return None, 0
+    if not targets:
+        return report, 0
+    adapted = _NUMBER.sub(lambda m: targets.get(m.group(), m.group()), report)
+    return adapted, len(targets)
+
+
+class _Bucket:
+    """
+    Ring buffer of quantized vectors plus their reports.
+
+    Vectors are kept as float32 holding the integer quantization levels, with
+    their squared norms precomputed, so a lookup is one matrix-vector product
+    (||x||² - 2x·q + ||q||²) over the whole bucket.
+    """
+
+    __slots__ = ("vectors", "norms", "entries", "size", "next", "exact", "max_entries")
+
+    def __init__(self, n_features: int, max_entries: int):
+        capacity = min(1024, max_entries)
+        self.vectors = np.empty((capacity, n_features), dtype=np.float32)
+        self.norms = np.empty(capacity, dtype=np.float32)
+        self.entries: List[Optional[tuple]] = [None] * capacity
+        self.size = 0
+        self.next = 0
+        self.exact: Dict[bytes, int] = {}
+        self.max_entries = max_entries
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.norms.nbytes
+
+    def nearest(self, query: np.ndarray) -> Tuple[int, float]:
+        vectors = self.vectors[: self.size]
+        distances = self.norms[: self.size] - 2 * (vectors @ query)
+        index = int(distances.argmin())
+        return index, float(distances[index] + query @ query)
+
+    def add(self, key: bytes, query: np.ndarray, entry: tuple) -> None:
+        index = self.exact.get(key)
+        if index is None:
+            index = self._slot()
+        self.vectors[index] = query
+        self.norms[index] = query @ query
+        self.entries[index] = entry
+        self.exact[key] = index
+
+    def _slot(self) -> int:
+        if self.size < len(self.norms):
+            self.size += 1
+            return self.size - 1
+        if self.size < self.max_entries:
+            capacity = min(2 * self.size, self.max_entries)
+            self.vectors = np.resize(self.vectors, (capacity, self.vectors.shape[1]))
+            self.norms = np.resize(self.norms, capacity)
+            self.entries.extend([None] * (capacity - self.size))
+            self.size += 1
+            return self.size - 1
+
+        # Cheio: sobrescreve a entrada mais antiga
+        index = self.next
+        self.next = (self.next + 1) % self.max_entries
+        old_key = self.entries[index][0]
+        if self.exact.get(old_key) == index:
+            del self.exact[old_key]
+        return index
+
+
+class ApproximateReportCache(ReportCache):
+    """
+    Report cache keyed by the neighborhood of the patient, not exact values.
+
+    The MinMax-scaled feature vector is quantized to `levels` steps per
+    feature and bucketed by model version, predicted class and confidence.
+    A lookup is an exact match on the quantized key or, failing that, a
+    nearest-neighbor search in the bucket: a cached report is reused when the
+    neighbor is within `max_distance` (Euclidean, in scaled units), with the
+    patient's values rewritten into the text by adapt_report().
+    """
+
+    def __init__(
+        self,
+        max_distance: float = 0.05,
+        levels: int = 100,
+        max_entries: int = 100_000,
+    ):
+        if not 1 <= levels <= 255:
+            raise ValueError("levels must be between 1 and 255")
+        self.max_distance = max_distance
+        self.levels = levels
+        self.max_entries = max_entries
+        self._max_distance_sq = (max_distance * levels) ** 2
+        self._buckets: Dict[tuple, _Bucket] = {}
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.adapted_values = 0
+        self.refused = 0
+        self.lookup_time = LatencyStats()
+
+    def quantize(self, features: np.ndarray) -> np.ndarray:
+        scaled = np.clip(np.asarray(features, dtype=np.float32).ravel(), 0.0, 1.0)
+        return np.rint(scaled * self.levels).astype(np.uint8)
+
+    @staticmethod
+    def bucket_key(prediction_result: Dict[str, Any]) -> tuple:
+        return (
+            prediction_result.get("model_version"),
+            bool(prediction_result["has_diabetes"]),
+            prediction_result["confidence"],
+            # Perfil de tamanho do relatório (None: relatório sem perfil)
+            prediction_result.get("report_profile"),
+        )
+
+    @staticmethod
+    def _bucket_label(bucket_key: tuple) -> str:
+        _, has_diabetes, confidence, profile = bucket_key
+        label = f"{'positive' if has_diabetes else 'negative'}-{confidence}"
+        return f"{label}-{profile}" if profile else label
+
+    def lookup(
+        self,
+        features: np.ndarray,
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+    ) -> Optional[str]:
+        start = time.perf_counter()
+        quantized = self.quantize(features)
+        key = quantized.tobytes()
+
+        with self._lock:
+            bucket = self._buckets.get(self.bucket_key(prediction_result))
+            entry, exact = None, False
+            if bucket is not None and bucket.size:
+                index = bucket.exact.get(key)
+                exact = index is not None
+                if not exact:
+                    index, distance_sq = bucket.nearest(quantized.astype(np.float32))
+                    if distance_sq > self._max_distance_sq:
+                        index = None
+                if index is not None:
+                    entry = bucket.entries[index]
+        self.lookup_time.record(time.perf_counter() - start)
+
+        report, replaced = None, 0
+        if entry is not None:
+            _, cached, source_values, source_probability = entry
+            source_data = {
+                name: value
+                for name, value in zip(FEATURE_ORDER, source_values.tolist())
+                if not math.isnan(value)
+            }
+            source_prediction = {"probability": source_probability}
+            report, replaced = adapt_report(
+                cached, source_data, source_prediction, patient_data, prediction_result
+            )
+
+        with self._lock:
+            if report is None:
+                self.misses += 1
+                # Vizinho achado, mas o texto ainda citaria o paciente anterior
+                self.refused += entry is not None
+            else:
+                self.hits += 1
+                self.exact_hits += exact
+                self.adapted_values += replaced
+        return report
+
+    def store(
+        self,
+        features: np.ndarray,
+        patient_data: Dict[str, Any],
+        prediction_result: Dict[str, Any],
+        report: str,
+    ) -> None:
+        quantized = self.quantize(features)
+        key = quantized.tobytes()
+        bucket_key = self.bucket_key(prediction_result)
+        # Só os valores numéricos citados no relatório, não o dict inteiro
+        source_values = np.array(
+            [
+                value if isinstance(value, (int, float)) else np.nan
+                for value in (patient_data.get(name) for name in FEATURE_ORDER)
+            ],
+            dtype=np.float64,
+        )
+        entry = (key, report, source_values, prediction_result["probability"])
+
+        with self._lock:
+            if bucket_key[0] != self._model_version:
+                # Modelo novo: relatórios do anterior deixam de valer
+                self._buckets = {
+                    k: b for k, b in self._buckets.items() if k[0] == bucket_key[0]
+                }
+                self._model_version = bucket_key[0]
+
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None:
+                bucket = _Bucket(len(quantized), self.max_entries)
+                self._buckets[bucket_key] = bucket
+            bucket.add(key, quantized.astype(np.float32), entry)
+            self.stores += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets = {}
+
+    def __len__(self) -> int:
+        return sum(bucket.size for bucket in self._buckets.values())
+
+    def status(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            buckets = {
+                self._bucket_label(key): bucket.size
+                for key, bucket in self._buckets.items()
+            }
+            index_bytes = sum(bucket.nbytes for bucket in self._buckets.values())
+        return {
+            "enabled": True,
+            "max_distance": self.max_distance,
+            "levels": self.levels,
+            "max_entries_per_bucket": self.max_entries,
+            "model_version": self._model_version,
+            "entries": sum(buckets.values()),
+            "buckets": buckets,
+            "index_bytes": index_bytes,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stores": self.stores,
+            "adapted_values": self.adapted_values,
+            "refused": self.refused,
+            "lookup_time": self.lookup_time.summary(),
+        }
@@ -0,0 +1,189 @@
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from api.infra.monitoring.llm_usage import llm_endpoint
+from api.infra.utils.prompt_builder import (
+    REPORT_END_MARKER,
+    REPORT_PROFILES,
+    ReportProfile,
+    profile_sections,
+)
+
+# Perfil padrão pelo endpoint que pediu o relatório (llm_endpoint)
+DEFAULT_ENDPOINT_PROFILES = {
+    "/diagnostic/stream": "standard",
+    "/diagnostic/ws": "standard",
+    "/diagnostic/invoke": "standard",
+    "jobs": "full",
+}
+
+# Início de uma nova seção depois das pedidas
+_NEXT_HEADING = "\n## "
+
+
+def parse_endpoint_profiles(raw: Optional[str]) -> Dict[str, str]:
+    """DEFAULT_ENDPOINT_PROFILES updated with REPORT_ENDPOINT_PROFILES"""
+    profiles = {**DEFAULT_ENDPOINT_PROFILES, **json.loads(raw or "{}")}
+    unknown = set(profiles.values()) - set(REPORT_PROFILES)
+    if unknown:
+        raise ValueError(
+            f"Unknown report profiles {sorted(unknown)}; use {list(REPORT_PROFILES)}"
+        )
+    return profiles
+
+
+def parse_profile_max_tokens(raw: Optional[str]) -> Dict[str, int]:
+    """REPORT_PROFILE_MAX_TOKENS ('{"profile": max_tokens}')"""
+    budgets = {name: int(tokens) for name, tokens in json.loads(raw or "{}").items()}
+    unknown = set(budgets) - set(REPORT_PROFILES)
+    if unknown:
+        raise ValueError(f"Unknown report profiles {sorted(unknown)}")
+    if any(tokens <= 0 for tokens in budgets.values()):
+        raise ValueError(f"Report token budgets must be positive: {budgets}")
+    return budgets
+
+
+class ReportEarlyStop:
+    """
+    Cuts a report once the sections of its profile are complete: at the end
+    marker, or at the next "## " heading after the last requested section.
+
+    Fed the streamed chunks, it returns the text that can be sent; only a
+    tail that could still be the start of the marker (or of that heading)
+    is held back until the next chunk.
+    """
+
+    def __init__(self, profile: ReportProfile):
+        self._headings = [
+            f"## {section.title}" for section in profile_sections(profile)
+        ]
+        # Reprocura um pouco antes do fim anterior: padrão partido entre chunks
+        self._overlap = max(len(h) for h in self._headings + [REPORT_END_MARKER])
+        self._text = ""
+        self._emitted = 0
+        self._scanned = 0
+        self._found = 0
+        self._after_heading = 0
+        self.stopped = False
+
+    def feed(self, chunk: str) -> str:
+        if self.stopped:
+            return ""
+        self._text += chunk
+        cut = self._find_cut()
+        if cut is not None:
+            self.stopped = True
+            return self._emit(cut)
+        return self._emit(len(self._text) - self._partial_match())
+
+    def flush(self) -> str:
+        """Text still held back when the stream ends by itself"""
+        return "" if self.stopped else self._emit(len(self._text))
+
+    def _emit(self, end: int) -> str:
+        end = max(end, self._emitted)
+        text, self._emitted = self._text[self._emitted : end], end
+        return text
+
+    def _patterns(self):
+        if self._found == len(self._headings):
+            return (REPORT_END_MARKER, _NEXT_HEADING)
+        return (REPORT_END_MARKER,)
+
+    def _partial_match(self) -> int:
+        # Maior sufixo do texto que ainda pode virar um dos padrões de corte
+        patterns = self._patterns()
+        longest = max(len(pattern) for pattern in patterns) - 1
+        for size in range(min(longest, len(self._text)), 0, -1):
+            tail = self._text[-size:]
+            if any(pattern.startswith(tail) for pattern in patterns):
+                return size
+        return 0
+
+    def _find_cut(self) -> Optional[int]:
+        text = self._text
+        start, self._scanned = self._scanned, max(0, len(text) - self._overlap)
+
+        while self._found < len(self._headings):
+            index = text.find(
+                self._headings[self._found], max(start, self._after_heading)
+            )
+            if index < 0:
+                break
+            self._after_heading = index + len(self._headings[self._found])
+            self._found += 1
+
+        cuts = [text.find(REPORT_END_MARKER, start)]
+        if self._found == len(self._headings):
+            cuts.append(text.find(_NEXT_HEADING, max(start, self._after_heading)))
+        cuts = [cut for cut in cuts if cut >= 0]
+        return min(cuts) if cuts else None
+
+
+class ReportProfiles:
+    """
+    Chooses the report profile of each request: the one asked for, else the
+    default of the endpoint that triggered the report, else `default`.
+    Token budgets can be overridden per profile.
+    """
+
+    def __init__(
+        self,
+        default: str = "standard",
+        endpoint_profiles: Optional[Dict[str, str]] = None,
+        max_tokens: Optional[Dict[str, int]] = None,
+    ):
+        if default not in REPORT_PROFILES:
+            raise ValueError(f"Unknown report profile {default!r}")
+        self.default = default
+        self.endpoint_profiles = (
+            DEFAULT_ENDPOINT_PROFILES
+            if endpoint_profiles is None
+            else endpoint_profiles
+        )
+        self.profiles = {
+            name: profile._replace(
+                max_tokens=(max_tokens or {}).get(name, profile.max_tokens)
+            )
+            for name, profile in REPORT_PROFILES.items()
+        }
+        self._lock = threading.Lock()
+        self._counts = {
+            name: {"reports": 0, "early_stops": 0} for name in self.profiles
+        }
+
+    def resolve(self, name: Optional[str] = None) -> ReportProfile:
+        """
+        Raises:
+            ValueError: unknown profile name
+        """
+        name = name or self.endpoint_profiles.get(llm_endpoint.get(), self.default)
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise ValueError(
+                f"Unknown report profile {name!r}; use {list(self.profiles)}"
+            )
+        return profile
+
+    def observe(self, profile: ReportProfile, early_stop: bool = False) -> None:
+        with self._lock:
+            self._counts[profile.name]["reports"] += 1
+            if early_stop:
+                self._counts[profile.name]["early_stops"] += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {name: dict(c) for name, c in self._counts.items()}
+        return {
+            "default": self.default,
+            "endpoints": self.endpoint_profiles,
+            "profiles": {
+                name: {
+                    "sections": list(profile.sections),
+                    "max_tokens": profile.max_tokens,
+                    **counts[name],
+                }
+                for name, profile in self.profiles.items()
+            },
+        }
@@ -1,7 +1,30 @@
-from typing import Dict, Any
+import json
+from collections.abc import Mapping
+from typing import Dict, Any, List
 
+FEATURE_LABELS = {
+    "age": ("Age", " years"),
+    "education_level": ("Education level", ""),
+    "income_level": ("Income level", ""),
+    "physical_activity_minutes_per_week": ("Physical activity", " minutes/week"),
+    "diet_score": ("Diet score", "/10"),
+    "family_history_diabetes": ("Family history of diabetes", ""),
+    "bmi": ("BMI", " kg/m²"),
+    "waist_to_hip_ratio": ("Waist-to-hip ratio", ""),
+    "systolic_bp": ("Systolic blood pressure", " mmHg"),
+    "cholesterol_total": ("Total cholesterol", " mg/dL"),
+    "hdl_cholesterol": ("HDL cholesterol", " mg/dL"),
+    "ldl_cholesterol": ("LDL cholesterol", " mg/dL"),
+    "triglycerides": ("Triglycerides", " mg/dL"),
+    "glucose_fasting": ("Fasting glucose", " mg/dL"),
+    "glucose_postprandial": ("Postprandial glucose", " mg/dL"),
+    "insulin_level": ("Insulin level", " μU/mL"),
+    "hba1c": ("HbA1c", "%"),
+    "diabetes_risk_score": ("Diabetes risk score", "/10"),
+}
 
-def format_patient_data(patient_data: Dict[str, Any]) -> str:
+
+def format_patient_data(patient_data: Mapping[str, Any]) -> str:
     """Formats patient data for LLM prompt"""
     return f"""
 PATIENT DATA:
@@ -42,3 +65,40 @@ ANALYSIS RESULT:
 - Confidence level: {confidence.upper()}
 - Threshold used: {threshold:.4f}
 """
+
+
+PREAMBLE_FIELDS = (
+    "has_diabetes",
+    "probability",
+    "threshold_used",
+    "confidence",
+    "model_version",
+    "top_factors",
+)
+
+
+def format_stream_preamble(prediction_result: Dict[str, Any]) -> str:
+    """Formats the prediction as the JSON line that opens a streamed report"""
+    preamble = {"event": "prediction"}
+    preamble.update({key: prediction_result.get(key) for key in PREAMBLE_FIELDS})
+    return json.dumps(preamble) + "\n"
+
+
+def format_risk_factors(top_factors: List[Dict[str, Any]]) -> str:
+    """Formats the model's top risk contributors for LLM prompt"""
+    lines = []
+    for factor in top_factors:
+        label, unit = FEATURE_LABELS.get(factor["feature"], (factor["feature"], ""))
+        value = factor.get("value")
+        if factor["feature"] == "family_history_diabetes":
+            value, unit = ("Yes" if value == 1 else "No"), ""
+        lines.append(
+            f"- {label}: {value}{unit} ({factor['direction']} risk, "
+            f"{factor['contribution']:+.2f} log-odds)"
+        )
+    factors = "\n".join(lines)
+
+    return f"""
+KEY RISK FACTORS (model attribution, largest first):
+{factors}
+"""
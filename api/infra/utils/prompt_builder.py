@@ -1,5 +1,9 @@
-from typing import Dict, Any
-from api.infra.utils.data_formatter import format_patient_data, format_prediction_result
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from api.infra.utils.data_formatter import (
+    format_patient_data,
+    format_prediction_result,
+    format_risk_factors,
+)
 
 
 def create_system_prompt() -> str:
@@ -7,16 +11,180 @@ def create_system_prompt() -> str:
     return """You are an endocrinologist and diabetes specialist. Analyze patient clinical data and ML prediction results to generate a clear, professional diagnostic report. Explain the prediction meaning, highlight key risk factors, provide practical recommendations, and emphasize regular medical follow-up. Keep it evidence-based and empathetic."""
 
 
+def _patient_info(
+    patient_data: Dict[str, Any],
+    prediction_result: Dict[str, Any],
+    top_factors_only: bool,
+) -> str:
+    top_factors = prediction_result.get("top_factors")
+    if top_factors and top_factors_only:
+        return format_risk_factors(top_factors)
+    if top_factors:
+        return format_patient_data(patient_data) + format_risk_factors(top_factors)
+    return format_patient_data(patient_data)
+
+
+class ReportSection(NamedTuple):
+    key: str
+    title: str
+    instruction: str
+    include_patient_data: bool
+
+
+# Seções do relatório em modo seccionado, na ordem em que são entregues
+REPORT_SECTIONS = [
+    ReportSection(
+        "interpretation",
+        "Interpretation",
+        "Explain in plain language what this analysis result means for the "
+        "patient, including the probability and the confidence of the model.",
+        False,
+    ),
+    ReportSection(
+        "risk_factors",
+        "Risk factors",
+        "Identify and explain the main risk factors present in this patient's "
+        "clinical data and how each one relates to diabetes.",
+        True,
+    ),
+    ReportSection(
+        "recommendations",
+        "Recommendations",
+        "Give practical, evidence-based recommendations for diabetes "
+        "prevention or control tailored to this patient's data.",
+        True,
+    ),
+    ReportSection(
+        "follow_up",
+        "Follow-up",
+        "Describe the recommended medical follow-up: which exams to repeat, "
+        "how often, and which specialists to consult.",
+        False,
+    ),
+]
+
+
+# Escrito pela LLM depois da última seção; também é stop sequence
+REPORT_END_MARKER = "<END OF REPORT>"
+
+
+class ReportProfile(NamedTuple):
+    """Report length: the sections to write, how long, and the token budget"""
+
+    name: str
+    sections: Tuple[str, ...]
+    max_tokens: int
+    guidance: str
+
+
+# Perfis de tamanho do relatório (seções na ordem de REPORT_SECTIONS)
+REPORT_PROFILES = {
+    profile.name: profile
+    for profile in (
+        ReportProfile(
+            "summary",
+            ("interpretation", "recommendations"),
+            250,
+            "Be brief: two or three sentences per section.",
+        ),
+        ReportProfile(
+            "standard",
+            ("interpretation", "risk_factors", "recommendations"),
+            600,
+            "Be concise: one short paragraph or a few bullet points per section.",
+        ),
+        ReportProfile(
+            "full",
+            tuple(section.key for section in REPORT_SECTIONS),
+            1200,
+            "Be thorough and explanatory.",
+        ),
+    )
+}
+
+
+def profile_sections(profile: ReportProfile) -> List[ReportSection]:
+    return [section for section in REPORT_SECTIONS if section.key in profile.sections]
+
+
+def report_stop_sequences(profile: ReportProfile) -> List[str]:
+    """
+    Stop sequences of a profile: the end marker, plus the headings of the
+    sections left out that come after its last section (a model that keeps
+    writing past the requested structure stops there).
+    """
+    keys = [section.key for section in REPORT_SECTIONS]
+    last = max(keys.index(key) for key in profile.sections)
+    return [REPORT_END_MARKER] + [
+        f"## {section.title}"
+        for section in REPORT_SECTIONS[last + 1 :]
+        if section.key not in profile.sections
+    ]
+
+
 def create_user_prompt(
     patient_data: Dict[str, Any],
     prediction_result: Dict[str, Any],
+    top_factors_only: bool = False,
+    profile: Optional[ReportProfile] = None,
 ) -> str:
-    """Creates user prompt with patient data and prediction result"""
-    patient_info = format_patient_data(patient_data)
+    """
+    Creates user prompt with patient data and prediction result.
+
+    When top_factors_only is set and the prediction carries model attribution,
+    only the top risk contributors are sent instead of all 18 features. With
+    a profile, the report is asked with the profile's sections as Markdown
+    headings, followed by REPORT_END_MARKER.
+    """
+    patient_info = _patient_info(patient_data, prediction_result, top_factors_only)
     prediction_info = format_prediction_result(prediction_result)
 
-    return f"""{patient_info}
+    if profile is None:
+        return f"""{patient_info}
 
 {prediction_info}
 
 Please generate a comprehensive and explanatory medical report for this patient, explaining the analysis result, the main risk factors identified, and practical recommendations for diabetes prevention or control."""
+
+    structure = "\n".join(
+        f"## {section.title}\n{section.instruction}"
+        for section in profile_sections(profile)
+    )
+    return f"""{patient_info}
+
+{prediction_info}
+
+Write the medical report for this patient using exactly these Markdown sections, in this order, and no others:
+
+{structure}
+
+{profile.guidance} After the last section, write {REPORT_END_MARKER} and stop."""
+
+
+def create_section_prompt(
+    section: ReportSection,
+    patient_data: Dict[str, Any],
+    prediction_result: Dict[str, Any],
+    top_factors_only: bool = False,
+) -> str:
+    """
+    Creates the prompt of a single report section.
+
+    Sections that do not need the full clinical data only get the prediction
+    (and its top factors, when available), keeping each prompt short.
+    """
+    prediction_info = format_prediction_result(prediction_result)
+    if section.include_patient_data:
+        context = _patient_info(patient_data, prediction_result, top_factors_only)
+    elif prediction_result.get("top_factors"):
+        context = format_risk_factors(prediction_result["top_factors"])
+    else:
+        context = ""
+
+    instruction = (
+        f'Write only the "{section.title}" section of this patient\'s medical '
+        "report, without a title and without repeating other sections. "
+        f"{section.instruction}"
+    )
+    parts = (context, prediction_info, instruction)
+    return "\n\n".join(part.strip() for part in parts if part)
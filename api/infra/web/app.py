@@ -2,19 +2,105 @@
 FastAPI Application
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.infra.web.routes import health_router, diagnostic_router
+from api.infra.container.dependecies import container
+from api.infra.monitoring.tracing import tracer
+from api.infra.web.routes import (
+    health_router,
+    diagnostic_router,
+    admin_router,
+    metrics_router,
+    prediction_router,
+    job_router,
+    monitoring_router,
+    profiling_router,
+)
+from api.infra.web.middlewares import LLMEndpointMiddleware, ProfilingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    config = container.envs()
+    if config.TRACING_ENABLED:
+        tracer.configure(container.trace_sampler())
+    # Carrega e aquece o modelo antes de aceitar tráfego
+    container.prediction_service()
+    if config.DRIFT_MONITOR_ENABLED:
+        # Avisa já na inicialização se o modelo não tem estatísticas de treino
+        container.drift_monitor().check_reference()
+    # Tokenizer das estimativas de uso (pode baixar o encoding) fora do event loop
+    await asyncio.to_thread(container.llm_usage().estimator.load)
+    registry = container.model_registry()
+    registry.start_watching()
+    shadow_scorer = container.shadow_scorer()
+    shadow_scorer.start()
+    job_service = container.report_job_service()
+    job_service.start()
+    audit_sink = container.audit_sink()
+    if config.AUDIT_LOG_ENABLED:
+        audit_sink.start()
+    model_catalog = container.model_catalog()
+    if model_catalog is not None:
+        model_catalog.start()
+    llm_probe = container.llm_probe()
+    if llm_probe is not None:
+        llm_probe.start()
+    yield
+    if llm_probe is not None:
+        await llm_probe.stop()
+    if model_catalog is not None:
+        await model_catalog.stop()
+    resumable_streams = container.resumable_streams()
+    if resumable_streams is not None:
+        await resumable_streams.stop()
+    await job_service.stop()
+    shadow_scorer.stop()
+    # Grava o que ainda está no buffer antes de encerrar
+    audit_sink.stop()
+    if tracer.enabled:
+        tracer.sampler.flush()
+        tracer.configure(None)
+        exporter = container.trace_exporter()
+        if exporter is not None:
+            exporter.shutdown()
+    registry.stop_watching()
+
 
 # Criar instância do FastAPI
 app = FastAPI(
     title="Diabetes Detection API",
     description="API para predição de diabetes usando Machine Learning",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Registrar rotas
 app.include_router(health_router)
+app.include_router(job_router)
 app.include_router(diagnostic_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+app.include_router(prediction_router)
+app.include_router(monitoring_router)
+app.include_router(profiling_router)
+
+envs = container.envs()
+
+# Endpoint e cliente das chamadas à LLM (custo por endpoint, fila justa por cliente)
+app.add_middleware(LLMEndpointMiddleware, client_header=envs.LLM_CLIENT_HEADER)
+
+# Profiling sob demanda: sem PROFILING_ENABLED o middleware nem entra na pilha
+if envs.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=container.profile_store(),
+        secret=envs.PROFILING_SECRET,
+        sample_rate=envs.PROFILING_SAMPLE_RATE,
+        interval=envs.PROFILING_INTERVAL,
+        max_concurrent=envs.PROFILING_MAX_CONCURRENT,
+    )
 
 
 @app.get("/")
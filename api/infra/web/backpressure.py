@@ -0,0 +1,25 @@
+"""
+Backpressure - Recusa novas predições enquanto a auditoria está atrasada
+"""
+
+import math
+
+from fastapi import HTTPException
+
+from api.infra.container.dependecies import container
+
+
+def audit_backpressure() -> None:
+    """
+    Route dependency for the routes that score patients: while the audit log
+    is backlogged the request is shed with 503 and Retry-After, before any
+    prediction, instead of growing the audit queue.
+    """
+    audit_sink = container.audit_sink()
+    if audit_sink.backlogged:
+        audit_sink.shed += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Prediction audit log is behind, retry later",
+            headers={"Retry-After": str(max(math.ceil(audit_sink.flush_interval), 1))},
+        )
@@ -0,0 +1,7 @@
+"""
+Batch formats module - Lotes de pacientes em Arrow IPC e MessagePack
+"""
+
+from api.infra.web.batch_formats import arrow_format, msgpack_format
+
+__all__ = ["arrow_format", "msgpack_format"]
@@ -0,0 +1,197 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from api.application.dto.diabetes_prediction import PatientBatchValidationError
+from api.application.dto.patient_batch import (
+    BATCH_COLUMNS,
+    CATEGORIES,
+    PatientBatch,
+    validate_patient_matrix,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    CONFIDENCE_LEVELS,
+)
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    # Dependência opcional: sem pyarrow a rota responde 415
+    pa = pc = None
+
+ARROW_AVAILABLE = pa is not None
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Layout matricial: uma coluna fixed_size_list<double>[18] na ordem BATCH_COLUMNS
+FEATURES_COLUMN = "features"
+
+
+def _document_error(message: str, error_type: str) -> PatientBatchValidationError:
+    return PatientBatchValidationError(
+        {None: [{"field": None, "message": message, "type": error_type}]}
+    )
+
+
+def read_patient_batch(body: bytes) -> PatientBatch:
+    """
+    Reads an Arrow IPC stream of patients into a validated PatientBatch.
+
+    Two layouts are accepted:
+
+    - a `features` column of fixed_size_list<double>[18] in BATCH_COLUMNS
+      order (categories as codes): the matrix is a view of the request body,
+      scored with no copy;
+    - one column per feature, named as in PatientData, with the categories as
+      strings, dictionaries or codes: every column is read in place and
+      written once into the row-major matrix the model takes.
+
+    Nulls are reported as missing fields.
+
+    Raises:
+        PatientBatchValidationError: same error shape as the JSON batch
+    """
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise _document_error(f"Invalid Arrow IPC stream: {e}", "arrow_invalid") from e
+
+    if FEATURES_COLUMN in table.column_names:
+        return validate_patient_matrix(_features_matrix(table.column(FEATURES_COLUMN)))
+    return validate_patient_matrix(_columns_matrix(table))
+
+
+def _features_matrix(column: "pa.ChunkedArray") -> np.ndarray:
+    width = len(BATCH_COLUMNS)
+    if not (
+        pa.types.is_fixed_size_list(column.type) and column.type.list_size == width
+    ):
+        raise _document_error(
+            f"Column {FEATURES_COLUMN!r} must be fixed_size_list<double>[{width}], "
+            f"got {column.type}",
+            "arrow_type",
+        )
+    if column.num_chunks == 0:
+        return np.empty((0, width))
+
+    # Um único chunk é o caso comum; vários são concatenados (uma cópia)
+    rows = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    values = rows.values.slice(rows.offset * width, len(rows) * width)
+    if not pa.types.is_float64(values.type):
+        values = pc.cast(values, pa.float64())
+    # Sem nulos é uma view do corpo da requisição; nulos viram NaN
+    matrix = values.to_numpy(zero_copy_only=False).reshape(len(rows), width)
+    if rows.null_count:
+        matrix = matrix.copy()
+        matrix[~rows.is_valid().to_numpy(zero_copy_only=False)] = np.nan
+    return matrix
+
+
+def _columns_matrix(table: "pa.Table") -> np.ndarray:
+    missing = [name for name in BATCH_COLUMNS if name not in table.column_names]
+    if missing:
+        raise PatientBatchValidationError(
+            {
+                None: [
+                    {"field": name, "message": "Field required", "type": "missing"}
+                    for name in missing
+                ]
+            }
+        )
+
+    matrix = np.empty((table.num_rows, len(BATCH_COLUMNS)))
+    for index, name in enumerate(BATCH_COLUMNS):
+        start = 0
+        for chunk in table.column(name).chunks:
+            end = start + len(chunk)
+            matrix[start:end, index] = _column_values(name, chunk)
+            start = end
+    return matrix
+
+
+def _column_values(name: str, chunk: "pa.Array") -> np.ndarray:
+    if name in CATEGORIES:
+        if pa.types.is_dictionary(chunk.type):
+            # Mapeia só o dicionário e leva os códigos pelos índices
+            dictionary_codes = _category_codes(name, chunk.dictionary)
+            indices = chunk.indices.to_numpy(zero_copy_only=False)
+            codes = np.full(len(chunk), np.nan)
+            valid = ~np.isnan(indices) if indices.dtype.kind == "f" else slice(None)
+            codes[valid] = dictionary_codes[indices[valid].astype(np.intp)]
+            return codes
+        if pa.types.is_string(chunk.type) or pa.types.is_large_string(chunk.type):
+            return _category_codes(name, chunk)
+
+    if not (
+        pa.types.is_integer(chunk.type)
+        or pa.types.is_floating(chunk.type)
+        or pa.types.is_boolean(chunk.type)
+    ):
+        raise _document_error(
+            f"Column {name!r} must be numeric, got {chunk.type}", "arrow_type"
+        )
+    # float64 sem nulos: view sem cópia; nulos viram NaN
+    return chunk.to_numpy(zero_copy_only=False)
+
+
+def _category_codes(name: str, values: "pa.Array") -> np.ndarray:
+    # Código da categoria; -1 para valores desconhecidos, NaN para nulos
+    codes = pc.index_in(values, value_set=pa.array(CATEGORIES[name]))
+    codes = codes.to_numpy(zero_copy_only=False).astype(np.float64)
+    unknown = np.isnan(codes) & values.is_valid().to_numpy(zero_copy_only=False)
+    codes[unknown] = -1
+    return codes
+
+
+def write_predictions(columns: Dict[str, Any]) -> memoryview:
+    """
+    Arrow IPC stream with one row per patient, in request order:
+
+        has_diabetes bool, probability double, confidence dictionary<string>,
+        top_factor_features fixed_size_list<dictionary<string>>[k],
+        top_factor_contributions fixed_size_list<double>[k]
+
+    The model version and threshold go in the schema metadata. The arrays of
+    predict_batch_columns() are wrapped without copying.
+    """
+    arrays: List["pa.Array"] = [
+        pa.array(columns["has_diabetes"]),
+        pa.array(columns["probability"]),
+        pa.DictionaryArray.from_arrays(
+            pa.array(columns["confidence"]), pa.array(CONFIDENCE_LEVELS)
+        ),
+    ]
+    names = ["has_diabetes", "probability", "confidence"]
+
+    top_index = columns["top_factor_index"]
+    if top_index is not None:
+        k = top_index.shape[1]
+        arrays.append(
+            pa.FixedSizeListArray.from_arrays(
+                pa.DictionaryArray.from_arrays(
+                    pa.array(top_index.ravel().astype(np.int8)),
+                    pa.array(FEATURE_ORDER),
+                ),
+                k,
+            )
+        )
+        arrays.append(
+            pa.FixedSizeListArray.from_arrays(
+                pa.array(columns["top_factor_contribution"].ravel()), k
+            )
+        )
+        names += ["top_factor_features", "top_factor_contributions"]
+
+    table = pa.Table.from_arrays(
+        arrays,
+        names=names,
+        metadata={
+            "model_version": str(columns["model_version"]),
+            "threshold_used": repr(columns["threshold_used"]),
+        },
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return memoryview(sink.getvalue())
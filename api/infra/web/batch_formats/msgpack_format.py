@@ -0,0 +1,99 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from api.application.dto.diabetes_prediction import PatientBatchValidationError
+from api.application.dto.patient_batch import (
+    BATCH_COLUMNS,
+    PatientBatch,
+    validate_patient_matrix,
+)
+
+try:
+    import msgpack
+except ImportError:
+    # Dependência opcional: sem msgpack a rota responde 415
+    msgpack = None
+
+MSGPACK_AVAILABLE = msgpack is not None
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _document_error(message: str, error_type: str) -> PatientBatchValidationError:
+    return PatientBatchValidationError(
+        {None: [{"field": None, "message": message, "type": error_type}]}
+    )
+
+
+def read_patient_batch(body: bytes) -> PatientBatch:
+    """
+    Reads a MessagePack document of patients into a validated PatientBatch.
+
+    Two layouts are accepted:
+
+    - an array of rows, each an array of the 18 values in BATCH_COLUMNS
+      order (categories as names or codes, nil for a missing value);
+    - a map {"columns": [...], "data": bin} where data is the row-major
+      float64 little-endian matrix (categories as codes, NaN for missing):
+      it is read with np.frombuffer, without parsing value by value.
+      "columns" may be omitted when it is BATCH_COLUMNS.
+
+    Raises:
+        PatientBatchValidationError: same error shape as the JSON batch
+    """
+    try:
+        document = msgpack.unpackb(body, raw=False)
+    except (ValueError, TypeError) as e:
+        raise _document_error(
+            f"Invalid MessagePack document: {str(e) or type(e).__name__}",
+            "msgpack_invalid",
+        ) from e
+
+    if isinstance(document, list):
+        return validate_patient_matrix(PatientBatch.from_rows(document).values)
+    if isinstance(document, dict):
+        return validate_patient_matrix(_matrix(document))
+    raise _document_error(
+        "Expected an array of rows or a {columns, data} map",
+        error_type="msgpack_type",
+    )
+
+
+def _matrix(document: Dict[str, Any]) -> np.ndarray:
+    columns = list(document.get("columns") or BATCH_COLUMNS)
+    data = document.get("data")
+    if not isinstance(data, bytes):
+        raise _document_error("'data' must be a bin of float64 values", "msgpack_type")
+
+    missing = [name for name in BATCH_COLUMNS if name not in columns]
+    if missing:
+        raise PatientBatchValidationError(
+            {
+                None: [
+                    {"field": name, "message": "Field required", "type": "missing"}
+                    for name in missing
+                ]
+            }
+        )
+    if len(data) % (8 * len(columns)):
+        raise _document_error(
+            f"'data' is not a whole number of rows of {len(columns)} float64 values",
+            "msgpack_shape",
+        )
+
+    matrix = np.frombuffer(data, dtype="<f8").reshape(-1, len(columns))
+    if columns != list(BATCH_COLUMNS):
+        # Outra ordem (ou colunas extras): uma cópia para a ordem do modelo
+        matrix = matrix[:, [columns.index(name) for name in BATCH_COLUMNS]]
+    return matrix
+
+
+def write_predictions(predictions: List[Dict[str, Any]]) -> bytes:
+    """Same document as the JSON batch route, packed as MessagePack"""
+    return msgpack.packb(
+        {
+            "model_version": predictions[0]["model_version"] if predictions else None,
+            "count": len(predictions),
+            "predictions": predictions,
+        }
+    )
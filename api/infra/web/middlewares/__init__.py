@@ -0,0 +1,8 @@
+"""
+Middlewares module - Middlewares ASGI opcionais da API
+"""
+
+from api.infra.web.middlewares.llm_endpoint_middleware import LLMEndpointMiddleware
+from api.infra.web.middlewares.profiling_middleware import ProfilingMiddleware
+
+__all__ = ["LLMEndpointMiddleware", "ProfilingMiddleware"]
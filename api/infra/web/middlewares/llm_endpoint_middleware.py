@@ -0,0 +1,52 @@
+import hashlib
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.infra.monitoring.llm_usage import ANONYMOUS_CLIENT, llm_client, llm_endpoint
+
+API_KEY_HEADER = b"x-api-key"
+
+
+def client_id(scope: Scope, client_header: bytes) -> str:
+    """
+    API client of a request: the client header when sent, otherwise a short
+    hash of the API key (the key itself never reaches metrics or traces),
+    otherwise anonymous.
+    """
+    api_key = None
+    for name, value in scope.get("headers", ()):
+        if name == client_header and value:
+            return value.decode("latin-1")[:64]
+        if name == API_KEY_HEADER and value:
+            api_key = value
+    if api_key is not None:
+        return "key-" + hashlib.sha256(api_key).hexdigest()[:12]
+    return ANONYMOUS_CLIENT
+
+
+class LLMEndpointMiddleware:
+    """
+    Labels the LLM calls of a request with its path and API client, for the
+    usage accounting and the per-client fair scheduling of LLM slots.
+
+    The labels live in context variables, so they also reach the streamed
+    body, the tasks of the WebSocket and the threadpool (invoke) without
+    being passed around.
+    """
+
+    def __init__(self, app: ASGIApp, client_header: str = "x-client-id"):
+        self.app = app
+        self.client_header = client_header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = llm_endpoint.set(scope["path"])
+        client = llm_client.set(client_id(scope, self.client_header))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            llm_client.reset(client)
+            llm_endpoint.reset(endpoint)
@@ -0,0 +1,109 @@
+import hashlib
+import hmac
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.infra.monitoring.sampling_profiler import ProfileStore, SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def sign_profile_token(secret: str, ttl: float = 300.0) -> str:
+    """Token '<expires>.<hmac>' accepted by the middleware until it expires"""
+    expires = str(int(time.time() + ttl))
+    signature = hmac.new(secret.encode(), expires.encode(), hashlib.sha256)
+    return f"{expires}.{signature.hexdigest()}"
+
+
+def verify_profile_token(secret: Optional[str], token: Optional[str]) -> bool:
+    if not secret or not token or "." not in token:
+        return False
+    expires, signature = token.split(".", 1)
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256)
+    return hmac.compare_digest(expected.hexdigest(), signature)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles selected requests end to end, including streamed bodies.
+
+    A request is profiled when it carries a valid X-Profile-Token (HMAC
+    signed, see sign_profile_token) or is picked by sample_rate. The profile
+    id is returned in the X-Profile-Id header. The app only installs this
+    middleware when PROFILING_ENABLED is set, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        secret: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        max_concurrent: int = 1,
+    ):
+        self.app = app
+        self.store = store
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def _selected(self, scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_TOKEN_HEADER)
+        if token is not None:
+            return verify_profile_token(self.secret, token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Limita perfis simultâneos: cada um tem uma thread de amostragem
+        if not self._slots.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(threading.get_ident(), interval=self.interval)
+        profile_id = self.store.new_id()
+        status = {"code": None}
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER, profile_id.encode()),
+                ]
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            self._slots.release()
+            request_info = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+            }
+            try:
+                await run_in_threadpool(
+                    self.store.save, profile_id, profiler, request_info
+                )
+            except Exception:
+                logger.exception("Failed to save profile %s", profile_id)
@@ -0,0 +1,7 @@
+"""
+Multiplex module - Vários relatórios em streaming sobre uma conexão WebSocket
+"""
+
+from api.infra.web.multiplex.report_multiplexer import ReportMultiplexer
+
+__all__ = ["ReportMultiplexer"]
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from api.application.dto.diabetes_prediction import PatientData
+from api.application.enum.report_profile import ReportProfileName
+from api.application.services.diagnostic_service import DiagnosticService
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.monitoring.multiplex_stats import MultiplexStats
+from api.infra.monitoring.tracing import tracer
+from api.infra.services.predict_services.prediction_audit_sink import (
+    PredictionAuditSink,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReportMultiplexer:
+    """
+    Runs the reports submitted over one WebSocket connection.
+
+    Every submitted patient becomes a task; at most `max_concurrency` of them
+    generate at the same time and the others wait for a slot, up to
+    `max_pending` reports per connection. Messages of all reports go through
+    one bounded send queue drained by a single sender, tagged with the report
+    id. When the client reads slowly the queue fills up and the report tasks
+    stop pulling from the LLM, so a connection never buffers more than
+    `send_queue_size` messages. While the audit log is backlogged new
+    submits are refused with a 503 error.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        diagnostic_service: DiagnosticService,
+        stats: MultiplexStats,
+        max_concurrency: int = 4,
+        max_pending: int = 64,
+        send_queue_size: int = 256,
+        audit_sink: Optional[PredictionAuditSink] = None,
+    ):
+        self.websocket = websocket
+        self.diagnostic_service = diagnostic_service
+        self.stats = stats
+        self.max_pending = max_pending
+        self.audit_sink = audit_sink
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=send_queue_size)
+        self._reports: Dict[Any, asyncio.Task] = {}
+
+    async def run(self) -> None:
+        """Serves the connection until the client disconnects"""
+        self.stats.connections += 1
+        self.stats.open_connections += 1
+        sender = asyncio.create_task(self._send_loop())
+        try:
+            while True:
+                try:
+                    message = await self.websocket.receive_json()
+                except WebSocketDisconnect:
+                    break
+                except ValueError:
+                    await self._error(None, 400, "Message is not valid JSON")
+                    continue
+                await self._handle(message)
+        finally:
+            # Cliente saiu: nada mais será lido, cancela relatórios e o envio
+            for task in list(self._reports.values()):
+                task.cancel()
+            await asyncio.gather(*self._reports.values(), return_exceptions=True)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+            self.stats.open_connections -= 1
+
+    async def _handle(self, message: Any) -> None:
+        if not isinstance(message, dict):
+            await self._error(None, 400, "Message must be a JSON object")
+            return
+
+        report_id = message.get("id")
+        if report_id is not None and (
+            isinstance(report_id, bool) or not isinstance(report_id, (str, int))
+        ):
+            # id vira chave de dict: listas/objetos derrubariam a conexão
+            await self._error(None, 400, "Field 'id' must be a string or an integer")
+            return
+        message_type = message.get("type")
+        if message_type == "cancel":
+            task = self._reports.get(report_id)
+            if task is not None:
+                task.cancel()
+                self.stats.cancelled += 1
+                await self._send({"id": report_id, "event": "cancelled"})
+            return
+        if message_type != "submit":
+            await self._error(report_id, 400, f"Unknown message type: {message_type}")
+            return
+
+        if report_id is None:
+            await self._error(None, 400, "Field 'id' is required")
+            return
+        if report_id in self._reports:
+            await self._error(report_id, 409, "A report with this id is in flight")
+            return
+        if len(self._reports) >= self.max_pending:
+            self.stats.rejected += 1
+            await self._error(
+                report_id, 429, f"Too many reports in flight (max {self.max_pending})"
+            )
+            return
+        if self.audit_sink is not None and self.audit_sink.backlogged:
+            self.audit_sink.shed += 1
+            self.stats.rejected += 1
+            await self._error(
+                report_id,
+                503,
+                "Prediction audit log is behind, retry later",
+                retry_after=max(math.ceil(self.audit_sink.flush_interval), 1),
+            )
+            return
+
+        try:
+            patient = PatientData.model_validate(message.get("patient"))
+        except ValidationError as e:
+            self.stats.rejected += 1
+            await self._error(report_id, 422, json.loads(e.json(include_url=False)))
+            return
+        profile = message.get("profile")
+        if profile is not None:
+            try:
+                profile = ReportProfileName(profile).value
+            except ValueError:
+                self.stats.rejected += 1
+                await self._error(
+                    report_id,
+                    422,
+                    f"Unknown report profile {profile!r}; "
+                    f"use {[p.value for p in ReportProfileName]}",
+                )
+                return
+
+        self.stats.submitted += 1
+        self._reports[report_id] = asyncio.create_task(
+            self._run_report(report_id, patient.model_dump(mode="json"), profile)
+        )
+
+    async def _run_report(
+        self,
+        report_id: Any,
+        patient_dict: Dict[str, Any],
+        profile: Optional[str] = None,
+    ) -> None:
+        try:
+            self.stats.waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self.stats.waiting -= 1
+
+            self.stats.running += 1
+            try:
+                with tracer.trace("ws_diagnostic", route="/diagnostic/ws"):
+                    await self._stream_report(report_id, patient_dict, profile)
+            finally:
+                self.stats.running -= 1
+                self._slots.release()
+            self.stats.completed += 1
+            await self._send({"id": report_id, "event": "done"})
+        except LLMOverloadedError as e:
+            self.stats.failed += 1
+            await self._error(report_id, 503, str(e), retry_after=e.retry_after)
+        except Exception as e:
+            self.stats.failed += 1
+            logger.exception(
+                "Report %r failed on the multiplexed connection", report_id
+            )
+            await self._error(report_id, 500, f"Error generating report: {e}")
+        finally:
+            self._reports.pop(report_id, None)
+
+    async def _stream_report(
+        self,
+        report_id: Any,
+        patient_dict: Dict[str, Any],
+        profile: Optional[str] = None,
+    ):
+        stream = self.diagnostic_service.generate_diagnostic_report_stream(
+            patient_dict, profile=profile
+        )
+        try:
+            preamble = True
+            async for chunk in stream:
+                if preamble:
+                    # O preâmbulo já é uma linha JSON: vira a mensagem "prediction"
+                    preamble = False
+                    await self._send({"id": report_id, **json.loads(chunk)})
+                else:
+                    await self._send({"id": report_id, "event": "chunk", "text": chunk})
+        finally:
+            await stream.aclose()
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            # Cliente lento: o relatório espera em vez de acumular saída
+            self.stats.send_blocked += 1
+            start = time.perf_counter()
+            await self._outbox.put(message)
+            self.stats.send_wait.record(time.perf_counter() - start)
+
+    async def _error(
+        self,
+        report_id: Optional[Any],
+        status: int,
+        detail: Any,
+        **fields,
+    ) -> None:
+        await self._send(
+            {
+                "id": report_id,
+                "event": "error",
+                "status": status,
+                "detail": detail,
+                **fields,
+            }
+        )
+
+    async def _send_loop(self) -> None:
+        closed = False
+        while True:
+            message = await self._outbox.get()
+            if closed:
+                continue
+            try:
+                await self.websocket.send_text(json.dumps(message))
+            except (WebSocketDisconnect, RuntimeError):
+                # Conexão caiu: segue esvaziando a fila para ninguém ficar
+                # preso no put até o receive perceber a desconexão
+                closed = True
@@ -0,0 +1,11 @@
+"""
+Resumable module - Streams de relatório retomáveis após reconexão do cliente
+"""
+
+from api.infra.web.resumable.resumable_streams import (
+    ResumableStreams,
+    StreamBuffer,
+    StreamGoneError,
+)
+
+__all__ = ["ResumableStreams", "StreamBuffer", "StreamGoneError"]
@@ -0,0 +1,231 @@
+import asyncio
+import bisect
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class StreamGoneError(Exception):
+    """The requested offset is no longer (or not yet) in the stream buffer"""
+
+
+class StreamBuffer:
+    """
+    Output of one stream, as the bytes sent to the client. The generation
+    appends to it; every connection reading the stream (the original one and
+    the reconnects) follows it from its own offset.
+    """
+
+    def __init__(self, stream_id: str, max_bytes: int):
+        self.id = stream_id
+        self.max_bytes = max_bytes
+        # Offset do primeiro byte ainda guardado (o início sai acima de max_bytes)
+        self.base = 0
+        self.data = bytearray()
+        # Offset final de cada chunk, para saber quantos o cliente já recebeu
+        self.chunk_ends: List[int] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def chunks(self) -> int:
+        return len(self.chunk_ends)
+
+    def chunks_before(self, offset: int) -> int:
+        """Chunks entirely received by a client that got `offset` bytes"""
+        return bisect.bisect_right(self.chunk_ends, offset)
+
+    @property
+    def size(self) -> int:
+        """Offset right after the last generated byte"""
+        return self.base + len(self.data)
+
+    def append(self, chunk: str) -> None:
+        self.data += chunk.encode("utf-8")
+        self.chunk_ends.append(self.size)
+        if len(self.data) > self.max_bytes:
+            dropped = len(self.data) - self.max_bytes
+            del self.data[:dropped]
+            self.base += dropped
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    def _notify(self) -> None:
+        # Acorda quem espera e arma um novo evento para o próximo chunk
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def read(self, offset: int = 0) -> AsyncIterator[bytes]:
+        """
+        Yields the stream from `offset` (bytes) to its end, waiting for the
+        generation while it runs.
+
+        Raises:
+            StreamGoneError: the offset was dropped from the buffer or is past
+                the end of a finished stream
+        """
+        while True:
+            if offset < self.base:
+                raise StreamGoneError(
+                    f"Offset {offset} is no longer buffered (from {self.base})"
+                )
+            if offset < self.size:
+                chunk = bytes(self.data[offset - self.base :])
+                offset += len(chunk)
+                yield chunk
+                continue
+            if self.done:
+                if offset > self.size:
+                    raise StreamGoneError(
+                        f"Offset {offset} is past the end of the stream ({self.size})"
+                    )
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class ResumableStreams:
+    """
+    Registry of streamed reports that a client can reconnect to.
+
+    `start` runs the report generator in a background task that fills a
+    StreamBuffer, so the generation keeps going when the client connection
+    drops; a reconnect reads the same buffer from the offset it had received,
+    instead of resubmitting the patient and paying for a new LLM generation.
+    Finished streams stay available for `ttl` seconds; at most `max_streams`
+    are kept (finished ones are evicted first) and each one keeps its last
+    `max_bytes` bytes.
+
+    The first chunk of a report is the prediction preamble; every other chunk
+    is one LLM token. A resubmission would pay again for the tokens the client
+    had received before the drop: that is what a resume counts as avoided.
+    """
+
+    def __init__(
+        self, ttl: float = 60.0, max_streams: int = 1000, max_bytes: int = 262144
+    ):
+        self.ttl = ttl
+        self.max_streams = max_streams
+        self.max_bytes = max_bytes
+        self._streams: "OrderedDict[str, StreamBuffer]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.started = 0
+        self.resumed = 0
+        self.resume_misses = 0
+        self.evicted_running = 0
+        self.bytes_replayed = 0
+        self.tokens_avoided = 0
+
+    def start(self, chunks: AsyncIterator[str]) -> StreamBuffer:
+        """Starts generating `chunks` into a new buffer"""
+        self._expire()
+        self._make_room()
+        stream_id = secrets.token_urlsafe(12)
+        buffer = self._streams[stream_id] = StreamBuffer(stream_id, self.max_bytes)
+        task = asyncio.create_task(self._produce(buffer, chunks))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.started += 1
+        return buffer
+
+    def get(self, stream_id: str) -> Optional[StreamBuffer]:
+        self._expire()
+        return self._streams.get(stream_id)
+
+    def resume(self, stream_id: str, offset: int) -> StreamBuffer:
+        """
+        Buffer of a stream being resumed from `offset`, counting the replayed
+        bytes and the LLM tokens a resubmission would have generated again
+        (the ones the client had already received).
+
+        Raises:
+            KeyError: unknown or expired stream
+            StreamGoneError: offset not in the buffer
+        """
+        buffer = self.get(stream_id)
+        if buffer is None:
+            self.resume_misses += 1
+            raise KeyError(stream_id)
+        if not buffer.base <= offset <= buffer.size:
+            self.resume_misses += 1
+            raise StreamGoneError(
+                f"Offset {offset} is outside the buffered range "
+                f"[{buffer.base}, {buffer.size}]"
+            )
+        self.resumed += 1
+        self.bytes_replayed += buffer.size - offset
+        self.tokens_avoided += max(buffer.chunks_before(offset) - 1, 0)
+        return buffer
+
+    async def stop(self) -> None:
+        """Cancels the generations still running (shutdown)"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def status(self) -> Dict[str, Any]:
+        self._expire()
+        buffers = list(self._streams.values())
+        return {
+            "enabled": True,
+            "ttl_seconds": self.ttl,
+            "streams": len(buffers),
+            "running": sum(not buffer.done for buffer in buffers),
+            "buffered_bytes": sum(len(buffer.data) for buffer in buffers),
+            "started": self.started,
+            "resumed": self.resumed,
+            "resume_misses": self.resume_misses,
+            "evicted_running": self.evicted_running,
+            "bytes_replayed": self.bytes_replayed,
+            "tokens_avoided": self.tokens_avoided,
+        }
+
+    async def _produce(self, buffer: StreamBuffer, chunks: AsyncIterator[str]):
+        error = None
+        try:
+            async for chunk in chunks:
+                buffer.append(chunk)
+        except asyncio.CancelledError as e:
+            error = e
+            raise
+        except Exception as e:
+            logger.exception("Resumable stream %s failed", buffer.id)
+            error = e
+        finally:
+            buffer.finish(error)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expired = [
+            stream_id
+            for stream_id, buffer in self._streams.items()
+            if buffer.done and now - buffer.finished_at > self.ttl
+        ]
+        for stream_id in expired:
+            del self._streams[stream_id]
+
+    def _make_room(self) -> None:
+        while len(self._streams) >= self.max_streams:
+            # Mais antigo já terminado; sem nenhum, o mais antigo em andamento
+            # (a geração segue para a conexão atual, só não pode ser retomada)
+            stream_id = next(
+                (sid for sid, buffer in self._streams.items() if buffer.done),
+                None,
+            )
+            if stream_id is None:
+                stream_id = next(iter(self._streams))
+                self.evicted_running += 1
+            del self._streams[stream_id]
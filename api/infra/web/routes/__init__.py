@@ -4,5 +4,20 @@ Routes module - Importa todas as rotas
 
 from api.infra.web.routes.health_route import router as health_router
 from api.infra.web.routes.diagnostic_route import router as diagnostic_router
+from api.infra.web.routes.admin_route import router as admin_router
+from api.infra.web.routes.metrics_route import router as metrics_router
+from api.infra.web.routes.prediction_route import router as prediction_router
+from api.infra.web.routes.job_route import router as job_router
+from api.infra.web.routes.monitoring_route import router as monitoring_router
+from api.infra.web.routes.profiling_route import router as profiling_router
 
-__all__ = ["health_router", "diagnostic_router"]
+__all__ = [
+    "health_router",
+    "diagnostic_router",
+    "admin_router",
+    "metrics_router",
+    "prediction_router",
+    "job_router",
+    "monitoring_router",
+    "profiling_router",
+]
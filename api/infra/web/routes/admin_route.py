@@ -0,0 +1,111 @@
+"""
+Admin routes - Model registry inspection and hot-reload
+"""
+
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from api.infra.container.dependecies import container
+from api.infra.services.predict_services.model_registry import (
+    ModelRegistry,
+    ModelVerificationError,
+)
+from api.infra.services.predict_services.shadow_scorer import ShadowScorer
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    expected = container.envs().ADMIN_TOKEN
+    # Sem token configurado as rotas administrativas ficam fechadas
+    if not expected:
+        raise HTTPException(
+            status_code=403, detail="Admin routes are disabled: ADMIN_TOKEN is not set"
+        )
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def get_model_registry() -> ModelRegistry:
+    return container.model_registry()
+
+
+def get_shadow_scorer() -> ShadowScorer:
+    return container.shadow_scorer()
+
+
+@router.get("/models", dependencies=[Depends(verify_admin_token)])
+async def list_models(registry: ModelRegistry = Depends(get_model_registry)):
+    return {
+        **registry.status(),
+        "available": [
+            {
+                "version": artifact["version"],
+                "path": str(artifact["path"]),
+                "modified_at": artifact["modified_at"],
+            }
+            for artifact in registry.discover()
+        ],
+    }
+
+
+@router.post("/models/reload", dependencies=[Depends(verify_admin_token)])
+async def reload_model(
+    version: Optional[str] = None,
+    registry: ModelRegistry = Depends(get_model_registry),
+):
+    """
+    Carrega a versão informada (ou a mais recente) em uma thread de trabalho
+    e troca o modelo ativo sem bloquear as requisições em andamento.
+    """
+    try:
+        if version:
+            loaded = await run_in_threadpool(registry.activate, version)
+        else:
+            newest = registry.discover()
+            if not newest:
+                raise HTTPException(status_code=404, detail="No model artifacts found")
+            loaded = await run_in_threadpool(registry.activate, newest[0]["path"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ModelVerificationError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    return {"active": loaded.info(), "swap_count": registry.swap_count}
+
+
+@router.get("/shadow", dependencies=[Depends(verify_admin_token)])
+async def shadow_status(shadow_scorer: ShadowScorer = Depends(get_shadow_scorer)):
+    return shadow_scorer.status()
+
+
+@router.post("/shadow", dependencies=[Depends(verify_admin_token)])
+async def add_shadow_model(
+    version: str,
+    registry: ModelRegistry = Depends(get_model_registry),
+    shadow_scorer: ShadowScorer = Depends(get_shadow_scorer),
+):
+    """Carrega uma versão candidata e passa a pontuá-la em shadow"""
+    try:
+        path = registry.resolve(version)
+        candidate = await run_in_threadpool(registry.load, path, False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ModelVerificationError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    shadow_scorer.add_candidate(candidate)
+    return shadow_scorer.status()
+
+
+@router.delete("/shadow/{version}", dependencies=[Depends(verify_admin_token)])
+async def remove_shadow_model(
+    version: str, shadow_scorer: ShadowScorer = Depends(get_shadow_scorer)
+):
+    shadow_scorer.remove_candidate(version)
+    return shadow_scorer.status()
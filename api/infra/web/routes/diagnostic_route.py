@@ -2,73 +2,284 @@
 Diagnostic routes - Generate diagnostic reports with ML prediction + LLM explanation
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket
 from fastapi.responses import StreamingResponse
 from api.application.dto.diabetes_prediction import (
     PatientData,
     DiagnosticReportResponse,
     PredictionResponse,
 )
+from api.application.enum.report_profile import ReportProfileName
 from api.application.services.diagnostic_service import DiagnosticService
-from api.infra.container.dependecies import Container
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.container.dependecies import container
+from api.infra.monitoring.tracing import tracer
+from api.infra.utils.data_formatter import format_stream_preamble
+from api.infra.web.backpressure import audit_backpressure
+from api.infra.web.multiplex import ReportMultiplexer
+from api.infra.web.resumable import StreamGoneError
 
 router = APIRouter(prefix="/diagnostic", tags=["Diagnostic"])
 
-container = Container()
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
 
 
 def get_diagnostic_service() -> DiagnosticService:
     return container.diagnostic_service()
 
 
-@router.post("/invoke", response_model=DiagnosticReportResponse)
+def _should_degrade() -> bool:
+    return container.envs().LLM_OVERLOAD_POLICY == "degrade"
+
+
+def _stream_event(event: str, **fields) -> str:
+    return json.dumps({"event": event, **fields}) + "\n"
+
+
+def _profile_name(profile: Optional[ReportProfileName]) -> Optional[str]:
+    return profile.value if profile is not None else None
+
+
+def _overloaded(e: LLMOverloadedError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+@router.post(
+    "/invoke",
+    response_model=DiagnosticReportResponse,
+    dependencies=[Depends(audit_backpressure)],
+)
 def invoke_diagnostic(
     patient_data: PatientData,
+    profile: Optional[ReportProfileName] = Query(default=None),
     diagnostic_service: DiagnosticService = Depends(get_diagnostic_service),
 ):
 
+    with tracer.trace("invoke_diagnostic", route="/diagnostic/invoke"):
+        return _invoke_diagnostic(
+            patient_data, diagnostic_service, _profile_name(profile)
+        )
+
+
+def _invoke_diagnostic(
+    patient_data: PatientData,
+    diagnostic_service: DiagnosticService,
+    profile: Optional[str] = None,
+) -> DiagnosticReportResponse:
     try:
         patient_dict = patient_data.model_dump(mode="json")
+        # Uma predição por requisição: o relatório e a resposta usam a mesma
+        prediction_result = container.prediction_service().predict(patient_dict)
 
-        diagnostic_report = diagnostic_service.generate_diagnostic_report(patient_dict)
+        try:
+            diagnostic_report = diagnostic_service.generate_diagnostic_report(
+                patient_dict, profile=profile, prediction=prediction_result
+            )
+            degraded = False
+        except LLMOverloadedError as e:
+            if not _should_degrade():
+                raise _overloaded(e) from e
+            # Degrada para resposta só com a predição
+            diagnostic_report = ""
+            degraded = True
 
-        prediction_result = container.prediction_service().predict(patient_dict)
         prediction_response = PredictionResponse(**prediction_result)
 
         return DiagnosticReportResponse(
-            prediction=prediction_response, diagnostic_report=diagnostic_report
+            prediction=prediction_response,
+            diagnostic_report=diagnostic_report,
+            degraded=degraded,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating diagnostic report: {str(e)}"
         )
 
 
-@router.post("/stream")
+@router.post("/stream", dependencies=[Depends(audit_backpressure)])
 async def stream_diagnostic(
     patient_data: PatientData,
+    profile: Optional[ReportProfileName] = Query(default=None),
     diagnostic_service: DiagnosticService = Depends(get_diagnostic_service),
 ):
+    """
+    Streams the report as text. The first line is a JSON preamble with the
+    prediction, sent before the LLM produces its first token. `profile`
+    (summary, standard, full) bounds the report length; by default the
+    endpoint's profile is used.
+    """
+    start = time.perf_counter()
+    timings = container.stream_timings()
 
+    # O trace só termina quando o último chunk sai (dentro do generate)
+    root = tracer.start_trace("stream_diagnostic", route="/diagnostic/stream")
     try:
         patient_dict = patient_data.model_dump(mode="json")
+        prediction_result = container.prediction_service().predict(patient_dict)
+
+        stream = tracer.stream(
+            diagnostic_service.generate_diagnostic_report_stream(
+                patient_dict,
+                profile=_profile_name(profile),
+                prediction=prediction_result,
+            ),
+            root,
+        )
+
+        # Primeiro chunk (preâmbulo) antes de responder: fila da LLM cheia ainda vira 503
+        try:
+            first_chunk = await anext(stream)
+        except StopAsyncIteration:
+            first_chunk = None
+        except LLMOverloadedError as e:
+            await stream.aclose()
+            if not _should_degrade():
+                raise _overloaded(e) from e
+            tracer.end(root, error=e)
+            return StreamingResponse(
+                iter([format_stream_preamble(prediction_result)]),
+                media_type="text/plain",
+                headers={**STREAM_HEADERS, "X-Degraded": "true"},
+            )
 
         async def generate():
-            async for chunk in diagnostic_service.generate_diagnostic_report_stream(
-                patient_dict
-            ):
+            # Lado da geração: TTFT, fim do stream e trace
+            error = None
+            chunks = 0
+            try:
+                if first_chunk is None:
+                    return
+                yield first_chunk
+                async for chunk in stream:
+                    if chunks == 0:
+                        timings.ttft.record(time.perf_counter() - start)
+                    chunks += 1
+                    yield chunk
+            except LLMOverloadedError as e:
+                # LLM saturou depois do preâmbulo: a predição já foi entregue
+                error = e
+                timings.overloaded_after_preamble += 1
+                yield _stream_event(
+                    "error", status=503, detail=str(e), retry_after=e.retry_after
+                )
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                timings.total.record(time.perf_counter() - start)
+                tracer.end(root, error=error)
+
+        streams = container.resumable_streams()
+        headers = dict(STREAM_HEADERS)
+        body = generate()
+        if streams is not None:
+            # Geração em background: segue se a conexão cair e pode ser retomada
+            buffer = streams.start(body)
+            headers["X-Stream-Id"] = buffer.id
+            body = buffer.read()
+
+        async def respond():
+            first = True
+            async for chunk in body:
                 yield chunk
+                if first:
+                    first = False
+                    timings.ttfb.record(time.perf_counter() - start)
+                    if root is not None:
+                        root.add_event("first_byte")
 
         return StreamingResponse(
-            generate(),
+            respond(),
             media_type="text/plain",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            },
+            headers=headers,
         )
+    except HTTPException as e:
+        tracer.end(root, error=e)
+        raise
     except Exception as e:
+        tracer.end(root, error=e)
         raise HTTPException(
             status_code=500, detail=f"Error streaming diagnostic report: {str(e)}"
         )
+
+
+@router.get("/stream/{stream_id}")
+async def resume_stream_diagnostic(
+    stream_id: str,
+    offset: Optional[int] = Query(default=None, ge=0),
+    last_event_id: Optional[str] = Header(default=None),
+):
+    """
+    Resumes a /diagnostic/stream response after the connection dropped, from
+    `offset` (bytes already received; the Last-Event-ID header also works)
+    without a new LLM generation. The stream id is the X-Stream-Id header.
+    """
+    streams = container.resumable_streams()
+    if streams is None:
+        raise HTTPException(status_code=404, detail="Resumable streams are disabled")
+    if offset is None:
+        try:
+            offset = int(last_event_id or 0)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400, detail="Last-Event-ID must be a byte offset"
+            ) from e
+
+    try:
+        buffer = streams.resume(stream_id, offset)
+    except KeyError as e:
+        raise HTTPException(
+            status_code=404, detail=f"Stream {stream_id} not found or expired"
+        ) from e
+    except StreamGoneError as e:
+        raise HTTPException(status_code=416, detail=str(e)) from e
+
+    return StreamingResponse(
+        buffer.read(offset),
+        media_type="text/plain",
+        headers={
+            **STREAM_HEADERS,
+            "X-Stream-Id": buffer.id,
+            "X-Stream-Offset": str(offset),
+        },
+    )
+
+
+@router.websocket("/ws")
+async def diagnostic_websocket(
+    websocket: WebSocket,
+    diagnostic_service: DiagnosticService = Depends(get_diagnostic_service),
+):
+    """
+    Streams many reports over one connection.
+
+    The client sends {"type": "submit", "id": ..., "patient": {...}}, with an
+    optional "profile" (or {"type": "cancel", "id": ...}); the server answers with messages tagged
+    by id: the "prediction" preamble, "chunk" messages with the report text,
+    then "done", or "error" with an HTTP-like status.
+    """
+    await websocket.accept()
+    envs = container.envs()
+    multiplexer = ReportMultiplexer(
+        websocket,
+        diagnostic_service,
+        stats=container.multiplex_stats(),
+        audit_sink=container.audit_sink(),
+        max_concurrency=envs.WS_MAX_CONCURRENT_REPORTS,
+        max_pending=envs.WS_MAX_PENDING_REPORTS,
+        send_queue_size=envs.WS_SEND_QUEUE_SIZE,
+    )
+    await multiplexer.run()
@@ -2,9 +2,12 @@
 Health check routes
 """
 
+from datetime import datetime
+
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
-from datetime import datetime
+
+from api.infra.container.dependecies import container
 
 router = APIRouter()
 
@@ -19,3 +22,23 @@ async def health_check():
         },
         status_code=200,
     )
+
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness for the load balancer: 200 when this worker can serve reports,
+    503 otherwise (model not loaded, LLM unreachable or its queue full).
+    Read from cached state only; `load_score` (also the X-Load-Score header)
+    is for least-loaded routing.
+    """
+    readiness = container.readiness().check()
+    return JSONResponse(
+        content={
+            "status": "ready" if readiness["ready"] else "not_ready",
+            **readiness,
+            "timestamp": datetime.now().isoformat(),
+        },
+        status_code=200 if readiness["ready"] else 503,
+        headers={"X-Load-Score": str(readiness["load_score"])},
+    )
@@ -0,0 +1,76 @@
+"""
+Report job routes - Enqueue diagnostic reports and poll for the result
+"""
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from api.application.dto.diabetes_prediction import PatientData
+from api.application.dto.report_job import ReportJobResponse
+from api.application.enum.report_profile import ReportProfileName
+from api.infra.container.dependecies import container
+from api.infra.services.jobs.report_job_service import ReportJobService
+from api.infra.web.backpressure import audit_backpressure
+
+router = APIRouter(prefix="/diagnostic/jobs", tags=["Diagnostic Jobs"])
+
+
+def get_report_job_service() -> ReportJobService:
+    return container.report_job_service()
+
+
+def _to_response(job: Dict[str, Any]) -> ReportJobResponse:
+    return ReportJobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        prediction=job["prediction"],
+        diagnostic_report=job.get("report"),
+        error=job.get("error"),
+        attempts=job.get("attempts", 0),
+        created_at=job.get("created_at"),
+        finished_at=job.get("finished_at"),
+    )
+
+
+@router.post(
+    "",
+    status_code=202,
+    response_model=ReportJobResponse,
+    dependencies=[Depends(audit_backpressure)],
+)
+async def create_report_job(
+    patient_data: PatientData,
+    profile: Optional[ReportProfileName] = Query(default=None),
+    job_service: ReportJobService = Depends(get_report_job_service),
+):
+    """Calcula a predição na hora e enfileira o relatório da LLM"""
+    submitted = await run_in_threadpool(
+        job_service.submit,
+        patient_data.model_dump(mode="json"),
+        profile.value if profile is not None else None,
+    )
+    return ReportJobResponse(**submitted)
+
+
+@router.get("/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    job_service: ReportJobService = Depends(get_report_job_service),
+):
+    job = await run_in_threadpool(job_service.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _to_response(job)
+
+
+@router.get("/{job_id}/wait", response_model=ReportJobResponse)
+async def wait_report_job(
+    job_id: str,
+    timeout: float = Query(30.0, gt=0, le=120),
+    job_service: ReportJobService = Depends(get_report_job_service),
+):
+    """Long-poll: responde quando o job termina ou quando o timeout expira"""
+    job = await job_service.wait(job_id, timeout)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _to_response(job)
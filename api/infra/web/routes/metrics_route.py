@@ -0,0 +1,53 @@
+"""
+Metrics routes - Runtime counters for the prediction and LLM pipeline
+"""
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from api.infra.container.dependecies import container
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    report_cache = container.report_cache()
+    model_router = container.model_router()
+    resumable_streams = container.resumable_streams()
+    report_profiles = container.report_profiles()
+    # Status do cassete quando a LLM grava ou reproduz (repassado pelo wrapper)
+    llm_service = container.diagnostic_service().llm_service
+    return {
+        "model": container.model_registry().status(),
+        "shadow": container.shadow_scorer().status(),
+        "llm_admission": container.llm_admission().status(),
+        "report_jobs": container.report_job_service().status(),
+        "audit": container.audit_sink().status(),
+        "diagnostic_stream": container.stream_timings().status(),
+        "diagnostic_ws": container.multiplex_stats().status(),
+        "resumable_streams": (
+            resumable_streams.status()
+            if resumable_streams is not None
+            else {"enabled": False}
+        ),
+        "report_cache": (
+            report_cache.status() if report_cache is not None else {"enabled": False}
+        ),
+        "report_profiles": (
+            report_profiles.status()
+            if report_profiles is not None
+            else {"enabled": False}
+        ),
+        "llm_routing": (
+            model_router.status() if model_router is not None else {"enabled": False}
+        ),
+        "llm_cassette": (
+            llm_service.status() if hasattr(llm_service, "status") else {"mode": None}
+        ),
+    }
+
+
+@router.get("/metrics/llm-usage")
+async def get_llm_usage():
+    """Prompt/completion tokens, TTFT, tokens/s and cost per provider, model and endpoint"""
+    return await run_in_threadpool(container.llm_usage().report)
@@ -0,0 +1,34 @@
+"""
+Monitoring routes - Feature drift of live traffic and slowest request traces
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from api.infra.container.dependecies import container
+from api.infra.monitoring.drift_monitor import DriftMonitor
+from api.infra.monitoring.tracing import tracer
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+
+
+def get_drift_monitor() -> DriftMonitor:
+    return container.drift_monitor()
+
+
+@router.get("/drift")
+async def get_drift(monitor: DriftMonitor = Depends(get_drift_monitor)):
+    if not container.envs().DRIFT_MONITOR_ENABLED:
+        raise HTTPException(status_code=404, detail="Drift monitor is disabled")
+    # Merge dos shards e PSI fora do event loop
+    return await run_in_threadpool(monitor.report)
+
+
+@router.get("/traces")
+async def get_slowest_traces(limit: int = Query(20, ge=1, le=500)):
+    """Slowest traces kept by the sampler in the last minutes, with all spans"""
+    if not tracer.enabled:
+        raise HTTPException(status_code=404, detail="Tracing is disabled")
+    return {
+        **tracer.sampler.status(),
+        "traces": tracer.sampler.slowest()[:limit],
+    }
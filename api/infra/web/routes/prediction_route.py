@@ -0,0 +1,180 @@
+"""
+Prediction routes - Bulk ML scoring without the LLM stage
+"""
+
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response
+from api.application.dto.diabetes_prediction import (
+    BatchPredictionResponse,
+    PatientBatchValidationError,
+)
+from api.application.dto.patient_batch import PatientBatch, validate_patient_columns
+from api.infra.container.dependecies import container
+from api.infra.web.backpressure import audit_backpressure
+from api.infra.web.batch_formats import arrow_format, msgpack_format
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+
+router = APIRouter(
+    prefix="/prediction",
+    tags=["Prediction"],
+    default_response_class=ORJSONResponse,
+    dependencies=[Depends(audit_backpressure)],
+)
+
+
+def get_prediction_service() -> DiabetesPredictionService:
+    return container.prediction_service()
+
+
+def _read_batch(
+    body: bytes, reader: Callable[[bytes], PatientBatch]
+) -> tuple[Optional[PatientBatch], Optional[ORJSONResponse]]:
+    """Parses a batch body; on error returns the 422/413 response instead"""
+    try:
+        batch = reader(body)
+    except PatientBatchValidationError as e:
+        return None, ORJSONResponse(
+            status_code=422,
+            content={
+                "detail": "Invalid patient rows",
+                "errors": [
+                    {"index": index, "errors": errors}
+                    for index, errors in sorted(
+                        e.errors.items(), key=lambda item: (item[0] is None, item[0])
+                    )
+                ],
+            },
+        )
+
+    max_batch_size = container.envs().PREDICTION_MAX_BATCH_SIZE
+    if len(batch) > max_batch_size:
+        return None, ORJSONResponse(
+            status_code=413,
+            content={"detail": f"Batch larger than {max_batch_size} patients"},
+        )
+    return batch, None
+
+
+def _binary_body(media_type: str) -> dict:
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": {"type": "string", "format": "binary"}}},
+        }
+    }
+
+
+def _unavailable(package: str) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=415,
+        content={"detail": f"This format needs the optional {package} package"},
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=BatchPredictionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/PatientData"},
+                    }
+                }
+            },
+        }
+    },
+)
+async def predict_batch(
+    request: Request,
+    prediction_service: DiabetesPredictionService = Depends(get_prediction_service),
+):
+    """
+    Valida o lote inteiro em uma única chamada e pontua todos os pacientes em
+    uma passada vetorizada. Linhas inválidas retornam 422 com erros por índice.
+    Os pacientes validados vão direto para um PatientBatch (matriz colunar),
+    sem serializar um dict por linha.
+    """
+    batch, error = _read_batch(await request.body(), validate_patient_columns)
+    if error is not None:
+        return error
+
+    predictions = await run_in_threadpool(prediction_service.predict_batch, batch)
+
+    # Resposta montada como dict e serializada direto pelo orjson
+    return ORJSONResponse(
+        content={
+            "model_version": predictions[0]["model_version"] if predictions else None,
+            "count": len(predictions),
+            "predictions": predictions,
+        }
+    )
+
+
+@router.post(
+    "/batch/arrow",
+    response_class=Response,
+    responses={200: {"content": {arrow_format.ARROW_MEDIA_TYPE: {}}}},
+    openapi_extra=_binary_body(arrow_format.ARROW_MEDIA_TYPE),
+)
+async def predict_batch_arrow(
+    request: Request,
+    prediction_service: DiabetesPredictionService = Depends(get_prediction_service),
+):
+    """
+    Lote em Arrow IPC (stream): uma coluna `features` fixed_size_list<double>[18]
+    ou uma coluna por feature. As colunas viram a matriz do modelo sem passar
+    por objetos Python, e a resposta volta como Arrow IPC, uma linha por
+    paciente (versão do modelo e threshold nos metadados do schema).
+    """
+    if not arrow_format.ARROW_AVAILABLE:
+        return _unavailable("pyarrow")
+
+    batch, error = _read_batch(await request.body(), arrow_format.read_patient_batch)
+    if error is not None:
+        return error
+
+    def score() -> memoryview:
+        columns = prediction_service.predict_batch_columns(batch)
+        return arrow_format.write_predictions(columns)
+
+    content = await run_in_threadpool(score)
+    return Response(content=content, media_type=arrow_format.ARROW_MEDIA_TYPE)
+
+
+@router.post(
+    "/batch/msgpack",
+    response_class=Response,
+    responses={200: {"content": {msgpack_format.MSGPACK_MEDIA_TYPE: {}}}},
+    openapi_extra=_binary_body(msgpack_format.MSGPACK_MEDIA_TYPE),
+)
+async def predict_batch_msgpack(
+    request: Request,
+    prediction_service: DiabetesPredictionService = Depends(get_prediction_service),
+):
+    """
+    Lote em MessagePack: array de linhas com os 18 valores ou o mapa
+    {columns, data} com a matriz float64 em binário. A resposta é o mesmo
+    documento da rota JSON, em MessagePack.
+    """
+    if not msgpack_format.MSGPACK_AVAILABLE:
+        return _unavailable("msgpack")
+
+    batch, error = _read_batch(await request.body(), msgpack_format.read_patient_batch)
+    if error is not None:
+        return error
+
+    def score() -> bytes:
+        predictions = prediction_service.predict_batch(batch)
+        return msgpack_format.write_predictions(predictions)
+
+    content = await run_in_threadpool(score)
+    return Response(content=content, media_type=msgpack_format.MSGPACK_MEDIA_TYPE)
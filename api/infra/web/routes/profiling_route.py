@@ -0,0 +1,59 @@
+"""
+Profiling routes - Signed profiling tokens and download of request profiles
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from api.infra.container.dependecies import container
+from api.infra.monitoring.sampling_profiler import ProfileStore
+from api.infra.web.middlewares.profiling_middleware import sign_profile_token
+from api.infra.web.routes.admin_route import verify_admin_token
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["Admin"],
+    dependencies=[Depends(verify_admin_token)],
+)
+
+
+def get_profile_store() -> ProfileStore:
+    return container.profile_store()
+
+
+@router.post("/token")
+async def create_profile_token(ttl: float = Query(300.0, gt=0, le=3600)):
+    envs = container.envs()
+    if not envs.PROFILING_ENABLED or not envs.PROFILING_SECRET:
+        raise HTTPException(
+            status_code=409,
+            detail="Profiling requires PROFILING_ENABLED and PROFILING_SECRET",
+        )
+    return {
+        "header": "X-Profile-Token",
+        "token": sign_profile_token(envs.PROFILING_SECRET, ttl),
+        "expires_in": ttl,
+    }
+
+
+@router.get("")
+def list_profiles(store: ProfileStore = Depends(get_profile_store)):
+    return {"profiles": store.list()}
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)):
+    summary = store.get(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return summary
+
+
+@router.get("/{profile_id}/folded")
+def download_folded_profile(
+    profile_id: str, store: ProfileStore = Depends(get_profile_store)
+):
+    """Folded stacks, input for flamegraph.pl or speedscope"""
+    path = store.folded_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
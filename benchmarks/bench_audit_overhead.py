@@ -0,0 +1,112 @@
+"""
+Per-request overhead of the write-behind prediction audit log.
+
+Runs N single-patient predictions without observers, with the audit sink, and
+with the audit sink on a simulated slow disk (each flush sleeps), then prints
+latency percentiles and how many records reached the files.
+
+    python -m benchmarks.bench_audit_overhead --requests 5000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.services.predict_services.prediction_audit_sink import (
+    PredictionAuditSink,
+)
+
+
+class SlowDiskAuditSink(PredictionAuditSink):
+    """Audit sink whose flushes take at least flush_delay seconds"""
+
+    def __init__(self, *args, flush_delay: float = 0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_delay = flush_delay
+
+    def _flush(self, buffer):
+        time.sleep(self.flush_delay)
+        return super()._flush(buffer)
+
+
+def run(service: DiabetesPredictionService, requests: int) -> LatencyStats:
+    latencies = LatencyStats(window=requests)
+    for i in range(requests):
+        patient = SMOKE_BATCH[i % len(SMOKE_BATCH)]
+        start = time.perf_counter()
+        service.predict(patient)
+        latencies.record(time.perf_counter() - start)
+    return latencies
+
+
+def observe_cost(sink: PredictionAuditSink, service, calls: int) -> float:
+    """Mean seconds spent inside observe() for a single-row prediction"""
+    loaded = service.active_model
+    features = loaded.encode(pd.DataFrame([SMOKE_BATCH[0]]))
+    probabilities = loaded.predict_proba(loaded.scale(features))
+    start = time.perf_counter()
+    for _ in range(calls):
+        sink.observe(features, probabilities, loaded.threshold, loaded.version)
+    return (time.perf_counter() - start) / calls
+
+
+def report(label: str, latencies: LatencyStats, sink=None):
+    summary = latencies.summary()
+    line = (
+        f"{label:<18} mean={summary['mean_ms'] * 1000:8.1f}us "
+        f"p50={summary['p50_ms'] * 1000:8.1f}us p99={summary['p99_ms'] * 1000:8.1f}us"
+    )
+    if sink is not None:
+        status = sink.status()
+        line += (
+            f"  written={status['written']} backlogged={status['backlogged']} "
+            f"overflows={status['overflows']} flushes={status['flushes']}"
+        )
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--slow-flush", type=float, default=0.05)
+    args = parser.parse_args()
+
+    service = DiabetesPredictionService()
+    run(service, 200)
+
+    report("no audit", run(service, args.requests))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = PredictionAuditSink(Path(tmp) / "fast")
+        service.observers = [sink]
+        latencies = run(service, args.requests)
+        sink.stop()
+        report("audit", latencies, sink)
+
+        sink = PredictionAuditSink(Path(tmp) / "observe")
+        cost = observe_cost(sink, service, args.requests * 10)
+        sink.stop()
+        print(f"observe() alone    mean={cost * 1e6:8.2f}us")
+
+        slow = SlowDiskAuditSink(
+            Path(tmp) / "slow",
+            max_queue_size=256,
+            flush_rows=64,
+            flush_delay=args.slow_flush,
+        )
+        service.observers = [slow]
+        latencies = run(service, args.requests)
+        slow.stop()
+        report("audit, slow disk", latencies, slow)
+
+
+if __name__ == "__main__":
+    main()
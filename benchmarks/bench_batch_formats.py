@@ -0,0 +1,133 @@
+"""
+Bytes on the wire and parse time of the batch prediction formats.
+
+Builds --rows synthetic patients and, for each body format of the batch
+routes (JSON, Arrow IPC by column and as a `features` matrix, MessagePack
+rows and binary matrix), measures the request size and the time to turn
+the body into the validated PatientBatch the model scores, next to the
+scoring itself. The responses are encoded the way each route does and
+measured the same way. Best of --repeat runs, in-process (no HTTP):
+
+    python -m benchmarks.bench_batch_formats --rows 100000 --repeat 5
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, Tuple
+
+import msgpack
+import orjson
+import pyarrow as pa
+
+from api.application.dto.patient_batch import (
+    BATCH_COLUMNS,
+    PatientBatch,
+    validate_patient_columns,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.web.batch_formats import arrow_format, msgpack_format
+
+
+def make_patients(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    patients = []
+    for i in range(n):
+        patient = dict(SMOKE_BATCH[i % len(SMOKE_BATCH)])
+        patient["age"] = round(rng.uniform(20, 85), 0)
+        patient["bmi"] = round(rng.uniform(18, 42), 1)
+        patient["hba1c"] = round(rng.uniform(4.5, 10.0), 1)
+        patient["glucose_fasting"] = round(rng.uniform(70, 200), 0)
+        patients.append(patient)
+    return patients
+
+
+def arrow_stream(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def bodies(patients: list) -> Dict[str, Tuple[bytes, Callable[[bytes], PatientBatch]]]:
+    values = PatientBatch.from_records(patients).values
+    features = pa.FixedSizeListArray.from_arrays(
+        pa.array(values.ravel()), len(BATCH_COLUMNS)
+    )
+    return {
+        "json": (orjson.dumps(patients), validate_patient_columns),
+        "arrow columns": (
+            arrow_stream(pa.Table.from_pylist(patients)),
+            arrow_format.read_patient_batch,
+        ),
+        "arrow features": (
+            arrow_stream(pa.table({"features": features})),
+            arrow_format.read_patient_batch,
+        ),
+        "msgpack rows": (
+            msgpack.packb([[p[name] for name in BATCH_COLUMNS] for p in patients]),
+            msgpack_format.read_patient_batch,
+        ),
+        "msgpack matrix": (
+            msgpack.packb({"data": values.tobytes()}),
+            msgpack_format.read_patient_batch,
+        ),
+    }
+
+
+def best_of(repeat: int, fn: Callable, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    service = DiabetesPredictionService()
+    patients = make_patients(args.rows)
+    per_100k = 100_000 / args.rows
+
+    print(f"requests ({args.rows} rows, times per 100k rows)")
+    batch = None
+    for name, (body, reader) in bodies(patients).items():
+        seconds, batch = best_of(args.repeat, reader, body)
+        print(
+            f"  {name:<15} {len(body) / 1e6:7.2f} MB  "
+            f"parse {seconds * per_100k * 1000:8.1f} ms"
+        )
+
+    score, _ = best_of(args.repeat, service.predict_batch_columns, batch)
+    print(f"  {'scoring':<15} {'':>10}  model {score * per_100k * 1000:8.1f} ms")
+
+    print("responses")
+    responses = {
+        "json": lambda: orjson.dumps(
+            {"count": len(batch), "predictions": service.predict_batch(batch)}
+        ),
+        "arrow": lambda: arrow_format.write_predictions(
+            service.predict_batch_columns(batch)
+        ),
+        "msgpack": lambda: msgpack_format.write_predictions(
+            service.predict_batch(batch)
+        ),
+    }
+    for name, encode in responses.items():
+        seconds, content = best_of(args.repeat, encode)
+        print(
+            f"  {name:<15} {len(content) / 1e6:7.2f} MB  "
+            f"score+encode {seconds * per_100k * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Request/response overhead per 1k patients: per-row validation + json encoder
+versus TypeAdapter.validate_json + orjson. Model scoring is excluded.
+
+    python -m benchmarks.bench_batch_validation --patients 1000 --repeat 20
+"""
+
+import argparse
+import json
+import random
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from api.application.dto.diabetes_prediction import (
+    PatientData,
+    PredictionResponse,
+    validate_patient_batch,
+)
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+
+
+def make_payload(n: int) -> bytes:
+    rng = random.Random(42)
+    patients = []
+    for i in range(n):
+        patient = dict(SMOKE_BATCH[i % len(SMOKE_BATCH)])
+        patient["age"] = round(rng.uniform(18, 90), 1)
+        patient["bmi"] = round(rng.uniform(18, 40), 1)
+        patients.append(patient)
+    return json.dumps(patients).encode()
+
+
+def make_predictions(n: int) -> list:
+    return [
+        {
+            "has_diabetes": i % 3 == 0,
+            "probability": 0.42,
+            "threshold_used": 0.59,
+            "confidence": "medium",
+            "model_version": "model_optimized",
+            "top_factors": [
+                {
+                    "feature": "hba1c",
+                    "value": 5.8,
+                    "contribution": 1.2,
+                    "direction": "increases",
+                }
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def baseline(payload: bytes, predictions: list) -> bytes:
+    # Antes: um model_validate + model_dump por paciente e JSONResponse padrão
+    records = [
+        PatientData.model_validate(item).model_dump(mode="json")
+        for item in json.loads(payload)
+    ]
+    assert records
+    content = jsonable_encoder(
+        {"predictions": [PredictionResponse(**p) for p in predictions]}
+    )
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(payload: bytes, predictions: list) -> bytes:
+    records = validate_patient_batch(payload)
+    assert records
+    return orjson.dumps({"predictions": predictions})
+
+
+def measure(fn, payload: bytes, predictions: list, repeat: int) -> float:
+    fn(payload, predictions)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload, predictions)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = make_payload(args.patients)
+    predictions = make_predictions(args.patients)
+    per_1k = 1000 / args.patients
+
+    before = measure(baseline, payload, predictions, args.repeat)
+    after = measure(fast_path, payload, predictions, args.repeat)
+
+    print(f"patients: {args.patients} ({len(payload) / 1024:.1f} KiB payload)")
+    print(f"per-row validation + json:    {before * per_1k * 1000:8.2f} ms / 1k")
+    print(f"TypeAdapter + orjson:         {after * per_1k * 1000:8.2f} ms / 1k")
+    print(f"speedup:                      {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
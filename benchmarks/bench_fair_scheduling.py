@@ -0,0 +1,159 @@
+"""
+Interactive latency under a batch burst: FIFO admission vs fair scheduling.
+
+Simulates mixed traffic on the stub LLM behind an AdmissionController with
+--capacity slots: a partner submits --burst report jobs at once (batch), a
+second partner calls /diagnostic/invoke at --standard-rate (standard) and
+--clinicians clinicians stream reports at --interactive-rate each
+(interactive), for --duration seconds. Every request is run under its own
+llm_client/llm_endpoint, as the middleware and the job workers set them.
+
+- fifo:          one client and one class, the controller before weighted
+                 fair scheduling (arrival order);
+- fair:          priority classes and fair queueing per client;
+- fair+reserved: fair, plus --reserved slots only interactive requests use.
+
+Reports latency (queue wait + generation) per class, and how many burst jobs
+finished while the others were served. Jobs still queued at the end are
+cancelled.
+
+    python -m benchmarks.bench_fair_scheduling --burst 150 --duration 15
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.monitoring.llm_usage import llm_client, llm_endpoint
+from api.infra.services.llm_services.admission_control import (
+    AdmissionControlledLLMService,
+    AdmissionController,
+)
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+
+MODES = ("fifo", "fair", "fair+reserved")
+
+
+async def call(service, client: str, endpoint: str, stats: Optional[LatencyStats]):
+    # Cada task tem o próprio contexto, como cada request/job da API
+    llm_client.set(client)
+    llm_endpoint.set(endpoint)
+    start = time.perf_counter()
+    async for _ in service.generate_response("patient", "system"):
+        pass
+    if stats is not None:
+        stats.record(time.perf_counter() - start)
+
+
+async def arrivals(rng, rate: float, duration: float, start, tasks: list):
+    deadline = time.perf_counter() + duration
+    while True:
+        await asyncio.sleep(rng.expovariate(rate))
+        if time.perf_counter() >= deadline:
+            return
+        tasks.append(asyncio.create_task(start()))
+
+
+async def run(mode: str, args) -> Dict[str, object]:
+    fifo = mode == "fifo"
+    controller = AdmissionController(
+        name="stub",
+        max_concurrency=args.capacity,
+        max_queue_size=100_000,
+        max_queue_time=3600,
+        endpoint_priorities={} if fifo else None,
+        reserved_slots=args.reserved if mode == "fair+reserved" else 0,
+    )
+    service = AdmissionControlledLLMService(
+        StubLLMService(
+            envs=ConfigEnvs(),
+            ttft=args.ttft,
+            token_delay=args.token_delay,
+            tokens=args.tokens,
+            capacity=0,
+        ),
+        controller,
+    )
+
+    def client(name: str) -> str:
+        return "shared" if fifo else name
+
+    stats = {"interactive": LatencyStats(100_000), "standard": LatencyStats(100_000)}
+    burst = [
+        asyncio.create_task(call(service, client("partner-a"), "jobs", None))
+        for _ in range(args.burst)
+    ]
+    tasks: list = []
+    rng = random.Random(7)
+    sources = [
+        arrivals(
+            rng,
+            args.standard_rate,
+            args.duration,
+            lambda: call(
+                service, client("partner-b"), "/diagnostic/invoke", stats["standard"]
+            ),
+            tasks,
+        )
+    ]
+    for i in range(args.clinicians):
+        sources.append(
+            arrivals(
+                rng,
+                args.interactive_rate,
+                args.duration,
+                lambda i=i: call(
+                    service,
+                    client(f"clinic-{i}"),
+                    "/diagnostic/stream",
+                    stats["interactive"],
+                ),
+                tasks,
+            )
+        )
+    await asyncio.gather(*sources)
+    await asyncio.gather(*tasks)
+
+    jobs_done = sum(task.done() for task in burst)
+    for task in burst:
+        task.cancel()
+    await asyncio.gather(*burst, return_exceptions=True)
+    return {**{k: v.summary() for k, v in stats.items()}, "jobs_done": jobs_done}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--reserved", type=int, default=1)
+    parser.add_argument("--burst", type=int, default=150)
+    parser.add_argument("--clinicians", type=int, default=3)
+    parser.add_argument("--interactive-rate", type=float, default=0.5)
+    parser.add_argument("--standard-rate", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    service_time = args.ttft + args.token_delay * args.tokens
+    print(
+        f"capacity ~{args.capacity / service_time:.1f} req/s; burst of {args.burst} "
+        f"jobs, {args.clinicians}x{args.interactive_rate} interactive + "
+        f"{args.standard_rate} standard req/s for {args.duration:.0f}s"
+    )
+    for mode in args.modes:
+        result = asyncio.run(run(mode, args))
+        line = f"{mode:<14}"
+        for name in ("interactive", "standard"):
+            summary = result[name]
+            line += f"  {name} p50={summary['p50_ms']:7.0f}ms p95={summary['p95_ms']:7.0f}ms"
+        print(f"{line}  jobs done={result['jobs_done']}/{args.burst}")
+
+
+if __name__ == "__main__":
+    main()
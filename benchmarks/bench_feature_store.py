@@ -0,0 +1,146 @@
+"""
+Memory and startup time of N training/evaluation workers: joblib vs feature store.
+
+Writes synthetic preprocessed splits (the shape of preprocessed_data.joblib,
+--train-rows x 18 and --test-rows x 18) both as a joblib package and as a
+feature store version, then starts --workers spawned processes per mode:
+
+- joblib: every worker runs joblib.load on the package (the notebook's way);
+- pickle: the parent sends X_train/y_train/X_test/y_test to each worker as
+  arguments, as a process pool running a parallel evaluation would;
+- mmap:   every worker opens the feature store read-only (np.load mmap).
+
+Each worker reads all of X_train and scores X_test, waits until every
+worker is done, then reports the time to get its data and its memory from
+/proc/self/smaps_rollup (Linux): USS (private pages) and PSS (shared pages
+split among the processes that map them). In pickle mode the data arrives
+while the process starts, so its cost shows in "all ready", not in "load".
+
+    python -m benchmarks.bench_feature_store --workers 1 4 8 --train-rows 960000
+"""
+
+import argparse
+import multiprocessing as mp
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import joblib
+import numpy as np
+
+from api.infra.feature_store import FeatureStore
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+
+MODES = ("joblib", "pickle", "mmap")
+
+
+def memory_kb() -> Dict[str, int]:
+    values = {}
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def worker(mode, source, started, barrier, results, arrays=None):
+    load_start = time.perf_counter()
+    if mode == "joblib":
+        arrays = joblib.load(source)
+    elif mode == "mmap":
+        arrays = FeatureStore(source).open()
+    loaded_at = time.time()
+    load = time.perf_counter() - load_start
+
+    # Lê o treino inteiro e pontua o teste, como uma avaliação faria
+    X_train, y_train = arrays["X_train"], arrays["y_train"]
+    coef = np.linalg.lstsq(X_train[:10_000], y_train[:10_000], rcond=None)[0]
+    checksum = float(np.asarray(X_train).sum()) + float((arrays["X_test"] @ coef).sum())
+
+    barrier.wait()
+    results.put(
+        {
+            "load_s": load,
+            "ready_s": loaded_at - started,
+            "checksum": checksum,
+            **memory_kb(),
+        }
+    )
+    barrier.wait()
+
+
+def run(mode: str, workers: int, source: Path, arrays: Optional[dict]) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    started = time.time()
+    processes = [
+        ctx.Process(
+            target=worker,
+            args=(mode, source, started, barrier, results),
+            kwargs={"arrays": arrays if mode == "pickle" else None},
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    rows = [results.get() for _ in range(workers)]
+    barrier.wait()
+    for process in processes:
+        process.join()
+    return {
+        "load_ms": statistics.mean(r["load_s"] for r in rows) * 1000,
+        "ready_ms": max(r["ready_s"] for r in rows) * 1000,
+        "uss_mb": statistics.mean(r["uss"] for r in rows) / 1024,
+        "pss_total_mb": sum(r["pss"] for r in rows) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--train-rows", type=int, default=960_000)
+    parser.add_argument("--test-rows", type=int, default=240_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    arrays = {
+        "X_train": rng.random((args.train_rows, len(FEATURE_ORDER))),
+        "X_test": rng.random((args.test_rows, len(FEATURE_ORDER))),
+        "y_train": rng.integers(0, 2, args.train_rows),
+        "y_test": rng.integers(0, 2, args.test_rows),
+    }
+    size_mb = sum(a.nbytes for a in arrays.values()) / 1e6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        package = Path(tmp) / "preprocessed_data.joblib"
+        joblib.dump(arrays, package)
+        store = FeatureStore(Path(tmp) / "feature_store")
+        store.write(arrays, feature_names=FEATURE_ORDER)
+        sources = {"joblib": package, "pickle": None, "mmap": store.root}
+
+        print(f"splits: {size_mb:.0f} MB")
+        for workers in args.workers:
+            print(f"{workers} workers")
+            for mode in MODES:
+                result = run(
+                    mode, workers, sources[mode], arrays if mode == "pickle" else None
+                )
+                print(
+                    f"  {mode:<7} load {result['load_ms']:7.1f}ms  "
+                    f"all ready {result['ready_ms']:7.0f}ms  "
+                    f"USS/worker {result['uss_mb']:7.1f}MB  "
+                    f"PSS total {result['pss_total_mb']:7.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Risk-tiered model routing against a single model for every report.
+
+Streams reports for --patients synthetic patients through the diagnostic
+service twice: once with every report on the large model and its full token
+budget, once with the routing table (LLM_ROUTING format, --routing). The LLM
+is the stub with a per-model speed (--speeds, seconds of TTFT and per token),
+standing in for e.g. llama3.2:1b vs llama3.1:8b on the same host, so the
+result reflects the speeds given, not a measured model. Reports mean and p95
+report latency overall and per tier.
+
+The trained model is very decisive (synthetic patients are almost all "high"
+confidence), so --mix can override the confidence of each prediction with a
+given share per level to see the effect on a less clear-cut population:
+
+    python -m benchmarks.bench_model_routing --patients 100 --concurrency 16
+    python -m benchmarks.bench_model_routing --mix high=0.6,medium=0.25,low=0.15
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.model_routing.tiered_model_router import (
+    RoutingTier,
+    TieredModelRouter,
+    parse_routing_table,
+)
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+
+DEFAULT_ROUTING = [
+    {"name": "fast", "confidence": ["high"], "model": "small", "max_tokens": 250},
+    {"name": "standard", "confidence": ["medium"], "model": "small", "max_tokens": 400},
+    {"name": "careful", "model": "large", "max_tokens": 600},
+]
+DEFAULT_SPEEDS = {"small": [0.05, 0.002], "large": [0.2, 0.006]}
+
+
+class MixedConfidencePrediction:
+    """Real predictions with the confidence drawn from the --mix shares"""
+
+    def __init__(self, inner: DiabetesPredictionService, mix: Dict[str, float]):
+        self.inner = inner
+        self.levels = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(5)
+
+    def predict(self, patient_data):
+        result = dict(self.inner.predict(patient_data))
+        result["confidence"] = self.rng.choices(self.levels, self.weights)[0]
+        return result
+
+
+class PerModelStub(StubLLMService):
+    """Stub LLM whose TTFT and token delay depend on the requested model"""
+
+    def __init__(self, envs: ConfigEnvs, speeds: Dict[str, Tuple[float, float]]):
+        super().__init__(envs, tokens=10_000, capacity=0)
+        self.speeds = speeds
+
+    async def generate_response(
+        self,
+        user_input: str,
+        system_prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        **kwargs,
+    ):
+        ttft, token_delay = self.speeds[model]
+        await asyncio.sleep(ttft)
+        # Um sleep por lote de 10 tokens: o custo do timer não domina a medida
+        for i in range(0, max_tokens, 10):
+            await asyncio.sleep(token_delay * min(10, max_tokens - i))
+            yield " token" * min(10, max_tokens - i)
+
+
+def make_patients(n: int, seed: int = 11) -> list:
+    # Faixas largas dos marcadores: casos negativos e positivos
+    rng = random.Random(seed)
+    patients = []
+    for i in range(n):
+        patient = dict(SMOKE_BATCH[i % len(SMOKE_BATCH)])
+        patient["age"] = round(rng.uniform(20, 85), 0)
+        patient["bmi"] = round(rng.uniform(18, 42), 1)
+        patient["hba1c"] = round(rng.uniform(4.5, 10.0), 1)
+        patient["glucose_fasting"] = round(rng.uniform(70, 200), 0)
+        patient["glucose_postprandial"] = round(rng.uniform(90, 260), 0)
+        patient["diabetes_risk_score"] = round(rng.uniform(10, 60), 1)
+        patients.append(patient)
+    return patients
+
+
+async def run(service: DiabetesDiagnosticService, patients: list, concurrency: int):
+    latencies = LatencyStats(window=1_000_000)
+    queue = list(patients)
+
+    async def user():
+        while queue:
+            patient = queue.pop()
+            start = time.perf_counter()
+            async for _ in service.generate_diagnostic_report_stream(patient):
+                pass
+            latencies.record(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def print_line(label: str, summary: dict, extra: str = "") -> None:
+    print(
+        f"  {label:<14} n={summary['count']:<5} mean={summary['mean_ms']}ms "
+        f"p95={summary['p95_ms']}ms {extra}"
+    )
+
+
+async def main_async(args):
+    envs = ConfigEnvs()
+    tiers = parse_routing_table(args.routing)
+    speeds = {model: tuple(v) for model, v in json.loads(args.speeds).items()}
+    llm = PerModelStub(envs, speeds)
+    prediction_service = DiabetesPredictionService()
+    if args.mix:
+        mix = {
+            level: float(share)
+            for level, share in (item.split("=") for item in args.mix.split(","))
+        }
+        prediction_service = MixedConfidencePrediction(prediction_service, mix)
+    patients = make_patients(args.patients)
+
+    largest = tiers[-1]
+    baseline_router = TieredModelRouter(
+        [RoutingTier("single", largest.models, largest.max_tokens)]
+    )
+    routed_router = TieredModelRouter(tiers)
+
+    for name, router in (("single model", baseline_router), ("routed", routed_router)):
+        service = DiabetesDiagnosticService(
+            prediction_service=prediction_service,
+            llm_service=llm,
+            model_router=router,
+        )
+        latencies, elapsed = await run(service, patients, args.concurrency)
+        print(f"{name}: {len(patients) / elapsed:.1f} reports/s")
+        print_line("all", latencies.summary())
+        if router is routed_router:
+            for tier in router.status()["tiers"]:
+                print_line(
+                    tier["name"],
+                    tier["latency"],
+                    f"models={tier['routed_models']} max_tokens={tier['max_tokens']}",
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--routing", default=json.dumps(DEFAULT_ROUTING))
+    parser.add_argument("--speeds", default=json.dumps(DEFAULT_SPEEDS))
+    parser.add_argument("--mix", help="e.g. high=0.6,medium=0.25,low=0.15")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
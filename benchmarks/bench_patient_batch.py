@@ -0,0 +1,128 @@
+"""
+PatientBatch versus list of dicts: memory per 1M patients, conversion overhead
+and end-to-end scoring time.
+
+Memory is measured with tracemalloc for the three shapes a batch has had on the
+way to the model: JSON-mode dicts, the pandas DataFrame the encoder built and
+the columnar PatientBatch. Timings compare the old path (validate -> dicts ->
+DataFrame -> encode) with validate -> PatientBatch -> encode_batch, and a
+whole /prediction/batch request fed with dicts versus a PatientBatch.
+
+    python -m benchmarks.bench_patient_batch --memory-rows 1000000 --rows 10000
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from api.application.dto.diabetes_prediction import validate_patient_batch
+from api.application.dto.patient_batch import PatientBatch, validate_patient_columns
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import (
+    FEATURE_ORDER,
+    SMOKE_BATCH,
+)
+
+
+def make_records(n: int) -> list:
+    rng = random.Random(42)
+    records = []
+    for i in range(n):
+        record = dict(SMOKE_BATCH[i % len(SMOKE_BATCH)])
+        record["age"] = round(rng.uniform(18, 90), 1)
+        record["bmi"] = round(rng.uniform(18, 40), 1)
+        records.append(record)
+    return records
+
+
+def traced_bytes(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def bench_memory(n: int) -> None:
+    records = make_records(n)
+    per_million = 1_000_000 / n
+    sizes = {
+        "list of dicts (JSON mode)": traced_bytes(lambda: make_records(n)),
+        "pandas DataFrame": traced_bytes(lambda: pd.DataFrame(records)[FEATURE_ORDER]),
+        "PatientBatch": traced_bytes(lambda: PatientBatch.from_records(records)),
+    }
+    print(f"memory, {n} patients (scaled to 1M):")
+    for name, size in sizes.items():
+        print(f"  {name:<27} {size * per_million / 2**20:8.1f} MiB")
+
+
+def median_time(fn, repeat: int) -> float:
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def bench_timings(n: int, repeat: int) -> None:
+    records = make_records(n)
+    payload = json.dumps(records).encode()
+    service = DiabetesPredictionService()
+    loaded = service.active_model
+    batch = PatientBatch.from_records(records)
+
+    timings = {
+        "validate -> dicts": lambda: validate_patient_batch(payload),
+        "validate -> PatientBatch": lambda: validate_patient_columns(payload),
+        "dicts -> DataFrame -> encode": lambda: loaded.encode(pd.DataFrame(records)),
+        "dicts -> PatientBatch": lambda: PatientBatch.from_records(records),
+        "PatientBatch -> encode_batch": lambda: loaded.encode_batch(batch),
+        "request (dicts)": lambda: service.predict_batch(
+            validate_patient_batch(payload)
+        ),
+        "request (PatientBatch)": lambda: service.predict_batch(
+            validate_patient_columns(payload)
+        ),
+    }
+    print(f"\ntimings, {n} patients (median of {repeat}):")
+    for name, fn in timings.items():
+        print(f"  {name:<29} {median_time(fn, repeat) * 1000:9.2f} ms")
+
+    single = SMOKE_BATCH[0]
+    print("\nsingle patient predict():")
+    print(
+        "  DataFrame path               "
+        f"{median_time(lambda: loaded.preprocess(pd.DataFrame([single])), 200) * 1e6:9.0f} us"
+        " (encode + scale only)"
+    )
+    print(
+        "  PatientBatch path            "
+        f"{median_time(lambda: service.predict(single), 200) * 1e6:9.0f} us"
+        " (whole predict)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--memory-rows", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    bench_memory(args.memory_rows)
+    bench_timings(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
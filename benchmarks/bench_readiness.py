@@ -0,0 +1,93 @@
+"""
+Cost of /ready: cached deep checks x probing the LLM on every request.
+
+A load balancer polls /ready --poll-rate times per second for --duration
+seconds while the LLM takes --probe-latency seconds to list its models:
+
+- per-request: every poll calls the provider before answering;
+- cached:      an LLMProbe refreshes every --interval seconds in the
+               background and the poll only reads memory (Readiness.check).
+
+Reports the /ready latency and the calls that reached the provider.
+
+    python -m benchmarks.bench_readiness --poll-rate 50 --probe-latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.monitoring.readiness import LLMProbe, Readiness
+
+
+class SlowProvider:
+    """LLM whose model listing takes a fixed time"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def get_available_models(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return ["stub"]
+
+
+def make_readiness(probe):
+    registry = SimpleNamespace(active=SimpleNamespace(version="v1"))
+    admission = SimpleNamespace(
+        in_use=2, queue_depth=1, max_concurrency=4, max_queue_size=64
+    )
+    return Readiness(registry, admission, probe)
+
+
+async def run(mode: str, args):
+    provider = SlowProvider(args.probe_latency)
+    probe = LLMProbe(provider, interval=args.interval, timeout=5.0)
+    readiness = make_readiness(probe)
+    stats = LatencyStats(1_000_000)
+
+    async def poll():
+        start = time.perf_counter()
+        if mode == "per-request":
+            await probe.probe()
+        readiness.check()
+        stats.record(time.perf_counter() - start)
+
+    if mode == "cached":
+        probe.start()
+    polls = []
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        polls.append(asyncio.create_task(poll()))
+        await asyncio.sleep(1 / args.poll_rate)
+    await asyncio.gather(*polls)
+    await probe.stop()
+    return stats.summary(), provider.calls, len(polls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--poll-rate", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--probe-latency", type=float, default=0.2)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.poll_rate:.0f} polls/s for {args.duration:.0f}s, "
+        f"LLM answers the probe in {args.probe_latency * 1000:.0f}ms"
+    )
+    for mode in ("per-request", "cached"):
+        summary, calls, polls = asyncio.run(run(mode, args))
+        print(
+            f"  {mode:<11} /ready p50={summary['p50_ms']:8.3f}ms "
+            f"p99={summary['p99_ms']:8.3f}ms  provider calls {calls:4d} "
+            f"for {polls} polls"
+        )
+
+
+if __name__ == "__main__":
+    main()
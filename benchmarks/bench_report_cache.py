@@ -0,0 +1,128 @@
+"""
+Approximate report cache: hit rate, lookup latency and memory footprint.
+
+Lookup latency and memory are measured with N entries in a single bucket (the
+worst case: every lookup scans all of them). Hit rate is measured on a
+synthetic population of patient archetypes with small per-visit variations
+(gaussian noise in the scaled space), replayed through lookup/store as the
+diagnostic service does, for a few max_distance values.
+
+    python -m benchmarks.bench_report_cache --entries 100000
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+
+from api.infra.services.predict_services.model_registry import FEATURE_ORDER
+from api.infra.services.report_cache.approximate_report_cache import (
+    ApproximateReportCache,
+)
+
+PREDICTION = {
+    "has_diabetes": True,
+    "probability": 0.72,
+    "threshold_used": 0.59,
+    "confidence": "high",
+    "model_version": "bench",
+}
+
+
+def patient(vector: np.ndarray) -> dict:
+    return {name: round(float(v) * 100, 1) for name, v in zip(FEATURE_ORDER, vector)}
+
+
+def fill(cache: ApproximateReportCache, vectors: np.ndarray, report_chars: int):
+    for i, vector in enumerate(vectors):
+        report = f"report {i} ".ljust(report_chars, "x")
+        cache.store(vector, patient(vector), PREDICTION, report)
+
+
+def measure_lookups(cache, queries) -> list:
+    timings = []
+    for query in queries:
+        data = patient(query)
+        start = time.perf_counter()
+        cache.lookup(query, data, PREDICTION)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_scale(args):
+    rng = np.random.default_rng(0)
+    vectors = rng.random((args.entries, len(FEATURE_ORDER)))
+
+    tracemalloc.start()
+    cache = ApproximateReportCache(max_distance=0.05, levels=args.levels)
+    start = time.perf_counter()
+    fill(cache, vectors, args.report_chars)
+    fill_time = time.perf_counter() - start
+    total_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    misses = measure_lookups(cache, rng.random((args.lookups, len(FEATURE_ORDER))))
+    near = vectors[rng.integers(0, args.entries, args.lookups)] + rng.normal(
+        0, 0.005, (args.lookups, len(FEATURE_ORDER))
+    )
+    hits = measure_lookups(cache, near)
+
+    status = cache.status()
+    print(f"{args.entries} entries, one bucket, {args.report_chars}-char reports")
+    print(f"  fill: {fill_time:.2f}s ({fill_time / args.entries * 1e6:.1f}us/store)")
+    for name, timings in (("miss (full scan)", misses), ("near hit", hits)):
+        timings = sorted(timings)
+        print(
+            f"  lookup {name:<16} p50 {statistics.median(timings) * 1e6:7.0f}us"
+            f"  p99 {timings[int(len(timings) * 0.99) - 1] * 1e6:7.0f}us"
+        )
+    print(f"  index (vectors + norms): {status['index_bytes'] / 2**20:.1f} MiB")
+    print(
+        f"  total with reports:      {total_bytes / 2**20:.1f} MiB "
+        f"({total_bytes / args.entries:.0f} B/entry)"
+    )
+
+
+def bench_hit_rate(args):
+    rng = np.random.default_rng(1)
+    archetypes = rng.random((args.archetypes, len(FEATURE_ORDER)))
+    visits = archetypes[rng.integers(0, args.archetypes, args.visits)]
+    visits = visits + rng.normal(0, args.noise, visits.shape)
+
+    print(
+        f"\nhit rate: {args.visits} requests from {args.archetypes} archetypes, "
+        f"noise sigma {args.noise} (scaled units)"
+    )
+    for max_distance in args.distances:
+        cache = ApproximateReportCache(max_distance=max_distance, levels=args.levels)
+        exact = ApproximateReportCache(max_distance=0.0, levels=args.levels)
+        for vector in visits:
+            data = patient(vector)
+            for c in (cache, exact):
+                if c.lookup(vector, data, PREDICTION) is None:
+                    c.store(vector, data, PREDICTION, "report")
+        print(
+            f"  max_distance {max_distance:<5} hit rate {cache.status()['hit_rate']:.1%}"
+            f"  (exact quantized match only: {exact.status()['hit_rate']:.1%})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--levels", type=int, default=100)
+    parser.add_argument("--report-chars", type=int, default=1500)
+    parser.add_argument("--archetypes", type=int, default=2000)
+    parser.add_argument("--visits", type=int, default=20000)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--distances", type=float, nargs="+", default=[0.02, 0.05, 0.1])
+    args = parser.parse_args()
+    bench_scale(args)
+    bench_hit_rate(args)
+
+
+if __name__ == "__main__":
+    main()
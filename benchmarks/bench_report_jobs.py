@@ -0,0 +1,117 @@
+"""
+Throughput of the asynchronous report job queue.
+
+Queues N report jobs against the stub LLM and measures how long K workers take
+to drain them. Then simulates a restart: the service is stopped halfway, a new
+service is opened on the same SQLite file and finishes the remaining jobs.
+
+    python -m benchmarks.bench_report_jobs --jobs 200 --workers 1 4 8
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.jobs.report_job_service import ReportJobService
+from api.infra.services.jobs.report_job_store import ReportJobStore
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+
+PREDICTION = {
+    "has_diabetes": True,
+    "probability": 0.72,
+    "threshold_used": 0.59,
+    "confidence": "high",
+    "top_factors": [],
+}
+
+
+class FixedPredictionService:
+    """Constant prediction, so the benchmark measures only the queue and the LLM"""
+
+    def predict(self, _patient_data):
+        return PREDICTION
+
+
+def make_service(db_path: Path, workers: int, args) -> ReportJobService:
+    prediction_service = FixedPredictionService()
+    llm = StubLLMService(
+        envs=ConfigEnvs(),
+        ttft=args.ttft,
+        token_delay=args.token_delay,
+        tokens=args.tokens,
+    )
+    return ReportJobService(
+        store=ReportJobStore(db_path),
+        diagnostic_service=DiabetesDiagnosticService(prediction_service, llm),
+        prediction_service=prediction_service,
+        workers=workers,
+        poll_interval=0.05,
+    )
+
+
+async def drain(service: ReportJobService, job_ids) -> float:
+    start = time.perf_counter()
+    service.start()
+    for job_id in job_ids:
+        await service.wait(job_id, timeout=600)
+    elapsed = time.perf_counter() - start
+    await service.stop()
+    return elapsed
+
+
+async def run(args):
+    service_time = args.ttft + args.token_delay * args.tokens
+    print(f"stub report ~{service_time * 1000:.0f}ms, {args.jobs} jobs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            db_path = Path(tmp) / f"jobs_{workers}.sqlite3"
+            service = make_service(db_path, workers, args)
+            job_ids = [
+                service.submit(SMOKE_BATCH[i % len(SMOKE_BATCH)])["job_id"]
+                for i in range(args.jobs)
+            ]
+            elapsed = await drain(service, job_ids)
+            print(
+                f"workers={workers:<3} {elapsed:7.2f}s "
+                f"{args.jobs / elapsed:7.1f} jobs/s  {service.store.counts()}"
+            )
+            service.store.close()
+
+        # Restart no meio da fila
+        workers = max(args.workers)
+        db_path = Path(tmp) / "jobs_restart.sqlite3"
+        first = make_service(db_path, workers, args)
+        job_ids = [first.submit(SMOKE_BATCH[0])["job_id"] for _ in range(args.jobs)]
+        first.start()
+        while first.store.counts().get(ReportJobStore.COMPLETED, 0) < args.jobs // 2:
+            await asyncio.sleep(0.01)
+        await first.stop()
+        before = first.store.counts()
+        first.store.close()
+
+        second = make_service(db_path, workers, args)
+        elapsed = await drain(second, job_ids)
+        after = second.store.counts()
+        second.store.close()
+        print(f"restart: before={before} after={after} (resumed in {elapsed:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--tokens", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
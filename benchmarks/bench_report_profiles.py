@@ -0,0 +1,164 @@
+"""
+Completion tokens and latency of the streamed report per length profile.
+
+The stub LLM behaves like a verbose model: it writes every section it is
+asked for (--words-per-section tokens each) and, after the END marker,
+keeps going with the remaining sections and a closing note. Without a
+profile (legacy prompt) nothing bounds it. With a profile the generation
+ends at max_tokens, at a provider stop sequence or, when the provider
+ignores stop sequences (--ignore-stop), at the early stop of the stream,
+which closes the LLM generation once the profile sections are complete.
+
+--clients reports are streamed at once against a stub LLM that processes
+--capacity generations at the same time.
+
+    python -m benchmarks.bench_report_profiles --clients 8 --capacity 4
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.services.report_profiles import ReportProfiles
+from api.infra.utils.prompt_builder import REPORT_END_MARKER, REPORT_SECTIONS
+
+PREDICTION = {
+    "has_diabetes": True,
+    "probability": 0.72,
+    "threshold_used": 0.59,
+    "confidence": "high",
+    "top_factors": [],
+}
+
+
+class FixedPredictionService:
+    """Constant prediction, so the benchmark measures only the LLM part"""
+
+    def predict(self, _patient_data):
+        return PREDICTION
+
+
+class VerboseLLMService(StubLLMService):
+    """Stub LLM that writes sectioned reports and overruns the requested ones"""
+
+    generated = 0
+
+    def __init__(self, words_per_section: int, honor_stop: bool, **kwargs):
+        super().__init__(**kwargs)
+        self.words_per_section = words_per_section
+        self.honor_stop = honor_stop
+
+    def _report(self, prompt: str):
+        requested = [s for s in REPORT_SECTIONS if f"## {s.title}\n" in prompt]
+        # Seções pedidas primeiro; depois do marcador o modelo continua com as
+        # outras e uma nota de encerramento
+        others = [s for s in REPORT_SECTIONS if s not in requested]
+        for index, section in enumerate(requested + others):
+            if requested and index == len(requested):
+                yield f"\n{REPORT_END_MARKER}"
+            yield ("\n\n" if index else "") + f"## {section.title}\n\n"
+            for i in range(self.words_per_section):
+                yield (" " if i else "") + self._words[i % len(self._words)]
+        if requested and not others:
+            yield f"\n{REPORT_END_MARKER}"
+        for i in range(self.words_per_section // 2):
+            yield " " + self._words[i % len(self._words)]
+
+    async def generate_response(
+        self,
+        user_input: str,
+        system_prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        top_p: float = 0.9,
+        max_tokens: Optional[int] = None,
+        stop: Optional[List[str]] = None,
+        **kwargs,
+    ):
+        if self._server_slots is None:
+            self._server_slots = asyncio.Semaphore(self.capacity)
+        stop = (stop or []) if self.honor_stop else []
+        async with self._server_slots:
+            await asyncio.sleep(self.ttft)
+            for i, chunk in enumerate(self._report(user_input)):
+                if max_tokens and i >= max_tokens:
+                    return
+                if any(sequence in chunk for sequence in stop):
+                    return
+                if i:
+                    await asyncio.sleep(self.token_delay)
+                VerboseLLMService.generated += 1
+                yield chunk
+
+
+async def client(service, profile, stats: LatencyStats) -> int:
+    start = time.perf_counter()
+    size = 0
+    async for chunk in service.generate_diagnostic_report_stream(
+        SMOKE_BATCH[0], profile=profile
+    ):
+        size += len(chunk)
+    stats.record(time.perf_counter() - start)
+    return size
+
+
+async def run(profile, args):
+    VerboseLLMService.generated = 0
+    llm = VerboseLLMService(
+        words_per_section=args.words_per_section,
+        honor_stop=not args.ignore_stop,
+        envs=ConfigEnvs(),
+        ttft=args.ttft,
+        token_delay=args.token_delay,
+        capacity=args.capacity,
+    )
+    profiles = ReportProfiles() if profile else None
+    service = DiabetesDiagnosticService(
+        FixedPredictionService(), llm, report_profiles=profiles
+    )
+    stats = LatencyStats(100_000)
+    sizes = await asyncio.gather(
+        *(client(service, profile, stats) for _ in range(args.clients))
+    )
+    early_stops = (
+        profiles.status()["profiles"][profile]["early_stops"] if profiles else 0
+    )
+    return VerboseLLMService.generated, sum(sizes), stats.summary(), early_stops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--words-per-section", type=int, default=150)
+    parser.add_argument("--ignore-stop", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, capacity {args.capacity}, "
+        f"{args.words_per_section} tokens per section, provider "
+        f"{'ignores' if args.ignore_stop else 'honors'} stop sequences"
+    )
+    print(
+        f"{'profile':>9} {'tokens/report':>14} {'chars/report':>13} "
+        f"{'p50':>8} {'p95':>8} {'early stops':>12}"
+    )
+    for profile in (None, "full", "standard", "summary"):
+        generated, chars, summary, early_stops = asyncio.run(run(profile, args))
+        print(
+            f"{profile or 'legacy':>9} {generated / args.clients:14.1f} "
+            f"{chars / args.clients:13.0f} {summary['p50_ms']:6.0f}ms "
+            f"{summary['p95_ms']:6.0f}ms {early_stops:12d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
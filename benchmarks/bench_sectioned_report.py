@@ -0,0 +1,113 @@
+"""
+End-to-end latency of the diagnostic report: single prompt x parallel sections.
+
+Generates the same report length with the stub LLM in both modes. In sectioned
+mode each of the sections produces 1/len(sections) of the tokens, all sections
+running at once. The stub capacity emulates how many generations the LLM server
+processes at the same time (0 = unlimited); with capacity 1 the sections are
+serialized by the server and the mode brings no gain. The stub's blocking
+invoke() does not model capacity, so the invoke column is only measured with
+unlimited capacity.
+
+    python -m benchmarks.bench_sectioned_report --reports 5 --capacity 0 1 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.utils.prompt_builder import REPORT_SECTIONS
+
+PREDICTION = {
+    "has_diabetes": True,
+    "probability": 0.72,
+    "threshold_used": 0.59,
+    "confidence": "high",
+    "top_factors": [],
+}
+
+
+class FixedPredictionService:
+    """Constant prediction, so the benchmark measures only the LLM part"""
+
+    def predict(self, _patient_data):
+        return PREDICTION
+
+
+def make_service(sectioned: bool, capacity: int, args) -> DiabetesDiagnosticService:
+    tokens = args.tokens // len(REPORT_SECTIONS) if sectioned else args.tokens
+    llm = StubLLMService(
+        envs=ConfigEnvs(),
+        ttft=args.ttft,
+        token_delay=args.token_delay,
+        tokens=tokens,
+        capacity=capacity,
+    )
+    return DiabetesDiagnosticService(FixedPredictionService(), llm, sectioned=sectioned)
+
+
+async def stream_once(service: DiabetesDiagnosticService):
+    start = time.perf_counter()
+    first_token = None
+    async for chunk in service.generate_diagnostic_report_stream(SMOKE_BATCH[0]):
+        # Ignora preâmbulo e cabeçalhos de seção: mede o primeiro texto da LLM
+        if first_token is None and not chunk.startswith(("{", "## ", "\n\n## ")):
+            first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+
+def invoke_once(service: DiabetesDiagnosticService) -> float:
+    start = time.perf_counter()
+    service.generate_diagnostic_report(SMOKE_BATCH[0])
+    return time.perf_counter() - start
+
+
+async def run(args):
+    single_time = args.ttft + args.token_delay * args.tokens
+    print(
+        f"{args.tokens} tokens per report, stub single-prompt ~{single_time * 1000:.0f}ms, "
+        f"{len(REPORT_SECTIONS)} sections"
+    )
+    print(
+        f"{'mode':>10} {'capacity':>9} {'stream ttft':>12} "
+        f"{'stream total':>13} {'invoke total':>13}"
+    )
+    for capacity in args.capacity:
+        for sectioned in (False, True):
+            service = make_service(sectioned, capacity, args)
+            ttfts, totals, invokes = [], [], []
+            for _ in range(args.reports):
+                ttft, total = await stream_once(service)
+                ttfts.append(ttft)
+                totals.append(total)
+                if not capacity:
+                    invokes.append(await asyncio.to_thread(invoke_once, service))
+            invoke = (
+                f"{statistics.median(invokes) * 1000:>11.0f}ms" if invokes else "n/a"
+            )
+            print(
+                f"{'sectioned' if sectioned else 'single':>10} "
+                f"{capacity or 'inf':>9} "
+                f"{statistics.median(ttfts) * 1000:>10.0f}ms "
+                f"{statistics.median(totals) * 1000:>11.0f}ms "
+                f"{invoke:>13}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reports", type=int, default=5)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--ttft", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[0, 1, 4])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
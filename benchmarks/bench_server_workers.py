@@ -0,0 +1,156 @@
+"""
+Worker-count sweep of the production server against the stub LLM.
+
+For every worker count the API is started with `python -m api --production`
+(LLM_PROVIDER=stub, SERVER_WORKERS=N) on a free port, driven by a closed loop
+of --concurrency clients for --duration seconds, and stopped. Reports
+throughput and latency per worker count and the knee: the smallest count
+whose throughput is within --knee-tolerance of the best one.
+
+LLM_MAX_CONCURRENCY / LLM_MAX_QUEUE_SIZE apply per worker process, so 503s
+(shed) drop as workers are added; they are reported apart from errors. The
+load generator runs on the same machine, so pin it or the server with taskset
+on hosts where that matters.
+
+    python -m benchmarks.bench_server_workers --workers 1 2 4 8 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "LLM_PROVIDER": "stub",
+        "STUB_LLM_TTFT": str(args.ttft),
+        "STUB_LLM_TOKEN_DELAY": str(args.token_delay),
+        "STUB_LLM_TOKENS": str(args.tokens),
+        "SERVER_WORKERS": str(workers),
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "AUDIT_LOG_ENABLED": "false",
+        "TRACE_EXPORTER": "none",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "api", "--production"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, workers: int, timeout: float = 60):
+    # Espera todos os workers responderem (cada um tem seu próprio pid)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                await asyncio.sleep(1.0 + 0.25 * workers)
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def closed_loop(client: httpx.AsyncClient, endpoint: str, args):
+    latencies = LatencyStats(window=1_000_000)
+    counters = {"shed": 0, "errors": 0}
+    deadline = time.perf_counter() + args.duration
+
+    async def user(i: int):
+        patient = SMOKE_BATCH[i % len(SMOKE_BATCH)]
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with client.stream("POST", endpoint, json=patient) as response:
+                    async for _ in response.aiter_bytes():
+                        pass
+                if response.status_code == 503:
+                    # Admission control da LLM (limite por processo worker)
+                    counters["shed"] += 1
+                    continue
+                if response.status_code != 200:
+                    counters["errors"] += 1
+                    continue
+                latencies.record(time.perf_counter() - start)
+            except httpx.HTTPError:
+                counters["errors"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(args.concurrency)))
+    return latencies, counters, time.perf_counter() - start
+
+
+async def run_sweep(args):
+    results = []
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port, args)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+            ) as client:
+                await wait_ready(client, workers)
+                latencies, counters, elapsed = await closed_loop(
+                    client, args.endpoint, args
+                )
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        summary = latencies.summary()
+        throughput = latencies.count / elapsed
+        results.append((workers, throughput))
+        print(
+            f"workers={workers:<3} throughput={throughput:7.1f} req/s "
+            f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+            f"shed={counters['shed']} errors={counters['errors']}"
+        )
+
+    best = max(throughput for _, throughput in results)
+    knee = next(
+        workers
+        for workers, throughput in results
+        if throughput >= best * (1 - args.knee_tolerance)
+    )
+    print(
+        f"knee: {knee} workers (within {args.knee_tolerance:.0%} of the best "
+        f"{best:.1f} req/s); CPUs on this host: {os.cpu_count()}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--endpoint", default="/diagnostic/stream")
+    parser.add_argument("--ttft", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.001)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--knee-tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run_sweep(args))
+
+
+if __name__ == "__main__":
+    main()
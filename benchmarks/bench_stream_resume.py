@@ -0,0 +1,145 @@
+"""
+LLM tokens and time to a full report for clients whose connection drops.
+
+--clients clients stream a report each (stub LLM behind the diagnostic
+service, --tokens tokens, --capacity generations at once); with probability
+--drop-rate a client's connection drops at a random point of the report and
+it reconnects after --reconnect-delay seconds:
+
+- resubmit: the dropped connection cancels the generation and the client
+  posts the patient again (the behavior without resumable streams);
+- resume:   the generation runs in a ResumableStreams buffer and the client
+  resumes from the bytes it had received.
+
+Reports the LLM tokens generated per finished report, the time until each
+client has the whole report and the tokens the resumes avoided.
+
+    python -m benchmarks.bench_stream_resume --clients 40 --drop-rate 0.5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+from api.infra.utils.data_formatter import format_stream_preamble
+from api.infra.web.resumable import ResumableStreams
+
+PREDICTION = {
+    "has_diabetes": True,
+    "probability": 0.72,
+    "threshold_used": 0.59,
+    "confidence": "high",
+    "top_factors": [],
+}
+
+
+class FixedPredictionService:
+    """Constant prediction, so the benchmark measures only the LLM part"""
+
+    def predict(self, _patient_data):
+        return PREDICTION
+
+
+class CountingLLMService(StubLLMService):
+    """Stub LLM that counts the tokens it actually generated"""
+
+    generated = 0
+
+    async def _generate(self, max_tokens=None):
+        async for chunk in super()._generate(max_tokens):
+            CountingLLMService.generated += 1
+            yield chunk
+
+
+async def read(chunks, limit=None) -> bytes:
+    received = b""
+    async for chunk in chunks:
+        received += chunk if isinstance(chunk, bytes) else chunk.encode()
+        if limit is not None and len(received) >= limit:
+            break
+    return received
+
+
+async def client(mode, service, streams, rng, args, stats: LatencyStats):
+    start = time.perf_counter()
+    patient = SMOKE_BATCH[0]
+    drop_at = None
+    if rng.random() < args.drop_rate:
+        # Queda em um ponto do texto da LLM (o stub gera ~6 bytes por token)
+        preamble = len(format_stream_preamble(PREDICTION).encode())
+        drop_at = preamble + rng.randint(1, args.tokens * 6)
+
+    if mode == "resubmit":
+        stream = service.generate_diagnostic_report_stream(patient)
+        received = await read(stream, drop_at)
+        await stream.aclose()
+        if drop_at is not None and len(received) >= drop_at:
+            await asyncio.sleep(args.reconnect_delay)
+            await read(service.generate_diagnostic_report_stream(patient))
+    else:
+        buffer = streams.start(service.generate_diagnostic_report_stream(patient))
+        reader = buffer.read()
+        received = await read(reader, drop_at)
+        await reader.aclose()
+        if drop_at is not None and len(received) >= drop_at:
+            await asyncio.sleep(args.reconnect_delay)
+            resumed = streams.resume(buffer.id, len(received))
+            await read(resumed.read(len(received)))
+    stats.record(time.perf_counter() - start)
+
+
+async def run(mode: str, args):
+    CountingLLMService.generated = 0
+    llm = CountingLLMService(
+        envs=ConfigEnvs(),
+        ttft=args.ttft,
+        token_delay=args.token_delay,
+        tokens=args.tokens,
+        capacity=args.capacity,
+    )
+    service = DiabetesDiagnosticService(
+        prediction_service=FixedPredictionService(), llm_service=llm
+    )
+    streams = ResumableStreams()
+    stats = LatencyStats(100_000)
+    rng = random.Random(7)
+    await asyncio.gather(
+        *(client(mode, service, streams, rng, args, stats) for _ in range(args.clients))
+    )
+    await streams.stop()
+    return CountingLLMService.generated, stats.summary(), streams.tokens_avoided
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--drop-rate", type=float, default=0.5)
+    parser.add_argument("--reconnect-delay", type=float, default=0.5)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=60)
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, {args.drop_rate:.0%} drop once, "
+        f"{args.tokens} tokens per report, capacity {args.capacity}"
+    )
+    for mode in ("resubmit", "resume"):
+        generated, summary, avoided = asyncio.run(run(mode, args))
+        print(
+            f"  {mode:<9} LLM tokens {generated:6d} "
+            f"({generated / args.clients:5.1f}/report)  "
+            f"full report p50={summary['p50_ms']:7.0f}ms "
+            f"p95={summary['p95_ms']:7.0f}ms  tokens avoided {avoided}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Overload test for LLM admission control.
+
+Drives the stub LLM (limited server capacity, like a single CPU Ollama) with an
+arrival rate above its capacity, with and without the AdmissionController, and
+reports latency of completed requests plus the shed rate.
+
+    python -m benchmarks.load_llm_admission --rate 15 --duration 10
+
+With --url the same open-loop load is sent to a running API instead
+(e.g. started with LLM_PROVIDER=stub STUB_LLM_CAPACITY=2):
+
+    python -m benchmarks.load_llm_admission --url http://localhost:8000 --rate 15
+
+With --cassette the recorded streams of a real model are replayed instead of
+the stub (timing scaled by --time-scale); a replayed model has no capacity
+limit of its own, so only the admission controller bounds concurrency:
+
+    python -m benchmarks.load_llm_admission --cassette data/cassettes/ollama.jsonl
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from api.application.services.llm_service import LLMOverloadedError
+from api.infra.config.env import ConfigEnvs
+from api.infra.monitoring.latency_stats import LatencyStats
+from api.infra.services.llm_services.admission_control import (
+    AdmissionControlledLLMService,
+    AdmissionController,
+)
+from api.infra.services.llm_services.cassette_llm_service import (
+    Cassette,
+    ReplayLLMService,
+)
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+
+
+async def open_loop(request, rate: float, duration: float, seed: int = 7):
+    """Poisson arrivals; returns (latency stats, shed count, error count)"""
+    rng = random.Random(seed)
+    latencies = LatencyStats(window=100_000)
+    counters = {"shed": 0, "errors": 0}
+    tasks = []
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await request()
+            latencies.record(time.perf_counter() - start)
+        except LLMOverloadedError:
+            counters["shed"] += 1
+        except Exception:
+            counters["errors"] += 1
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    return latencies, counters["shed"], counters["errors"]
+
+
+def report(label: str, latencies: LatencyStats, shed: int, errors: int):
+    total = latencies.count + shed + errors
+    summary = latencies.summary()
+    print(
+        f"{label:<22} completed={latencies.count:<5} shed={shed:<5} "
+        f"shed_rate={shed / total if total else 0:6.1%} "
+        f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms max={summary['max_ms']}ms"
+    )
+
+
+async def run_in_process(args):
+    envs = ConfigEnvs()
+    cassette = Cassette(args.cassette) if args.cassette else None
+
+    def make_stub():
+        if cassette is not None:
+            return ReplayLLMService(
+                envs=envs, cassette=cassette, time_scale=args.time_scale
+            )
+        return StubLLMService(
+            envs=envs,
+            ttft=args.ttft,
+            token_delay=args.token_delay,
+            tokens=args.tokens,
+            capacity=args.capacity,
+        )
+
+    unbounded = make_stub()
+
+    async def without_admission():
+        async for _ in unbounded.generate_response("patient", "system"):
+            pass
+
+    controller = AdmissionController(
+        name="stub",
+        max_concurrency=args.capacity,
+        max_queue_size=args.queue_size,
+        max_queue_time=args.max_queue_time,
+    )
+    limited = AdmissionControlledLLMService(make_stub(), controller)
+
+    async def with_admission():
+        async for _ in limited.generate_response("patient", "system"):
+            pass
+
+    service_time = args.ttft + args.token_delay * args.tokens
+    if cassette is not None:
+        service_time = (
+            args.time_scale
+            * sum(e["duration"] for e in cassette.entries)
+            / len(cassette)
+        )
+    print(
+        f"capacity ~{args.capacity / service_time:.1f} req/s, "
+        f"offered {args.rate:.1f} req/s for {args.duration:.0f}s"
+    )
+    report(
+        "without admission",
+        *await open_loop(without_admission, args.rate, args.duration),
+    )
+    report("with admission", *await open_loop(with_admission, args.rate, args.duration))
+    print(f"admission status: {controller.status()}")
+
+
+async def run_http(args):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+
+        async def request():
+            async with client.stream(
+                "POST", "/diagnostic/stream", json=SMOKE_BATCH[0]
+            ) as response:
+                if response.status_code == 503:
+                    raise LLMOverloadedError("503", 1)
+                response.raise_for_status()
+                async for _ in response.aiter_bytes():
+                    pass
+
+        report(
+            "http /diagnostic/stream",
+            *await open_loop(request, args.rate, args.duration),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=15.0, help="requests/s")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--capacity", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--max-queue-time", type=float, default=1.0)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--cassette", default=None, help="replay a recorded LLM")
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    asyncio.run(run_http(args) if args.url else run_in_process(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Records an LLM cassette from a live provider for LLM_PROVIDER=replay.
+
+Runs the real diagnostic pipeline (prediction + prompt + streamed report)
+for --patients synthetic patients against Ollama or OpenAI, one report at a
+time so the recorded timings are those of an idle model, and appends every
+call to the cassette. With --sectioned the per-section prompts are recorded
+too.
+
+    python -m benchmarks.record_llm_cassette --provider ollama --patients 20 \\
+        --out data/cassettes/ollama.jsonl
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+from pathlib import Path
+
+from api.infra.config.env import ConfigEnvs
+from api.infra.services.diagnostic_service import DiabetesDiagnosticService
+from api.infra.services.llm_services.cassette_llm_service import (
+    Cassette,
+    RecordingLLMService,
+)
+from api.infra.services.llm_services.ollama_llm_service import OllamaLLMService
+from api.infra.services.llm_services.openai_llm_service import OpenaiLLMService
+from api.infra.services.llm_services.stub_llm_service import StubLLMService
+from api.infra.services.predict_services.diabetes_prediction_service import (
+    DiabetesPredictionService,
+)
+from api.infra.services.predict_services.model_registry import SMOKE_BATCH
+
+PROVIDERS = {
+    "ollama": OllamaLLMService,
+    "openai": OpenaiLLMService,
+    "stub": StubLLMService,
+}
+
+
+def make_patients(n: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    patients = []
+    for i in range(n):
+        patient = dict(SMOKE_BATCH[i % len(SMOKE_BATCH)])
+        patient["age"] = round(rng.uniform(20, 85), 0)
+        patient["bmi"] = round(rng.uniform(19, 40), 1)
+        patient["hba1c"] = round(rng.uniform(4.5, 9.5), 1)
+        patient["glucose_fasting"] = round(rng.uniform(75, 180), 0)
+        patients.append(patient)
+    return patients
+
+
+async def record(args):
+    envs = ConfigEnvs()
+    cassette = Cassette(Path(args.out))
+    before = len(cassette)
+    llm = RecordingLLMService(
+        inner=PROVIDERS[args.provider](envs=envs),
+        cassette=cassette,
+        provider=args.provider,
+    )
+    service = DiabetesDiagnosticService(
+        prediction_service=DiabetesPredictionService(),
+        llm_service=llm,
+        sectioned=args.sectioned,
+    )
+
+    for i, patient in enumerate(make_patients(args.patients), 1):
+        stream = service.generate_diagnostic_report_stream(patient)
+        async for _ in stream:
+            pass
+        print(f"  recorded report {i}/{args.patients}", end="\r")
+
+    recorded = cassette.entries[before:]
+    ttfts = [e["chunks"][0][0] for e in recorded if e["chunks"]]
+    durations = [e["duration"] for e in recorded]
+    chunks = [len(e["chunks"]) for e in recorded]
+    print(f"\n{len(recorded)} calls appended to {cassette.path}")
+    if recorded:
+        print(
+            f"  ttft median {statistics.median(ttfts) * 1000:.0f}ms, "
+            f"duration median {statistics.median(durations):.2f}s, "
+            f"chunks median {statistics.median(chunks):.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="ollama")
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--out", default="data/cassettes/llm.jsonl")
+    parser.add_argument("--sectioned", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(record(args))
+
+
+if __name__ == "__main__":
+    main()